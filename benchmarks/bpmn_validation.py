@@ -0,0 +1,162 @@
+"""
+BPMN validation benchmark: single-pass graph validator vs the legacy checker.
+
+The legacy checker (kept here for comparison) built a full ElementTree and
+ran six ``findall`` traversals. validate_bpmn_graph streams parse events
+once, detaching elements as it goes, and additionally checks the process
+graph. Both run on synthetic diagrams of increasing size.
+
+Usage:
+    python -m benchmarks.bpmn_validation
+    python -m benchmarks.run validation
+"""
+
+import json
+import sys
+import time
+import tracemalloc
+import xml.etree.ElementTree as ET
+from typing import Any, Callable, Dict, List, Optional
+
+from src.components.generation.bpmn_validation import validate_bpmn_graph
+
+SIZES = (100, 1000, 10000)
+REPEATS = 5
+
+
+def legacy_validate(bpmn_text: str) -> tuple[bool, str]:
+    """The validator BPMNGenerator used before validate_bpmn_graph."""
+    try:
+        root = ET.fromstring(bpmn_text)
+        bpmn_ns = "http://www.omg.org/spec/BPMN/20100524/MODEL"
+        if bpmn_ns not in root.tag:
+            return False, f"Invalid BPMN namespace. Root tag: {root.tag}"
+        if root.find(f".//{{{bpmn_ns}}}process") is None:
+            return False, "No process element found"
+        if not root.findall(f".//{{{bpmn_ns}}}startEvent"):
+            return False, "No start event found"
+        if not root.findall(f".//{{{bpmn_ns}}}endEvent"):
+            return False, "No end event found"
+        tasks = root.findall(f".//{{{bpmn_ns}}}task")
+        gateways = root.findall(f".//{{{bpmn_ns}}}exclusiveGateway")
+        lanes = root.findall(f".//{{{bpmn_ns}}}lane")
+        flows = root.findall(f".//{{{bpmn_ns}}}sequenceFlow")
+        return True, (f"Valid BPMN XML - {len(tasks)} tasks, {len(gateways)} gateways, "
+                      f"{len(lanes)} lanes, {len(flows)} flows")
+    except ET.ParseError as e:
+        return False, f"XML parsing error: {str(e)}"
+
+
+def synthetic_bpmn(tasks: int, lanes: int = 4) -> str:
+    """
+    Build a valid diagram with a chain of tasks and a gateway every 10 tasks.
+
+    Args:
+        tasks: Number of tasks
+        lanes: Number of lanes tasks are spread over
+
+    Returns:
+        BPMN XML text including a BPMNDI section
+    """
+    nodes = ['<bpmn:startEvent id="Start"><bpmn:outgoing>Flow_0</bpmn:outgoing></bpmn:startEvent>']
+    flows = []
+    shapes = []
+    lane_refs: List[List[str]] = [[] for _ in range(lanes)]
+    previous, flow_index = "Start", 0
+
+    def connect(source: str, target: str, condition: bool = False) -> str:
+        nonlocal flow_index
+        flow_id = f"Flow_{flow_index}"
+        flow_index += 1
+        body = '<bpmn:conditionExpression xsi:type="bpmn:tFormalExpression">ok</bpmn:conditionExpression>' \
+            if condition else ""
+        flows.append(f'<bpmn:sequenceFlow id="{flow_id}" sourceRef="{source}" targetRef="{target}">{body}'
+                     f'</bpmn:sequenceFlow>')
+        return flow_id
+
+    for i in range(tasks):
+        task_id = f"Task_{i}"
+        incoming = connect(previous, task_id, condition=previous.startswith("Gateway"))
+        nodes.append(f'<bpmn:task id="{task_id}" name="Task {i}"><bpmn:incoming>{incoming}</bpmn:incoming>'
+                     f'<bpmn:outgoing>Flow_{flow_index}</bpmn:outgoing></bpmn:task>')
+        lane_refs[i % lanes].append(task_id)
+        shapes.append(f'<bpmndi:BPMNShape id="{task_id}_di" bpmnElement="{task_id}">'
+                      f'<dc:Bounds x="{i * 150}" y="100" width="100" height="80" /></bpmndi:BPMNShape>')
+        previous = task_id
+        if i % 10 == 9:
+            gateway_id = f"Gateway_{i}"
+            connect(previous, gateway_id)
+            connect(gateway_id, "End", condition=True)
+            nodes.append(f'<bpmn:exclusiveGateway id="{gateway_id}" />')
+            lane_refs[i % lanes].append(gateway_id)
+            previous = gateway_id
+    connect(previous, "End", condition=previous.startswith("Gateway"))
+    nodes.append('<bpmn:endEvent id="End" />')
+    lane_refs[0] += ["Start", "End"]
+
+    lane_xml = "".join(
+        f'<bpmn:lane id="Lane_{n}" name="Lane {n}">'
+        + "".join(f"<bpmn:flowNodeRef>{ref}</bpmn:flowNodeRef>" for ref in refs)
+        + "</bpmn:lane>"
+        for n, refs in enumerate(lane_refs)
+    )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<bpmn:definitions xmlns:bpmn="http://www.omg.org/spec/BPMN/20100524/MODEL" '
+        'xmlns:bpmndi="http://www.omg.org/spec/BPMN/20100524/DI" '
+        'xmlns:dc="http://www.omg.org/spec/DD/20100524/DC" '
+        'xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" id="Definitions_1">'
+        f'<bpmn:process id="Process_1" isExecutable="false"><bpmn:laneSet id="LaneSet_1">{lane_xml}</bpmn:laneSet>'
+        + "".join(nodes) + "".join(flows) +
+        '</bpmn:process><bpmndi:BPMNDiagram id="Diagram_1"><bpmndi:BPMNPlane id="Plane_1" bpmnElement="Process_1">'
+        + "".join(shapes) +
+        '</bpmndi:BPMNPlane></bpmndi:BPMNDiagram></bpmn:definitions>'
+    )
+
+
+def measure(validate: Callable[[str], Any], text: str, repeats: int = REPEATS) -> Dict[str, float]:
+    """Return best-of-N seconds and peak traced memory for one validator."""
+    seconds = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        validate(text)
+        seconds.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    validate(text)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"seconds": min(seconds), "peak_bytes": peak}
+
+
+def bench_validation(sizes=SIZES, repeats: int = REPEATS) -> Dict[str, Any]:
+    """Compare both validators on synthetic diagrams of each size."""
+    rows = []
+    for size in sizes:
+        text = synthetic_bpmn(size)
+        report = validate_bpmn_graph(text)
+        if not report.valid or report.warnings:
+            raise RuntimeError(f"Synthetic diagram is not clean: {report.errors + report.warnings}")
+        legacy = measure(legacy_validate, text, repeats)
+        graph = measure(validate_bpmn_graph, text, repeats)
+        rows.append({
+            "tasks": size,
+            "xml_bytes": len(text.encode('utf-8')),
+            "legacy": legacy,
+            "graph": graph,
+            "time_ratio": graph["seconds"] / legacy["seconds"],
+            "memory_ratio": graph["peak_bytes"] / legacy["peak_bytes"],
+        })
+        print(f"  {size:>6} tasks: legacy {legacy['seconds'] * 1000:8.2f} ms / {legacy['peak_bytes'] / 1e6:6.2f} MB, "
+              f"graph {graph['seconds'] * 1000:8.2f} ms / {graph['peak_bytes'] / 1e6:6.2f} MB")
+    return {"sizes": rows}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Print the comparison as JSON."""
+    print(json.dumps(bench_validation(), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,344 @@
+"""
+Local stand-in for the Anthropic Messages API.
+
+Serves ``POST /v1/messages`` (plain JSON and server-sent-event streaming) by
+replaying the recorded artifacts in ``outputs/``. The skill prompt in the
+first system block decides what is replayed:
+
+- transcript-analysis  -> outputs/analysis/*.md
+- bpmn-generation      -> outputs/bpmn-diagrams/*.bpmn (without the diagram
+                          section when the request asks for a local layout,
+                          as a JSON process graph in JSON mode)
+- process-optimization -> outputs/recommendations/*-recommendations-*.md (just
+                          the requested section for sectioned requests)
+
+Latency is simulated with a time to first token and an output token rate.
+Prompt caching is simulated too: system prefixes ending in a
+``cache_control`` block are remembered, and later requests sharing them
+report ``cache_read_input_tokens``.
+
+Run standalone with ``python -m benchmarks.mock_api --port 8765`` and point
+a ClientPool at it with ``ClientPool(base_url="http://127.0.0.1:8765")``.
+"""
+
+import argparse
+import hashlib
+import json
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from src.components.generation.bpmn_layout import LOCAL_LAYOUT_INSTRUCTION, strip_diagram
+from src.components.generation.bpmn_serializer import PROCESS_GRAPH_INSTRUCTION, process_graph_from_bpmn
+from src.components.optimization.recommendation_engine import SECTION_REQUEST, section_text
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+# Skill directory -> (artifact directory, glob)
+SKILL_ARTIFACTS = {
+    "transcript-analysis": ("outputs/analysis", "*.md"),
+    "bpmn-generation": ("outputs/bpmn-diagrams", "*.bpmn"),
+    "process-optimization": ("outputs/recommendations", "*-recommendations-*.md"),
+}
+
+CHARS_PER_TOKEN = 4
+
+
+@dataclass
+class MockConfig:
+    """Simulated model behaviour."""
+
+    time_to_first_token: float = 0.5
+    output_tokens_per_second: float = 80.0
+    tokens_per_chunk: int = 8
+    time_scale: float = 1.0  # Multiplies every simulated delay (0 disables them)
+
+
+def _tokens(text: str) -> int:
+    """Approximate the token count of a text."""
+    return max(1, len(text) // CHARS_PER_TOKEN)
+
+
+class ReplayLibrary:
+    """Recorded responses per skill, selected by the request's skill prompt."""
+
+    def __init__(self, project_root: Path = PROJECT_ROOT):
+        """
+        Load skill prompts and recorded artifacts.
+
+        Args:
+            project_root: Repository root containing skills/ and outputs/
+        """
+        self.skill_prompts: Dict[str, str] = {}
+        self.artifacts: Dict[str, List[str]] = {}
+        for skill, (directory, pattern) in SKILL_ARTIFACTS.items():
+            skill_path = project_root / "skills" / skill / "SKILL.md"
+            if skill_path.exists():
+                self.skill_prompts[skill] = skill_path.read_text(encoding='utf-8')
+            self.artifacts[skill] = [
+                path.read_text(encoding='utf-8')
+                for path in sorted((project_root / directory).glob(pattern))
+            ]
+
+    def identify_skill(self, system_messages: list) -> Optional[str]:
+        """Return the skill whose SKILL.md opens the system prompt."""
+        if not system_messages:
+            return None
+        first = system_messages[0].get("text", "") if isinstance(system_messages[0], dict) else ""
+        for skill, prompt in self.skill_prompts.items():
+            if first == prompt or first.startswith(prompt[:200]):
+                return skill
+        return None
+
+    def response_for(self, skill: Optional[str], user_message: str) -> str:
+        """Pick a recorded response deterministically from the user message."""
+        candidates = self.artifacts.get(skill) or []
+        if not candidates:
+            return f"No recorded output for skill {skill!r}"
+        # Section requests of one document share everything before the closing line
+        request_prefix, _, section_request = user_message.partition(SECTION_REQUEST.split("`")[0])
+        digest = hashlib.sha256(request_prefix.encode('utf-8')).digest()
+        text = candidates[digest[0] % len(candidates)]
+        if skill == "process-optimization" and section_request:
+            return section_text(text, section_request.split("`")[1][3:])
+        if skill == "bpmn-generation":
+            if PROCESS_GRAPH_INSTRUCTION in user_message:
+                return json.dumps(process_graph_from_bpmn(text), separators=(",", ":"))
+            if LOCAL_LAYOUT_INSTRUCTION in user_message:
+                text = strip_diagram(text)
+            text = f"```xml\n{text.strip()}\n```"
+        return text
+
+
+class PromptCacheSimulator:
+    """Remembers cached system prefixes to report cache read/creation tokens."""
+
+    def __init__(self):
+        """Initialize an empty cache."""
+        self._prefixes = set()
+        self._lock = threading.Lock()
+
+    def usage(self, system_messages: list, user_message: str) -> Dict[str, int]:
+        """
+        Split a request's input tokens into uncached, cache write and cache read.
+
+        Args:
+            system_messages: System message blocks
+            user_message: User message content
+
+        Returns:
+            Dict with input_tokens, cache_creation_input_tokens, cache_read_input_tokens
+        """
+        breakpoints = []  # (prefix hash, prefix tokens)
+        digest = hashlib.sha256()
+        prefix_chars = 0
+        for block in system_messages:
+            text = block.get("text", "")
+            digest.update(text.encode('utf-8'))
+            prefix_chars += len(text)
+            if "cache_control" in block:
+                breakpoints.append((digest.hexdigest(), prefix_chars // CHARS_PER_TOKEN))
+        total = prefix_chars // CHARS_PER_TOKEN + _tokens(user_message)
+
+        with self._lock:
+            read = 0
+            for prefix_hash, prefix_tokens in breakpoints:
+                if prefix_hash in self._prefixes:
+                    read = prefix_tokens
+            cached_end = breakpoints[-1][1] if breakpoints else 0
+            self._prefixes.update(prefix_hash for prefix_hash, _ in breakpoints)
+
+        creation = max(0, cached_end - read)
+        return {
+            "input_tokens": total - read - creation,
+            "cache_creation_input_tokens": creation,
+            "cache_read_input_tokens": read,
+        }
+
+
+class MockMessagesAPI:
+    """
+    Threaded HTTP server implementing the Messages endpoint.
+
+    Usable as a context manager::
+
+        with MockMessagesAPI(MockConfig(time_to_first_token=0.2)) as api:
+            pool = ClientPool(base_url=api.url)
+    """
+
+    def __init__(self,
+                 config: Optional[MockConfig] = None,
+                 host: str = "127.0.0.1",
+                 port: int = 0,
+                 library: Optional[ReplayLibrary] = None):
+        """
+        Initialize server (not started).
+
+        Args:
+            config: Simulated latency and token rate
+            host: Interface to bind
+            port: Port to bind (0 picks a free port)
+            library: Recorded responses (defaults to the repository's outputs/)
+        """
+        self.config = config or MockConfig()
+        self.library = library or ReplayLibrary()
+        self.prompt_cache = PromptCacheSimulator()
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """Return the base URL clients should use."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "MockMessagesAPI":
+        """Serve requests on a background thread."""
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving and release the port."""
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "MockMessagesAPI":
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _handler_class(self):
+        """Build the request handler bound to this server instance."""
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass  # Keep benchmark output clean
+
+            def do_POST(self):
+                if self.path.split("?")[0] != "/v1/messages":
+                    self._send_json(404, {"type": "error", "error": {"type": "not_found_error",
+                                                                     "message": self.path}})
+                    return
+                length = int(self.headers.get("content-length", 0))
+                request = json.loads(self.rfile.read(length) or b"{}")
+                api._handle(self, request)
+
+            def _send_json(self, status: int, body: dict):
+                payload = json.dumps(body).encode('utf-8')
+                self.send_response(status)
+                self.send_header("content-type", "application/json")
+                self.send_header("content-length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+        return Handler
+
+    def _sleep(self, seconds: float):
+        """Sleep for a simulated duration."""
+        if seconds > 0 and self.config.time_scale > 0:
+            time.sleep(seconds * self.config.time_scale)
+
+    def _handle(self, handler: BaseHTTPRequestHandler, request: dict):
+        """Answer one Messages API request."""
+        with self._lock:
+            self.requests += 1
+
+        system_messages = request.get("system") or []
+        if isinstance(system_messages, str):
+            system_messages = [{"type": "text", "text": system_messages}]
+        messages = request.get("messages") or [{}]
+        user_message = messages[-1].get("content", "")
+        if not isinstance(user_message, str):
+            user_message = json.dumps(user_message)
+
+        skill = self.library.identify_skill(system_messages)
+        text = self.library.response_for(skill, user_message)
+        usage = self.prompt_cache.usage(system_messages, user_message)
+        output_tokens = _tokens(text)
+        message = {
+            "id": f"msg_mock_{uuid.uuid4().hex[:20]}",
+            "type": "message",
+            "role": "assistant",
+            "model": request.get("model", "mock"),
+            "content": [],
+            "stop_reason": None,
+            "stop_sequence": None,
+            "usage": {**usage, "output_tokens": 0},
+        }
+
+        if not request.get("stream"):
+            self._sleep(self.config.time_to_first_token + output_tokens / self.config.output_tokens_per_second)
+            message["content"] = [{"type": "text", "text": text}]
+            message["stop_reason"] = "end_turn"
+            message["usage"]["output_tokens"] = output_tokens
+            handler._send_json(200, message)
+            return
+
+        handler.send_response(200)
+        handler.send_header("content-type", "text/event-stream")
+        handler.send_header("cache-control", "no-cache")
+        handler.send_header("connection", "close")
+        handler.end_headers()
+        handler.close_connection = True
+
+        def event(name: str, data: dict):
+            handler.wfile.write(f"event: {name}\ndata: {json.dumps(data)}\n\n".encode('utf-8'))
+            handler.wfile.flush()
+
+        try:
+            self._sleep(self.config.time_to_first_token)
+            event("message_start", {"type": "message_start", "message": message})
+            event("content_block_start", {"type": "content_block_start", "index": 0,
+                                          "content_block": {"type": "text", "text": ""}})
+            chunk_chars = self.config.tokens_per_chunk * CHARS_PER_TOKEN
+            chunk_delay = self.config.tokens_per_chunk / self.config.output_tokens_per_second
+            for start in range(0, len(text), chunk_chars):
+                event("content_block_delta", {"type": "content_block_delta", "index": 0,
+                                              "delta": {"type": "text_delta",
+                                                        "text": text[start:start + chunk_chars]}})
+                self._sleep(chunk_delay)
+            event("content_block_stop", {"type": "content_block_stop", "index": 0})
+            event("message_delta", {"type": "message_delta",
+                                    "delta": {"stop_reason": "end_turn", "stop_sequence": None},
+                                    "usage": {"output_tokens": output_tokens}})
+            event("message_stop", {"type": "message_stop"})
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # Client cancelled the stream (e.g. early BPMN abort)
+
+
+def main():
+    """Run the mock server until interrupted."""
+    parser = argparse.ArgumentParser(description="Local mock of the Anthropic Messages API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--ttft", type=float, default=0.5, help="Seconds to first token (default: 0.5)")
+    parser.add_argument("--tps", type=float, default=80.0, help="Output tokens per second (default: 80)")
+    args = parser.parse_args()
+
+    config = MockConfig(time_to_first_token=args.ttft, output_tokens_per_second=args.tps)
+    api = MockMessagesAPI(config, host=args.host, port=args.port)
+    print(f"Mock Messages API listening on {api.url} (ttft={args.ttft}s, {args.tps} tok/s)")
+    try:
+        api._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        api._server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,290 @@
+"""
+Offline benchmark suite for the transformation consultant pipeline.
+
+Every suite runs the real components, client pool, scheduler and pipeline
+against the local mock Messages API (benchmarks/mock_api.py), so results are
+reproducible without network access or an API key.
+
+Suites:
+    overhead     Local time around API calls (validation, request building,
+                 post-processing, queueing, file writes) with zero simulated latency
+    concurrency  Throughput and latency percentiles for 1..N in-flight pipelines
+    memory       Peak and retained Python heap per job (tracemalloc)
+    cache        Response cache cold vs warm runs and prompt-cache hit ratios
+    startup      Import time of src.main in fresh interpreters (-X importtime)
+    validation   Single-pass BPMN graph validator vs the legacy ElementTree checker
+
+Usage:
+    python -m benchmarks.run                       # all suites
+    python -m benchmarks.run concurrency --max-concurrency 64 --ttft 0.5 --tps 80
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from benchmarks.bpmn_validation import bench_validation
+from benchmarks.mock_api import MockConfig, MockMessagesAPI
+from benchmarks.startup import bench_startup
+from src.main import create_full_pipeline
+from src.pipeline import PipelineResult
+from src.runtime.client_pool import ClientPool
+from src.runtime.rate_limiter import RequestScheduler, set_request_scheduler
+from src.runtime.response_cache import ResponseCache
+
+PROJECT_ROOT = Path(__file__).parent.parent
+DEFAULT_TRANSCRIPT = PROJECT_ROOT / "data" / "sample-transcripts" / "ap-process.txt"
+API_KEY = "benchmark-key"
+
+
+@contextlib.contextmanager
+def quiet():
+    """Silence pipeline progress output."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Return the nearest-rank percentile of a list of values."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+def transcript_variant(transcript: str, index: int) -> str:
+    """Return a distinct transcript so jobs do not share response cache keys."""
+    return f"{transcript}\n\n[Benchmark job {index}]"
+
+
+async def run_async_jobs(api_url: str,
+                         transcripts: List[str],
+                         concurrency: int,
+                         response_cache: Optional[ResponseCache] = None) -> List[tuple[PipelineResult, float]]:
+    """
+    Run one full pipeline per transcript on a single event loop.
+
+    Args:
+        api_url: Mock API base URL
+        transcripts: Pipeline inputs
+        concurrency: Maximum pipelines in flight
+        response_cache: Optional response cache shared by all jobs
+
+    Returns:
+        List of (pipeline result, seconds) per job
+    """
+    pool = ClientPool(base_url=api_url, max_connections=max(100, concurrency * 3),
+                      max_keepalive_connections=max(20, concurrency * 3))
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run_job(transcript: str) -> tuple[PipelineResult, float]:
+        async with semaphore:
+            pipeline = create_full_pipeline(api_key=API_KEY, client_pool=pool, response_cache=response_cache)
+            start = time.perf_counter()
+            result = await pipeline.aexecute(transcript)
+            return result, time.perf_counter() - start
+
+    return await asyncio.gather(*(run_job(t) for t in transcripts))
+
+
+def run_sync_job(api_url: str,
+                 transcript: str,
+                 pool: ClientPool,
+                 response_cache: Optional[ResponseCache] = None) -> tuple[PipelineResult, float]:
+    """Run one full pipeline with the thread-based executor."""
+    pipeline = create_full_pipeline(api_key=API_KEY, client_pool=pool, response_cache=response_cache)
+    start = time.perf_counter()
+    result = pipeline.execute(transcript)
+    return result, time.perf_counter() - start
+
+
+def bench_overhead(args, transcript: str) -> Dict[str, Any]:
+    """Measure time spent outside the API with simulated latency disabled."""
+    config = MockConfig(time_to_first_token=0.0, output_tokens_per_second=1e9, time_scale=0.0)
+    stage_totals: Dict[str, List[float]] = {}
+    orchestration = []
+    walls = []
+
+    with MockMessagesAPI(config) as api, quiet():
+        pool = ClientPool(base_url=api.url)
+        run_sync_job(api.url, transcript, pool)  # Warm up connections and skill files
+        for i in range(args.jobs):
+            result, seconds = run_sync_job(api.url, transcript_variant(transcript, i), pool)
+            if not result.success:
+                raise RuntimeError(f"Benchmark pipeline failed: {result.errors}")
+            walls.append(seconds)
+            stages = result.metadata["stages"]
+            for span in stages.values():
+                for stage in ("queue_wait", "validation", "request_build", "api", "postprocess"):
+                    stage_totals.setdefault(stage, []).append(span.get(stage, 0.0))
+            # Critical path: analysis, then the slower of the two parallel branches
+            critical = stages["Transcript Analysis"]["total"] + max(
+                stages["BPMN Generation"]["total"], stages["Process Optimization"]["total"])
+            orchestration.append(seconds - critical)
+
+    return {
+        "jobs": args.jobs,
+        "pipeline_seconds_mean": statistics.mean(walls),
+        "orchestration_overhead_seconds_mean": statistics.mean(orchestration),
+        "stage_seconds_mean": {stage: statistics.mean(values) for stage, values in stage_totals.items()},
+    }
+
+
+def bench_concurrency(args, transcript: str) -> Dict[str, Any]:
+    """Measure throughput and latency for increasing numbers of in-flight pipelines."""
+    config = MockConfig(time_to_first_token=args.ttft, output_tokens_per_second=args.tps)
+    levels = []
+    level = 1
+    while level <= args.max_concurrency:
+        levels.append(level)
+        level *= 2
+
+    rows = []
+    with MockMessagesAPI(config) as api:
+        for level in levels:
+            transcripts = [transcript_variant(transcript, i) for i in range(level)]
+            start = time.perf_counter()
+            with quiet():
+                outcomes = asyncio.run(run_async_jobs(api.url, transcripts, concurrency=level))
+            wall = time.perf_counter() - start
+            durations = [seconds for _, seconds in outcomes]
+            rows.append({
+                "concurrency": level,
+                "jobs": level,
+                "failed": sum(1 for result, _ in outcomes if not result.success),
+                "wall_seconds": wall,
+                "jobs_per_minute": level / wall * 60,
+                "latency_p50": percentile(durations, 0.50),
+                "latency_p95": percentile(durations, 0.95),
+            })
+            print(f"  concurrency {level:>4}: {rows[-1]['jobs_per_minute']:8.1f} jobs/min, "
+                  f"p50 {rows[-1]['latency_p50']:.2f}s, p95 {rows[-1]['latency_p95']:.2f}s")
+
+    return {"mock": asdict(config), "levels": rows}
+
+
+def bench_memory(args, transcript: str) -> Dict[str, Any]:
+    """Measure Python heap usage per concurrently running job."""
+    config = MockConfig(time_to_first_token=0.0, output_tokens_per_second=1e9, time_scale=0.0)
+    transcripts = [transcript_variant(transcript, i) for i in range(args.jobs)]
+
+    with MockMessagesAPI(config) as api, quiet():
+        asyncio.run(run_async_jobs(api.url, transcripts[:1], concurrency=1))  # Warm up imports and caches
+        tracemalloc.start()
+        baseline, _ = tracemalloc.get_traced_memory()
+        outcomes = asyncio.run(run_async_jobs(api.url, transcripts, concurrency=args.jobs))
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    return {
+        "jobs": args.jobs,
+        "failed": sum(1 for result, _ in outcomes if not result.success),
+        "peak_bytes_per_job": (peak - baseline) / args.jobs,
+        "retained_bytes_per_job": (current - baseline) / args.jobs,
+    }
+
+
+def bench_cache(args, transcript: str) -> Dict[str, Any]:
+    """Compare cold and warm response cache runs and report prompt-cache hit ratios."""
+    config = MockConfig(time_to_first_token=args.ttft, output_tokens_per_second=args.tps)
+
+    with MockMessagesAPI(config) as api, tempfile.TemporaryDirectory() as cache_dir, quiet():
+        pool = ClientPool(base_url=api.url)
+        response_cache = ResponseCache(Path(cache_dir))
+        cold, cold_seconds = run_sync_job(api.url, transcript, pool, response_cache)
+        warm, warm_seconds = run_sync_job(api.url, transcript, pool, response_cache)
+        requests_after_warm = api.requests
+
+        # Distinct transcripts share only the skill prompt prefix
+        hit_ratios = []
+        for i in range(args.jobs):
+            result, _ = run_sync_job(api.url, transcript_variant(transcript, i), pool)
+            hit_ratios.append(result.metadata["prompt_cache"]["hit_ratio"])
+
+    return {
+        "response_cache": {
+            "cold_seconds": cold_seconds,
+            "warm_seconds": warm_seconds,
+            "speedup": cold_seconds / warm_seconds if warm_seconds else None,
+            "api_requests_cold_plus_warm": requests_after_warm,
+            "stats": response_cache.stats(),
+            "success": cold.success and warm.success,
+        },
+        "prompt_cache_hit_ratio_per_job": hit_ratios,
+    }
+
+
+def bench_import(args, transcript: str) -> Dict[str, Any]:
+    """Measure CLI startup cost paid by every short-lived worker."""
+    return bench_startup(runs=args.jobs)
+
+
+SUITES = {
+    "overhead": bench_overhead,
+    "concurrency": bench_concurrency,
+    "memory": bench_memory,
+    "cache": bench_cache,
+    "startup": bench_import,
+    "validation": lambda args, transcript: bench_validation(),
+}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the selected benchmark suites and save results as JSON."""
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run", description=__doc__.split("\n\n")[0])
+    parser.add_argument("suites", nargs="*", default=[],
+                        help=f"Suites to run: {', '.join(SUITES)} (default: all)")
+    parser.add_argument("--jobs", type=int, default=8,
+                        help="Jobs per run for overhead, memory and cache suites, interpreters for startup (default: 8)")
+    parser.add_argument("--max-concurrency", type=int, default=256,
+                        help="Highest in-flight pipeline count for the concurrency suite (default: 256)")
+    parser.add_argument("--ttft", type=float, default=0.2,
+                        help="Simulated seconds to first token (default: 0.2)")
+    parser.add_argument("--tps", type=float, default=2000.0,
+                        help="Simulated output tokens per second (default: 2000)")
+    parser.add_argument("--transcript", default=str(DEFAULT_TRANSCRIPT),
+                        help="Transcript used as pipeline input")
+    parser.add_argument("--output", default=str(PROJECT_ROOT / "benchmarks" / "results" / "latest.json"),
+                        help="Where to write JSON results")
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.suites if name not in SUITES]
+    if unknown:
+        parser.error(f"unknown suite(s): {', '.join(unknown)}")
+
+    transcript = Path(args.transcript).read_text(encoding='utf-8')
+    # Benchmarks measure the pipeline, not rate limiting: no limits, default retries
+    set_request_scheduler(RequestScheduler())
+
+    results: Dict[str, Any] = {
+        "timestamp": datetime.now().isoformat(),
+        "python": sys.version.split()[0],
+        "settings": {k: v for k, v in vars(args).items() if k != "suites"},
+    }
+    for name in args.suites or list(SUITES):
+        print(f"[Benchmark] {name}")
+        start = time.perf_counter()
+        results[name] = SUITES[name](args, transcript)
+        print(f"[Benchmark] {name} finished in {time.perf_counter() - start:.1f}s")
+        print(json.dumps(results[name], indent=2, default=str))
+
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2, default=str), encoding='utf-8')
+    print(f"[Benchmark] Results saved to {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,130 @@
+"""
+Startup benchmark: how long ``import src.main`` takes in a fresh interpreter.
+
+Batch workers are short-lived processes, so import time is paid once per
+worker. Each run starts a new interpreter with ``python -X importtime`` and
+parses its report, giving the cumulative import time of the target module
+and of the heaviest modules it pulls in.
+
+Usage:
+    python -m benchmarks.startup                   # report for src.main
+    python -m benchmarks.run startup --jobs 20     # as part of the suite
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+# Budget for the median cumulative import time of src.main, enforced in tests.
+# The Anthropic SDK alone takes several hundred milliseconds to import.
+IMPORT_BUDGET_SECONDS = 0.25
+
+# Modules that must not be imported by ``import src.main``
+DEFERRED_MODULES = (
+    "anthropic",
+    "asyncio",
+    "dotenv",
+    "src.components.input.transcript_processor",
+    "src.components.generation.bpmn_generator",
+    "src.components.optimization.recommendation_engine",
+)
+
+
+def parse_importtime(report: str) -> Dict[str, float]:
+    """
+    Parse ``-X importtime`` output into cumulative seconds per module.
+
+    Args:
+        report: stderr of an interpreter run with ``-X importtime``
+
+    Returns:
+        Mapping of module name to cumulative import seconds
+    """
+    cumulative = {}
+    for line in report.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue  # Header line
+        cumulative[parts[2].strip()] = int(parts[1]) / 1e6
+    return cumulative
+
+
+def import_profile(module: str = "src.main") -> tuple[Dict[str, float], List[str]]:
+    """
+    Import a module in a fresh interpreter.
+
+    Args:
+        module: Module to import
+
+    Returns:
+        Tuple of (cumulative seconds per module, names in sys.modules afterwards)
+    """
+    code = f"import sys, json, {module}; print(json.dumps(sorted(sys.modules)))"
+    env = {k: v for k, v in os.environ.items() if k != "PYTHONPROFILEIMPORTTIME"}
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=PROJECT_ROOT, env=env, capture_output=True, text=True, check=True
+    )
+    return parse_importtime(completed.stderr), json.loads(completed.stdout)
+
+
+def bench_startup(runs: int = 10, module: str = "src.main", top: int = 10) -> Dict[str, Any]:
+    """
+    Measure the import time of a module over several fresh interpreters.
+
+    Args:
+        runs: Number of interpreters to start
+        module: Module to import
+        top: Number of heaviest modules to report
+
+    Returns:
+        Dict with median/min import seconds, budget, heaviest modules and
+        any deferred modules that were imported eagerly
+    """
+    totals = []
+    per_module: Dict[str, List[float]] = {}
+    loaded: List[str] = []
+    for _ in range(runs):
+        cumulative, loaded = import_profile(module)
+        totals.append(cumulative.get(module, 0.0))
+        for name, seconds in cumulative.items():
+            per_module.setdefault(name, []).append(seconds)
+
+    heaviest = sorted(
+        ((name, statistics.median(values)) for name, values in per_module.items() if name != module),
+        key=lambda item: item[1], reverse=True
+    )[:top]
+    return {
+        "module": module,
+        "runs": runs,
+        "import_seconds_median": statistics.median(totals),
+        "import_seconds_min": min(totals),
+        "budget_seconds": IMPORT_BUDGET_SECONDS,
+        "heaviest_modules": dict(heaviest),
+        "eagerly_imported": [name for name in DEFERRED_MODULES if name in loaded],
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Print the startup report; exit non-zero if over budget."""
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.startup", description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=10, help="Fresh interpreters to start (default: 10)")
+    parser.add_argument("--module", default="src.main", help="Module to import (default: src.main)")
+    args = parser.parse_args(argv)
+
+    report = bench_startup(args.runs, args.module)
+    print(json.dumps(report, indent=2))
+    return 0 if report["import_seconds_median"] <= IMPORT_BUDGET_SECONDS else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,333 @@
+"""
+Batch execution for transformation consultant agent.
+
+Runs the full transformation pipeline over a directory or manifest of
+transcripts with a bounded worker pool, reporting live throughput and a
+summary table at the end.
+"""
+
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from .pipeline import PipelineResult, summarize_prompt_cache
+from .runtime.checkpoint import CheckpointStore
+from .runtime.metrics import MetricsSink
+from .runtime.response_cache import ResponseCache
+
+
+@dataclass
+class BatchJob:
+    """A single transcript to run through the pipeline."""
+
+    transcript_path: Path
+    output_dir: Path
+    business_context: Optional[str] = None
+
+    @property
+    def name(self) -> str:
+        """Return the job name (output subdirectory name)."""
+        return self.output_dir.name
+
+
+@dataclass
+class BatchJobResult:
+    """Outcome of a single batch job."""
+
+    job: BatchJob
+    success: bool
+    duration_seconds: float
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cache_creation_input_tokens: int = 0
+    cache_read_input_tokens: int = 0
+    errors: List[str] = field(default_factory=list)
+
+    @property
+    def total_tokens(self) -> int:
+        """Return input plus output tokens."""
+        return self.input_tokens + self.output_tokens
+
+    @property
+    def cache_hit_ratio(self) -> float:
+        """Return the share of prompt tokens read from the prompt cache."""
+        prompt_tokens = self.input_tokens + self.cache_creation_input_tokens + self.cache_read_input_tokens
+        return self.cache_read_input_tokens / prompt_tokens if prompt_tokens else 0.0
+
+
+def load_batch_jobs(source: Path, output_root: Path) -> List[BatchJob]:
+    """
+    Build batch jobs from a directory or manifest file.
+
+    A directory yields one job per ``*.txt`` transcript. A ``.json`` manifest
+    holds a list of transcript paths or objects with ``transcript`` and optional
+    ``name`` and ``business_context`` keys. Any other file is read as a text
+    manifest with one transcript path per line (``#`` starts a comment).
+    Relative paths in a manifest are resolved against the manifest's directory.
+
+    Args:
+        source: Transcript directory or manifest file
+        output_root: Directory under which each job gets its own subdirectory
+
+    Returns:
+        List of batch jobs in manifest order
+
+    Raises:
+        FileNotFoundError: If source does not exist
+        ValueError: If the manifest is malformed or lists no transcripts
+    """
+    source = Path(source)
+    output_root = Path(output_root)
+    if not source.exists():
+        raise FileNotFoundError(f"Batch source not found: {source}")
+
+    entries: List[Dict[str, Any]] = []
+    if source.is_dir():
+        entries = [{"transcript": path} for path in sorted(source.glob("*.txt"))]
+    elif source.suffix.lower() == ".json":
+        manifest = json.loads(source.read_text(encoding='utf-8'))
+        if not isinstance(manifest, list):
+            raise ValueError("JSON manifest must be a list of transcripts")
+        for item in manifest:
+            if isinstance(item, str):
+                item = {"transcript": item}
+            if not isinstance(item, dict) or "transcript" not in item:
+                raise ValueError(f"Invalid manifest entry: {item!r}")
+            entries.append(item)
+    else:
+        for line in source.read_text(encoding='utf-8').splitlines():
+            line = line.split("#", 1)[0].strip()
+            if line:
+                entries.append({"transcript": line})
+
+    if not entries:
+        raise ValueError(f"No transcripts found in {source}")
+
+    base_dir = source if source.is_dir() else source.parent
+    jobs = []
+    used_names = set()
+    for entry in entries:
+        transcript_path = Path(entry["transcript"])
+        if not transcript_path.is_absolute():
+            transcript_path = base_dir / transcript_path
+
+        # Give every job a unique output subdirectory
+        name = entry.get("name") or transcript_path.stem
+        unique_name = name
+        suffix = 2
+        while unique_name in used_names:
+            unique_name = f"{name}-{suffix}"
+            suffix += 1
+        used_names.add(unique_name)
+
+        jobs.append(BatchJob(
+            transcript_path=transcript_path,
+            output_dir=output_root / unique_name,
+            business_context=entry.get("business_context")
+        ))
+
+    return jobs
+
+
+def _token_usage(result: PipelineResult) -> tuple[int, int]:
+    """Sum input and output tokens spent by this run across component metadata."""
+    input_tokens = 0
+    output_tokens = 0
+    for component_name in result.metadata.get("components", []):
+        component_metadata = result.metadata.get(component_name)
+        # Responses replayed from the cache were paid for by an earlier run
+        if isinstance(component_metadata, dict) and component_metadata.get("response_cache") != "hit":
+            input_tokens += component_metadata.get("input_tokens", 0) or 0
+            output_tokens += component_metadata.get("output_tokens", 0) or 0
+    return input_tokens, output_tokens
+
+
+def _default_runner(api_key: Optional[str],
+                    response_cache: Optional[ResponseCache] = None,
+                    metrics_sink: Optional[MetricsSink] = None,
+                    checkpoint_store: Optional[CheckpointStore] = None) -> Callable[[BatchJob], PipelineResult]:
+    """Return a runner that executes the full pipeline for one job."""
+    from .main import run_full_transformation
+
+    def run(job: BatchJob) -> PipelineResult:
+        return run_full_transformation(
+            transcript_path=job.transcript_path,
+            output_dir=job.output_dir,
+            api_key=api_key,
+            business_context=job.business_context,
+            response_cache=response_cache,
+            metrics_sink=metrics_sink,
+            checkpoint_store=checkpoint_store
+        )
+
+    return run
+
+
+def run_batch(jobs: List[BatchJob],
+              concurrency: int = 4,
+              api_key: Optional[str] = None,
+              runner: Optional[Callable[[BatchJob], PipelineResult]] = None,
+              response_cache: Optional[ResponseCache] = None,
+              metrics_sink: Optional[MetricsSink] = None,
+              checkpoint_store: Optional[CheckpointStore] = None) -> List[BatchJobResult]:
+    """
+    Run batch jobs over a bounded worker pool.
+
+    Args:
+        jobs: Jobs to run
+        concurrency: Maximum number of pipelines in flight
+        api_key: Anthropic API key (defaults to env var)
+        runner: Callable executing one job (defaults to run_full_transformation)
+        response_cache: Optional response cache shared by every job
+        metrics_sink: Optional sink receiving every job's metric events
+        checkpoint_store: Optional stage checkpoint store shared by every job;
+                         rerunning a batch resumes each job after its last
+                         completed stage
+
+    Returns:
+        List of job results in the same order as jobs
+    """
+    if concurrency < 1:
+        raise ValueError("Concurrency must be at least 1")
+    if runner is None:
+        runner = _default_runner(api_key, response_cache, metrics_sink, checkpoint_store)
+
+    results: List[Optional[BatchJobResult]] = [None] * len(jobs)
+    start = time.perf_counter()
+    completed = 0
+    failed = 0
+    total_tokens = 0
+
+    def run_job(job: BatchJob) -> BatchJobResult:
+        job_start = time.perf_counter()
+        try:
+            pipeline_result = runner(job)
+        except Exception as e:
+            return BatchJobResult(
+                job=job,
+                success=False,
+                duration_seconds=time.perf_counter() - job_start,
+                errors=[f"{type(e).__name__}: {str(e)}"]
+            )
+        input_tokens, output_tokens = _token_usage(pipeline_result)
+        prompt_cache = pipeline_result.metadata.get("prompt_cache") or summarize_prompt_cache([])
+        return BatchJobResult(
+            job=job,
+            success=pipeline_result.success,
+            duration_seconds=time.perf_counter() - job_start,
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            cache_creation_input_tokens=prompt_cache["cache_creation_input_tokens"],
+            cache_read_input_tokens=prompt_cache["cache_read_input_tokens"],
+            errors=list(pipeline_result.errors)
+        )
+
+    print(f"[Batch] Running {len(jobs)} transcripts with concurrency {concurrency}")
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = {executor.submit(run_job, job): i for i, job in enumerate(jobs)}
+        for future in as_completed(futures):
+            job_result = future.result()
+            results[futures[future]] = job_result
+
+            completed += 1
+            failed += 0 if job_result.success else 1
+            total_tokens += job_result.total_tokens
+            elapsed = max(time.perf_counter() - start, 1e-9)
+            print(
+                f"[Batch] {completed}/{len(jobs)} complete ({failed} failed) | "
+                f"{completed / elapsed * 60:.1f} transcripts/min | "
+                f"{total_tokens / elapsed:.0f} tokens/s | "
+                f"last: {job_result.job.name} ({'OK' if job_result.success else 'FAILED'})"
+            )
+
+    return results
+
+
+def format_summary(results: List[BatchJobResult]) -> str:
+    """
+    Format batch results as a plain-text summary table.
+
+    Args:
+        results: Job results from run_batch
+
+    Returns:
+        Table with one row per job plus a totals row
+    """
+    headers = ["Transcript", "Status", "Time (s)", "Input tok", "Output tok", "Cache hit", "Error"]
+    rows = []
+    for r in results:
+        rows.append([
+            r.job.name,
+            "OK" if r.success else "FAILED",
+            f"{r.duration_seconds:.1f}",
+            str(r.input_tokens),
+            str(r.output_tokens),
+            f"{r.cache_hit_ratio:.0%}",
+            r.errors[0] if r.errors else ""
+        ])
+
+    succeeded = sum(1 for r in results if r.success)
+    cache_read = sum(r.cache_read_input_tokens for r in results)
+    prompt_tokens = sum(r.input_tokens + r.cache_creation_input_tokens + r.cache_read_input_tokens
+                        for r in results)
+    rows.append([
+        "TOTAL",
+        f"{succeeded}/{len(results)} OK",
+        f"{sum(r.duration_seconds for r in results):.1f}",
+        str(sum(r.input_tokens for r in results)),
+        str(sum(r.output_tokens for r in results)),
+        f"{(cache_read / prompt_tokens if prompt_tokens else 0.0):.0%}",
+        ""
+    ])
+
+    widths = [max(len(row[i]) for row in [headers] + rows) for i in range(len(headers))]
+    # Keep long error messages from blowing up the table width
+    widths[-1] = min(widths[-1], 60)
+
+    def format_row(row: List[str]) -> str:
+        cells = [cell[:widths[i]].ljust(widths[i]) for i, cell in enumerate(row)]
+        return " | ".join(cells).rstrip()
+
+    separator = "-+-".join("-" * w for w in widths)
+    lines = [format_row(headers), separator]
+    lines.extend(format_row(row) for row in rows[:-1])
+    lines.append(separator)
+    lines.append(format_row(rows[-1]))
+    return "\n".join(lines)
+
+
+def save_summary(results: List[BatchJobResult], output_root: Path) -> Path:
+    """
+    Save batch results as JSON next to the job output directories.
+
+    Args:
+        results: Job results from run_batch
+        output_root: Batch output root directory
+
+    Returns:
+        Path to the written batch-summary.json
+    """
+    output_root = Path(output_root)
+    output_root.mkdir(parents=True, exist_ok=True)
+    summary = [
+        {
+            "name": r.job.name,
+            "transcript": str(r.job.transcript_path),
+            "output_dir": str(r.job.output_dir),
+            "success": r.success,
+            "duration_seconds": round(r.duration_seconds, 3),
+            "input_tokens": r.input_tokens,
+            "output_tokens": r.output_tokens,
+            "cache_creation_input_tokens": r.cache_creation_input_tokens,
+            "cache_read_input_tokens": r.cache_read_input_tokens,
+            "errors": r.errors
+        }
+        for r in results
+    ]
+    summary_path = output_root / "batch-summary.json"
+    summary_path.write_text(json.dumps(summary, indent=2), encoding='utf-8')
+    return summary_path
@@ -3,14 +3,32 @@ Components for transformation consultant agent.
 
 This package contains all the processing components that implement
 specific transformation capabilities.
+
+Components are exported lazily: ``from src.components import BPMNGenerator``
+imports only that component's module, on first access.
 """
 
-from .input.transcript_processor import TranscriptProcessor
-from .generation.bpmn_generator import BPMNGenerator
-from .optimization.recommendation_engine import RecommendationEngine
+import importlib
+
+# Exported name -> module (relative to this package) that defines it
+_EXPORTS = {
+    "TranscriptPreprocessor": ".input.transcript_preprocessor",
+    "TranscriptProcessor": ".input.transcript_processor",
+    "BPMNGenerator": ".generation.bpmn_generator",
+    "RecommendationEngine": ".optimization.recommendation_engine",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    """Import a component's module on first access."""
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value  # Later lookups skip __getattr__
+    return value
+
 
-__all__ = [
-    "TranscriptProcessor",
-    "BPMNGenerator",
-    "RecommendationEngine"
-]
+def __dir__():
+    return sorted(list(globals()) + __all__)
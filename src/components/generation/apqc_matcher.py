@@ -0,0 +1,297 @@
+"""
+Local APQC Level 4 activity matching for BPMN tasks.
+
+The APQC reference (skills/bpmn-generation/domain-knowledge/apqc-activities.md)
+is parsed once into activities with normalized term sets. Generated task
+names are then mapped to activity codes locally, so the reference does not
+have to be sent to the model on every BPMN call.
+
+Matching is token-set similarity over normalized terms: words are lowercased,
+mapped through a synonym table and lightly stemmed, and shared terms are
+weighted by how rare they are across activities. A name that already carries
+an activity code ("3.2.4 Verify Invoice Accuracy") matches that code with
+full confidence.
+"""
+
+import math
+import re
+import threading
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, List, Optional, Sequence
+
+from .bpmn_validation import BPMN_NS
+
+APQC_REFERENCE = "apqc-activities.md"
+
+# Matches below this confidence are reported without a code
+MIN_CONFIDENCE = 0.3
+
+# Weight of the activity name versus its description and variations
+NAME_WEIGHT = 0.7
+
+TASK_TYPES = ("task", "userTask", "serviceTask", "manualTask", "sendTask", "receiveTask",
+              "scriptTask", "businessRuleTask", "subProcess", "callActivity")
+
+# Word -> canonical term, applied before stemming
+SYNONYMS = {
+    "supplier": "vendor", "suppliers": "vendor", "payee": "vendor",
+    "bill": "invoice", "bills": "invoice",
+    "pay": "payment", "paid": "payment", "payments": "payment", "disburse": "payment", "remit": "payment",
+    "approve": "approval", "approved": "approval", "approves": "approval", "authorize": "approval",
+    "authorization": "approval", "signoff": "approval", "sign": "approval",
+    "validate": "verify", "validation": "verify", "check": "verify", "checks": "verify", "review": "review",
+    "reconcile": "match", "matching": "match", "3way": "match",
+    "enter": "capture", "entry": "capture", "key": "capture", "data": "capture", "scan": "capture", "ocr": "capture",
+    "get": "receive", "intake": "receive", "arrive": "receive", "collect": "receive",
+    "requisition": "request", "req": "request",
+    "po": "purchase_order",
+    "hire": "hire", "hiring": "hire", "newhire": "hire", "employee": "employee", "staff": "employee",
+    "laptop": "equipment", "hardware": "equipment", "account": "access", "accounts": "access",
+    "desk": "workspace", "office": "workspace", "seat": "workspace",
+    "induction": "orientation", "onboard": "orientation", "welcome": "orientation",
+    "benefit": "benefit", "insurance": "benefit",
+    "exception": "exception", "discrepancy": "exception", "discrepancies": "exception", "error": "exception",
+    "escalate": "exception", "escalation": "exception",
+    "archive": "close", "complete": "close", "closing": "close",
+    "notify": "notification", "notification": "notification", "inform": "notification",
+    "legal": "legal", "contract": "legal",
+}
+
+STOPWORDS = frozenset("a an and for from in into of on or the to with by via per".split())
+
+_WORD = re.compile(r"[a-z0-9]+")
+_CODE = re.compile(r"^\s*(\d+\.\d+\.\d+)\b")
+_DOMAIN = re.compile(r"^##\s+(.*)$")
+_ACTIVITY = re.compile(r"^###\s+(\d+\.\d+\.\d+)\s+(.*)$")
+
+
+def _stem(word: str) -> str:
+    """Strip common English suffixes so "routing", "routed" and "route" agree."""
+    for suffix in ("ations", "ation", "ments", "ment", "ings", "ing", "ies", "ed", "es", "s"):
+        if len(word) > len(suffix) + 3 and word.endswith(suffix):
+            return word[:-len(suffix)] + ("y" if suffix == "ies" else "")
+    return word
+
+
+def normalize_terms(text: str) -> FrozenSet[str]:
+    """
+    Return the normalized term set of a text.
+
+    "Purchase order" and "PO" both become ``purchase_order``; other words are
+    mapped through SYNONYMS and stemmed.
+    """
+    text = re.sub(r"\bpurchase\s+orders?\b", "po", text.lower())
+    text = text.replace("three-way", "3way").replace("new hire", "newhire").replace("sign-off", "signoff")
+    terms = set()
+    for word in _WORD.findall(text):
+        if word in STOPWORDS or word.isdigit():
+            continue
+        terms.add(SYNONYMS.get(word) or _stem(word))
+    return frozenset(terms)
+
+
+@dataclass(frozen=True)
+class APQCActivity:
+    """One APQC Level 4 activity from the reference."""
+
+    code: str
+    name: str
+    domain: str
+    description: str
+    name_terms: FrozenSet[str]
+    context_terms: FrozenSet[str]  # Description and common variations
+
+
+@dataclass(frozen=True)
+class APQCMatch:
+    """Best APQC activity for a task name."""
+
+    task_name: str
+    code: Optional[str]
+    activity: Optional[str]
+    confidence: float
+
+    def as_dict(self) -> Dict[str, object]:
+        """Return the match as a JSON-friendly dict."""
+        return {"task_name": self.task_name, "code": self.code, "activity": self.activity,
+                "confidence": self.confidence}
+
+
+def parse_apqc_reference(text: str) -> List[APQCActivity]:
+    """
+    Parse the APQC reference markdown into activities.
+
+    Activities are ``### <code> <name>`` headings under a ``## <domain>``
+    heading. The ``**Description:**`` line and ``**Common Variations:**``
+    bullets contribute context terms.
+
+    Args:
+        text: Content of apqc-activities.md
+
+    Returns:
+        Activities in document order
+    """
+    activities = []
+    domain = ""
+    current = None
+
+    def finish():
+        if current is not None:
+            code, name, body = current
+            description = next((line.split(":**", 1)[1].strip() for line in body
+                                if line.startswith("**Description:**")), "")
+            variations, in_variations = [], False
+            for line in body:
+                if line.startswith("**"):
+                    in_variations = line.startswith("**Common Variations")
+                elif in_variations and line.startswith("- "):
+                    variations.append(line[2:])
+            activities.append(APQCActivity(
+                code=code, name=name, domain=domain, description=description,
+                name_terms=normalize_terms(name),
+                context_terms=normalize_terms(" ".join([description] + variations)),
+            ))
+
+    for line in text.splitlines():
+        activity = _ACTIVITY.match(line)
+        if activity:
+            finish()
+            current = (activity.group(1), activity.group(2).strip(), [])
+            continue
+        heading = _DOMAIN.match(line)
+        if heading:
+            finish()
+            current = None
+            domain = heading.group(1).strip()
+        elif current is not None:
+            current[2].append(line.strip())
+    finish()
+    return activities
+
+
+class APQCMatcher:
+    """
+    Maps task names to APQC activities.
+
+    An inverted index from term to activities is built once; matching a
+    diagram's tasks walks the postings of each task's terms, so only
+    activities sharing a term are scored.
+    """
+
+    def __init__(self, activities: Sequence[APQCActivity], min_confidence: float = MIN_CONFIDENCE):
+        """
+        Build the matcher.
+
+        Args:
+            activities: Parsed APQC activities
+            min_confidence: Matches below this confidence get no code
+        """
+        self.activities = list(activities)
+        self.min_confidence = min_confidence
+        self.by_code = {activity.code: activity for activity in self.activities}
+        self.postings: Dict[str, List[int]] = {}
+        for index, activity in enumerate(self.activities):
+            for term in activity.name_terms | activity.context_terms:
+                self.postings.setdefault(term, []).append(index)
+        total = max(len(self.activities), 1)
+        self.weights = {term: math.log(1 + total / len(posting)) for term, posting in self.postings.items()}
+
+    @classmethod
+    def from_reference(cls, text: str, **kwargs) -> "APQCMatcher":
+        """Build a matcher from the APQC reference markdown."""
+        return cls(parse_apqc_reference(text), **kwargs)
+
+    def _weight(self, terms) -> float:
+        """Sum the weights of terms; terms unknown to the reference count as common words."""
+        return sum(self.weights.get(term, 1.0) for term in terms)
+
+    def _score(self, terms: FrozenSet[str], activity: APQCActivity) -> float:
+        """Return the similarity of a task's terms to an activity in [0, 1]."""
+        name_union = self._weight(terms | activity.name_terms)
+        name_similarity = self._weight(terms & activity.name_terms) / name_union if name_union else 0.0
+        task_weight = self._weight(terms)
+        coverage = self._weight(terms & (activity.name_terms | activity.context_terms)) / task_weight \
+            if task_weight else 0.0
+        return NAME_WEIGHT * name_similarity + (1 - NAME_WEIGHT) * coverage
+
+    def match(self, task_names: Sequence[str]) -> List[APQCMatch]:
+        """
+        Match every task name of a diagram.
+
+        Args:
+            task_names: Task names
+
+        Returns:
+            One APQCMatch per name, in order
+        """
+        matches = []
+        for name in task_names:
+            code = _CODE.match(name)
+            if code and code.group(1) in self.by_code:
+                activity = self.by_code[code.group(1)]
+                matches.append(APQCMatch(name, activity.code, activity.name, 1.0))
+                continue
+
+            terms = normalize_terms(name)
+            candidates = {index for term in terms for index in self.postings.get(term, ())}
+            best, best_score = None, 0.0
+            for index in sorted(candidates):
+                score = self._score(terms, self.activities[index])
+                if score > best_score:
+                    best, best_score = self.activities[index], score
+            if best is None or best_score < self.min_confidence:
+                matches.append(APQCMatch(name, None, None, round(best_score, 3)))
+            else:
+                matches.append(APQCMatch(name, best.code, best.name, round(best_score, 3)))
+        return matches
+
+    def match_bpmn(self, bpmn_text: str) -> List[Dict[str, object]]:
+        """
+        Match the tasks of a BPMN diagram.
+
+        Args:
+            bpmn_text: BPMN XML
+
+        Returns:
+            List of match dicts with ``task_id`` added, in document order
+
+        Raises:
+            ValueError: If the XML cannot be parsed
+        """
+        try:
+            root = ET.fromstring(bpmn_text)
+        except ET.ParseError as e:
+            raise ValueError(f"XML parsing error: {str(e)}")
+        tags = {f"{{{BPMN_NS}}}{task_type}" for task_type in TASK_TYPES}
+        tasks = [element for element in root.iter() if element.tag in tags]
+        matches = self.match([task.get("name") or "" for task in tasks])
+        return [{"task_id": task.get("id"), **match.as_dict()} for task, match in zip(tasks, matches)]
+
+
+_matchers: Dict[str, APQCMatcher] = {}
+_matchers_lock = threading.Lock()
+
+
+def get_apqc_matcher(manager=None) -> APQCMatcher:
+    """
+    Return a matcher for the current APQC reference, parsing it once per content hash.
+
+    Args:
+        manager: SkillManager to read the reference with (defaults to the
+                process-wide manager)
+
+    Returns:
+        APQCMatcher
+    """
+    from ...skills.skill_manager import get_skill_manager
+
+    manager = manager or get_skill_manager()
+    content_hash = manager.domain_knowledge_hash('bpmn-generation', APQC_REFERENCE)
+    with _matchers_lock:
+        matcher = _matchers.get(content_hash)
+    if matcher is None:
+        matcher = APQCMatcher.from_reference(manager.load_domain_knowledge('bpmn-generation', APQC_REFERENCE))
+        with _matchers_lock:
+            _matchers[content_hash] = matcher
+    return matcher
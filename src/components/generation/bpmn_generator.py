@@ -6,9 +6,25 @@ the bpmn-generation skill.
 """
 
 from pathlib import Path
-from typing import Any
-import xml.etree.ElementTree as ET
-from ...interfaces.component import BaseComponent, ComponentResult
+from typing import Any, Callable, Optional
+from ...interfaces.component import BaseComponent, ComponentResult, StreamAborted
+from ...interfaces.process_analysis import (
+    ACTORS, DECISION_POINTS, EXECUTIVE_SUMMARY, PROCESS_STEPS, SYSTEMS, ProcessAnalysis
+)
+from ...runtime.metrics import StageTimings
+from ...skills.knowledge_index import format_chunks
+from ...skills.skill_manager import get_skill_manager
+from .apqc_matcher import APQC_REFERENCE, get_apqc_matcher
+from .bpmn_layout import LOCAL_LAYOUT_INSTRUCTION, layout_bpmn
+from .bpmn_serializer import (
+    PROCESS_GRAPH_INSTRUCTION, ProcessGraphError, parse_process_graph, schema_prompt, serialize_bpmn
+)
+from .bpmn_validation import IncrementalBPMNValidator, validate_bpmn_graph
+
+# Response formats BPMNGenerator can ask the model for
+OUTPUT_FORMATS = ("xml", "json")
+# Where BPMNGenerator gets APQC codes from when include_apqc is set
+APQC_REFERENCES = ("local", "prompt")
 
 
 class BPMNGenerator(BaseComponent):
@@ -18,6 +34,24 @@ class BPMNGenerator(BaseComponent):
     Implements the bpmn-generation skill.
     """
 
+    # Sections the diagram needs; pain points, metrics and notes are not sent
+    required_sections = (PROCESS_STEPS, ACTORS, DECISION_POINTS)
+    analysis_sections = (EXECUTIVE_SUMMARY, PROCESS_STEPS, ACTORS, DECISION_POINTS, SYSTEMS)
+    # Compute the BPMNDiagram section locally instead of generating it
+    local_layout = True
+    # "xml": the model writes BPMN XML; "json": it writes a compact process
+    # graph that bpmn_serializer turns into XML
+    output_format = "xml"
+    # "local": tasks are matched to APQC activities after generation and the
+    # reference is not sent; "prompt": the reference is sent to the model
+    apqc_reference = "local"
+    # Token budget for retrieved APQC activities in "prompt" mode; None
+    # attaches the whole reference
+    knowledge_budget: Optional[int] = None
+    # Graph warnings that send a diagram to a larger model in a ModelCascade;
+    # incoming/outgoing bookkeeping and gateway conditions are tolerated
+    escalation_warnings = ("unreachable from a start event", "not assigned to any lane", "references unknown element")
+
     @property
     def component_name(self) -> str:
         """Return human-readable component name."""
@@ -30,10 +64,10 @@ class BPMNGenerator(BaseComponent):
 
     def validate_input(self, input_data: Any) -> bool:
         """
-        Validate that input is a process analysis markdown.
+        Validate that input is a process analysis.
 
         Args:
-            input_data: Expected to be analysis markdown text
+            input_data: Expected to be a ProcessAnalysis or analysis markdown text
 
         Returns:
             True if valid
@@ -41,155 +75,350 @@ class BPMNGenerator(BaseComponent):
         Raises:
             ValueError: If input is invalid
         """
-        if not isinstance(input_data, str):
-            raise ValueError(f"Input must be string, got {type(input_data)}")
-        if not input_data.strip():
+        analysis = ProcessAnalysis.coerce(input_data)
+        if not analysis.blocks and not analysis.preamble.strip():
             raise ValueError("Analysis text cannot be empty")
 
-        # Check for required sections
-        required_sections = ["## Process Steps", "## Actors and Roles", "## Decision Points"]
-        for section in required_sections:
-            if section not in input_data:
-                raise ValueError(f"Analysis missing required section: {section}")
+        for section in self.required_sections:
+            if not analysis.has_section(section):
+                raise ValueError(f"Analysis missing required section: ## {section}")
 
         return True
 
-    def _validate_bpmn_xml(self, bpmn_text: str) -> tuple[bool, str]:
+    def _output_format(self, kwargs: dict) -> str:
+        """Return the requested output format ("xml" or "json")."""
+        output_format = kwargs.get('output_format', self.output_format)
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError(f"output_format must be one of {', '.join(OUTPUT_FORMATS)}, got {output_format!r}")
+        return output_format
+
+    def _apqc_reference(self, kwargs: dict) -> Optional[str]:
+        """Return how APQC codes are assigned ("local" or "prompt"), or None if include_apqc is off."""
+        if not kwargs.get('include_apqc', True):
+            return None
+        apqc_reference = kwargs.get('apqc_reference', self.apqc_reference)
+        if apqc_reference not in APQC_REFERENCES:
+            raise ValueError(
+                f"apqc_reference must be one of {', '.join(APQC_REFERENCES)}, got {apqc_reference!r}"
+            )
+        return apqc_reference
+
+    def _build_request(self, input_data: ProcessAnalysis, **kwargs) -> tuple[str, list]:
+        """
+        Build the user message and system messages for a BPMN generation call.
+
+        Args:
+            input_data: Parsed process analysis
+            **kwargs: Optional parameters (see process)
+
+        Returns:
+            Tuple of (user_message, system_messages)
+        """
+        output_format = self._output_format(kwargs)
+
+        # Load APQC activities reference (local matching needs none)
+        context_blocks = []
+        knowledge_budget = kwargs.get('knowledge_budget', self.knowledge_budget)
+        analysis_markdown = input_data.to_markdown(kwargs.get('analysis_sections', self.analysis_sections))
+        if self._apqc_reference(kwargs) == "prompt":
+            manager = get_skill_manager()
+            if knowledge_budget:
+                # Only the activities most similar to this analysis
+                chunks = manager.retrieve_domain_knowledge('bpmn-generation', analysis_markdown, knowledge_budget,
+                                                           top_k=kwargs.get('knowledge_top_k'),
+                                                           filenames=[APQC_REFERENCE])
+                apqc_content = format_chunks(chunks)
+            else:
+                apqc_content = manager.load_domain_knowledge('bpmn-generation', APQC_REFERENCE)
+            context_blocks.append(f"# APQC Level 4 Activities Reference\n\n{apqc_content}")
+        if output_format == "json":
+            context_blocks.append(schema_prompt())
+
+        # Skill prompt first, then the references, with cache breakpoints on both
+        system_messages = self._build_system_messages(context_blocks)
+
+        # Prepare user message
+        user_message = f"Generate BPMN 2.0 XML for the following process analysis:\n\n{analysis_markdown}"
+        if output_format == "json":
+            user_message += f"\n\n{PROCESS_GRAPH_INSTRUCTION}"
+        elif kwargs.get('local_layout', self.local_layout):
+            user_message += f"\n\n{LOCAL_LAYOUT_INSTRUCTION}"
+
+        return user_message, system_messages
+
+    def _build_result(self, bpmn_text: str, api_metadata: dict, local_layout: bool = False) -> ComponentResult:
         """
-        Validate BPMN XML structure.
+        Extract, lay out and validate the BPMN XML returned by Claude.
 
         Args:
-            bpmn_text: BPMN XML text to validate
+            bpmn_text: Raw response text
+            api_metadata: Usage metadata from the API call
+            local_layout: Replace the diagram section with a local layout
 
         Returns:
-            Tuple of (is_valid, message)
+            ComponentResult with BPMN XML in data field
+        """
+        # Extract XML from markdown code blocks if present
+        if '```xml' in bpmn_text:
+            bpmn_text = bpmn_text.split('```xml')[1].split('```')[0].strip()
+        elif '```' in bpmn_text:
+            bpmn_text = bpmn_text.split('```')[1].split('```')[0].strip()
+
+        metadata = dict(api_metadata)
+        if local_layout:
+            try:
+                bpmn_text = layout_bpmn(bpmn_text)
+                metadata["layout"] = "local"
+            except ValueError as e:
+                metadata["layout_error"] = str(e)
+
+        return self._validated_result(bpmn_text, metadata)
+
+    def _build_graph_result(self, response_text: str, api_metadata: dict) -> ComponentResult:
+        """
+        Validate the JSON process graph returned by Claude and serialize it.
+
+        Args:
+            response_text: Raw response text
+            api_metadata: Usage metadata from the API call
+
+        Returns:
+            ComponentResult with BPMN XML in data field
         """
         try:
-            # Parse XML
-            root = ET.fromstring(bpmn_text)
-
-            # Check namespace
-            bpmn_ns = "http://www.omg.org/spec/BPMN/20100524/MODEL"
-            if bpmn_ns not in root.tag:
-                return False, f"Invalid BPMN namespace. Root tag: {root.tag}"
-
-            # Check for process
-            process = root.find(f".//{{{bpmn_ns}}}process")
-            if process is None:
-                return False, "No process element found"
-
-            # Check for start and end events
-            start_events = root.findall(f".//{{{bpmn_ns}}}startEvent")
-            if not start_events:
-                return False, "No start event found"
-
-            end_events = root.findall(f".//{{{bpmn_ns}}}endEvent")
-            if not end_events:
-                return False, "No end event found"
-
-            # Count elements for reporting
-            tasks = root.findall(f".//{{{bpmn_ns}}}task")
-            gateways = root.findall(f".//{{{bpmn_ns}}}exclusiveGateway")
-            lanes = root.findall(f".//{{{bpmn_ns}}}lane")
-            flows = root.findall(f".//{{{bpmn_ns}}}sequenceFlow")
-
-            message = f"Valid BPMN XML - {len(tasks)} tasks, {len(gateways)} gateways, {len(lanes)} lanes, {len(flows)} flows"
-            return True, message
-
-        except ET.ParseError as e:
-            return False, f"XML parsing error: {str(e)}"
-        except Exception as e:
-            return False, f"Validation error: {str(e)}"
+            graph = parse_process_graph(response_text)
+        except ProcessGraphError as e:
+            return ComponentResult(
+                success=False,
+                data=response_text,  # Return the response anyway for debugging
+                metadata={
+                    **api_metadata,
+                    "component": self.component_name,
+                    "output_format": "json",
+                    "validation_error": str(e)
+                },
+                error=f"Process graph validation failed: {str(e)}"
+            )
+
+        metadata = {
+            **api_metadata,
+            "output_format": "json",
+            "response_length": len(response_text),
+            "layout": "local",
+        }
+        return self._validated_result(serialize_bpmn(graph), metadata)
+
+    def _validated_result(self, bpmn_text: str, metadata: dict) -> ComponentResult:
+        """
+        Validate final BPMN XML and wrap it in a ComponentResult.
+
+        Args:
+            bpmn_text: BPMN XML
+            metadata: API and postprocessing metadata
+
+        Returns:
+            ComponentResult with BPMN XML in data field
+        """
+        # Validate BPMN XML and its process graph in one pass
+        report = validate_bpmn_graph(bpmn_text)
 
-    def process(self, input_data: str, **kwargs) -> ComponentResult:
+        if not report.valid:
+            return ComponentResult(
+                success=False,
+                data=bpmn_text,  # Return generated XML anyway for debugging
+                metadata={
+                    **metadata,
+                    "component": self.component_name,
+                    "validation_error": report.message,
+                    "validation_warnings": report.warnings
+                },
+                error=f"BPMN validation failed: {report.message}"
+            )
+
+        # Return result
+        return ComponentResult(
+            success=True,
+            data=bpmn_text,
+            metadata={
+                **metadata,
+                "component": self.component_name,
+                "xml_length": len(bpmn_text),
+                "validation": report.message,
+                "validation_warnings": report.warnings
+            }
+        )
+
+    def _postprocess(self, response_text: str, api_metadata: dict, output_format: str,
+                     kwargs: dict) -> ComponentResult:
+        """Build the result for a response and attach local APQC matches."""
+        if output_format == "json":
+            result = self._build_graph_result(response_text, api_metadata)
+        else:
+            result = self._build_result(response_text, api_metadata, kwargs.get('local_layout', self.local_layout))
+
+        if result.success and self._apqc_reference(kwargs) == "local":
+            matches = get_apqc_matcher().match_bpmn(result.data)
+            result.metadata["apqc_activities"] = matches
+            result.metadata["apqc_unmatched"] = sum(1 for match in matches if match["code"] is None)
+        return result
+
+    def escalation_reason(self, result: ComponentResult) -> Optional[str]:
+        """Also reject structurally broken diagrams or a failed layout (see BaseComponent.escalation_reason)."""
+        reason = super().escalation_reason(result)
+        if reason is not None:
+            return reason
+        structural = [warning for warning in result.metadata.get("validation_warnings", [])
+                      if any(marker in warning for marker in self.escalation_warnings)]
+        if structural:
+            return f"BPMN validation warnings: {'; '.join(structural)}"
+        if result.metadata.get("layout_error"):
+            return f"BPMN layout failed: {result.metadata['layout_error']}"
+        return None
+
+    def _stream_callback(self,
+                         validator: Optional[IncrementalBPMNValidator],
+                         on_text: Optional[Callable[[str], None]]) -> Optional[Callable[[str], None]]:
+        """
+        Build the on_text callback for a generation call.
+
+        Args:
+            validator: Incremental validator fed with every delta (None disables early abort)
+            on_text: Caller-supplied delta callback
+
+        Returns:
+            Callback that validates each delta before forwarding it, or None
+            if neither validation nor a caller callback is requested
+        """
+        if validator is None:
+            return on_text
+
+        def handle_text(delta: str):
+            error = validator.feed(delta)
+            if on_text is not None:
+                on_text(delta)
+            if error is not None:
+                raise StreamAborted(error)
+
+        return handle_text
+
+    def _aborted_result(self, validator: IncrementalBPMNValidator, reason: str) -> ComponentResult:
+        """Build the failed result for a generation cancelled by early validation."""
+        return ComponentResult(
+            success=False,
+            data=validator.text,  # Partial XML for debugging
+            metadata={
+                "component": self.component_name,
+                "model": self.model,
+                "aborted_early": True,
+                "aborted_after_chars": validator.chars_received,
+                "validation_error": reason
+            },
+            error=f"BPMN validation failed: {reason} (generation aborted after {validator.chars_received} chars)"
+        )
+
+    def process(self, input_data: ProcessAnalysis, **kwargs) -> ComponentResult:
         """
         Generate BPMN 2.0 XML from process analysis.
 
         Args:
-            input_data: Process analysis markdown
+            input_data: ProcessAnalysis (or analysis markdown, parsed on input)
             **kwargs: Optional parameters:
-                - include_apqc: Whether to include APQC activities reference (default True)
+                - include_apqc: Whether to assign APQC activity codes (default True)
+                - apqc_reference: "local" (default: apqc_reference) matches the
+                  generated tasks to APQC activities locally and reports them
+                  in metadata["apqc_activities"]; "prompt" sends the APQC
+                  reference to the model instead
+                - knowledge_budget: Token budget for the APQC reference in
+                  "prompt" mode; when set, only the activities most relevant
+                  to the analysis are sent
+                - knowledge_top_k: Maximum number of retrieved activities
+                - analysis_sections: Analysis sections to send (default:
+                  analysis_sections; None sends the whole analysis)
+                - on_text: Callback receiving text deltas; streams the response
+                - early_abort: Stream the response through an incremental
+                  validator and cancel it as soon as the XML is provably
+                  invalid (default True)
+                - local_layout: Ask for the semantic model only and compute
+                  the BPMNDiagram section locally (default: local_layout)
+                - output_format: "xml" or "json" (default: output_format);
+                  in JSON mode the model returns a process graph that is
+                  validated and serialized locally, and early_abort and
+                  local_layout do not apply
 
         Returns:
             ComponentResult with BPMN XML in data field
         """
         try:
+            timings = StageTimings()
+
             # Validate input
-            self.validate_input(input_data)
+            with timings.measure("validation"):
+                analysis = ProcessAnalysis.coerce(input_data)
+                self.validate_input(analysis)
 
-            # Load skill prompt
-            skill_prompt = self._load_skill_prompt()
+            with timings.measure("request_build"):
+                user_message, system_messages = self._build_request(analysis, **kwargs)
 
-            # Prepare system messages
-            system_messages = [{"type": "text", "text": skill_prompt}]
+            output_format = self._output_format(kwargs)
+            early_abort = output_format == "xml" and kwargs.get('early_abort', True)
+            validator = IncrementalBPMNValidator() if early_abort else None
 
-            # Load APQC activities reference (cached)
-            include_apqc = kwargs.get('include_apqc', True)
-            if include_apqc:
-                from ...skills.skill_manager import SkillManager
-                manager = SkillManager()
-                apqc_content = manager.load_domain_knowledge('bpmn-generation', 'apqc-activities.md')
-                system_messages.append({
-                    "type": "text",
-                    "text": f"# APQC Level 4 Activities Reference\n\n{apqc_content}",
-                    "cache_control": {"type": "ephemeral"}
-                })
+            # Call Claude
+            try:
+                with timings.measure("api"):
+                    bpmn_text, api_metadata = self._call_claude(
+                        user_message=user_message,
+                        system_messages=system_messages,
+                        max_tokens=16000,
+                        temperature=0,
+                        on_text=self._stream_callback(validator, kwargs.get('on_text'))
+                    )
+            except StreamAborted as e:
+                return self._with_timings(self._aborted_result(validator, str(e)), timings)
+
+            with timings.measure("postprocess"):
+                result = self._postprocess(bpmn_text, api_metadata, output_format, kwargs)
+            return self._with_timings(result, timings)
 
-            # Prepare user message
-            user_message = f"Generate BPMN 2.0 XML for the following process analysis:\n\n{input_data}"
+        except Exception as e:
+            return self._error_result(e)
 
-            # Call Claude
-            bpmn_text, api_metadata = self._call_claude(
-                user_message=user_message,
-                system_messages=system_messages,
-                max_tokens=16000,
-                temperature=0
-            )
+    async def aprocess(self, input_data: ProcessAnalysis, **kwargs) -> ComponentResult:
+        """
+        Asynchronously generate BPMN 2.0 XML (see process for parameters).
 
-            # Extract XML from markdown code blocks if present
-            if '```xml' in bpmn_text:
-                bpmn_text = bpmn_text.split('```xml')[1].split('```')[0].strip()
-            elif '```' in bpmn_text:
-                bpmn_text = bpmn_text.split('```')[1].split('```')[0].strip()
-
-            # Validate BPMN XML
-            is_valid, validation_message = self._validate_bpmn_xml(bpmn_text)
-
-            if not is_valid:
-                return ComponentResult(
-                    success=False,
-                    data=bpmn_text,  # Return generated XML anyway for debugging
-                    metadata={
-                        **api_metadata,
-                        "component": self.component_name,
-                        "validation_error": validation_message
-                    },
-                    error=f"BPMN validation failed: {validation_message}"
-                )
-
-            # Return result
-            return ComponentResult(
-                success=True,
-                data=bpmn_text,
-                metadata={
-                    **api_metadata,
-                    "component": self.component_name,
-                    "xml_length": len(bpmn_text),
-                    "validation": validation_message
-                }
-            )
+        Returns:
+            ComponentResult with BPMN XML in data field
+        """
+        try:
+            timings = StageTimings()
+
+            with timings.measure("validation"):
+                analysis = ProcessAnalysis.coerce(input_data)
+                self.validate_input(analysis)
+
+            with timings.measure("request_build"):
+                user_message, system_messages = self._build_request(analysis, **kwargs)
+
+            output_format = self._output_format(kwargs)
+            early_abort = output_format == "xml" and kwargs.get('early_abort', True)
+            validator = IncrementalBPMNValidator() if early_abort else None
+
+            try:
+                with timings.measure("api"):
+                    bpmn_text, api_metadata = await self._acall_claude(
+                        user_message=user_message,
+                        system_messages=system_messages,
+                        max_tokens=16000,
+                        temperature=0,
+                        on_text=self._stream_callback(validator, kwargs.get('on_text'))
+                    )
+            except StreamAborted as e:
+                return self._with_timings(self._aborted_result(validator, str(e)), timings)
+
+            with timings.measure("postprocess"):
+                result = self._postprocess(bpmn_text, api_metadata, output_format, kwargs)
+            return self._with_timings(result, timings)
 
-        except ValueError as e:
-            return ComponentResult(
-                success=False,
-                data=None,
-                metadata={"component": self.component_name},
-                error=f"Validation error: {str(e)}"
-            )
         except Exception as e:
-            return ComponentResult(
-                success=False,
-                data=None,
-                metadata={"component": self.component_name},
-                error=f"Processing error: {str(e)}"
-            )
+            return self._error_result(e)
@@ -0,0 +1,545 @@
+"""
+Local BPMN diagram layout.
+
+Roughly half of a generated BPMN file is ``bpmndi:BPMNDiagram`` boilerplate:
+bounds for every lane and node and waypoints for every flow. layout_bpmn
+computes that section deterministically from the semantic model, so the
+model only has to generate ``bpmn:process``:
+
+- nodes are ranked into columns by their longest path from a start event
+  (flows that loop back are ignored for ranking)
+- each lane is a horizontal band with one row per node sharing a column
+- sequence flows get orthogonal waypoints; loop-backs run below their nodes
+
+Participants of a collaboration are stacked as pools with their message
+flows. Sub-processes are drawn collapsed, and artifacts (text annotations,
+data objects) are not laid out.
+"""
+
+import re
+from collections import deque
+from dataclasses import dataclass, field
+from itertools import count
+from typing import Dict, List, Optional, Set, Tuple
+from xml.sax.saxutils import quoteattr
+import xml.etree.ElementTree as ET
+
+from .bpmn_validation import BPMN_NS, BPMNDI_NS, FLOW_NODE_TYPES, GATEWAY_TYPES, _split_tag
+
+DC_NS = "http://www.omg.org/spec/DD/20100524/DC"
+DI_NS = "http://www.omg.org/spec/DD/20100524/DI"
+
+# Prefixes used by the generated section, declared on the root if missing
+DI_NAMESPACES = {"bpmndi": BPMNDI_NS, "dc": DC_NS, "di": DI_NS}
+
+# Appended to the generation request when the diagram is laid out locally
+LOCAL_LAYOUT_INSTRUCTION = (
+    "Output only the semantic process model: omit the bpmndi:BPMNDiagram section "
+    "(shapes, edges and coordinates). The diagram layout is computed locally."
+)
+
+# Geometry, following the positioning rules in skills/bpmn-generation/SKILL.md
+ORIGIN_X = 160
+ORIGIN_Y = 80
+HEADER_WIDTH = 30        # Pool and lane name bands
+MARGIN = 50              # Space between a lane header or end and the nearest column
+COLUMN_WIDTH = 150
+ROW_HEIGHT = 120
+LANE_MIN_HEIGHT = 250
+LANE_PADDING = 20
+POOL_GAP = 60
+LABEL_HEIGHT = 14
+LABEL_MAX_WIDTH = 120
+
+TASK_SIZE = (100, 80)
+GATEWAY_SIZE = (50, 50)
+EVENT_SIZE = (36, 36)
+
+_DIAGRAM = re.compile(r"[ \t]*<(?:[\w.-]+:)?BPMNDiagram\b.*?</(?:[\w.-]+:)?BPMNDiagram>[ \t]*\n?", re.S)
+_ROOT_TAG = re.compile(r"<((?:[\w.-]+:)?definitions)\b([^>]*)>")
+
+
+@dataclass
+class _Shape:
+    """Bounds of a laid-out element."""
+
+    element_id: str
+    kind: str
+    x: int
+    y: int
+    width: int
+    height: int
+    attributes: str = ""  # Extra BPMNShape attributes, e.g. isHorizontal
+    label: Optional[Tuple[int, int, int, int]] = None
+
+    @property
+    def cx(self) -> int:
+        return self.x + self.width // 2
+
+    @property
+    def cy(self) -> int:
+        return self.y + self.height // 2
+
+    @property
+    def right(self) -> int:
+        return self.x + self.width
+
+    @property
+    def bottom(self) -> int:
+        return self.y + self.height
+
+
+@dataclass
+class _Edge:
+    """Waypoints of a laid-out flow."""
+
+    element_id: str
+    waypoints: List[Tuple[int, int]]
+    label: Optional[Tuple[int, int, int, int]] = None
+
+
+@dataclass
+class _Lane:
+    """A lane and its nested lanes, in document order."""
+
+    element_id: str
+    refs: List[str]
+    children: List["_Lane"] = field(default_factory=list)
+
+
+@dataclass
+class _ProcessLayout:
+    """Shapes and edges of one process, in output order."""
+
+    shapes: List[_Shape] = field(default_factory=list)
+    edges: List[_Edge] = field(default_factory=list)
+    index: Dict[str, _Shape] = field(default_factory=dict)  # Element id -> shape
+    width: int = 0
+    height: int = 0
+
+
+def _children(element: ET.Element, local: str) -> List[ET.Element]:
+    """Return the BPMN children of an element with the given local name."""
+    return [child for child in element if _split_tag(child.tag) == (BPMN_NS, local)]
+
+
+def _shape_size(kind: str) -> Tuple[int, int]:
+    """Return the (width, height) of a flow node."""
+    if kind in GATEWAY_TYPES:
+        return GATEWAY_SIZE
+    if kind.endswith("Event"):
+        return EVENT_SIZE
+    return TASK_SIZE
+
+
+def _label_bounds(name: str, cx: int, y: int) -> Tuple[int, int, int, int]:
+    """Return label bounds centred on cx with their top at y."""
+    width = max(40, min(LABEL_MAX_WIDTH, len(name) * 6))
+    return cx - width // 2, y, width, LABEL_HEIGHT
+
+
+def _free_row(taken: Set[int], preferred: int) -> int:
+    """Return the free row nearest to the preferred one."""
+    for offset in count():
+        for candidate in (preferred + offset, preferred - offset):
+            if candidate >= 0 and candidate not in taken:
+                return candidate
+    raise AssertionError("unreachable")
+
+
+def _lane_tree(lane_set: ET.Element) -> List[_Lane]:
+    """Read a laneSet (or childLaneSet) recursively."""
+    lanes = []
+    for lane in _children(lane_set, "lane"):
+        refs = [(ref.text or "").strip() for ref in _children(lane, "flowNodeRef")]
+        nested = _children(lane, "childLaneSet")
+        lanes.append(_Lane(lane.get("id", ""), refs, _lane_tree(nested[0]) if nested else []))
+    return lanes
+
+
+def _leaves(lanes: List[_Lane], depth: int = 1) -> List[Tuple[_Lane, int]]:
+    """Return (lane, depth) for every lane without nested lanes, top to bottom."""
+    leaves = []
+    for lane in lanes:
+        leaves.extend(_leaves(lane.children, depth + 1) if lane.children else [(lane, depth)])
+    return leaves
+
+
+def _assign_lanes(lanes: List[_Lane], leaf_index: Dict[str, int], lane_of: Dict[str, int]):
+    """Map node ids to leaf lane indexes; refs on a parent lane go to its first leaf."""
+    for lane in lanes:
+        _assign_lanes(lane.children, leaf_index, lane_of)
+        first_leaf = leaf_index[_leaves([lane])[0][0].element_id]
+        for ref in lane.refs:
+            lane_of.setdefault(ref, first_leaf)
+
+
+def _rank(nodes: Dict[str, str], successors: Dict[str, List[str]]) -> Tuple[Dict[str, int], List[str], Set[tuple]]:
+    """
+    Rank nodes into columns by longest path, ignoring loop-back flows.
+
+    Args:
+        nodes: Node id -> element type, in document order
+        successors: Node id -> successor ids
+
+    Returns:
+        Tuple of (rank per node, topological order, loop-back (source, target) pairs)
+    """
+    incoming = {node: 0 for node in nodes}
+    for targets in successors.values():
+        for target in targets:
+            incoming[target] += 1
+    roots = [node for node, kind in nodes.items() if kind == "startEvent"]
+    roots += [node for node in nodes if incoming[node] == 0] + list(nodes)
+
+    # Depth-first search from the start events; flows to a node still on the
+    # stack close a loop
+    state: Dict[str, int] = {}  # 1 while on the stack, 2 when finished
+    back: Set[tuple] = set()
+    for root in roots:
+        if root in state:
+            continue
+        state[root] = 1
+        stack = [(root, iter(successors[root]))]
+        while stack:
+            node, remaining = stack[-1]
+            for target in remaining:
+                if state.get(target) == 1:
+                    back.add((node, target))
+                elif target not in state:
+                    state[target] = 1
+                    stack.append((target, iter(successors[target])))
+                    break
+            else:
+                state[node] = 2
+                stack.pop()
+
+    indegree = {node: 0 for node in nodes}
+    for source, targets in successors.items():
+        for target in targets:
+            if (source, target) not in back:
+                indegree[target] += 1
+    rank = {node: 0 for node in nodes}
+    order = []
+    queue = deque(node for node in nodes if indegree[node] == 0)
+    while queue:
+        node = queue.popleft()
+        order.append(node)
+        for target in successors[node]:
+            if (node, target) in back:
+                continue
+            rank[target] = max(rank[target], rank[node] + 1)
+            indegree[target] -= 1
+            if indegree[target] == 0:
+                queue.append(target)
+    return rank, order, back
+
+
+def _route(source: _Shape, target: _Shape, backward: bool) -> List[Tuple[int, int]]:
+    """Return orthogonal waypoints from source to target."""
+    if backward or (source.kind == "boundaryEvent" and target.cy <= source.cy):
+        below = max(source.cy, target.cy) + ROW_HEIGHT // 2
+        return [(source.cx, source.bottom), (source.cx, below), (target.cx, below), (target.cx, target.bottom)]
+    if source.cy == target.cy:
+        return [(source.right, source.cy), (target.x, target.cy)]
+    if source.kind in GATEWAY_TYPES or source.kind == "boundaryEvent":
+        start = source.y if target.cy < source.cy else source.bottom
+        return [(source.cx, start), (source.cx, target.cy), (target.x, target.cy)]
+    if target.kind in GATEWAY_TYPES:
+        end = target.y if source.cy < target.cy else target.bottom
+        return [(source.right, source.cy), (target.cx, source.cy), (target.cx, end)]
+    middle = (source.right + target.x) // 2
+    return [(source.right, source.cy), (middle, source.cy), (middle, target.cy), (target.x, target.cy)]
+
+
+def layout_process(process: ET.Element, x0: int = ORIGIN_X, y0: int = ORIGIN_Y) -> _ProcessLayout:
+    """
+    Lay out the lanes, flow nodes and sequence flows of one process.
+
+    Args:
+        process: ``bpmn:process`` element
+        x0: Left edge of the lanes
+        y0: Top edge of the first lane
+
+    Returns:
+        Layout with lane shapes first, then nodes, then edges
+    """
+    nodes: Dict[str, str] = {}
+    names: Dict[str, str] = {}
+    attached: Dict[str, str] = {}  # Boundary event -> host
+    flows = []
+    for child in process:
+        namespace, local = _split_tag(child.tag)
+        element_id = child.get("id")
+        if namespace != BPMN_NS or not element_id:
+            continue
+        if local == "boundaryEvent":
+            attached[element_id] = child.get("attachedToRef", "")
+            names[element_id] = child.get("name", "")
+        elif local in FLOW_NODE_TYPES:
+            nodes[element_id] = local
+            names[element_id] = child.get("name", "")
+        elif local == "sequenceFlow":
+            flows.append((element_id, child.get("sourceRef", ""), child.get("targetRef", ""), child.get("name", "")))
+
+    # Flows leaving a boundary event rank from its host
+    successors: Dict[str, List[str]] = {node: [] for node in nodes}
+    predecessors: Dict[str, List[str]] = {node: [] for node in nodes}
+    for _, source, target, _ in flows:
+        source = attached.get(source, source)
+        if source in nodes and target in nodes:
+            successors[source].append(target)
+            predecessors[target].append(source)
+    rank, order, back = _rank(nodes, successors)
+
+    lane_sets = _children(process, "laneSet")
+    lanes = _lane_tree(lane_sets[0]) if lane_sets else []
+    leaves = _leaves(lanes)
+    leaf_index = {lane.element_id: index for index, (lane, _) in enumerate(leaves)}
+    lane_of: Dict[str, int] = {}
+    _assign_lanes(lanes, leaf_index, lane_of)
+    for node in order:  # Unassigned nodes follow their first predecessor
+        if node not in lane_of:
+            lane_of[node] = next((lane_of[p] for p in predecessors[node] if p in lane_of), 0)
+
+    row: Dict[str, int] = {}
+    taken: Dict[tuple, Set[int]] = {}
+    for node in order:
+        preferred = next((row[p] for p in predecessors[node] if p in row and lane_of[p] == lane_of[node]), 0)
+        cell = taken.setdefault((lane_of[node], rank[node]), set())
+        row[node] = _free_row(cell, preferred)
+        cell.add(row[node])
+
+    # Lane bands, top to bottom
+    band_count = max(len(leaves), 1)
+    rows = [1] * band_count
+    for node in order:
+        rows[lane_of[node]] = max(rows[lane_of[node]], row[node] + 1)
+    tops, heights = [], []
+    y = y0
+    for band_rows in rows:
+        tops.append(y)
+        heights.append(max(LANE_MIN_HEIGHT, band_rows * ROW_HEIGHT + 2 * LANE_PADDING))
+        y += heights[-1]
+
+    depth = max((lane_depth for _, lane_depth in leaves), default=0)
+    content_x = x0 + depth * HEADER_WIDTH + MARGIN
+    columns = max(rank.values(), default=0) + 1
+    layout = _ProcessLayout(width=content_x - x0 + columns * COLUMN_WIDTH + MARGIN, height=y - y0)
+
+    def add_lanes(children: List[_Lane], lane_depth: int):
+        for lane in children:
+            indexes = [leaf_index[leaf.element_id] for leaf, _ in _leaves([lane])]
+            top = tops[indexes[0]]
+            bottom = tops[indexes[-1]] + heights[indexes[-1]]
+            offset = (lane_depth - 1) * HEADER_WIDTH
+            layout.shapes.append(_Shape(lane.element_id, "lane", x0 + offset, top, layout.width - offset,
+                                        bottom - top, ' isHorizontal="true"'))
+            add_lanes(lane.children, lane_depth + 1)
+
+    add_lanes(lanes, 1)
+
+    index = layout.index
+    for node in order:
+        kind = nodes[node]
+        width, height = _shape_size(kind)
+        band = lane_of[node]
+        cx = content_x + rank[node] * COLUMN_WIDTH + COLUMN_WIDTH // 2
+        cy = (tops[band] + (heights[band] - rows[band] * ROW_HEIGHT) // 2
+              + row[node] * ROW_HEIGHT + ROW_HEIGHT // 2)
+        shape = _Shape(node, kind, cx - width // 2, cy - height // 2, width, height)
+        if kind == "exclusiveGateway":
+            shape.attributes = ' isMarkerVisible="true"'
+        elif kind == "subProcess":
+            shape.attributes = ' isExpanded="false"'
+        name = names[node]
+        if name and kind in GATEWAY_TYPES:
+            shape.label = _label_bounds(name, cx, shape.y - LABEL_HEIGHT - 10)
+        elif name and kind.endswith("Event"):
+            shape.label = _label_bounds(name, cx, shape.bottom + 7)
+        index[node] = shape
+        layout.shapes.append(shape)
+
+    # Boundary events sit on the bottom edge of their host, right to left
+    per_host: Dict[str, int] = {}
+    for event, host in attached.items():
+        if host not in index:
+            continue
+        position = per_host.get(host, 0)
+        per_host[host] = position + 1
+        width, height = EVENT_SIZE
+        host_shape = index[host]
+        shape = _Shape(event, "boundaryEvent", host_shape.right - 20 - width - position * (width + 10),
+                       host_shape.bottom - height // 2, width, height)
+        if names[event]:
+            shape.label = _label_bounds(names[event], shape.cx, shape.bottom + 7)
+        index[event] = shape
+        layout.shapes.append(shape)
+
+    for flow_id, source, target, name in flows:
+        if source not in index or target not in index:
+            continue
+        anchor = attached.get(source, source)
+        backward = (anchor, target) in back or rank[target] <= rank[anchor]
+        waypoints = _route(index[source], index[target], backward)
+        edge = _Edge(flow_id, waypoints)
+        if name:
+            x, y = waypoints[-2]
+            edge.label = (x + 5, y - LABEL_HEIGHT - 4, min(LABEL_MAX_WIDTH, max(40, len(name) * 6)), LABEL_HEIGHT)
+        layout.edges.append(edge)
+
+    return layout
+
+
+def _collaboration_layout(collaboration: ET.Element, processes: Dict[str, ET.Element]) -> _ProcessLayout:
+    """Stack participants as pools and route message flows between them."""
+    layout = _ProcessLayout()
+    pools = []
+    index = layout.index
+    y = ORIGIN_Y
+    for participant in _children(collaboration, "participant"):
+        process = processes.get(participant.get("processRef", ""))
+        if process is not None:
+            inner = layout_process(process, ORIGIN_X + HEADER_WIDTH, y)
+            height, width = inner.height, inner.width + HEADER_WIDTH
+        else:  # Black-box pool
+            inner, height, width = None, ROW_HEIGHT // 2, 0
+        pool = _Shape(participant.get("id", ""), "participant", ORIGIN_X, y, width, height, ' isHorizontal="true"')
+        pools.append(pool)
+        index[pool.element_id] = pool
+        layout.shapes.append(pool)
+        if inner is not None:
+            layout.shapes.extend(inner.shapes)
+            layout.edges.extend(inner.edges)
+            index.update(inner.index)
+        y += height + POOL_GAP
+
+    layout.width = max((pool.width for pool in pools), default=0)
+    for pool in pools:  # Equal pool widths
+        pool.width = layout.width
+    layout.height = y - POOL_GAP - ORIGIN_Y
+
+    for flow in _children(collaboration, "messageFlow"):
+        source, target = index.get(flow.get("sourceRef", "")), index.get(flow.get("targetRef", ""))
+        if source is None or target is None:
+            continue
+        downward = source.cy < target.cy
+        start = source.bottom if downward else source.y
+        end = target.y if downward else target.bottom
+        middle = (start + end) // 2
+        waypoints = [(source.cx, start), (source.cx, middle), (target.cx, middle), (target.cx, end)]
+        if source.cx == target.cx:
+            waypoints = [(source.cx, start), (target.cx, end)]
+        layout.edges.append(_Edge(flow.get("id", ""), waypoints))
+    return layout
+
+
+def _render_plane(diagram_number: int, element_id: str, layout: _ProcessLayout) -> List[str]:
+    """Render one BPMNDiagram element as indented lines."""
+    lines = [
+        f'  <bpmndi:BPMNDiagram id="BPMNDiagram_{diagram_number}">',
+        f'    <bpmndi:BPMNPlane id="BPMNPlane_{diagram_number}" bpmnElement={quoteattr(element_id)}>',
+    ]
+    for shape in layout.shapes:
+        lines.append(f'      <bpmndi:BPMNShape id={quoteattr(shape.element_id + "_di")} '
+                     f'bpmnElement={quoteattr(shape.element_id)}{shape.attributes}>')
+        lines.append(f'        <dc:Bounds x="{shape.x}" y="{shape.y}" width="{shape.width}" height="{shape.height}" />')
+        if shape.label is not None:
+            x, y, width, height = shape.label
+            lines += ['        <bpmndi:BPMNLabel>',
+                      f'          <dc:Bounds x="{x}" y="{y}" width="{width}" height="{height}" />',
+                      '        </bpmndi:BPMNLabel>']
+        lines.append('      </bpmndi:BPMNShape>')
+    for edge in layout.edges:
+        lines.append(f'      <bpmndi:BPMNEdge id={quoteattr(edge.element_id + "_di")} '
+                     f'bpmnElement={quoteattr(edge.element_id)}>')
+        lines += [f'        <di:waypoint x="{x}" y="{y}" />' for x, y in edge.waypoints]
+        if edge.label is not None:
+            x, y, width, height = edge.label
+            lines += ['        <bpmndi:BPMNLabel>',
+                      f'          <dc:Bounds x="{x}" y="{y}" width="{width}" height="{height}" />',
+                      '        </bpmndi:BPMNLabel>']
+        lines.append('      </bpmndi:BPMNEdge>')
+    lines += ['    </bpmndi:BPMNPlane>', '  </bpmndi:BPMNDiagram>']
+    return lines
+
+
+def strip_diagram(bpmn_text: str) -> str:
+    """Remove any ``BPMNDiagram`` sections from BPMN XML text."""
+    return _DIAGRAM.sub("", bpmn_text)
+
+
+def render_diagram(root: ET.Element) -> str:
+    """
+    Compute the BPMNDiagram section(s) for a parsed ``bpmn:definitions``.
+
+    A collaboration gets one diagram with a pool per participant; otherwise
+    each process gets its own diagram.
+
+    Args:
+        root: Parsed definitions element
+
+    Returns:
+        Diagram XML, indented for insertion before ``</bpmn:definitions>``
+    """
+    processes = {process.get("id", ""): process for process in _children(root, "process")}
+    collaborations = _children(root, "collaboration")
+    if collaborations:
+        planes = [(collaborations[0].get("id", ""), _collaboration_layout(collaborations[0], processes))]
+    else:
+        planes = [(process_id, layout_process(process)) for process_id, process in processes.items()]
+
+    lines = []
+    for number, (element_id, layout) in enumerate(planes, start=1):
+        lines += _render_plane(number, element_id, layout)
+    return "\n".join(lines) + "\n"
+
+
+def layout_bpmn(bpmn_text: str) -> str:
+    """
+    Replace the diagram section of BPMN XML with a locally computed layout.
+
+    The semantic part of the document is kept unchanged; any existing
+    BPMNDiagram is removed and the new one is inserted before the root close
+    tag, so laying out a laid-out document is a no-op. Missing
+    ``bpmndi``/``dc``/``di`` namespace declarations are added to the root
+    element.
+
+    Args:
+        bpmn_text: BPMN 2.0 XML, with or without a diagram section
+
+    Returns:
+        BPMN XML with a BPMNDiagram for every process
+
+    Raises:
+        ValueError: If the XML cannot be parsed, is not BPMN definitions or
+            has no root close tag to insert the diagram before
+    """
+    semantic = strip_diagram(bpmn_text)
+    try:
+        root = ET.fromstring(semantic)
+    except ET.ParseError as e:
+        raise ValueError(f"XML parsing error: {str(e)}") from e
+    if _split_tag(root.tag) != (BPMN_NS, "definitions"):
+        raise ValueError(f"Invalid BPMN namespace. Root tag: {root.tag}")
+    diagram = render_diagram(root)
+
+    match = _ROOT_TAG.search(semantic)
+    if match is None:
+        raise ValueError("Root definitions tag not found")
+    qualified, attributes = match.group(1), match.group(2)
+    declarations = ""
+    for prefix, uri in DI_NAMESPACES.items():
+        declared = re.search(rf'xmlns:{prefix}\s*=\s*(["\'])(.*?)\1', attributes)
+        if declared is None:
+            declarations += f' xmlns:{prefix}="{uri}"'
+        elif declared.group(2) != uri:
+            raise ValueError(f"Namespace prefix '{prefix}' is bound to {declared.group(2)}")
+    if declarations:
+        insert_at = match.end(2) - (1 if attributes.endswith("/") else 0)
+        semantic = semantic[:insert_at] + declarations + semantic[insert_at:]
+
+    close = semantic.rfind(f"</{qualified}>")
+    if close == -1:
+        raise ValueError(f"Closing </{qualified}> tag not found")
+    return f"{semantic[:close].rstrip()}\n\n{diagram}\n{semantic[close:]}"
@@ -0,0 +1,396 @@
+"""
+Compact JSON process graphs and their BPMN 2.0 XML serialization.
+
+In ``output_format="json"`` mode BPMNGenerator asks the model for a small
+JSON object describing lanes, nodes and flows instead of namespaced XML.
+The graph is checked against PROCESS_GRAPH_SCHEMA and for consistent
+references, then serialize_bpmn writes the XML locally: ids, lane
+``flowNodeRef``s, ``incoming``/``outgoing`` cross-references, conditions
+and default flows, with the diagram section computed by bpmn_layout.
+Malformed XML cannot occur, and the model writes a fraction of the tokens.
+"""
+
+import json
+import re
+from typing import Any, Dict, List, Optional
+from xml.sax.saxutils import escape, quoteattr
+import xml.etree.ElementTree as ET
+
+from .bpmn_layout import layout_bpmn
+from .bpmn_validation import BPMN_NS, GATEWAY_TYPES, TASK_TYPES, _split_tag
+
+# Node types a process graph may use
+EVENT_TYPES = ("startEvent", "endEvent", "intermediateCatchEvent", "intermediateThrowEvent", "boundaryEvent")
+NODE_TYPES = tuple(sorted(TASK_TYPES)) + tuple(sorted(GATEWAY_TYPES)) + EVENT_TYPES
+
+# Event definitions, written as <bpmn:{name}EventDefinition />
+EVENT_DEFINITIONS = ("message", "timer", "error", "signal", "conditional", "escalation", "terminate")
+
+_ID_PATTERN = r"^[A-Za-z_][A-Za-z0-9_.-]*$"
+
+PROCESS_GRAPH_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "required": ["nodes", "flows"],
+    "additionalProperties": False,
+    "properties": {
+        "id": {"type": "string", "pattern": _ID_PATTERN},
+        "name": {"type": "string"},
+        "lanes": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "required": ["id", "name"],
+                "additionalProperties": False,
+                "properties": {
+                    "id": {"type": "string", "pattern": _ID_PATTERN},
+                    "name": {"type": "string"},
+                },
+            },
+        },
+        "nodes": {
+            "type": "array",
+            "minItems": 2,
+            "items": {
+                "type": "object",
+                "required": ["id", "type"],
+                "additionalProperties": False,
+                "properties": {
+                    "id": {"type": "string", "pattern": _ID_PATTERN},
+                    "type": {"type": "string", "enum": list(NODE_TYPES)},
+                    "name": {"type": "string"},
+                    "lane": {"type": "string"},
+                    "event": {"type": "string", "enum": list(EVENT_DEFINITIONS)},
+                    "attachedTo": {"type": "string"},
+                    "documentation": {"type": "string"},
+                },
+            },
+        },
+        "flows": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "required": ["source", "target"],
+                "additionalProperties": False,
+                "properties": {
+                    "id": {"type": "string", "pattern": _ID_PATTERN},
+                    "source": {"type": "string"},
+                    "target": {"type": "string"},
+                    "name": {"type": "string"},
+                    "condition": {"type": "string"},
+                    "default": {"type": "boolean"},
+                },
+            },
+        },
+    },
+}
+
+# Appended to the generation request in JSON mode
+PROCESS_GRAPH_INSTRUCTION = (
+    "Return the process as a single JSON object matching the process graph schema "
+    "in the system prompt, not as XML. Use the same ids, names, lanes and gateway "
+    "conditions the BPMN XML would have; incoming/outgoing references, flow ids and "
+    "the diagram layout are generated locally."
+)
+
+_JSON_TYPES = {"object": dict, "array": list, "string": str, "boolean": bool}
+
+
+class ProcessGraphError(ValueError):
+    """Raised when a process graph is not valid JSON or violates the schema."""
+
+    def __init__(self, errors: List[str]):
+        self.errors = errors
+        shown = "; ".join(errors[:5])
+        super().__init__(shown if len(errors) <= 5 else f"{shown}; ... ({len(errors)} errors)")
+
+
+def schema_prompt() -> str:
+    """Return the schema reference block sent as system context in JSON mode."""
+    return (
+        "# Process Graph JSON Schema\n\n"
+        "Node types map to BPMN elements of the same name; `lane` is a lane id, `event` adds an "
+        "event definition, `attachedTo` places a boundaryEvent on a task, and a flow's "
+        "`condition` becomes its conditionExpression. Mark at most one outgoing flow per "
+        "gateway as `default`.\n\n"
+        f"```json\n{json.dumps(PROCESS_GRAPH_SCHEMA, indent=1)}\n```"
+    )
+
+
+def _check_schema(value: Any, schema: Dict[str, Any], path: str, errors: List[str]):
+    """Check a value against the subset of JSON Schema used by PROCESS_GRAPH_SCHEMA."""
+    expected = _JSON_TYPES[schema["type"]]
+    if not isinstance(value, expected) or (expected is not bool and isinstance(value, bool)):
+        errors.append(f"{path}: expected {schema['type']}")
+        return
+    if "enum" in schema and value not in schema["enum"]:
+        errors.append(f"{path}: {value!r} is not one of {', '.join(schema['enum'])}")
+    if "pattern" in schema and not re.match(schema["pattern"], value):
+        errors.append(f"{path}: {value!r} is not a valid id")
+    if expected is list:
+        if len(value) < schema.get("minItems", 0):
+            errors.append(f"{path}: expected at least {schema['minItems']} items")
+        for i, item in enumerate(value):
+            _check_schema(item, schema["items"], f"{path}[{i}]", errors)
+    elif expected is dict:
+        for key in schema.get("required", ()):
+            if key not in value:
+                errors.append(f"{path}: missing '{key}'")
+        properties = schema.get("properties", {})
+        for key, item in value.items():
+            if key in properties:
+                _check_schema(item, properties[key], f"{path}.{key}", errors)
+            elif schema.get("additionalProperties", True) is False:
+                errors.append(f"{path}: unexpected property '{key}'")
+
+
+def validate_process_graph(graph: Any) -> Dict[str, Any]:
+    """
+    Check a process graph against the schema and for consistent references.
+
+    Flows without an id are numbered ``Flow_1``, ``Flow_2``, ... (skipping
+    ids already in use).
+
+    Args:
+        graph: Decoded JSON graph
+
+    Returns:
+        The graph, with flow ids filled in
+
+    Raises:
+        ProcessGraphError: Listing every problem found
+    """
+    errors: List[str] = []
+    _check_schema(graph, PROCESS_GRAPH_SCHEMA, "graph", errors)
+    if errors:
+        raise ProcessGraphError(errors)
+
+    lanes = {lane["id"] for lane in graph.get("lanes", [])}
+    nodes = {node["id"]: node for node in graph["nodes"]}
+    ids = [graph.get("id", "Process_1")] + [lane["id"] for lane in graph.get("lanes", [])]
+    ids += [node["id"] for node in graph["nodes"]] + [flow["id"] for flow in graph["flows"] if "id" in flow]
+    seen = set()
+    for element_id in ids:
+        if element_id in seen:
+            errors.append(f"Duplicate id: {element_id}")
+        seen.add(element_id)
+
+    types = [node["type"] for node in graph["nodes"]]
+    if "startEvent" not in types:
+        errors.append("No startEvent node")
+    if "endEvent" not in types:
+        errors.append("No endEvent node")
+
+    for node in graph["nodes"]:
+        if "lane" in node and node["lane"] not in lanes:
+            errors.append(f"Node {node['id']} references unknown lane '{node['lane']}'")
+        if "event" in node and node["type"] not in EVENT_TYPES:
+            errors.append(f"Node {node['id']} is a {node['type']} and cannot have an event definition")
+        if node["type"] == "boundaryEvent":
+            host = nodes.get(node.get("attachedTo", ""))
+            if host is None or host["type"] not in TASK_TYPES:
+                errors.append(f"Boundary event {node['id']} must be attachedTo a task")
+        elif "attachedTo" in node:
+            errors.append(f"Node {node['id']} is not a boundaryEvent but has attachedTo")
+
+    defaults: Dict[str, int] = {}
+    for i, flow in enumerate(graph["flows"]):
+        for end in ("source", "target"):
+            if flow[end] not in nodes:
+                errors.append(f"flows[{i}] {end} references unknown node '{flow[end]}'")
+        if flow.get("default"):
+            source = nodes.get(flow["source"])
+            if source is not None and source["type"] not in GATEWAY_TYPES:
+                errors.append(f"flows[{i}] is marked default but {flow['source']} is not a gateway")
+            defaults[flow["source"]] = defaults.get(flow["source"], 0) + 1
+    errors += [f"Gateway {gateway} has {n} default flows" for gateway, n in defaults.items() if n > 1]
+    if errors:
+        raise ProcessGraphError(errors)
+
+    number = 0
+    for flow in graph["flows"]:
+        if "id" not in flow:
+            number += 1
+            while f"Flow_{number}" in seen:
+                number += 1
+            flow["id"] = f"Flow_{number}"
+    return graph
+
+
+def parse_process_graph(text: str) -> Dict[str, Any]:
+    """
+    Decode and validate the JSON object in a model response.
+
+    Decoding starts at the first ``{``, so surrounding prose or a code fence
+    is ignored without splitting the text.
+
+    Args:
+        text: Response text containing a JSON process graph
+
+    Returns:
+        Validated graph (see validate_process_graph)
+
+    Raises:
+        ProcessGraphError: If there is no JSON object or it is invalid
+    """
+    start = text.find("{")
+    if start == -1:
+        raise ProcessGraphError(["Response contains no JSON object"])
+    try:
+        graph, _ = json.JSONDecoder().raw_decode(text, start)
+    except json.JSONDecodeError as e:
+        raise ProcessGraphError([f"JSON parsing error: {str(e)}"]) from e
+    return validate_process_graph(graph)
+
+
+def _element(local: str, attributes: Dict[str, Optional[str]], children: List[str], indent: str) -> List[str]:
+    """Render a BPMN element with optional child lines."""
+    attrs = "".join(f" {key}={quoteattr(value)}" for key, value in attributes.items() if value is not None)
+    if not children:
+        return [f"{indent}<bpmn:{local}{attrs} />"]
+    return [f"{indent}<bpmn:{local}{attrs}>", *children, f"{indent}</bpmn:{local}>"]
+
+
+def serialize_bpmn(graph: Dict[str, Any], layout: bool = True) -> str:
+    """
+    Write BPMN 2.0 XML for a validated process graph.
+
+    Args:
+        graph: Graph returned by parse_process_graph or validate_process_graph
+        layout: Add the BPMNDiagram section (see bpmn_layout.layout_bpmn)
+
+    Returns:
+        BPMN 2.0 XML document
+    """
+    incoming: Dict[str, List[str]] = {node["id"]: [] for node in graph["nodes"]}
+    outgoing: Dict[str, List[str]] = {node["id"]: [] for node in graph["nodes"]}
+    default_flow: Dict[str, str] = {}
+    for flow in graph["flows"]:
+        outgoing[flow["source"]].append(flow["id"])
+        incoming[flow["target"]].append(flow["id"])
+        if flow.get("default"):
+            default_flow[flow["source"]] = flow["id"]
+
+    lines = [
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        '<bpmn:definitions xmlns:bpmn="http://www.omg.org/spec/BPMN/20100524/MODEL"',
+        '                  xmlns:bpmndi="http://www.omg.org/spec/BPMN/20100524/DI"',
+        '                  xmlns:dc="http://www.omg.org/spec/DD/20100524/DC"',
+        '                  xmlns:di="http://www.omg.org/spec/DD/20100524/DI"',
+        '                  xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance"',
+        '                  id="Definitions_1"',
+        '                  targetNamespace="http://bpmn.io/schema/bpmn"',
+        '                  exporter="Transformation Consultant Agent - BPMN Generation Skill"',
+        '                  exporterVersion="1.0">',
+        "",
+    ]
+    lines += [f'  <bpmn:process id={quoteattr(graph.get("id", "Process_1"))}'
+              + (f' name={quoteattr(graph["name"])}' if graph.get("name") else "")
+              + ' isExecutable="false">']
+
+    if graph.get("lanes"):
+        # Boundary events without a lane share their host's lane
+        hosts = {node["id"]: node for node in graph["nodes"]}
+        lane_of = {
+            node["id"]: node.get("lane") or hosts[node.get("attachedTo", "")].get("lane")
+            if node["type"] == "boundaryEvent" else node.get("lane")
+            for node in graph["nodes"]
+        }
+        lane_lines = []
+        for lane in graph["lanes"]:
+            refs = [f"        <bpmn:flowNodeRef>{escape(node['id'])}</bpmn:flowNodeRef>"
+                    for node in graph["nodes"] if lane_of[node["id"]] == lane["id"]]
+            lane_lines += _element("lane", {"id": lane["id"], "name": lane["name"]}, refs, "      ")
+        lines += _element("laneSet", {"id": "LaneSet_1"}, lane_lines, "    ")
+
+    for node in graph["nodes"]:
+        node_id = node["id"]
+        children = []
+        if node.get("documentation"):
+            children.append(f"      <bpmn:documentation>{escape(node['documentation'])}</bpmn:documentation>")
+        children += [f"      <bpmn:incoming>{escape(flow_id)}</bpmn:incoming>" for flow_id in incoming[node_id]]
+        children += [f"      <bpmn:outgoing>{escape(flow_id)}</bpmn:outgoing>" for flow_id in outgoing[node_id]]
+        if node.get("event"):
+            children.append(f"      <bpmn:{node['event']}EventDefinition />")
+        attributes = {"id": node_id, "name": node.get("name") or None}
+        if node["type"] == "boundaryEvent":
+            attributes["attachedToRef"] = node["attachedTo"]
+        if node_id in default_flow:
+            attributes["default"] = default_flow[node_id]
+        lines += _element(node["type"], attributes, children, "    ")
+
+    for flow in graph["flows"]:
+        children = []
+        if flow.get("condition"):
+            children.append('      <bpmn:conditionExpression xsi:type="bpmn:tFormalExpression">'
+                            f'{escape(flow["condition"])}</bpmn:conditionExpression>')
+        lines += _element("sequenceFlow", {
+            "id": flow["id"], "name": flow.get("name") or None,
+            "sourceRef": flow["source"], "targetRef": flow["target"]
+        }, children, "    ")
+
+    lines += ["  </bpmn:process>", "", "</bpmn:definitions>", ""]
+    bpmn_text = "\n".join(lines)
+    return layout_bpmn(bpmn_text) if layout else bpmn_text
+
+
+def process_graph_from_bpmn(bpmn_text: str) -> Dict[str, Any]:
+    """
+    Extract the process graph of the first process in BPMN XML.
+
+    The inverse of serialize_bpmn for the node types a graph supports;
+    used to replay recorded diagrams in JSON mode and to compare sizes.
+
+    Args:
+        bpmn_text: BPMN 2.0 XML
+
+    Returns:
+        Validated process graph
+    """
+    process = next(child for child in ET.fromstring(bpmn_text) if _split_tag(child.tag) == (BPMN_NS, "process"))
+    graph: Dict[str, Any] = {"id": process.get("id", "Process_1")}
+    if process.get("name"):
+        graph["name"] = process.get("name")
+
+    lane_of: Dict[str, str] = {}
+    graph["lanes"] = []
+    for lane in process.iter(f"{{{BPMN_NS}}}lane"):
+        graph["lanes"].append({"id": lane.get("id", ""), "name": lane.get("name", "")})
+        for ref in lane.findall(f"{{{BPMN_NS}}}flowNodeRef"):
+            lane_of[(ref.text or "").strip()] = lane.get("id", "")
+
+    graph["nodes"], graph["flows"] = [], []
+    defaults = set()
+    for child in process:
+        namespace, local = _split_tag(child.tag)
+        if namespace != BPMN_NS:
+            continue
+        if local in NODE_TYPES:
+            node: Dict[str, Any] = {"id": child.get("id", ""), "type": local}
+            for key, value in (("name", child.get("name")), ("lane", lane_of.get(child.get("id", ""))),
+                               ("attachedTo", child.get("attachedToRef"))):
+                if value:
+                    node[key] = value
+            for item in child:
+                item_local = _split_tag(item.tag)[1]
+                if item_local == "documentation" and item.text:
+                    node["documentation"] = item.text.strip()
+                elif item_local.endswith("EventDefinition") and item_local[:-15] in EVENT_DEFINITIONS:
+                    node["event"] = item_local[:-15]
+            if child.get("default"):
+                defaults.add(child.get("default"))
+            graph["nodes"].append(node)
+        elif local == "sequenceFlow":
+            flow: Dict[str, Any] = {"id": child.get("id", ""), "source": child.get("sourceRef", ""),
+                                    "target": child.get("targetRef", "")}
+            if child.get("name"):
+                flow["name"] = child.get("name")
+            condition = child.find(f"{{{BPMN_NS}}}conditionExpression")
+            if condition is not None and condition.text:
+                flow["condition"] = condition.text.strip()
+            graph["flows"].append(flow)
+    for flow in graph["flows"]:
+        if flow["id"] in defaults:
+            flow["default"] = True
+    if not graph["lanes"]:
+        del graph["lanes"]
+    return validate_process_graph(graph)
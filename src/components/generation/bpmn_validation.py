@@ -0,0 +1,613 @@
+"""
+BPMN XML validation.
+
+IncrementalBPMNValidator checks BPMN 2.0 XML while it is still being
+generated, so a streaming request can be cancelled as soon as the output is
+provably invalid instead of after the full response has arrived.
+
+validate_bpmn_graph checks a complete document in a single streaming pass and
+reports structural problems in the process graph (dangling references,
+unreachable nodes, unconditioned gateway branches, lane mismatches).
+"""
+
+import re
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Union
+import xml.etree.ElementTree as ET
+
+BPMN_NS = "http://www.omg.org/spec/BPMN/20100524/MODEL"
+BPMNDI_NS = "http://www.omg.org/spec/BPMN/20100524/DI"
+
+# Start of an unfenced BPMN document: XML declaration or definitions root tag
+_XML_START = re.compile(r"<\?xml\b|<(?:[\w.-]+:)?definitions[\s>/]")
+
+# Flow node types that sequence flows may connect
+FLOW_NODE_TYPES = {
+    "task", "userTask", "serviceTask", "manualTask", "scriptTask", "sendTask",
+    "receiveTask", "businessRuleTask", "callActivity", "subProcess",
+    "startEvent", "endEvent", "intermediateCatchEvent", "intermediateThrowEvent",
+    "boundaryEvent", "exclusiveGateway", "inclusiveGateway", "parallelGateway",
+    "eventBasedGateway", "complexGateway",
+}
+
+
+def _split_tag(tag: str) -> tuple[str, str]:
+    """Split an ElementTree ``{namespace}local`` tag into its parts."""
+    if tag.startswith("{"):
+        namespace, _, local = tag[1:].partition("}")
+        return namespace, local
+    return "", tag
+
+
+def _xml_start(text: str) -> Optional[int]:
+    """
+    Return where the XML document in a partial response starts, or None if
+    that cannot be decided yet.
+
+    A code fence wins if it comes first: the document starts at the first
+    non-blank character after the fence line. Otherwise it starts at an XML
+    declaration or a ``definitions`` root tag.
+    """
+    fence = text.find("```")
+    match = _XML_START.search(text)
+    if fence != -1 and (match is None or fence < match.start()):
+        newline = text.find("\n", fence)
+        if newline == -1:
+            return None
+        body = text[newline + 1:]
+        content = body.lstrip()
+        if not content:
+            return None
+        return newline + 1 + len(body) - len(content)
+    return match.start() if match else None
+
+
+class IncrementalBPMNValidator:
+    """
+    Validates BPMN XML fed in arbitrary text chunks.
+
+    Parsing starts where BPMNGenerator's extraction would: after the line
+    opening a code fence, or, without a fence, at an XML declaration or a
+    ``definitions`` root tag. Prose before that (which may itself contain
+    ``<``) is held back, not parsed. Text after the closing code fence or
+    root element is ignored. ``feed`` returns an error message as soon as the
+    document is provably invalid:
+
+    - malformed XML
+    - root element outside the BPMN model namespace
+    - BPMN diagram section started before any process
+    - a process that closes without a start or end event
+    - a process whose sequence flows or incoming/outgoing references point
+      at elements that were never declared in it
+    """
+
+    def __init__(self):
+        """Initialize validator state."""
+        self._parser = ET.XMLPullParser(events=("start", "end"))
+        self._buffer = ""       # Text received after the XML started
+        self._fed = 0           # Number of buffer characters fed to the parser
+        self._started = False
+        self._finished = False
+        self._root_close_tag: Optional[str] = None
+        self.error: Optional[str] = None
+        self.chars_received = 0
+        self.process_count = 0
+
+        # Per-process state
+        self._in_process = False
+        self._node_ids: Set[str] = set()
+        self._flow_ids: Set[str] = set()
+        self._flow_refs: List[tuple[str, str, str]] = []
+        self._node_flow_refs: List[tuple[str, str]] = []
+        self._has_start = False
+        self._has_end = False
+        self._element_stack: List[ET.Element] = []
+        self._ids: Set[str] = set()
+
+    @property
+    def text(self) -> str:
+        """Return the XML text received so far."""
+        return self._buffer
+
+    def feed(self, chunk: str) -> Optional[str]:
+        """
+        Feed a chunk of response text.
+
+        Args:
+            chunk: Next piece of streamed text
+
+        Returns:
+            Error message if the document is provably invalid, else None
+        """
+        self.chars_received += len(chunk)
+        if self.error is not None or self._finished:
+            return self.error
+
+        if not self._started:
+            self._buffer += chunk
+            start = _xml_start(self._buffer)
+            if start is None:
+                return None
+            self._buffer = self._buffer[start:]
+            self._started = True
+        else:
+            self._buffer += chunk
+
+        self._feed_parser()
+        return self.error
+
+    def _safe_end(self) -> int:
+        """
+        Return how much of the buffer can be fed without crossing the end of
+        the XML document (closing code fence or root close tag).
+        """
+        end = len(self._buffer)
+
+        fence = self._buffer.find("```", self._fed)
+        if fence != -1:
+            end = fence
+            self._finished = True
+        else:
+            # Hold back trailing backticks that may begin a code fence
+            while end > self._fed and self._buffer[end - 1] == "`":
+                end -= 1
+
+        if self._root_close_tag is not None:
+            search_from = max(self._fed - len(self._root_close_tag), 0)
+            close = self._buffer.find(self._root_close_tag, search_from)
+            if close != -1 and close + len(self._root_close_tag) <= end:
+                end = close + len(self._root_close_tag)
+                self._finished = True
+            elif not self._finished:
+                # Hold back a possible partial close tag
+                end = max(self._fed, end - len(self._root_close_tag) + 1)
+
+        return end
+
+    def _feed_parser(self):
+        """Feed newly available text to the pull parser and check events."""
+        end = self._safe_end()
+        try:
+            if end > self._fed:
+                self._parser.feed(self._buffer[self._fed:end])
+                self._fed = end
+
+            # Parse errors surface from either feed() or read_events()
+            for event, element in self._parser.read_events():
+                self._handle_event(event, element)
+                if self.error is not None:
+                    return
+        except ET.ParseError as e:
+            self.error = f"XML parsing error: {str(e)}"
+
+    def _handle_event(self, event: str, element: ET.Element):
+        """Check a single start/end event."""
+        namespace, local = _split_tag(element.tag)
+
+        if event == "start":
+            if not self._element_stack and self._root_close_tag is None:
+                self._check_root(namespace, local)
+            self._element_stack.append(element)
+
+            element_id = element.get("id")
+            if element_id is not None:
+                if element_id in self._ids:
+                    self.error = f"Duplicate element id: {element_id}"
+                    return
+                self._ids.add(element_id)
+
+            if namespace == BPMNDI_NS and local == "BPMNDiagram" and self.process_count == 0:
+                self.error = "BPMN diagram section started before any process element"
+            elif namespace == BPMN_NS and local == "process":
+                self._start_process()
+            elif self._in_process and namespace == BPMN_NS:
+                self._record_process_element(local, element)
+            return
+
+        # End event
+        if self._element_stack:
+            self._element_stack.pop()
+
+        if self._in_process and namespace == BPMN_NS:
+            if local in ("incoming", "outgoing") and element.text:
+                parent = self._element_stack[-1] if self._element_stack else None
+                parent_id = parent.get("id", "?") if parent is not None else "?"
+                self._node_flow_refs.append((parent_id, element.text.strip()))
+            elif local == "process":
+                self._end_process(element)
+
+        # Release memory for closed subtrees of the root element
+        if len(self._element_stack) == 1:
+            self._element_stack[0].remove(element)
+
+    def _check_root(self, namespace: str, local: str):
+        """Check the root element and remember its close tag."""
+        if namespace != BPMN_NS:
+            self.error = f"Invalid BPMN namespace. Root tag: {{{namespace}}}{local}"
+            return
+
+        # Recover the literal close tag (prefix included) from the source text
+        match = re.search(rf"<((?:[A-Za-z_][\w.\-]*:)?{local})[\s/>]", self._buffer)
+        qualified = match.group(1) if match else local
+        self._root_close_tag = f"</{qualified}>"
+
+    def _start_process(self):
+        """Reset per-process state."""
+        self.process_count += 1
+        self._in_process = True
+        self._node_ids = set()
+        self._flow_ids = set()
+        self._flow_refs = []
+        self._node_flow_refs = []
+        self._has_start = False
+        self._has_end = False
+
+    def _record_process_element(self, local: str, element: ET.Element):
+        """Index a node or flow declared inside the current process."""
+        element_id = element.get("id")
+        if local == "sequenceFlow":
+            if element_id:
+                self._flow_ids.add(element_id)
+            self._flow_refs.append((
+                element_id or "?",
+                element.get("sourceRef", ""),
+                element.get("targetRef", "")
+            ))
+        elif local in FLOW_NODE_TYPES and element_id:
+            self._node_ids.add(element_id)
+            if local == "startEvent":
+                self._has_start = True
+            elif local == "endEvent":
+                self._has_end = True
+
+    def _end_process(self, element: ET.Element):
+        """Check a completed process for events and reference consistency."""
+        self._in_process = False
+        process_id = element.get("id", "?")
+
+        if self._node_ids and not self._has_start:
+            self.error = f"Process {process_id} has no start event"
+            return
+        if self._node_ids and not self._has_end:
+            self.error = f"Process {process_id} has no end event"
+            return
+
+        for flow_id, source, target in self._flow_refs:
+            for ref in (source, target):
+                if ref not in self._node_ids:
+                    self.error = f"Sequence flow {flow_id} references unknown element '{ref}'"
+                    return
+
+        for node_id, flow_id in self._node_flow_refs:
+            if flow_id not in self._flow_ids:
+                self.error = f"Element {node_id} references unknown sequence flow '{flow_id}'"
+                return
+
+
+TASK_TYPES = {
+    "task", "userTask", "serviceTask", "manualTask", "scriptTask", "sendTask",
+    "receiveTask", "businessRuleTask",
+}
+GATEWAY_TYPES = {"exclusiveGateway", "inclusiveGateway", "parallelGateway", "eventBasedGateway", "complexGateway"}
+
+# Gateways whose outgoing branches are chosen by conditions
+CONDITIONAL_GATEWAY_TYPES = {"exclusiveGateway", "inclusiveGateway", "complexGateway"}
+
+# Elements that contain flow nodes and sequence flows
+CONTAINER_TYPES = {"process", "subProcess"}
+
+# Cap on element ids listed in a single warning
+MAX_LISTED_IDS = 10
+
+
+def _listing(ids: List[str]) -> str:
+    """Format element ids for a message, truncating long lists."""
+    shown = ", ".join(ids[:MAX_LISTED_IDS])
+    return shown if len(ids) <= MAX_LISTED_IDS else f"{shown}, ... ({len(ids)} total)"
+
+
+@dataclass
+class BPMNValidationReport:
+    """Outcome of validate_bpmn_graph."""
+
+    errors: List[str] = field(default_factory=list)
+    warnings: List[str] = field(default_factory=list)
+    counts: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def valid(self) -> bool:
+        """Return True if the document has no errors (warnings are allowed)."""
+        return not self.errors
+
+    @property
+    def message(self) -> str:
+        """Return the first error, or the element summary for a valid document."""
+        if self.errors:
+            return self.errors[0]
+        return (f"Valid BPMN XML - {self.counts.get('tasks', 0)} tasks, {self.counts.get('gateways', 0)} gateways, "
+                f"{self.counts.get('lanes', 0)} lanes, {self.counts.get('flows', 0)} flows")
+
+
+class BPMNGraphValidator:
+    """
+    Builds an indexed flow graph from a stream of parse events.
+
+    Each element is indexed when it starts (ids and reference attributes)
+    or ends (text references such as ``incoming`` and ``flowNodeRef``) and
+    is then detached from the tree, so memory grows with the number of ids
+    and references only, never with the document text. ``finish`` checks
+    the graph:
+
+    Errors: wrong namespace, no process, no start or end event, duplicate
+    ids, and sequence/message flows, incoming/outgoing entries or gateway
+    defaults that reference undeclared elements.
+
+    Warnings: nodes unreachable from a start event, conditional gateway
+    branches without a condition, incoming/outgoing lists that disagree
+    with the flows' sourceRef/targetRef, and lane flowNodeRef mismatches.
+    """
+
+    def __init__(self):
+        """Initialize empty indexes."""
+        self.errors: List[str] = []
+        self.warnings: List[str] = []
+        self.counts = {"processes": 0, "tasks": 0, "gateways": 0, "lanes": 0, "flows": 0,
+                       "start_events": 0, "end_events": 0}
+        self.stopped = False
+        self._stack: List[ET.Element] = []
+        self._containers: List[str] = []
+        self._ids: Set[str] = set()
+        self._tags: Dict[str, tuple[str, str]] = {}  # Cache of split tags
+
+        self._node_types: Dict[str, str] = {}
+        self._node_container: Dict[str, str] = {}
+        self._flows: Dict[str, tuple[str, str]] = {}
+        self._conditioned: Set[str] = set()
+        self._gateway_defaults: Dict[str, str] = {}
+        self._event_subprocesses: Set[str] = set()
+        self._attachments: List[tuple[str, str]] = []
+        self._message_flows: List[tuple[str, str, str]] = []
+        self._declared: List[tuple[str, str, str]] = []  # (node, "incoming"/"outgoing", flow)
+        self._lane_container: Dict[str, str] = {}
+        self._lane_refs: List[tuple[str, str]] = []
+
+    def handle(self, event: str, element: ET.Element):
+        """Index a single start/end parse event."""
+        tag = element.tag
+        split = self._tags.get(tag)
+        if split is None:
+            split = self._tags[tag] = _split_tag(tag)
+        namespace, local = split
+
+        if event == "start":
+            if not self._stack:
+                if namespace != BPMN_NS:
+                    self.errors.append(f"Invalid BPMN namespace. Root tag: {element.tag}")
+                    self.stopped = True
+                    return
+            self._stack.append(element)
+            if namespace == BPMN_NS:
+                self._start(local, element)
+            return
+
+        self._stack.pop()
+        if namespace == BPMN_NS:
+            self._end(local, element)
+        if self._stack:
+            self._stack[-1].remove(element)  # Keep memory bounded
+
+    def _start(self, local: str, element: ET.Element):
+        """Index the attributes of a BPMN element."""
+        element_id = element.get("id")
+        if element_id is not None:
+            if element_id in self._ids:
+                self.errors.append(f"Duplicate element id: {element_id}")
+            self._ids.add(element_id)
+        container = self._containers[-1] if self._containers else ""
+
+        if local in FLOW_NODE_TYPES and element_id:
+            self._node_types[element_id] = local
+            self._node_container[element_id] = container
+            if local in TASK_TYPES:
+                self.counts["tasks"] += 1
+            elif local in GATEWAY_TYPES:
+                self.counts["gateways"] += 1
+                if element.get("default"):
+                    self._gateway_defaults[element_id] = element.get("default")
+            elif local == "startEvent":
+                self.counts["start_events"] += 1
+            elif local == "endEvent":
+                self.counts["end_events"] += 1
+            elif local == "boundaryEvent" and element.get("attachedToRef"):
+                self._attachments.append((element.get("attachedToRef"), element_id))
+            if local == "subProcess" and element.get("triggeredByEvent") == "true":
+                self._event_subprocesses.add(element_id)
+        elif local == "sequenceFlow":
+            self.counts["flows"] += 1
+            self._flows[element_id or f"?{self.counts['flows']}"] = (
+                element.get("sourceRef", ""), element.get("targetRef", ""))
+        elif local == "messageFlow":
+            self._message_flows.append((element_id or "?", element.get("sourceRef", ""), element.get("targetRef", "")))
+        elif local == "lane":
+            self.counts["lanes"] += 1
+            self._lane_container[element_id or "?"] = container
+        elif local == "process":
+            self.counts["processes"] += 1
+
+        if local in CONTAINER_TYPES:
+            self._containers.append(element_id or "?")
+
+    def _end(self, local: str, element: ET.Element):
+        """Index text references once an element is complete."""
+        parent = self._stack[-1] if self._stack else None
+        parent_id = parent.get("id", "?") if parent is not None else "?"
+        text = (element.text or "").strip()
+
+        if local in ("incoming", "outgoing") and text:
+            self._declared.append((parent_id, local, text))
+        elif local == "flowNodeRef" and text:
+            self._lane_refs.append((parent_id, text))
+        elif local == "conditionExpression":
+            self._conditioned.add(parent_id)
+        elif local in CONTAINER_TYPES and self._containers:
+            self._containers.pop()
+
+    def finish(self) -> BPMNValidationReport:
+        """Check the indexed graph and return the report."""
+        report = BPMNValidationReport(self.errors, self.warnings, self.counts)
+        if self.stopped:
+            return report
+        if self.counts["processes"] == 0:
+            self.errors.append("No process element found")
+            return report
+        if self.counts["start_events"] == 0:
+            self.errors.append("No start event found")
+        if self.counts["end_events"] == 0:
+            self.errors.append("No end event found")
+
+        outgoing = self._check_references()
+        self._check_declared_flows()
+        self._check_gateways(outgoing)
+        self._check_reachability(outgoing)
+        self._check_lanes()
+        return report
+
+    def _check_references(self) -> Dict[str, List[str]]:
+        """Report dangling references; return outgoing flow ids per node."""
+        outgoing: Dict[str, List[str]] = {}
+        for flow_id, (source, target) in self._flows.items():
+            for ref in (source, target):
+                if ref not in self._node_types:
+                    self.errors.append(f"Sequence flow {flow_id} references unknown element '{ref}'")
+            outgoing.setdefault(source, []).append(flow_id)
+
+        for flow_id, source, target in self._message_flows:
+            for ref in (source, target):
+                if ref not in self._ids:
+                    self.errors.append(f"Message flow {flow_id} references unknown element '{ref}'")
+
+        for gateway_id, flow_id in self._gateway_defaults.items():
+            if flow_id not in self._flows:
+                self.errors.append(f"Gateway {gateway_id} default references unknown sequence flow '{flow_id}'")
+        return outgoing
+
+    def _check_declared_flows(self):
+        """Compare incoming/outgoing lists with the flows' sourceRef/targetRef."""
+        declared: Dict[tuple[str, str], Set[str]] = {}
+        for node_id, direction, flow_id in self._declared:
+            declared.setdefault((node_id, direction), set()).add(flow_id)
+            if flow_id not in self._flows:
+                self.errors.append(f"Element {node_id} references unknown sequence flow '{flow_id}'")
+                continue
+            source, target = self._flows[flow_id]
+            endpoint = source if direction == "outgoing" else target
+            if endpoint != node_id:
+                self.warnings.append(f"Element {node_id} lists {direction} flow {flow_id}, "
+                                     f"but the flow {'starts at' if direction == 'outgoing' else 'ends at'} "
+                                     f"'{endpoint}'")
+
+        declaring = {node_id for node_id, _ in declared}
+        for flow_id, (source, target) in self._flows.items():
+            if source in declaring and flow_id not in declared.get((source, "outgoing"), ()):
+                self.warnings.append(f"Sequence flow {flow_id} is missing from {source}'s outgoing list")
+            if target in declaring and flow_id not in declared.get((target, "incoming"), ()):
+                self.warnings.append(f"Sequence flow {flow_id} is missing from {target}'s incoming list")
+
+    def _check_gateways(self, outgoing: Dict[str, List[str]]):
+        """Warn about diverging conditional gateways with unconditioned branches."""
+        for node_id, node_type in self._node_types.items():
+            flows = outgoing.get(node_id, [])
+            if node_type not in CONDITIONAL_GATEWAY_TYPES or len(flows) < 2:
+                continue
+            default = self._gateway_defaults.get(node_id)
+            missing = [f for f in flows if f != default and f not in self._conditioned]
+            if missing:
+                self.warnings.append(f"Gateway {node_id} has outgoing flows without conditions: {_listing(missing)}")
+
+    def _check_reachability(self, outgoing: Dict[str, List[str]]):
+        """Warn about flow nodes that no path from a start event reaches."""
+        successors: Dict[str, List[str]] = {}
+        for node_id, flows in outgoing.items():
+            successors[node_id] = [self._flows[f][1] for f in flows]
+        for activity_id, boundary_id in self._attachments:
+            successors.setdefault(activity_id, []).append(boundary_id)
+
+        roots = []
+        for node_id, node_type in self._node_types.items():
+            container = self._node_container[node_id]
+            if node_type == "startEvent":
+                if container in self._node_types:
+                    # Start of a subprocess: entered through the subprocess
+                    successors.setdefault(container, []).append(node_id)
+                else:
+                    roots.append(node_id)
+            elif node_id in self._event_subprocesses:
+                roots.append(node_id)  # Triggered by events, not by flows
+
+        reached = set(roots)
+        queue = deque(roots)
+        while queue:
+            for successor in successors.get(queue.popleft(), ()):
+                if successor not in reached:
+                    reached.add(successor)
+                    queue.append(successor)
+
+        if roots:
+            unreachable = [node_id for node_id in self._node_types if node_id not in reached]
+            if unreachable:
+                self.warnings.append(f"Elements unreachable from a start event: {_listing(unreachable)}")
+
+    def _check_lanes(self):
+        """Warn about lane references that do not match the process's flow nodes."""
+        if not self._lane_container:
+            return
+        assigned = set()
+        for lane_id, node_id in self._lane_refs:
+            assigned.add(node_id)
+            if node_id not in self._node_types:
+                self.warnings.append(f"Lane {lane_id} references unknown element '{node_id}'")
+            elif self._node_container[node_id] != self._lane_container.get(lane_id):
+                self.warnings.append(f"Lane {lane_id} references {node_id} from another process")
+
+        laned = set(self._lane_container.values())
+        unassigned = [node_id for node_id, container in self._node_container.items()
+                      if container in laned and node_id not in assigned]
+        if unassigned:
+            self.warnings.append(f"Elements not assigned to any lane: {_listing(unassigned)}")
+
+
+def validate_bpmn_graph(source: Union[str, Path], chunk_size: int = 65536) -> BPMNValidationReport:
+    """
+    Validate a complete BPMN document in one streaming pass.
+
+    Args:
+        source: BPMN XML text, or a Path to a BPMN file (parsed with
+                iterparse without reading it into memory)
+        chunk_size: Characters fed to the parser at a time for text input
+
+    Returns:
+        BPMNValidationReport with errors, warnings and element counts
+    """
+    validator = BPMNGraphValidator()
+    try:
+        if isinstance(source, Path):
+            for event, element in ET.iterparse(source, events=("start", "end")):
+                validator.handle(event, element)
+                if validator.stopped:
+                    break
+        else:
+            parser = ET.XMLPullParser(events=("start", "end"))
+            for offset in range(0, len(source), chunk_size):
+                parser.feed(source[offset:offset + chunk_size])
+                for event, element in parser.read_events():
+                    validator.handle(event, element)
+                    if validator.stopped:
+                        return validator.finish()
+            parser.close()
+            for event, element in parser.read_events():
+                validator.handle(event, element)
+    except ET.ParseError as e:
+        return BPMNValidationReport(errors=[f"XML parsing error: {str(e)}"], counts=validator.counts)
+    return validator.finish()
@@ -2,9 +2,10 @@
 Input components for transformation consultant agent.
 
 This package contains components that handle input processing,
-particularly transcript analysis.
+particularly transcript preprocessing and analysis.
 """
 
+from .transcript_preprocessor import TranscriptPreprocessor
 from .transcript_processor import TranscriptProcessor
 
-__all__ = ["TranscriptProcessor"]
+__all__ = ["TranscriptPreprocessor", "TranscriptProcessor"]
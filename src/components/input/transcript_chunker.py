@@ -0,0 +1,108 @@
+"""
+Splitting long transcripts for map-reduce analysis.
+
+A transcript is cut between speaker turns, never inside one unless a single
+turn is longer than a chunk. Cuts prefer topic changes ("Let's move on to
+payments...") and otherwise the start of a question, and each chunk repeats
+the last turns of the previous one so a step described across a cut is seen
+whole by at least one chunk. The transcript header (process name,
+participants) is repeated at the top of every chunk.
+"""
+
+import re
+from typing import List
+
+from .transcript_preprocessor import normalize_whitespace, parse_turns, split_header
+
+# Chunks are filled to at least this share of max_chars before a topic change ends them
+TOPIC_FILL = 0.6
+# ... and to at least this share before any question ends them
+QUESTION_FILL = 0.85
+
+_TOPIC_SHIFT = re.compile(
+    r"\b(?:let's (?:move on|talk about|turn to|switch|go back|look at)|moving on|switching gears|"
+    r"(?:another|next|different) (?:topic|area|thing|question|part)|what about|now let's|can we talk about)\b",
+    re.IGNORECASE
+)
+_SENTENCE = re.compile(r"(?<=[.!?])\s+")
+
+
+def _render_turns(lines: List[str]) -> List[str]:
+    """Return each speaker turn as one text block."""
+    blocks = []
+    for speaker, paragraphs in parse_turns(lines):
+        text = "\n".join(paragraphs)
+        blocks.append(f"{speaker}: {text}" if speaker else text)
+    return blocks
+
+
+def _split_block(block: str, max_chars: int) -> List[str]:
+    """Split a turn longer than max_chars at sentence boundaries, repeating its speaker label."""
+    if len(block) <= max_chars:
+        return [block]
+    label, separator, _ = block.partition(": ")
+    prefix = f"{label}: " if separator and "\n" not in label and len(label) <= 40 else ""
+    pieces: List[str] = []
+    current = ""
+    for sentence in _SENTENCE.split(block):
+        if current and len(current) + len(sentence) + 1 > max_chars:
+            pieces.append(current)
+            current = prefix
+        current = f"{current} {sentence}" if current and current != prefix else current + sentence
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def _is_question(block: str) -> bool:
+    """Return True for a turn that asks something (a natural place to start a chunk)."""
+    return block.rstrip().endswith("?")
+
+
+def split_transcript(transcript: str, max_chars: int, overlap_turns: int = 2) -> List[str]:
+    """
+    Split a transcript into overlapping chunks of whole speaker turns.
+
+    Args:
+        transcript: Transcript text
+        max_chars: Target maximum chunk length (header excluded)
+        overlap_turns: Number of turns each chunk repeats from the previous one
+
+    Returns:
+        Chunk texts in transcript order; a transcript that fits in one chunk
+        is returned whole
+    """
+    header, body = split_header(normalize_whitespace(transcript).split("\n"))
+    blocks = [piece for block in _render_turns(body) for piece in _split_block(block, max_chars)]
+    if sum(len(block) + 2 for block in blocks) <= max_chars:
+        return [transcript]
+
+    chunks: List[List[str]] = []
+    current: List[str] = []
+    size = 0
+    fresh = 0  # Turns in the current chunk that are not overlap
+    for block in blocks:
+        cut = False
+        if fresh:
+            if size + len(block) > max_chars:
+                cut = True
+            elif size >= max_chars * TOPIC_FILL and _TOPIC_SHIFT.search(block):
+                cut = True
+            elif size >= max_chars * QUESTION_FILL and _is_question(block):
+                cut = True
+        if cut:
+            chunks.append(current)
+            current = current[-overlap_turns:] if overlap_turns else []
+            # Overlap never pushes the next turn past the limit
+            while current and sum(len(b) + 2 for b in current) + len(block) > max_chars:
+                current = current[1:]
+            size = sum(len(b) + 2 for b in current)
+            fresh = 0
+        current.append(block)
+        size += len(block) + 2
+        fresh += 1
+    if fresh:
+        chunks.append(current)
+
+    prefix = "\n".join(header) + "\n\n" if header else ""
+    return [prefix + "\n\n".join(chunk) for chunk in chunks]
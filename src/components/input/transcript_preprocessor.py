@@ -0,0 +1,340 @@
+"""
+Transcript preprocessor component.
+
+This component compacts raw interview transcripts locally, before they are
+sent to the transcript-analysis skill: whitespace and speaker tags are
+normalized, consecutive turns by the same speaker are merged, filler words
+and pleasantries are removed, and passages repeated verbatim are dropped.
+It makes no API calls.
+"""
+
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from ...interfaces.component import BaseComponent, ComponentResult
+from ...runtime.metrics import StageTimings
+
+# Roughly 4 characters per token, as in rate_limiter.estimate_input_tokens
+CHARS_PER_TOKEN = 4
+
+# "[00:01:23] **Jennifer Park:** text" -> ("Jennifer Park", "text")
+_TURN = re.compile(
+    r"^(?:[\[(]?\d{1,2}:\d{2}(?::\d{2})?[\])]?\s*)?(?:\*\*)?([A-Z][\w.' -]{0,40}?)(?:\*\*)?\s*:(?:\*\*)?\s+(.*)$"
+)
+_SEPARATOR = re.compile(r"^\s*(?:-{3,}|={3,}|\*{3,})\s*$")
+# Header lines (title, interviewee, date) end at the first separator line
+HEADER_MAX_LINES = 15
+
+_FILLER = r"(?:u+m+|u+h+|e+r+m+|h+m+|m{2,}|a+h+)"
+# Fillers opening a sentence ("Um, so we...") - the next word is capitalized
+_LEADING_FILLER = re.compile(rf"(^|[.!?]\s+)(?:{_FILLER}|you know|I mean|well|so yeah)[,.]?\s+(\w)", re.IGNORECASE)
+# Fillers inside a sentence ("we, um, send", "it's, you know, slow")
+_INNER_FILLER = re.compile(rf",?\s+\b{_FILLER}\b,?|,\s*(?:you know|I mean),", re.IGNORECASE)
+# Stutters ("I- I", "the the"); "had had" and "that that" can be grammatical
+_STUTTER = re.compile(r"\b(\w+)(?:-\s+|\s+)(\1)\b", re.IGNORECASE)
+_GRAMMATICAL_REPEATS = frozenset({"had", "that"})
+
+_SENTENCE = re.compile(r"(?<=[.!?])\s+(?=[\"'A-Z])")
+SMALL_TALK_MAX_WORDS = 15
+SMALL_TALK = [re.compile(pattern, re.IGNORECASE) for pattern in (
+    r"^(?:(?:okay|ok|great|perfect|well|alright)[,.!]?\s+)?(?:thanks|thank you)\b",
+    r"^(?:hi|hello|hey|good (?:morning|afternoon|evening))\b",
+    r"^(?:you're welcome|no problem|my pleasure|sure thing|happy to help)\b",
+    r"\b(?:nice|great|good) to (?:meet|see|talk to) you\b",
+    r"^(?:how are you|how was your (?:weekend|day|trip|holiday)|have a (?:good|great|nice) (?:day|weekend|one)"
+    r"|bye|goodbye|see you)\b",
+    # Bare acknowledgements ("Okay.", "Great, got it.", "Interesting.")
+    r"^(?:(?:okay|ok|great|perfect|sure|alright|all right|got it|makes sense|interesting|i see|right|cool)"
+    r"[,.!\s]*)+$",
+)]
+
+# Sentences shorter than this are never treated as repeated passages
+MIN_DUPLICATE_WORDS = 10
+
+_WORDS = re.compile(r"[a-z0-9]+")
+# Discourse openers ignored when comparing sentences for repeats
+_OPENERS = frozenset({"so", "and", "but", "then", "okay", "well", "yes", "yeah"})
+
+
+def normalize_whitespace(text: str) -> str:
+    """Normalize line endings and spaces, strip lines and collapse blank lines."""
+    text = text.replace("\r\n", "\n").replace("\r", "\n").replace(" ", " ").replace("\t", " ")
+    lines = [re.sub(r" {2,}", " ", line).strip() for line in text.split("\n")]
+    return re.sub(r"\n{3,}", "\n\n", "\n".join(lines)).strip()
+
+
+def _canonical_speaker(label: str) -> str:
+    """Return a speaker label in one spelling ("JENNIFER PARK" -> "Jennifer Park")."""
+    label = " ".join(label.split())
+    return label.title() if label.isupper() else label
+
+
+def split_header(lines: List[str]) -> Tuple[List[str], List[str]]:
+    """Split off the header lines above the first separator, if there is one near the top."""
+    for index, line in enumerate(lines[:HEADER_MAX_LINES]):
+        if _SEPARATOR.match(line):
+            return lines[:index + 1], lines[index + 1:]
+    return [], lines
+
+
+def parse_turns(lines: List[str]) -> List[Tuple[Optional[str], List[str]]]:
+    """
+    Group transcript lines into speaker turns.
+
+    A label only counts as a speaker if it opens at least two lines, so
+    incidental "Note: ..." lines stay part of the turn they appear in.
+    A label that is the first word of a longer label ("Jennifer" and
+    "Jennifer Park") names the same speaker.
+
+    Args:
+        lines: Transcript lines below the header
+
+    Returns:
+        List of (speaker, paragraphs); the speaker is None for text before
+        the first labelled turn
+    """
+    counts: Dict[str, int] = {}
+    for line in lines:
+        match = _TURN.match(line)
+        if match:
+            label = _canonical_speaker(match.group(1))
+            counts[label] = counts.get(label, 0) + 1
+    # "Jennifer Park" is written as "Jennifer" when "Jennifer" is also used
+    aliases = {label: label.split()[0] if label.split()[0] in counts else label for label in counts}
+    totals: Dict[str, int] = {}
+    for label, count in counts.items():
+        totals[aliases[label]] = totals.get(aliases[label], 0) + count
+    speakers = {label for label in counts if totals[aliases[label]] >= 2}
+
+    turns: List[Tuple[Optional[str], List[str]]] = []
+    paragraph: List[str] = []
+
+    def end_paragraph():
+        if paragraph:
+            if not turns:
+                turns.append((None, []))
+            turns[-1][1].append(" ".join(paragraph))
+            paragraph.clear()
+
+    for line in lines:
+        match = _TURN.match(line)
+        label = _canonical_speaker(match.group(1)) if match else None
+        if label in speakers:
+            end_paragraph()
+            turns.append((aliases[label], []))
+            paragraph.append(match.group(2))
+        elif not line:
+            end_paragraph()
+        else:
+            paragraph.append(line)
+    end_paragraph()
+    return turns
+
+
+def strip_disfluencies(text: str) -> Tuple[str, int]:
+    """
+    Remove filler words and stutters from a paragraph.
+
+    Args:
+        text: Paragraph text
+
+    Returns:
+        Tuple of (cleaned text, number of removals)
+    """
+    removed = 0
+
+    def collapse(match: re.Match) -> str:
+        nonlocal removed
+        if match.group(1).lower() in _GRAMMATICAL_REPEATS:
+            return match.group(0)
+        removed += 1
+        return match.group(1)
+
+    text = _STUTTER.sub(collapse, text)
+
+    def capitalize(match: re.Match) -> str:
+        return match.group(1) + match.group(2)[0].upper() + match.group(2)[1:]
+
+    while True:
+        text, count = _LEADING_FILLER.subn(capitalize, text)
+        removed += count
+        if not count:
+            break
+    text, count = _INNER_FILLER.subn("", text)
+    removed += count
+    text = re.sub(r"\s+([,.!?])", r"\1", text)
+    text = re.sub(r",{2,}", ",", text)
+    return text.strip(), removed
+
+
+def is_small_talk(sentence: str) -> bool:
+    """Return True for short pleasantries and bare acknowledgements."""
+    if len(sentence.split()) > SMALL_TALK_MAX_WORDS:
+        return False
+    return any(pattern.search(sentence) for pattern in SMALL_TALK)
+
+
+class TranscriptPreprocessor(BaseComponent):
+    """
+    Component compacting raw transcripts before analysis.
+
+    Runs locally; the API key and model are accepted so the component can be
+    built and checkpointed like the others, but no API call is made.
+    """
+
+    # Which reductions to apply (each can be overridden per call)
+    strip_disfluencies = True
+    strip_small_talk = True
+    dedupe = True
+
+    def __init__(self, api_key: Optional[str] = None, **kwargs):
+        """
+        Initialize preprocessor.
+
+        Args:
+            api_key: Unused; accepted for a uniform component constructor
+            **kwargs: Passed to BaseComponent
+        """
+        super().__init__(api_key=api_key, **kwargs)
+
+    @property
+    def component_name(self) -> str:
+        """Return human-readable component name."""
+        return "Transcript Preprocessing"
+
+    @property
+    def skill_path(self) -> Path:
+        """Return path to the SKILL.md of the skill this component prepares input for."""
+        return Path(__file__).parent.parent.parent.parent / "skills" / "transcript-analysis" / "SKILL.md"
+
+    def validate_input(self, input_data: Any) -> bool:
+        """
+        Validate that input is a non-empty string (transcript text).
+
+        Args:
+            input_data: Expected to be transcript text
+
+        Returns:
+            True if valid
+
+        Raises:
+            ValueError: If input is invalid
+        """
+        if not isinstance(input_data, str):
+            raise ValueError(f"Input must be string, got {type(input_data)}")
+        if not input_data.strip():
+            raise ValueError("Transcript text cannot be empty")
+        return True
+
+    def preprocess(self, transcript: str, **kwargs) -> Tuple[str, Dict[str, Any]]:
+        """
+        Compact a transcript.
+
+        Args:
+            transcript: Raw transcript text
+            **kwargs: strip_disfluencies, strip_small_talk and dedupe
+                     (defaults: the class attributes)
+
+        Returns:
+            Tuple of (compacted transcript, counts of what was removed)
+        """
+        disfluencies = kwargs.get('strip_disfluencies', self.strip_disfluencies)
+        small_talk = kwargs.get('strip_small_talk', self.strip_small_talk)
+        dedupe = kwargs.get('dedupe', self.dedupe)
+
+        header, body = split_header(normalize_whitespace(transcript).split("\n"))
+        turns = parse_turns(body)
+        stats = {"disfluencies": 0, "small_talk_sentences": 0, "duplicate_sentences": 0, "merged_turns": 0}
+        seen = set()
+
+        kept: List[Tuple[Optional[str], List[str]]] = []
+        for speaker, paragraphs in turns:
+            cleaned = []
+            for paragraph in paragraphs:
+                if disfluencies:
+                    paragraph, count = strip_disfluencies(paragraph)
+                    stats["disfluencies"] += count
+                sentences = []
+                for sentence in _SENTENCE.split(paragraph):
+                    if small_talk and is_small_talk(sentence):
+                        stats["small_talk_sentences"] += 1
+                        continue
+                    words = _WORDS.findall(sentence.lower())
+                    while words and words[0] in _OPENERS:
+                        words.pop(0)
+                    words = tuple(words)
+                    if dedupe and len(words) >= MIN_DUPLICATE_WORDS:
+                        if words in seen:
+                            stats["duplicate_sentences"] += 1
+                            continue
+                        seen.add(words)
+                    sentences.append(sentence)
+                if sentences:
+                    cleaned.append(" ".join(sentences))
+            if not cleaned:
+                continue
+            # Turns left adjacent by a removed turn (or split by the speaker) are merged
+            if kept and kept[-1][0] == speaker:
+                kept[-1][1].extend(cleaned)
+                stats["merged_turns"] += 1
+            else:
+                kept.append((speaker, cleaned))
+
+        parts = ["\n".join(header)] if header else []
+        for speaker, paragraphs in kept:
+            text = "\n".join(paragraphs)
+            parts.append(f"{speaker}: {text}" if speaker else text)
+        stats["speakers"] = sorted({speaker for speaker, _ in kept if speaker})
+        stats["turns"] = len(kept)
+        return "\n\n".join(parts), stats
+
+    def process(self, input_data: str, **kwargs) -> ComponentResult:
+        """
+        Compact a transcript before analysis.
+
+        Args:
+            input_data: Raw transcript text
+            **kwargs: Optional parameters:
+                - strip_disfluencies: Remove filler words and stutters (default True)
+                - strip_small_talk: Remove pleasantries and bare acknowledgements (default True)
+                - dedupe: Drop sentences repeated verbatim (default True)
+                - on_text: Callback receiving the compacted transcript
+
+        Returns:
+            ComponentResult with the compacted transcript in data field;
+            metadata reports ``compression_ratio`` (compacted / original
+            characters) and what was removed
+        """
+        try:
+            timings = StageTimings()
+
+            with timings.measure("validation"):
+                self.validate_input(input_data)
+
+            with timings.measure("postprocess"):
+                text, stats = self.preprocess(input_data, **kwargs)
+
+            on_text = kwargs.get('on_text')
+            if on_text is not None:
+                on_text(text)
+
+            result = ComponentResult(
+                success=True,
+                data=text,
+                metadata={
+                    "component": self.component_name,
+                    "original_chars": len(input_data),
+                    "preprocessed_chars": len(text),
+                    "compression_ratio": round(len(text) / len(input_data), 4),
+                    "estimated_tokens_saved": (len(input_data) - len(text)) // CHARS_PER_TOKEN,
+                    **stats
+                }
+            )
+            return self._with_timings(result, timings)
+
+        except Exception as e:
+            return self._error_result(e)
+
+    async def aprocess(self, input_data: str, **kwargs) -> ComponentResult:
+        """Compact a transcript (see process); the work is local and quick, so it runs inline."""
+        return self.process(input_data, **kwargs)
@@ -2,12 +2,28 @@
 Transcript processor component.
 
 This component analyzes process transcripts and extracts structured information
-using the transcript-analysis skill.
+using the transcript-analysis skill. Long transcripts are analyzed in chunked
+(map-reduce) mode: overlapping chunks are analyzed in parallel over a shared
+cached prompt prefix and the chunk analyses are merged locally.
 """
 
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable, List, Optional
+from ...interfaces.analysis_merge import merge_analyses
 from ...interfaces.component import BaseComponent, ComponentResult
+from ...interfaces.process_analysis import ACTORS, DECISION_POINTS, PAIN_POINTS, PROCESS_STEPS, ProcessAnalysis
+from ...runtime.metrics import StageTimings
+from ...skills.knowledge_index import format_chunks
+from ...skills.skill_manager import get_skill_manager
+from .transcript_chunker import split_transcript
+
+# Closing line of a chunk request
+CHUNK_REQUEST = (
+    "This is part {part} of {parts} of a long transcript, split between speaker turns; its first turns "
+    "repeat the end of the previous part. Analyze only this part in the usual format, numbering steps from 1."
+)
 
 
 class TranscriptProcessor(BaseComponent):
@@ -17,6 +33,20 @@ class TranscriptProcessor(BaseComponent):
     Implements the transcript-analysis skill.
     """
 
+    # Sections the downstream BPMN and recommendation stages require
+    expected_sections = (PROCESS_STEPS, ACTORS, DECISION_POINTS, PAIN_POINTS)
+    # Token budget for retrieved domain knowledge excerpts; None attaches whole files
+    knowledge_budget: Optional[int] = None
+    # Chunked mode: True, False, or None to chunk transcripts longer than chunk_threshold
+    chunked: Optional[bool] = None
+    chunk_threshold = 60000  # Characters (about 15k tokens)
+    chunk_chars = 30000
+    chunk_overlap_turns = 2
+    # Most chunk requests in flight at once; a multi-hour transcript is queued, not sent at once
+    max_parallel_chunks = 8
+    # Longest transcript sent in a single call when chunked=False
+    max_single_call_chars = 400000
+
     @property
     def component_name(self) -> str:
         """Return human-readable component name."""
@@ -48,6 +78,215 @@ class TranscriptProcessor(BaseComponent):
             raise ValueError("Transcript text seems too short (< 100 chars)")
         return True
 
+    def _build_request(self, input_data: str, **kwargs) -> tuple[str, list]:
+        """
+        Build the user message and system messages for an analysis call.
+
+        Args:
+            input_data: Transcript text to analyze
+            **kwargs: Optional parameters (see process)
+
+        Returns:
+            Tuple of (user_message, system_messages)
+        """
+        # Optionally load domain knowledge examples
+        context_blocks = []
+        domain_knowledge = kwargs.get('domain_knowledge', [])
+        knowledge_budget = kwargs.get('knowledge_budget', self.knowledge_budget)
+        manager = get_skill_manager()
+        if knowledge_budget:
+            # Only the example sections most similar to this transcript
+            chunks = manager.retrieve_domain_knowledge('transcript-analysis', input_data, knowledge_budget,
+                                                       top_k=kwargs.get('knowledge_top_k'),
+                                                       filenames=domain_knowledge or None)
+            if chunks:
+                context_blocks.append(f"# Domain Knowledge Excerpts\n\n{format_chunks(chunks)}")
+        else:
+            for dk_file in domain_knowledge:
+                dk_content = manager.load_domain_knowledge('transcript-analysis', dk_file)
+                context_blocks.append(f"# Domain Knowledge Example\n\n{dk_content}")
+
+        # Skill prompt first, then examples, with cache breakpoints on both
+        system_messages = self._build_system_messages(context_blocks)
+
+        # Prepare user message
+        user_message = f"Please analyze the following process transcript:\n\n{input_data}"
+
+        return user_message, system_messages
+
+    def _build_result(self, input_data: str, analysis_text: str, api_metadata: dict) -> ComponentResult:
+        """Parse the analysis returned by Claude into a ProcessAnalysis result."""
+        analysis = ProcessAnalysis.parse(analysis_text)
+        return ComponentResult(
+            success=True,
+            data=analysis,
+            metadata={
+                **api_metadata,
+                "component": self.component_name,
+                "transcript_length": len(input_data),
+                "analysis_stats": analysis.stats()
+            }
+        )
+
+    def _is_chunked(self, input_data: str, kwargs: dict) -> bool:
+        """Return True if the transcript should be analyzed in chunks."""
+        chunked = kwargs.get('chunked', self.chunked)
+        if chunked is None:
+            return len(input_data) > kwargs.get('chunk_threshold', self.chunk_threshold)
+        if not chunked and len(input_data) > self.max_single_call_chars:
+            raise ValueError(
+                f"Transcript too long for a single call ({len(input_data)} > {self.max_single_call_chars} chars); "
+                "use chunked=True"
+            )
+        return chunked
+
+    def _build_chunk_requests(self, input_data: str, **kwargs) -> tuple[List[str], list]:
+        """
+        Build one user message per transcript chunk and the shared system messages.
+
+        The system messages (and any retrieved excerpts, which are selected
+        against the whole transcript) are the same for every chunk, so the
+        chunks share a cached prefix.
+
+        Returns:
+            Tuple of (user_messages, system_messages)
+        """
+        _, system_messages = self._build_request(input_data, **kwargs)
+        chunks = split_transcript(input_data, kwargs.get('chunk_chars', self.chunk_chars),
+                                  kwargs.get('chunk_overlap_turns', self.chunk_overlap_turns))
+        user_messages = [
+            f"Please analyze the following process transcript:\n\n{chunk}\n\n"
+            + CHUNK_REQUEST.format(part=part, parts=len(chunks))
+            for part, chunk in enumerate(chunks, 1)
+        ]
+        return user_messages, system_messages
+
+    def _chunk_call_args(self, user_message: str, system_messages: list,
+                         on_text: Optional[Callable[[str], None]] = None) -> dict:
+        """Return _call_claude keyword arguments for one chunk."""
+        return {
+            "user_message": user_message,
+            "system_messages": system_messages,
+            "max_tokens": 16000,
+            "temperature": 0,
+            "on_text": on_text,
+        }
+
+    def _call_chunks(self, user_messages: List[str], system_messages: list, warm_cache: bool,
+                     max_parallel: int) -> list:
+        """
+        Analyze chunks on a thread pool of at most ``max_parallel`` threads.
+
+        With ``warm_cache`` the first chunk is streamed and the others start
+        once its first token arrives, so they read the shared prefix from the
+        prompt cache instead of each paying to create it.
+
+        Returns:
+            List of (text, metadata) in chunk order
+        """
+        prefix_cached = threading.Event()
+        if not warm_cache:
+            prefix_cached.set()
+
+        def first(user_message: str) -> tuple[str, dict]:
+            try:
+                return self._call_claude(**self._chunk_call_args(
+                    user_message, system_messages, on_text=lambda _: prefix_cached.set()))
+            finally:
+                prefix_cached.set()
+
+        def rest(user_message: str) -> tuple[str, dict]:
+            prefix_cached.wait()
+            return self._call_claude(**self._chunk_call_args(user_message, system_messages))
+
+        with ThreadPoolExecutor(max_workers=max(1, min(max_parallel, len(user_messages)))) as executor:
+            futures = [executor.submit(first if i == 0 else rest, message) for i, message in enumerate(user_messages)]
+            return [future.result() for future in futures]
+
+    async def _acall_chunks(self, user_messages: List[str], system_messages: list, warm_cache: bool,
+                            max_parallel: int) -> list:
+        """Analyze chunks concurrently on the event loop (see _call_chunks)."""
+        import asyncio  # Deferred: only async callers need it
+
+        prefix_cached = asyncio.Event()
+        if not warm_cache:
+            prefix_cached.set()
+        slots = asyncio.Semaphore(max(1, max_parallel))
+
+        async def first(user_message: str) -> tuple[str, dict]:
+            try:
+                async with slots:
+                    return await self._acall_claude(**self._chunk_call_args(
+                        user_message, system_messages, on_text=lambda _: prefix_cached.set()))
+            finally:
+                prefix_cached.set()
+
+        async def rest(user_message: str) -> tuple[str, dict]:
+            await prefix_cached.wait()
+            async with slots:
+                return await self._acall_claude(**self._chunk_call_args(user_message, system_messages))
+
+        return await asyncio.gather(*(
+            (first if i == 0 else rest)(message) for i, message in enumerate(user_messages)
+        ))
+
+    def _build_chunked_result(self, input_data: str, responses: list,
+                              on_text: Optional[Callable[[str], None]] = None) -> ComponentResult:
+        """
+        Merge chunk analyses into one ProcessAnalysis result.
+
+        Args:
+            input_data: Whole transcript
+            responses: (text, metadata) per chunk, in transcript order
+            on_text: Optional callback receiving the merged markdown
+
+        Returns:
+            ComponentResult with the merged ProcessAnalysis in data field
+        """
+        analysis, duplicates = merge_analyses([ProcessAnalysis.parse(text) for text, _ in responses])
+        if on_text is not None:
+            on_text(str(analysis))
+
+        metadata = {
+            key: sum(meta.get(key, 0) for _, meta in responses)
+            for key in ("input_tokens", "output_tokens", "cache_creation_input_tokens", "cache_read_input_tokens")
+        }
+        metadata["model"] = responses[0][1].get("model", self.model)
+        cache_keys = [meta["response_cache_key"] for _, meta in responses if meta.get("response_cache_key")]
+        if cache_keys:
+            metadata["response_cache_keys"] = cache_keys
+        first_token = responses[0][1].get("time_to_first_token")
+        if first_token is not None:
+            metadata["time_to_first_token"] = first_token
+
+        return ComponentResult(
+            success=True,
+            data=analysis,
+            metadata={
+                **metadata,
+                "component": self.component_name,
+                "transcript_length": len(input_data),
+                "analysis_stats": analysis.stats(),
+                "chunked": True,
+                "chunks": len(responses),
+                "chunk_output_tokens": [meta.get("output_tokens", 0) for _, meta in responses],
+                "merged_duplicates": duplicates
+            }
+        )
+
+    def escalation_reason(self, result: ComponentResult) -> Optional[str]:
+        """Reject analyses the later stages could not use (see BaseComponent.escalation_reason)."""
+        reason = super().escalation_reason(result)
+        if reason is not None:
+            return reason
+        analysis = result.data
+        missing = [section for section in self.expected_sections if not analysis.has_section(section)]
+        if missing:
+            return f"Analysis missing sections: {', '.join(missing)}"
+        if not analysis.steps:
+            return "Analysis has no parsed process steps"
+        return None
+
     def process(self, input_data: str, **kwargs) -> ComponentResult:
         """
         Analyze transcript and extract structured process information.
@@ -56,66 +295,104 @@ class TranscriptProcessor(BaseComponent):
             input_data: Transcript text to analyze
             **kwargs: Optional parameters:
                 - domain_knowledge: List of domain knowledge filenames to include
+                - knowledge_budget: Token budget for retrieved excerpts; when set,
+                  only the chunks of ``domain_knowledge`` (or of every example
+                  file if none are listed) most relevant to the transcript are sent
+                - knowledge_top_k: Maximum number of retrieved excerpts
+                - on_text: Callback receiving text deltas; streams the response
+                  (in chunked mode it receives the merged analysis once)
+                - chunked: Analyze overlapping chunks in parallel and merge
+                  them; False always sends one call (default: None, which
+                  chunks transcripts longer than chunk_threshold characters)
+                - chunk_chars: Target chunk length (default: chunk_chars)
+                - chunk_overlap_turns: Speaker turns repeated from the
+                  previous chunk (default: chunk_overlap_turns)
+                - max_parallel_chunks: Most chunk requests in flight at once
+                  (default: max_parallel_chunks)
+                - warm_cache: In chunked mode, hold the other chunks until the
+                  first one has cached the shared prefix (default True)
 
         Returns:
-            ComponentResult with analysis markdown in data field
+            ComponentResult with a ProcessAnalysis in data field (str() gives the markdown)
         """
         try:
+            timings = StageTimings()
+
             # Validate input
-            self.validate_input(input_data)
-
-            # Load skill prompt
-            skill_prompt = self._load_skill_prompt()
-
-            # Prepare system messages
-            system_messages = [{"type": "text", "text": skill_prompt}]
-
-            # Optionally load domain knowledge examples
-            domain_knowledge = kwargs.get('domain_knowledge', [])
-            if domain_knowledge:
-                from ...skills.skill_manager import SkillManager
-                manager = SkillManager()
-                for dk_file in domain_knowledge:
-                    dk_content = manager.load_domain_knowledge('transcript-analysis', dk_file)
-                    system_messages.append({
-                        "type": "text",
-                        "text": f"# Domain Knowledge Example\n\n{dk_content}",
-                        "cache_control": {"type": "ephemeral"}
-                    })
-
-            # Prepare user message
-            user_message = f"Please analyze the following process transcript:\n\n{input_data}"
+            with timings.measure("validation"):
+                self.validate_input(input_data)
+                chunked = self._is_chunked(input_data, kwargs)
+
+            if chunked:
+                with timings.measure("request_build"):
+                    user_messages, system_messages = self._build_chunk_requests(input_data, **kwargs)
+                with timings.measure("api"):
+                    responses = self._call_chunks(user_messages, system_messages, kwargs.get('warm_cache', True),
+                                                  kwargs.get('max_parallel_chunks', self.max_parallel_chunks))
+                with timings.measure("postprocess"):
+                    result = self._build_chunked_result(input_data, responses, kwargs.get('on_text'))
+                return self._with_timings(result, timings)
+
+            with timings.measure("request_build"):
+                user_message, system_messages = self._build_request(input_data, **kwargs)
 
             # Call Claude
-            analysis_text, api_metadata = self._call_claude(
-                user_message=user_message,
-                system_messages=system_messages,
-                max_tokens=16000,
-                temperature=0
-            )
+            with timings.measure("api"):
+                analysis_text, api_metadata = self._call_claude(
+                    user_message=user_message,
+                    system_messages=system_messages,
+                    max_tokens=16000,
+                    temperature=0,
+                    on_text=kwargs.get('on_text')
+                )
 
-            # Return result
-            return ComponentResult(
-                success=True,
-                data=analysis_text,
-                metadata={
-                    **api_metadata,
-                    "component": self.component_name,
-                    "transcript_length": len(input_data)
-                }
-            )
+            with timings.measure("postprocess"):
+                result = self._build_result(input_data, analysis_text, api_metadata)
+            return self._with_timings(result, timings)
 
-        except ValueError as e:
-            return ComponentResult(
-                success=False,
-                data=None,
-                metadata={"component": self.component_name},
-                error=f"Validation error: {str(e)}"
-            )
         except Exception as e:
-            return ComponentResult(
-                success=False,
-                data=None,
-                metadata={"component": self.component_name},
-                error=f"Processing error: {str(e)}"
-            )
+            return self._error_result(e)
+
+    async def aprocess(self, input_data: str, **kwargs) -> ComponentResult:
+        """
+        Asynchronously analyze transcript (see process for parameters).
+
+        Returns:
+            ComponentResult with a ProcessAnalysis in data field (str() gives the markdown)
+        """
+        try:
+            timings = StageTimings()
+
+            with timings.measure("validation"):
+                self.validate_input(input_data)
+                chunked = self._is_chunked(input_data, kwargs)
+
+            if chunked:
+                with timings.measure("request_build"):
+                    user_messages, system_messages = self._build_chunk_requests(input_data, **kwargs)
+                with timings.measure("api"):
+                    responses = await self._acall_chunks(
+                        user_messages, system_messages, kwargs.get('warm_cache', True),
+                        kwargs.get('max_parallel_chunks', self.max_parallel_chunks))
+                with timings.measure("postprocess"):
+                    result = self._build_chunked_result(input_data, responses, kwargs.get('on_text'))
+                return self._with_timings(result, timings)
+
+            with timings.measure("request_build"):
+                user_message, system_messages = self._build_request(input_data, **kwargs)
+
+            with timings.measure("api"):
+                analysis_text, api_metadata = await self._acall_claude(
+                    user_message=user_message,
+                    system_messages=system_messages,
+                    max_tokens=16000,
+                    temperature=0,
+                    on_text=kwargs.get('on_text')
+                )
+
+            with timings.measure("postprocess"):
+                result = self._build_result(input_data, analysis_text, api_metadata)
+            return self._with_timings(result, timings)
+
+        except Exception as e:
+            return self._error_result(e)
@@ -2,12 +2,134 @@
 Recommendation engine component.
 
 This component generates process optimization recommendations using
-the process-optimization skill.
+the process-optimization skill. By default the whole document comes from
+one call. In sectioned mode each top-level section is generated by its own
+call over a shared cached prompt prefix: the recommendation sections run in
+parallel first, then the sections that summarise or refer to them (executive
+summary, roadmap, ...) run in parallel with the finished recommendations in
+the prompt.
 """
 
+import itertools
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable, List, Optional
 from ...interfaces.component import BaseComponent, ComponentResult
+from ...interfaces.process_analysis import PAIN_POINTS, PROCESS_STEPS, ProcessAnalysis
+from ...runtime.metrics import StageTimings
+
+# Top-level sections of a recommendations document, in order
+RECOMMENDATION_SECTIONS = (
+    "Executive Summary",
+    "Quick Wins (0-3 Months)",
+    "Medium-Term Improvements (3-6 Months)",
+    "Long-Term Transformations (6-12+ Months)",
+    "Implementation Roadmap",
+    "Technology Stack Recommendations",
+    "Change Management Considerations",
+    "Risk Assessment Summary",
+    "Appendix: Detailed Assumptions",
+)
+
+# Sections holding the numbered recommendations; sectioned mode generates these first
+PLAN_SECTIONS = RECOMMENDATION_SECTIONS[1:4]
+# Sections that summarise or refer to the recommendations; generated second, from the finished plan
+DEPENDENT_SECTIONS = tuple(heading for heading in RECOMMENDATION_SECTIONS if heading not in PLAN_SECTIONS)
+
+# Closing line of a section request; the heading identifies the section
+SECTION_REQUEST = "Write only the `## {heading}` section of the recommendations document."
+
+# Introduces the finished recommendation sections in dependent section requests
+RECOMMENDATIONS_CONTEXT = (
+    "Recommendation sections of this document (final). Base summaries, totals, phases and risks on "
+    "them and refer to recommendations by these numbers:\n\n"
+)
+
+_RECOMMENDATION_NUMBER = re.compile(r"^(### Recommendation )(\d+)(?=:)")
+_RECOMMENDATION_REFERENCE = re.compile(
+    r"\b(Recommendations?\s+#?)(\d+(?:(?:\s*,\s*(?:and\s+|or\s+)?|\s+(?:and|or|to)\s+|\s*[-–]\s*)\d+\b)*)"
+)
+
+
+def _heading_name(heading: str) -> str:
+    """Return the comparable part of a heading: its text before any "(" qualifier."""
+    return heading.split(" (")[0].strip().casefold()
+
+
+def section_text(markdown: str, heading: str) -> str:
+    """
+    Extract one ``## `` section from a recommendations document.
+
+    Headings match on their text before any parenthesised qualifier, so
+    "## Quick Wins" matches "Quick Wins (0-3 Months)". The section runs to
+    the next ``## `` heading; trailing horizontal rules are dropped.
+
+    Args:
+        markdown: Recommendations markdown
+        heading: Section heading without the leading "## "
+
+    Returns:
+        The section including its heading line, or "" if it is not present
+    """
+    lines = markdown.splitlines()
+    name = _heading_name(heading)
+    start = next((i for i, line in enumerate(lines)
+                  if line.startswith("## ") and _heading_name(line[3:]) == name), None)
+    if start is None:
+        return ""
+    end = next((i for i in range(start + 1, len(lines)) if lines[i].startswith("## ")), len(lines))
+    body = lines[start:end]
+    while body and body[-1].strip() in ("", "---"):
+        body.pop()
+    return "\n".join(body)
+
+
+def _section_body(heading: str, text: str) -> str:
+    """
+    Cut a section response down to its own section under the canonical heading.
+
+    A response without the heading is taken as the section body.
+    """
+    lines = text.strip().splitlines()
+    if lines and lines[0].startswith("# "):
+        lines = lines[1:]
+    body = section_text("\n".join(lines), heading)
+    if body:
+        return "\n".join([f"## {heading}"] + body.splitlines()[1:])
+    return section_text(f"## {heading}\n\n" + "\n".join(lines).strip(), heading)
+
+
+def _renumber_recommendations(sections: List[str]) -> List[str]:
+    """
+    Number recommendations consecutively across sections numbered from 1.
+
+    "Recommendation N" references inside a section are remapped along with
+    its headings, so they keep pointing at the same item.
+    """
+    numbers = itertools.count(1)
+    renumbered = []
+    for section in sections:
+        lines = section.split("\n")
+        headings = {i: (match, str(next(numbers))) for i, match in
+                    ((i, _RECOMMENDATION_NUMBER.match(line)) for i, line in enumerate(lines)) if match}
+        mapping: dict = {}
+        for match, number in headings.values():
+            mapping.setdefault(match.group(2), number)
+
+        def remap(match: re.Match) -> str:
+            listed = re.sub(r"\d+", lambda n: mapping.get(n.group(0), n.group(0)), match.group(2))
+            return match.group(1) + listed
+
+        for i, line in enumerate(lines):
+            if i in headings:
+                match, number = headings[i]
+                lines[i] = match.group(1) + number + _RECOMMENDATION_REFERENCE.sub(remap, line[match.end():])
+            else:
+                lines[i] = _RECOMMENDATION_REFERENCE.sub(remap, line)
+        renumbered.append("\n".join(lines))
+    return renumbered
 
 
 class RecommendationEngine(BaseComponent):
@@ -18,10 +140,17 @@ class RecommendationEngine(BaseComponent):
     for better reasoning on complex business recommendations.
     """
 
+    required_sections = (PROCESS_STEPS, PAIN_POINTS)
+
+    # Generate one call per section instead of one call for the whole document
+    sectioned = False
+    section_max_tokens = 8000
+
     def __init__(self,
                  api_key: str,
                  model: str = "claude-opus-4-5-20251101",
-                 config: dict = None):
+                 config: dict = None,
+                 **kwargs):
         """
         Initialize recommendation engine.
 
@@ -29,8 +158,10 @@ class RecommendationEngine(BaseComponent):
             api_key: Anthropic API key
             model: Claude model to use (defaults to Opus for better reasoning)
             config: Component-specific configuration
+            **kwargs: Shared runtime services passed to BaseComponent
+                     (e.g. response_cache)
         """
-        super().__init__(api_key, model, config)
+        super().__init__(api_key, model, config, **kwargs)
 
     @property
     def component_name(self) -> str:
@@ -44,10 +175,10 @@ class RecommendationEngine(BaseComponent):
 
     def validate_input(self, input_data: Any) -> bool:
         """
-        Validate that input is a process analysis markdown.
+        Validate that input is a process analysis.
 
         Args:
-            input_data: Expected to be analysis markdown text
+            input_data: Expected to be a ProcessAnalysis or analysis markdown text
 
         Returns:
             True if valid
@@ -55,91 +186,353 @@ class RecommendationEngine(BaseComponent):
         Raises:
             ValueError: If input is invalid
         """
-        if not isinstance(input_data, str):
-            raise ValueError(f"Input must be string, got {type(input_data)}")
-        if not input_data.strip():
+        analysis = ProcessAnalysis.coerce(input_data)
+        if not analysis.blocks and not analysis.preamble.strip():
             raise ValueError("Analysis text cannot be empty")
 
-        # Check for required sections
-        required_sections = ["## Process Steps", "## Pain Points"]
-        for section in required_sections:
-            if section not in input_data:
-                raise ValueError(f"Analysis missing required section: {section}")
+        for section in self.required_sections:
+            if not analysis.has_section(section):
+                raise ValueError(f"Analysis missing required section: ## {section}")
 
         return True
 
-    def process(self, input_data: str, **kwargs) -> ComponentResult:
+    def _build_request(self, input_data: ProcessAnalysis, **kwargs) -> tuple[str, list]:
+        """
+        Build the user message and system messages for a recommendations call.
+
+        Args:
+            input_data: Parsed process analysis
+            **kwargs: Optional parameters (see process)
+
+        Returns:
+            Tuple of (user_message, system_messages)
+        """
+        # Skill prompt with a cache breakpoint
+        system_messages = self._build_system_messages()
+
+        # Prepare user message
+        business_context = kwargs.get('business_context', '')
+        user_message = f"Please analyze this process and generate comprehensive optimization recommendations.\n\n"
+        user_message += f"Process Analysis Document:\n{input_data.to_markdown()}\n\n"
+
+        if business_context:
+            user_message += f"Additional Context:\n{business_context}\n\n"
+
+        user_message += "Please provide specific technology recommendations, detailed ROI calculations, and a phased implementation roadmap."
+
+        return user_message, system_messages
+
+    def _build_result(self, recommendations_text: str, api_metadata: dict) -> ComponentResult:
+        """
+        Check the recommendations returned by Claude and wrap them in a result.
+
+        Args:
+            recommendations_text: Recommendations markdown
+            api_metadata: Usage metadata from the API call
+
+        Returns:
+            ComponentResult with recommendations markdown in data field
+        """
+        # Validate output has key sections
+        expected_sections = ["Executive Summary", "Quick Wins", "Implementation Roadmap"]
+        missing_sections = [s for s in expected_sections if s not in recommendations_text]
+
+        if missing_sections:
+            warning = f"Recommendations missing sections: {', '.join(missing_sections)}"
+        else:
+            warning = None
+
+        # Return result
+        return ComponentResult(
+            success=True,
+            data=recommendations_text,
+            metadata={
+                **api_metadata,
+                "component": self.component_name,
+                "model_used": self.model,
+                "warning": warning
+            }
+        )
+
+    def _build_section_requests(self, input_data: ProcessAnalysis, headings: tuple,
+                                recommendations: Optional[str] = None, **kwargs) -> tuple[list, list]:
+        """
+        Build one user message per section over a shared system prompt.
+
+        The analysis (and any business context) goes into the system
+        messages after the skill prompt, so every section call sends the same
+        cached prefix and only the short user message differs. Dependent
+        sections also get the finished recommendation sections as a further
+        cached block.
+
+        Args:
+            input_data: Parsed process analysis
+            headings: Sections to request
+            recommendations: Renumbered recommendation sections, for
+                DEPENDENT_SECTIONS
+            **kwargs: Optional parameters (see process)
+
+        Returns:
+            Tuple of ([(heading, user_message), ...], system_messages)
+        """
+        context_blocks = [f"Process Analysis Document:\n{input_data.to_markdown()}"]
+        business_context = kwargs.get('business_context', '')
+        if business_context:
+            context_blocks.append(f"Additional Context:\n{business_context}")
+        if recommendations is None:
+            system_messages = self._build_system_messages(context_blocks)
+        else:
+            system_messages = self._build_system_messages(context_blocks + [RECOMMENDATIONS_CONTEXT + recommendations])
+            # Keep the breakpoint the recommendation sections were generated with
+            system_messages[len(context_blocks)]["cache_control"] = {"type": "ephemeral"}
+
+        outline = "\n".join(f"## {heading}" for heading in RECOMMENDATION_SECTIONS)
+        requests = []
+        for heading in headings:
+            user_message = (
+                "Please generate comprehensive optimization recommendations for the process analysis "
+                "above. The recommendations document has these sections, each written separately:\n\n"
+                f"{outline}\n\n"
+                "Start with the section heading and do not add a document title. Number recommendations "
+                "from 1 within the section.\n\n"
+                + SECTION_REQUEST.format(heading=heading)
+            )
+            requests.append((heading, user_message))
+        return requests, system_messages
+
+    def _section_call_args(self, user_message: str, system_messages: list,
+                           on_text: Optional[Callable[[str], None]] = None) -> dict:
+        """Return _call_claude keyword arguments for one section."""
+        return {
+            "user_message": user_message,
+            "system_messages": system_messages,
+            "max_tokens": self.section_max_tokens,
+            "temperature": 0,
+            "on_text": on_text,
+        }
+
+    def _call_sections(self, requests: list, system_messages: list, warm_cache: bool) -> list:
+        """
+        Run section calls on a thread pool.
+
+        With ``warm_cache`` the first section is streamed and the others start
+        once its first token arrives, by which point the shared prefix has
+        been written to the prompt cache and the remaining calls read it
+        instead of each paying to create it.
+
+        Returns:
+            List of (text, metadata) in section order
+        """
+        prefix_cached = threading.Event()
+        if not warm_cache:
+            prefix_cached.set()
+
+        def first(heading: str, user_message: str) -> tuple[str, dict]:
+            try:
+                return self._call_claude(**self._section_call_args(
+                    user_message, system_messages, on_text=lambda _: prefix_cached.set()))
+            finally:
+                prefix_cached.set()
+
+        def rest(heading: str, user_message: str) -> tuple[str, dict]:
+            prefix_cached.wait()
+            return self._call_claude(**self._section_call_args(user_message, system_messages))
+
+        with ThreadPoolExecutor(max_workers=len(requests)) as executor:
+            futures = [executor.submit(first if i == 0 else rest, *request) for i, request in enumerate(requests)]
+            return [future.result() for future in futures]
+
+    async def _acall_sections(self, requests: list, system_messages: list, warm_cache: bool) -> list:
+        """Run section calls concurrently on the event loop (see _call_sections)."""
+        import asyncio  # Deferred: only async callers need it
+
+        prefix_cached = asyncio.Event()
+        if not warm_cache:
+            prefix_cached.set()
+
+        async def first(heading: str, user_message: str) -> tuple[str, dict]:
+            try:
+                return await self._acall_claude(**self._section_call_args(
+                    user_message, system_messages, on_text=lambda _: prefix_cached.set()))
+            finally:
+                prefix_cached.set()
+
+        async def rest(heading: str, user_message: str) -> tuple[str, dict]:
+            await prefix_cached.wait()
+            return await self._acall_claude(**self._section_call_args(user_message, system_messages))
+
+        return await asyncio.gather(*(
+            (first if i == 0 else rest)(*request) for i, request in enumerate(requests)
+        ))
+
+    def _build_sectioned_result(self, analysis: ProcessAnalysis, plan: List[str],
+                                responses: list) -> ComponentResult:
+        """
+        Assemble section responses into one recommendations document.
+
+        Args:
+            analysis: Parsed process analysis (for the document title)
+            plan: Renumbered PLAN_SECTIONS bodies
+            responses: (text, metadata) per section, PLAN_SECTIONS then
+                DEPENDENT_SECTIONS
+
+        Returns:
+            ComponentResult with recommendations markdown in data field
+        """
+        headings = PLAN_SECTIONS + DEPENDENT_SECTIONS
+        bodies = dict(zip(PLAN_SECTIONS, plan))
+        for heading, (text, _) in zip(DEPENDENT_SECTIONS, responses[len(PLAN_SECTIONS):]):
+            bodies[heading] = _section_body(heading, text)
+        sections = [bodies[heading] for heading in RECOMMENDATION_SECTIONS]
+        empty_sections = [heading for heading in RECOMMENDATION_SECTIONS
+                          if not bodies[heading].partition("\n")[2].strip()]
+
+        title = (analysis.title or "").replace("Process Analysis:", "").strip() or "Process"
+        document = f"# Process Optimization Recommendations: {title}\n\n" + "\n\n---\n\n".join(sections) + "\n"
+
+        metadata = {
+            key: sum(meta.get(key, 0) for _, meta in responses)
+            for key in ("input_tokens", "output_tokens", "cache_creation_input_tokens", "cache_read_input_tokens")
+        }
+        metadata["model"] = responses[0][1].get("model", self.model)
+        cache_keys = [meta["response_cache_key"] for _, meta in responses if meta.get("response_cache_key")]
+        if cache_keys:
+            metadata["response_cache_keys"] = cache_keys
+        first_token = responses[0][1].get("time_to_first_token")
+        if first_token is not None:
+            metadata["time_to_first_token"] = first_token
+
+        warning = f"Recommendations missing sections: {', '.join(empty_sections)}" if empty_sections else None
+        return ComponentResult(
+            success=True,
+            data=document,
+            metadata={
+                **metadata,
+                "component": self.component_name,
+                "model_used": self.model,
+                "sectioned": True,
+                "section_output_tokens": {
+                    heading: meta.get("output_tokens", 0)
+                    for heading, (_, meta) in zip(headings, responses)
+                },
+                "warning": warning
+            }
+        )
+
+    def process(self, input_data: ProcessAnalysis, **kwargs) -> ComponentResult:
         """
         Generate optimization recommendations from process analysis.
 
         Args:
-            input_data: Process analysis markdown
+            input_data: ProcessAnalysis (or analysis markdown, parsed on input)
             **kwargs: Optional parameters:
                 - business_context: Additional context (industry, budget, priorities)
+                - on_text: Callback receiving text deltas; streams the response
+                  (single-call mode only)
+                - sectioned: Generate each section in its own call, the
+                  PLAN_SECTIONS in parallel and then the DEPENDENT_SECTIONS in
+                  parallel (defaults to the ``sectioned`` class attribute)
+                - warm_cache: In sectioned mode, hold the other sections of
+                  each round until the first one has cached the shared prefix
+                  (default True)
 
         Returns:
             ComponentResult with recommendations markdown in data field
         """
         try:
+            timings = StageTimings()
+
             # Validate input
-            self.validate_input(input_data)
+            with timings.measure("validation"):
+                analysis = ProcessAnalysis.coerce(input_data)
+                self.validate_input(analysis)
 
-            # Load skill prompt
-            skill_prompt = self._load_skill_prompt()
+            if kwargs.get('sectioned', self.sectioned):
+                warm_cache = kwargs.get('warm_cache', True)
+                with timings.measure("request_build"):
+                    requests, system_messages = self._build_section_requests(analysis, PLAN_SECTIONS, **kwargs)
+                with timings.measure("api"):
+                    plan_responses = self._call_sections(requests, system_messages, warm_cache)
+                with timings.measure("postprocess"):
+                    plan = _renumber_recommendations(
+                        [_section_body(heading, text) for heading, (text, _) in zip(PLAN_SECTIONS, plan_responses)])
+                with timings.measure("request_build"):
+                    requests, system_messages = self._build_section_requests(
+                        analysis, DEPENDENT_SECTIONS, recommendations="\n\n".join(plan), **kwargs)
+                with timings.measure("api"):
+                    responses = plan_responses + self._call_sections(requests, system_messages, warm_cache)
+                with timings.measure("postprocess"):
+                    result = self._build_sectioned_result(analysis, plan, responses)
+                return self._with_timings(result, timings)
 
-            # Prepare system messages
-            system_messages = [{"type": "text", "text": skill_prompt}]
+            with timings.measure("request_build"):
+                user_message, system_messages = self._build_request(analysis, **kwargs)
 
-            # Prepare user message
-            business_context = kwargs.get('business_context', '')
-            user_message = f"Please analyze this process and generate comprehensive optimization recommendations.\n\n"
-            user_message += f"Process Analysis Document:\n{input_data}\n\n"
+            # Call Claude
+            with timings.measure("api"):
+                recommendations_text, api_metadata = self._call_claude(
+                    user_message=user_message,
+                    system_messages=system_messages,
+                    max_tokens=16000,
+                    temperature=0,
+                    on_text=kwargs.get('on_text')
+                )
 
-            if business_context:
-                user_message += f"Additional Context:\n{business_context}\n\n"
+            with timings.measure("postprocess"):
+                result = self._build_result(recommendations_text, api_metadata)
+            return self._with_timings(result, timings)
 
-            user_message += "Please provide specific technology recommendations, detailed ROI calculations, and a phased implementation roadmap."
+        except Exception as e:
+            return self._error_result(e)
 
-            # Call Claude
-            recommendations_text, api_metadata = self._call_claude(
-                user_message=user_message,
-                system_messages=system_messages,
-                max_tokens=16000,
-                temperature=0
-            )
+    async def aprocess(self, input_data: ProcessAnalysis, **kwargs) -> ComponentResult:
+        """
+        Asynchronously generate recommendations (see process for parameters).
 
-            # Validate output has key sections
-            expected_sections = ["Executive Summary", "Quick Wins", "Implementation Roadmap"]
-            missing_sections = [s for s in expected_sections if s not in recommendations_text]
+        Returns:
+            ComponentResult with recommendations markdown in data field
+        """
+        try:
+            timings = StageTimings()
 
-            if missing_sections:
-                warning = f"Recommendations missing sections: {', '.join(missing_sections)}"
-            else:
-                warning = None
-
-            # Return result
-            return ComponentResult(
-                success=True,
-                data=recommendations_text,
-                metadata={
-                    **api_metadata,
-                    "component": self.component_name,
-                    "model_used": self.model,
-                    "warning": warning
-                }
-            )
+            with timings.measure("validation"):
+                analysis = ProcessAnalysis.coerce(input_data)
+                self.validate_input(analysis)
+
+            if kwargs.get('sectioned', self.sectioned):
+                warm_cache = kwargs.get('warm_cache', True)
+                with timings.measure("request_build"):
+                    requests, system_messages = self._build_section_requests(analysis, PLAN_SECTIONS, **kwargs)
+                with timings.measure("api"):
+                    plan_responses = await self._acall_sections(requests, system_messages, warm_cache)
+                with timings.measure("postprocess"):
+                    plan = _renumber_recommendations(
+                        [_section_body(heading, text) for heading, (text, _) in zip(PLAN_SECTIONS, plan_responses)])
+                with timings.measure("request_build"):
+                    requests, system_messages = self._build_section_requests(
+                        analysis, DEPENDENT_SECTIONS, recommendations="\n\n".join(plan), **kwargs)
+                with timings.measure("api"):
+                    responses = plan_responses + await self._acall_sections(
+                        requests, system_messages, warm_cache)
+                with timings.measure("postprocess"):
+                    result = self._build_sectioned_result(analysis, plan, responses)
+                return self._with_timings(result, timings)
+
+            with timings.measure("request_build"):
+                user_message, system_messages = self._build_request(analysis, **kwargs)
+
+            with timings.measure("api"):
+                recommendations_text, api_metadata = await self._acall_claude(
+                    user_message=user_message,
+                    system_messages=system_messages,
+                    max_tokens=16000,
+                    temperature=0,
+                    on_text=kwargs.get('on_text')
+                )
+
+            with timings.measure("postprocess"):
+                result = self._build_result(recommendations_text, api_metadata)
+            return self._with_timings(result, timings)
 
-        except ValueError as e:
-            return ComponentResult(
-                success=False,
-                data=None,
-                metadata={"component": self.component_name},
-                error=f"Validation error: {str(e)}"
-            )
         except Exception as e:
-            return ComponentResult(
-                success=False,
-                data=None,
-                metadata={"component": self.component_name},
-                error=f"Processing error: {str(e)}"
-            )
+            return self._error_result(e)
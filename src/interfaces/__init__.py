@@ -1,9 +1,12 @@
 """
 Component interfaces for transformation consultant agent.
 
-This module exports the base component interface and result types.
+This module exports the base component interface, result types, the model
+cascade wrapper and the process analysis model passed between stages.
 """
 
-from .component import BaseComponent, ComponentResult
+from .cascade import ModelCascade
+from .component import BaseComponent, ComponentResult, StreamAborted
+from .process_analysis import ProcessAnalysis
 
-__all__ = ["BaseComponent", "ComponentResult"]
+__all__ = ["BaseComponent", "ComponentResult", "ModelCascade", "StreamAborted", "ProcessAnalysis"]
@@ -0,0 +1,361 @@
+"""
+Merging process analyses of consecutive transcript chunks.
+
+Long transcripts are analyzed in overlapping chunks (see
+TranscriptProcessor's chunked mode), so the same step, actor or issue is
+often reported by two neighbouring chunks. ``merge_analyses`` combines the
+typed records of every chunk into one analysis in the standard
+transcript-analysis format:
+
+- Steps and decision points are deduplicated by name and renumbered in
+  transcript order; "Step N" references in every section are rewritten to
+  the new numbers.
+- Actors and systems are deduplicated by name, joining their
+  responsibilities, systems and integration points.
+- Pain points are deduplicated by title, keeping the category that first
+  reported them.
+- Count metrics (total steps, actors, ...) are recomputed; other metrics
+  keep the first value reported.
+"""
+
+import re
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from .process_analysis import (
+    ACTORS, DECISION_POINTS, EXECUTIVE_SUMMARY, METRICS, NOTES, PAIN_POINTS, PROCESS_STEPS, SYSTEMS,
+    Actor, DecisionPoint, Metric, PainPoint, ProcessAnalysis, ProcessStep, SystemTool, section_kind
+)
+
+# Names at least this similar (weighted by shared words) are the same record
+SIMILARITY_THRESHOLD = 0.6
+
+_STEP_REFERENCE = re.compile(
+    r"\b(Steps?\s+)(\d+[a-z]?(?:(?:\s*,\s*(?:and\s+|or\s+)?|\s+(?:and|or|to)\s+|\s*[-–]\s*)\d+[a-z]?\b)*)"
+)
+_STEP_NUMBER = re.compile(r"\d+[a-z]?")
+_NUMBER_PARTS = re.compile(r"^(\d+)(.*)$")
+_WORD = re.compile(r"[a-z0-9]+")
+_PARENTHETICAL = re.compile(r"\s*\([^)]*\)")
+_NAME_STOPWORDS = frozenset("a an and for from in of on or the to with via".split())
+
+# Metric name prefix -> count recomputed from the merged records
+_COUNT_METRICS: Dict[str, Callable[[ProcessAnalysis], int]] = {
+    "total steps": lambda analysis: len(analysis.steps),
+    "number of decision points": lambda analysis: len(analysis.decision_points),
+    "number of actors": lambda analysis: len(analysis.actors),
+    "identified pain points": lambda analysis: len(analysis.pain_points),
+    "systems involved": lambda analysis: len(analysis.systems),
+}
+
+
+def _name_terms(name: str) -> frozenset:
+    """Return the comparable words of a record name."""
+    words = _WORD.findall(_PARENTHETICAL.sub("", name).lower())
+    return frozenset(word.rstrip("s") if len(word) > 3 else word for word in words if word not in _NAME_STOPWORDS)
+
+
+def _similar(a: frozenset, b: frozenset) -> bool:
+    """Return True if two term sets name the same thing."""
+    if not a or not b:
+        return a == b
+    return len(a & b) / len(a | b) >= SIMILARITY_THRESHOLD
+
+
+def _find(terms: frozenset, kept: List[Tuple[frozenset, object]]) -> Optional[object]:
+    """Return the first kept record whose name matches ``terms``."""
+    for kept_terms, record in kept:
+        if _similar(terms, kept_terms):
+            return record
+    return None
+
+
+def _join_items(*values: str) -> str:
+    """Join comma or semicolon separated lists, dropping repeated items."""
+    items: List[str] = []
+    seen = set()
+    for value in values:
+        for item in re.split(r"\s*[;,]\s*", value):
+            key = item.strip().lower()
+            if key and key not in seen:
+                seen.add(key)
+                items.append(item.strip())
+    return ", ".join(items)
+
+
+def _unique_sentences(texts: Sequence[str]) -> str:
+    """Concatenate several texts, dropping sentences already seen; line structure is kept."""
+    seen = set()
+    lines: List[str] = []
+    for text in texts:
+        for line in text.strip().splitlines() + [""]:
+            kept = []
+            for sentence in re.split(r"(?<=[.!?])\s+", line.strip()):
+                key = " ".join(_WORD.findall(sentence.lower()))
+                if key and key not in seen:
+                    seen.add(key)
+                    kept.append(sentence)
+            if kept:
+                # Keep the bullet or indentation of the line
+                indent = line[:len(line) - len(line.lstrip())]
+                lines.append(indent + " ".join(kept))
+            elif not line.strip() and lines and lines[-1]:
+                lines.append("")
+    return "\n".join(lines).strip()
+
+
+def remap_step_references(text: str, numbers: Dict[str, str]) -> str:
+    """
+    Rewrite "Step 4a" and "Steps 2, 9a and 21" references to new step numbers.
+
+    Args:
+        text: Text containing step references
+        numbers: Old step number -> new step number
+
+    Returns:
+        Text with every known step number replaced
+    """
+    if not numbers or not text:
+        return text
+
+    def replace(match: re.Match) -> str:
+        listed = _STEP_NUMBER.sub(lambda number: numbers.get(number.group(0), number.group(0)), match.group(2))
+        return match.group(1) + listed
+
+    return _STEP_REFERENCE.sub(replace, text)
+
+
+class _StepNumbering:
+    """Assigns merged step numbers, keeping branch suffixes ("4a", "4b") together."""
+
+    def __init__(self):
+        self.next_base = 1
+        self.used = set()
+        self.bases: Dict[str, str] = {}  # Chunk base number -> merged base number
+
+    def start_chunk(self):
+        """Forget the previous chunk's base numbers."""
+        self.bases = {}
+
+    def assign(self, number: str, duplicate_of: Optional[str] = None) -> str:
+        """Return the merged number of a chunk step (``duplicate_of``: its kept step's number)."""
+        match = _NUMBER_PARTS.match(number)
+        base, suffix = (match.group(1), match.group(2)) if match else (number, "")
+        if duplicate_of is not None:
+            kept = _NUMBER_PARTS.match(duplicate_of)
+            self.bases.setdefault(base, kept.group(1) if kept else duplicate_of)
+            return duplicate_of
+        merged_base = self.bases.get(base)
+        if merged_base is None or f"{merged_base}{suffix}" in self.used:
+            merged_base = str(self.next_base)
+            self.next_base += 1
+            self.bases[base] = merged_base
+        new_number = f"{merged_base}{suffix}"
+        self.used.add(new_number)
+        if merged_base.isdigit():
+            self.next_base = max(self.next_base, int(merged_base) + 1)
+        return new_number
+
+
+def _render_step(step: ProcessStep) -> str:
+    """Render a step in the transcript-analysis format."""
+    lines = [f"### Step {step.number}: {step.name}"]
+    for label, value in (("Actor/Role", step.actor), ("Description", step.description), ("Input", step.input),
+                         ("Output", step.output), ("Duration/Timing", step.duration),
+                         ("Pain Points", step.pain_points), *step.extra.items()):
+        if value:
+            lines.append(f"- **{label}**: {value}")
+    return "\n".join(lines)
+
+
+def _render_decision(decision: DecisionPoint) -> str:
+    """Render a decision point in the transcript-analysis format."""
+    lines = [f"### Decision Point {decision.number}: {decision.name}"]
+    if decision.location:
+        lines.append(f"- **Location in Process**: {decision.location}")
+    if decision.condition:
+        lines.append(f"- **Condition**: {decision.condition}")
+    if decision.outcomes:
+        lines.append("- **Outcomes**:")
+        for outcome in decision.outcomes:
+            label, _, value = outcome.partition(": ")
+            lines.append(f"  - **{label}**: {value}")
+    if decision.decision_maker:
+        lines.append(f"- **Decision Maker**: {decision.decision_maker}")
+    return "\n".join(lines)
+
+
+def _render_table(header: Tuple[str, str, str], rows: List[Tuple[str, str, str]]) -> str:
+    """Render a three-column markdown table."""
+    lines = ["| " + " | ".join(header) + " |", "|" + "|".join("-" * (len(cell) + 2) for cell in header) + "|"]
+    lines += ["| " + " | ".join(row) + " |" for row in rows]
+    return "\n".join(lines)
+
+
+def _render_pain_points(pain_points: List[PainPoint]) -> str:
+    """Render pain points grouped by category, numbered within each category."""
+    categories: Dict[str, List[PainPoint]] = {}
+    for pain_point in pain_points:
+        categories.setdefault(pain_point.category, []).append(pain_point)
+    parts = []
+    for category, items in categories.items():
+        lines = [f"### {category}", ""] if category else []
+        for number, item in enumerate(items, 1):
+            lines.append(f"{number}. **{item.title}**: {item.summary}" if item.summary else f"{number}. **{item.title}**")
+            lines += [f"   - **{label}**: {value}" for label, value in item.details.items()]
+            lines.append("")
+        parts.append("\n".join(lines).rstrip())
+    return "\n\n".join(parts)
+
+
+def merge_analyses(analyses: Sequence[ProcessAnalysis],
+                   title: Optional[str] = None) -> Tuple[ProcessAnalysis, Dict[str, int]]:
+    """
+    Merge the analyses of consecutive transcript chunks into one analysis.
+
+    Args:
+        analyses: Chunk analyses in transcript order
+        title: Document title (defaults to the first chunk's title)
+
+    Returns:
+        Tuple of (merged ProcessAnalysis, counts of duplicates removed per record type)
+
+    Raises:
+        ValueError: If no analyses are given
+    """
+    if not analyses:
+        raise ValueError("No analyses to merge")
+
+    removed = {"steps": 0, "actors": 0, "decision_points": 0, "systems": 0, "pain_points": 0}
+    steps: List[ProcessStep] = []
+    kept_steps: List[Tuple[frozenset, ProcessStep]] = []
+    decisions: List[DecisionPoint] = []
+    kept_decisions: List[Tuple[frozenset, DecisionPoint]] = []
+    actors: List[Actor] = []
+    kept_actors: List[Tuple[frozenset, Actor]] = []
+    systems: List[SystemTool] = []
+    kept_systems: List[Tuple[frozenset, SystemTool]] = []
+    pain_points: List[PainPoint] = []
+    kept_pain_points: List[Tuple[frozenset, PainPoint]] = []
+    metrics: Dict[str, Metric] = {}
+    summaries, notes, extra_blocks = [], [], {}
+    numbering = _StepNumbering()
+
+    for analysis in analyses:
+        # Only records of earlier chunks can be overlap duplicates
+        previous_steps, previous_decisions = list(kept_steps), list(kept_decisions)
+        previous_actors, previous_systems = list(kept_actors), list(kept_systems)
+        previous_pain_points = list(kept_pain_points)
+
+        # Number every step first: references may point forward ("Proceed to Step 4b")
+        numbering.start_chunk()
+        numbers: Dict[str, str] = {}
+        matched = []
+        for step in analysis.steps:
+            terms = _name_terms(step.name)
+            duplicate = _find(terms, previous_steps)
+            numbers[step.number] = numbering.assign(step.number, duplicate.number if duplicate else None)
+            matched.append((step, terms, duplicate))
+
+        def remap(text: str) -> str:
+            return remap_step_references(text, numbers)
+
+        for step, terms, duplicate in matched:
+            fields = {attribute: remap(getattr(step, attribute))
+                      for attribute in ("actor", "description", "input", "output", "duration", "pain_points")}
+            if duplicate is not None:
+                removed["steps"] += 1
+                for attribute, value in fields.items():
+                    if not getattr(duplicate, attribute):
+                        setattr(duplicate, attribute, value)
+                continue
+            merged = ProcessStep(number=numbers[step.number], name=step.name, extra=dict(step.extra), **fields)
+            steps.append(merged)
+            kept_steps.append((terms, merged))
+
+        for decision in analysis.decision_points:
+            terms = _name_terms(decision.name)
+            if _find(terms, previous_decisions) is not None:
+                removed["decision_points"] += 1
+                continue
+            merged = DecisionPoint(number=str(len(decisions) + 1), name=decision.name,
+                                   location=remap(decision.location), condition=remap(decision.condition),
+                                   outcomes=[remap(outcome) for outcome in decision.outcomes],
+                                   decision_maker=decision.decision_maker)
+            decisions.append(merged)
+            kept_decisions.append((terms, merged))
+
+        for actor in analysis.actors:
+            terms = _name_terms(actor.role)
+            duplicate = _find(terms, previous_actors)
+            if duplicate is not None:
+                removed["actors"] += 1
+                if len(actor.role) > len(duplicate.role) and _PARENTHETICAL.search(actor.role):
+                    duplicate.role = actor.role  # Keep the more specific "AP Specialist (Jennifer Park)"
+                duplicate.responsibilities = _join_items(duplicate.responsibilities, actor.responsibilities)
+                duplicate.systems = _join_items(duplicate.systems, actor.systems)
+                continue
+            merged = Actor(actor.role, actor.responsibilities, actor.systems)
+            actors.append(merged)
+            kept_actors.append((terms, merged))
+
+        for system in analysis.systems:
+            terms = _name_terms(system.name)
+            duplicate = _find(terms, previous_systems)
+            if duplicate is not None:
+                removed["systems"] += 1
+                duplicate.integration_points = _join_items(duplicate.integration_points,
+                                                           remap(system.integration_points))
+                continue
+            merged = SystemTool(system.name, system.purpose, remap(system.integration_points))
+            systems.append(merged)
+            kept_systems.append((terms, merged))
+
+        for pain_point in analysis.pain_points:
+            terms = _name_terms(pain_point.title)
+            if _find(terms, previous_pain_points) is not None:
+                removed["pain_points"] += 1
+                continue
+            merged = PainPoint(pain_point.category, pain_point.title, remap(pain_point.summary),
+                               {label: remap(value) for label, value in pain_point.details.items()})
+            pain_points.append(merged)
+            kept_pain_points.append((terms, merged))
+
+        for metric in analysis.metrics:
+            metrics.setdefault(metric.name.lower(), metric)
+
+        summaries.append(analysis.summary)
+        notes.append(analysis.section(NOTES))
+        for heading, text in analysis.blocks:
+            if section_kind(heading) is None:
+                extra_blocks.setdefault(heading, text.rstrip())
+
+    document_title = title or next((analysis.title for analysis in analyses if analysis.title), "Process Analysis")
+    parts = [f"# {document_title}"]
+    parts.append(f"## {EXECUTIVE_SUMMARY}\n" + _unique_sentences(summaries))
+    parts.append(f"## {PROCESS_STEPS}\n\n" + "\n\n".join(_render_step(step) for step in steps))
+    parts.append(f"## {ACTORS}\n\n" + _render_table(
+        ("Role", "Responsibilities", "Systems Used"),
+        [(actor.role, actor.responsibilities, actor.systems) for actor in actors]))
+    parts.append(f"## {DECISION_POINTS}\n\n" + "\n\n".join(_render_decision(decision) for decision in decisions))
+    parts.append(f"## {SYSTEMS}\n\n" + _render_table(
+        ("System", "Purpose", "Integration Points"),
+        [(system.name, system.purpose, system.integration_points) for system in systems]))
+    parts.append(f"## {PAIN_POINTS} and Inefficiencies\n\n" + _render_pain_points(pain_points))
+
+    # Count metrics describe the merged analysis, not one chunk
+    counted = ProcessAnalysis(steps=steps, actors=actors, decision_points=decisions, systems=systems,
+                              pain_points=pain_points)
+    metric_lines = []
+    for prefix, count in _COUNT_METRICS.items():
+        name = next((metric.name for key, metric in metrics.items() if key.startswith(prefix)), prefix.title())
+        metric_lines.append(f"- **{name}**: {count(counted)}")
+    metric_lines += [f"- **{metric.name}**: {metric.value}" for key, metric in metrics.items()
+                     if not any(key.startswith(prefix) for prefix in _COUNT_METRICS)]
+    parts.append(f"## {METRICS}\n" + "\n".join(metric_lines))
+
+    merged_notes = _unique_sentences(notes)
+    if merged_notes:
+        parts.append(f"## {NOTES}\n\n" + merged_notes)
+    parts += list(extra_blocks.values())
+
+    return ProcessAnalysis.parse("\n\n".join(parts) + "\n"), removed
@@ -0,0 +1,160 @@
+"""
+Model cascade for transformation consultant components.
+
+A cascade runs a component on a faster model first and only escalates to a
+larger model when the result fails the component's own checks (output
+validation, required sections, quality warnings). Routine inputs are served
+by the first tier; the metadata records which tier answered and why earlier
+tiers were rejected.
+"""
+
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from .component import BaseComponent, ComponentResult
+
+# Usage counters summed over every tier that ran
+USAGE_KEYS = ("input_tokens", "output_tokens", "cache_creation_input_tokens", "cache_read_input_tokens")
+
+
+class ModelCascade:
+    """
+    Wraps a component so it tries a sequence of models, cheapest first.
+
+    The cascade stands in for the component in a Pipeline: it has the same
+    name, skill and validation, and unknown attributes are read from the
+    wrapped component. Each tier is a copy of the component that only
+    differs in its model, so caches, clients and the scheduler are shared.
+    """
+
+    def __init__(self, component: BaseComponent, models: Sequence[str]):
+        """
+        Initialize a cascade.
+
+        Args:
+            component: Component to run
+            models: Models to try in order; the last one is always accepted
+
+        Raises:
+            ValueError: If no models are given
+        """
+        if not models:
+            raise ValueError("A model cascade needs at least one model")
+        self.component = component
+        self.models = list(models)
+        self.tiers = [component.with_model(model) for model in self.models]
+
+    def __getattr__(self, name: str) -> Any:
+        """Read other attributes (model, response_cache, ...) from the wrapped component."""
+        if name == "component":
+            raise AttributeError(name)
+        return getattr(self.component, name)
+
+    @property
+    def component_name(self) -> str:
+        """Return the wrapped component's name."""
+        return self.component.component_name
+
+    @property
+    def skill_path(self) -> Path:
+        """Return the wrapped component's SKILL.md path."""
+        return self.component.skill_path
+
+    def validate_input(self, input_data: Any) -> bool:
+        """Validate input with the wrapped component (see BaseComponent.validate_input)."""
+        return self.component.validate_input(input_data)
+
+    def _input_is_valid(self, input_data: Any) -> bool:
+        """Return False when the input itself is rejected, so no tier could succeed."""
+        try:
+            self.validate_input(input_data)
+        except Exception:
+            return False
+        return True
+
+    def _annotate(self, result: ComponentResult, tier: int, escalations: List[Dict[str, Any]]) -> ComponentResult:
+        """
+        Record which tier served the request and why earlier tiers were rejected.
+
+        Rejected tiers were paid for too, so their usage and stage timings are
+        added to the result's totals; the accepted tier's own usage is kept
+        under ``metadata["cascade"]["usage"]``.
+        """
+        metadata = result.metadata
+        usage = {key: metadata.get(key, 0) or 0 for key in USAGE_KEYS}
+        for escalation in escalations:
+            for key in USAGE_KEYS:
+                metadata[key] = (metadata.get(key, 0) or 0) + escalation[key]
+            if escalation["timings"] and "timings" in metadata:
+                timings = dict(metadata["timings"])
+                for stage, seconds in escalation["timings"].items():
+                    timings[stage] = round(timings.get(stage, 0.0) + seconds, 6)
+                metadata["timings"] = timings
+        metadata["cascade"] = {
+            "tier": tier,
+            "model": self.models[tier],
+            "models": list(self.models),
+            "usage": usage,
+            "escalations": escalations,
+        }
+        return result
+
+    def _escalation(self, tier: int, result: ComponentResult, kwargs: dict) -> Optional[Dict[str, Any]]:
+        """Return an escalation record if ``result`` should be retried on the next tier."""
+        if tier == len(self.tiers) - 1:
+            return None
+        reason = self.tiers[tier].escalation_reason(result)
+        if reason is None:
+            return None
+
+        on_escalate: Optional[Callable[[], None]] = kwargs.get('on_escalate')
+        if on_escalate is not None:
+            on_escalate()
+        return {
+            "model": self.models[tier],
+            "reason": reason,
+            **{key: result.metadata.get(key, 0) or 0 for key in USAGE_KEYS},
+            "timings": dict(result.metadata.get("timings") or {}),
+        }
+
+    def process(self, input_data: Any, **kwargs) -> ComponentResult:
+        """
+        Process input on each tier in turn until one is accepted.
+
+        Args:
+            input_data: Input for the wrapped component
+            **kwargs: Passed to the wrapped component's process, plus:
+                - on_escalate: Called before a rejected result is retried on
+                  the next tier (e.g. to restart a streamed output file)
+
+        Returns:
+            The accepted tier's ComponentResult, with ``metadata["cascade"]``
+        """
+        if not self._input_is_valid(input_data):
+            return self.tiers[0].process(input_data, **kwargs)
+
+        escalations: List[Dict[str, Any]] = []
+        for tier, component in enumerate(self.tiers):
+            result = component.process(input_data, **kwargs)
+            escalation = self._escalation(tier, result, kwargs)
+            if escalation is None:
+                return self._annotate(result, tier, escalations)
+            escalations.append(escalation)
+
+    async def aprocess(self, input_data: Any, **kwargs) -> ComponentResult:
+        """
+        Asynchronously process input on each tier in turn (see process).
+
+        Returns:
+            The accepted tier's ComponentResult, with ``metadata["cascade"]``
+        """
+        if not self._input_is_valid(input_data):
+            return await self.tiers[0].aprocess(input_data, **kwargs)
+
+        escalations: List[Dict[str, Any]] = []
+        for tier, component in enumerate(self.tiers):
+            result = await component.aprocess(input_data, **kwargs)
+            escalation = self._escalation(tier, result, kwargs)
+            if escalation is None:
+                return self._annotate(result, tier, escalations)
+            escalations.append(escalation)
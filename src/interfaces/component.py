@@ -5,12 +5,21 @@ This module defines the abstract base class that all components must implement,
 as well as the standard result format returned by component execution.
 """
 
+import copy
+import time
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, List, Optional
 from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
 
+from ..runtime.cassette import Cassette, CassetteMiss, get_cassette
+from ..runtime.client_pool import ClientPool, get_client_pool
+from ..runtime.metrics import StageTimings
+from ..runtime.rate_limiter import RequestScheduler, estimate_input_tokens, get_request_scheduler
+from ..runtime.response_cache import ResponseCache, make_request_key
+from ..skills.skill_registry import get_skill_registry
+
 
 @dataclass
 class ComponentResult:
@@ -28,6 +37,18 @@ class ComponentResult:
             self.timestamp = datetime.now()
 
 
+class StreamAborted(Exception):
+    """
+    Raised by an ``on_text`` callback to cancel a streaming API call.
+
+    Leaving the stream context closes the HTTP response, so generation stops
+    on the server instead of running to ``max_tokens``. ``partial_text`` is
+    set to the text streamed before the abort.
+    """
+
+    partial_text: str = ""
+
+
 class BaseComponent(ABC):
     """
     Base interface for all transformation consultant components.
@@ -39,7 +60,11 @@ class BaseComponent(ABC):
     def __init__(self,
                  api_key: str,
                  model: str = "claude-sonnet-4-5-20250929",
-                 config: Optional[Dict[str, Any]] = None):
+                 config: Optional[Dict[str, Any]] = None,
+                 response_cache: Optional["ResponseCache"] = None,
+                 client_pool: Optional[ClientPool] = None,
+                 scheduler: Optional[RequestScheduler] = None,
+                 cassette: Optional[Cassette] = None):
         """
         Initialize component.
 
@@ -47,11 +72,23 @@ class BaseComponent(ABC):
             api_key: Anthropic API key
             model: Claude model to use
             config: Component-specific configuration
+            response_cache: Optional on-disk cache for deterministic API responses
+            client_pool: Pool to take API clients from (defaults to the
+                        process-wide pool)
+            scheduler: Rate limit scheduler every API call goes through
+                      (defaults to the process-wide scheduler)
+            cassette: Cassette to record API responses into or replay them
+                     from (defaults to the process-wide cassette, if any)
         """
         self.api_key = api_key
         self.model = model
         self.config = config or {}
+        self.response_cache = response_cache
+        self.client_pool = client_pool
+        self.scheduler = scheduler
+        self.cassette = cassette
         self._client = None  # Lazy initialization
+        self._async_client = None  # Set to pin a specific async client
 
     @property
     @abstractmethod
@@ -95,54 +132,447 @@ class BaseComponent(ABC):
         """
         pass
 
+    async def aprocess(self, input_data: Any, **kwargs) -> ComponentResult:
+        """
+        Asynchronously execute the component's main processing logic.
+
+        Components that call Claude override this with a native asyncio
+        implementation. The default runs ``process`` in a worker thread so
+        that every component can be awaited.
+
+        Args:
+            input_data: Input data (type varies by component)
+            **kwargs: Additional component-specific parameters
+
+        Returns:
+            ComponentResult with success status, data, and metadata
+        """
+        import asyncio  # Deferred: only async callers need it
+
+        return await asyncio.to_thread(self.process, input_data, **kwargs)
+
+    def with_model(self, model: str) -> "BaseComponent":
+        """
+        Return a copy of this component that calls a different model.
+
+        The copy shares configuration, clients, caches and the scheduler
+        with this component; only the model differs.
+
+        Args:
+            model: Claude model for the copy
+
+        Returns:
+            New component instance
+        """
+        clone = copy.copy(self)
+        clone.model = model
+        return clone
+
+    def escalation_reason(self, result: ComponentResult) -> Optional[str]:
+        """
+        Explain why a result should be retried on a larger model, if it should.
+
+        Used by ModelCascade. The default rejects failed results and results
+        carrying a ``warning``; components add their own quality checks.
+
+        Args:
+            result: Result returned by process/aprocess
+
+        Returns:
+            Reason to escalate, or None if the result is acceptable
+        """
+        if not result.success:
+            return result.error or "Processing failed"
+        if result.metadata.get("warning"):
+            return result.metadata["warning"]
+        return None
+
+    def _error_result(self, error: Exception) -> ComponentResult:
+        """
+        Convert an exception raised during processing into a failed result.
+
+        Args:
+            error: Exception raised by validation or processing
+
+        Returns:
+            ComponentResult with success=False and a categorized error message
+        """
+        if isinstance(error, ValueError):
+            message = f"Validation error: {str(error)}"
+        else:
+            message = f"Processing error: {str(error)}"
+        return ComponentResult(
+            success=False,
+            data=None,
+            metadata={"component": self.component_name},
+            error=message
+        )
+
+    def _with_timings(self, result: ComponentResult, timings: StageTimings) -> ComponentResult:
+        """
+        Attach per-stage durations to a result's metadata.
+
+        Every component finishes its result here, so this is also where
+        responses behind a rejected result leave the response cache (see
+        _evict_rejected).
+
+        Args:
+            result: Result built by the component
+            timings: Stage timings recorded while producing it
+
+        Returns:
+            The same result with ``timings`` in its metadata
+        """
+        result.metadata["timings"] = timings.as_dict()
+        self._evict_rejected(result)
+        return result
+
+    def _evict_rejected(self, result: ComponentResult):
+        """
+        Remove the cached responses behind a result that fails validation.
+
+        Responses are cached before the component checks them, so a malformed
+        answer would otherwise be replayed by every deterministic rerun until
+        it expires. A result is rejected when escalation_reason returns a
+        reason, the same test ModelCascade escalates on.
+
+        Args:
+            result: Finished result; its metadata carries the cache key(s)
+        """
+        if self.response_cache is None:
+            return
+        keys = result.metadata.get("response_cache_keys") or [result.metadata.get("response_cache_key")]
+        keys = [key for key in keys if key]
+        if keys and self.escalation_reason(result) is not None:
+            for key in keys:
+                self.response_cache.delete(key)
+            result.metadata["response_cache_evicted"] = len(keys)
+
+    def _get_client_pool(self) -> ClientPool:
+        """Return the injected client pool or the process-wide one."""
+        return self.client_pool or get_client_pool()
+
+    def _get_scheduler(self) -> RequestScheduler:
+        """Return the injected request scheduler or the process-wide one."""
+        return self.scheduler or get_request_scheduler()
+
     def _get_client(self):
-        """Lazy initialization of Anthropic client."""
+        """Lazy initialization of Anthropic client from the shared pool."""
         if self._client is None:
-            from anthropic import Anthropic
-            self._client = Anthropic(api_key=self.api_key)
+            # Retries are handled by the request scheduler, not the SDK
+            self._client = self._get_client_pool().get_client(self.api_key, max_retries=0)
         return self._client
 
+    def _get_async_client(self):
+        """
+        Return the async Anthropic client for the running event loop.
+
+        Async clients are bound to the loop they were created on, so the
+        pooled client is looked up on every call instead of being kept.
+        """
+        if self._async_client is not None:
+            return self._async_client
+        return self._get_client_pool().get_async_client(self.api_key, max_retries=0)
+
     def _load_skill_prompt(self) -> str:
-        """Load SKILL.md content."""
-        return self.skill_path.read_text(encoding='utf-8')
+        """Load SKILL.md content from the process-wide skill registry."""
+        return get_skill_registry().read_text(self.skill_path)
+
+    def _build_system_messages(self, context_blocks: Optional[List[str]] = None) -> list:
+        """
+        Build system messages with a prompt-caching friendly layout.
+
+        The SKILL.md prompt always comes first and carries a cache breakpoint,
+        so every call of this component shares a cached prefix regardless of
+        which reference material follows. Reference blocks come next in the
+        order given, with a second breakpoint on the last one so repeat calls
+        with the same references also reuse them. This uses at most two of
+        the four breakpoints the API allows.
+
+        Args:
+            context_blocks: Reference texts appended after the skill prompt
+
+        Returns:
+            List of system message dicts
+        """
+        system_messages = [{
+            "type": "text",
+            "text": self._load_skill_prompt(),
+            "cache_control": {"type": "ephemeral"}
+        }]
+
+        for text in context_blocks or []:
+            system_messages.append({"type": "text", "text": text})
+        if len(system_messages) > 1:
+            system_messages[-1]["cache_control"] = {"type": "ephemeral"}
+
+        return system_messages
+
+    @property
+    def skill_hash(self) -> str:
+        """Return the SHA-256 hex digest of the current SKILL.md content."""
+        return get_skill_registry().content_hash(self.skill_path)
+
+    def _cache_key(self,
+                   user_message: str,
+                   system_messages: list,
+                   max_tokens: int,
+                   temperature: float) -> Optional[str]:
+        """
+        Return the response cache key for a request, or None if not cacheable.
+
+        Only deterministic (temperature 0) requests are cached.
+        """
+        if self.response_cache is None or temperature != 0:
+            return None
+        return make_request_key(self.model, system_messages, user_message, temperature, max_tokens)
+
+    def _cached_response(self, cache_key: Optional[str]) -> Optional[tuple[str, dict]]:
+        """Return (response_text, metadata) from the response cache on a hit."""
+        if cache_key is None:
+            return None
+        entry = self.response_cache.get(cache_key)
+        if entry is None:
+            return None
+        # A hit costs no tokens; usage totals should only count this run's calls
+        metadata = {**entry["metadata"]}
+        for usage in ("input_tokens", "output_tokens", "cache_creation_input_tokens", "cache_read_input_tokens"):
+            if usage in metadata:
+                metadata[usage] = 0
+        metadata = {
+            **metadata,
+            "response_cache": "hit",
+            "response_cache_key": cache_key,
+            "response_cache_stats": self.response_cache.stats()
+        }
+        return entry["text"], metadata
+
+    def _store_response(self, cache_key: Optional[str], text: str, metadata: dict) -> dict:
+        """Store a fresh response in the cache and annotate its metadata."""
+        if cache_key is None:
+            return metadata
+        try:
+            self.response_cache.put(cache_key, text, metadata)
+        except OSError:
+            # A full or read-only cache directory must not fail the API call
+            return {**metadata, "response_cache": "error"}
+        return {
+            **metadata,
+            "response_cache": "miss",
+            "response_cache_key": cache_key,
+            "response_cache_stats": self.response_cache.stats()
+        }
+
+    def _get_cassette(self) -> Optional[Cassette]:
+        """Return the injected cassette or the process-wide one."""
+        return self.cassette if self.cassette is not None else get_cassette()
+
+    def _build_message_request(self,
+                               user_message: str,
+                               system_messages: list,
+                               max_tokens: int,
+                               temperature: float) -> Dict[str, Any]:
+        """Build Messages API request parameters."""
+        return {
+            "model": self.model,
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+            "system": system_messages,
+            "messages": [{"role": "user", "content": user_message}]
+        }
+
+    def _response_metadata(self, usage: Any, time_to_first_token: Optional[float]) -> dict:
+        """Build usage metadata for an API response."""
+        metadata = {
+            "input_tokens": usage.input_tokens,
+            "output_tokens": usage.output_tokens,
+            "cache_creation_input_tokens": getattr(usage, "cache_creation_input_tokens", None) or 0,
+            "cache_read_input_tokens": getattr(usage, "cache_read_input_tokens", None) or 0,
+            "model": self.model
+        }
+        if time_to_first_token is not None:
+            metadata["streamed"] = True
+            metadata["time_to_first_token"] = round(time_to_first_token, 3)
+        return metadata
 
     def _call_claude(self,
                      user_message: str,
                      system_messages: list,
                      max_tokens: int = 16000,
-                     temperature: float = 0) -> tuple[str, dict]:
+                     temperature: float = 0,
+                     on_text: Optional[Callable[[str], None]] = None) -> tuple[str, dict]:
         """
         Call Claude API with standard error handling.
 
+        Deterministic requests are served from the response cache when one
+        is configured. With a replaying cassette, recorded responses are
+        served without network access; a recording cassette captures every
+        response. Other requests go through the request scheduler, which
+        paces them to the model's rate limits and retries transient errors.
+        When ``on_text`` is given the response is streamed and each text
+        delta is passed to it as it arrives.
+
         Args:
             user_message: User message content
             system_messages: List of system message dicts
             max_tokens: Maximum tokens in response
             temperature: Sampling temperature
+            on_text: Optional callback receiving streamed text deltas
 
         Returns:
             Tuple of (response_text, usage_metadata)
 
         Raises:
             RuntimeError: If API call fails
+            StreamAborted: If on_text cancelled the stream
         """
-        try:
+        cache_key = self._cache_key(user_message, system_messages, max_tokens, temperature)
+        cached = self._cached_response(cache_key)
+        if cached is not None:
+            if on_text is not None:
+                on_text(cached[0])
+            return cached
+
+        cassette = self._get_cassette()
+        cassette_key = None
+        if cassette is not None:
+            cassette_key = make_request_key(self.model, system_messages, user_message, temperature, max_tokens)
+            if cassette.replaying:
+                try:
+                    return cassette.replay(cassette_key, on_text)
+                except CassetteMiss as e:
+                    raise RuntimeError(f"Claude API call failed: {str(e)}")
+
+        request = self._build_message_request(user_message, system_messages, max_tokens, temperature)
+
+        def send() -> tuple[str, dict]:
             client = self._get_client()
-            response = client.messages.create(
-                model=self.model,
-                max_tokens=max_tokens,
-                temperature=temperature,
-                system=system_messages,
-                messages=[{"role": "user", "content": user_message}]
+            if on_text is None:
+                response = client.messages.create(**request)
+                return response.content[0].text, self._response_metadata(response.usage, None)
+
+            start = time.perf_counter()
+            time_to_first_token = None
+            chunks = []
+            try:
+                with client.messages.stream(**request) as stream:
+                    for delta in stream.text_stream:
+                        if time_to_first_token is None:
+                            time_to_first_token = time.perf_counter() - start
+                        chunks.append(delta)
+                        on_text(delta)
+                    usage = stream.get_final_message().usage
+            except StreamAborted as e:
+                e.partial_text = "".join(chunks)
+                raise
+            except Exception as e:
+                if chunks:
+                    # Text already reached on_text, so the request cannot be retried
+                    raise RuntimeError(f"Stream interrupted: {str(e)}") from e
+                raise
+            return "".join(chunks), self._response_metadata(usage, time_to_first_token)
+
+        start = time.perf_counter()
+        try:
+            text, metadata = self._get_scheduler().run(
+                self.model, send, estimate_input_tokens(system_messages, user_message), max_tokens
             )
+        except StreamAborted as e:
+            if cassette is not None:
+                # Record the partial stream so a replay aborts at the same point
+                cassette.record(cassette_key, self.model, e.partial_text, {"model": self.model, "aborted": True},
+                                time.perf_counter() - start)
+            raise
+        except Exception as e:
+            raise RuntimeError(f"Claude API call failed: {str(e)}")
+
+        if cassette is not None:
+            cassette.record(cassette_key, self.model, text, metadata, time.perf_counter() - start)
+        return text, self._store_response(cache_key, text, metadata)
+
+    async def _acall_claude(self,
+                            user_message: str,
+                            system_messages: list,
+                            max_tokens: int = 16000,
+                            temperature: float = 0,
+                            on_text: Optional[Callable[[str], None]] = None) -> tuple[str, dict]:
+        """
+        Call Claude API asynchronously with standard error handling.
+
+        Args:
+            user_message: User message content
+            system_messages: List of system message dicts
+            max_tokens: Maximum tokens in response
+            temperature: Sampling temperature
+            on_text: Optional callback receiving streamed text deltas
+
+        Returns:
+            Tuple of (response_text, usage_metadata)
+
+        Raises:
+            RuntimeError: If API call fails
+            StreamAborted: If on_text cancelled the stream
+        """
+        cache_key = self._cache_key(user_message, system_messages, max_tokens, temperature)
+        cached = self._cached_response(cache_key)
+        if cached is not None:
+            if on_text is not None:
+                on_text(cached[0])
+            return cached
+
+        cassette = self._get_cassette()
+        cassette_key = None
+        if cassette is not None:
+            cassette_key = make_request_key(self.model, system_messages, user_message, temperature, max_tokens)
+            if cassette.replaying:
+                try:
+                    return await cassette.areplay(cassette_key, on_text)
+                except CassetteMiss as e:
+                    raise RuntimeError(f"Claude API call failed: {str(e)}")
+
+        request = self._build_message_request(user_message, system_messages, max_tokens, temperature)
 
-            metadata = {
-                "input_tokens": response.usage.input_tokens,
-                "output_tokens": response.usage.output_tokens,
-                "model": self.model
-            }
+        async def send() -> tuple[str, dict]:
+            client = self._get_async_client()
+            if on_text is None:
+                response = await client.messages.create(**request)
+                return response.content[0].text, self._response_metadata(response.usage, None)
 
-            return response.content[0].text, metadata
+            start = time.perf_counter()
+            time_to_first_token = None
+            chunks = []
+            try:
+                async with client.messages.stream(**request) as stream:
+                    async for delta in stream.text_stream:
+                        if time_to_first_token is None:
+                            time_to_first_token = time.perf_counter() - start
+                        chunks.append(delta)
+                        on_text(delta)
+                    usage = (await stream.get_final_message()).usage
+            except StreamAborted as e:
+                e.partial_text = "".join(chunks)
+                raise
+            except Exception as e:
+                if chunks:
+                    # Text already reached on_text, so the request cannot be retried
+                    raise RuntimeError(f"Stream interrupted: {str(e)}") from e
+                raise
+            return "".join(chunks), self._response_metadata(usage, time_to_first_token)
 
+        start = time.perf_counter()
+        try:
+            text, metadata = await self._get_scheduler().arun(
+                self.model, send, estimate_input_tokens(system_messages, user_message), max_tokens
+            )
+        except StreamAborted as e:
+            if cassette is not None:
+                # Record the partial stream so a replay aborts at the same point
+                cassette.record(cassette_key, self.model, e.partial_text, {"model": self.model, "aborted": True},
+                                time.perf_counter() - start)
+            raise
         except Exception as e:
             raise RuntimeError(f"Claude API call failed: {str(e)}")
+
+        if cassette is not None:
+            cassette.record(cassette_key, self.model, text, metadata, time.perf_counter() - start)
+        return text, self._store_response(cache_key, text, metadata)
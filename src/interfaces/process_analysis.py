@@ -0,0 +1,359 @@
+"""
+Typed process analysis shared between pipeline stages.
+
+The transcript-analysis skill returns markdown with a fixed set of ``##``
+sections (see skills/transcript-analysis/SKILL.md). ProcessAnalysis parses
+that markdown once, in a single pass over its lines, into compact records
+for steps, actors, decision points, systems, pain points and metrics.
+
+The original text of every section is kept, so ``to_markdown()`` reproduces
+the input exactly, and downstream components can render only the sections
+they need.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Canonical section names, matched as heading prefixes
+# ("## Pain Points and Inefficiencies" is the "Pain Points" section)
+EXECUTIVE_SUMMARY = "Executive Summary"
+PROCESS_STEPS = "Process Steps"
+ACTORS = "Actors and Roles"
+DECISION_POINTS = "Decision Points"
+SYSTEMS = "Systems and Tools"
+PAIN_POINTS = "Pain Points"
+METRICS = "Process Metrics"
+NOTES = "Notes and Observations"
+
+SECTIONS = (EXECUTIVE_SUMMARY, PROCESS_STEPS, ACTORS, DECISION_POINTS, SYSTEMS, PAIN_POINTS, METRICS, NOTES)
+
+_FIELD = re.compile(r"^\s*(?:[-*]|\d+\.)\s+\*\*(.+?)\*\*:?\s*(.*)$")
+_NUMBERED_HEADING = re.compile(r"^###\s+(?:Step|Decision Point)\s+([\w.-]+)\s*[:.-]\s*(.*)$")
+_NUMBERED_ITEM = re.compile(r"^(\d+)\.\s+\*\*(.+?)\*\*:?\s*(.*)$")
+_TABLE_SEPARATOR = re.compile(r"^\|[\s:|-]+\|$")
+
+# Step field labels -> ProcessStep attribute
+_STEP_FIELDS = {
+    "actor/role": "actor",
+    "actor": "actor",
+    "description": "description",
+    "input": "input",
+    "output": "output",
+    "duration/timing": "duration",
+    "duration": "duration",
+    "pain points": "pain_points",
+}
+
+
+@dataclass
+class ProcessStep:
+    """A step from the Process Steps section (``### Step 4a: ...``)."""
+
+    number: str
+    name: str
+    actor: str = ""
+    description: str = ""
+    input: str = ""
+    output: str = ""
+    duration: str = ""
+    pain_points: str = ""
+    extra: Dict[str, str] = field(default_factory=dict)  # Other fields, e.g. Frequency
+
+
+@dataclass
+class Actor:
+    """A row of the Actors and Roles table."""
+
+    role: str
+    responsibilities: str = ""
+    systems: str = ""
+
+
+@dataclass
+class DecisionPoint:
+    """A decision from the Decision Points section."""
+
+    number: str
+    name: str
+    location: str = ""
+    condition: str = ""
+    outcomes: List[str] = field(default_factory=list)
+    decision_maker: str = ""
+
+
+@dataclass
+class SystemTool:
+    """A row of the Systems and Tools table."""
+
+    name: str
+    purpose: str = ""
+    integration_points: str = ""
+
+
+@dataclass
+class PainPoint:
+    """A numbered issue from the Pain Points section."""
+
+    category: str  # e.g. "Critical Issues" or "Inefficiencies"
+    title: str
+    summary: str = ""
+    details: Dict[str, str] = field(default_factory=dict)  # Impact, Frequency, Affected Steps, ...
+
+
+@dataclass
+class Metric:
+    """A ``- **Name**: value`` line from the Process Metrics section."""
+
+    name: str
+    value: str
+
+
+def section_kind(heading: str) -> Optional[str]:
+    """Return the canonical section name for a ``##`` heading, if known."""
+    lowered = heading.lower()
+    for name in SECTIONS:
+        if lowered.startswith(name.lower()):
+            return name
+    if lowered.startswith("actors"):
+        return ACTORS
+    if lowered.startswith("systems"):
+        return SYSTEMS
+    if lowered.startswith("metrics"):
+        return METRICS
+    return None
+
+
+def _table_cells(line: str) -> List[str]:
+    """Split a markdown table row into stripped cells."""
+    return [cell.strip() for cell in line.strip().strip("|").split("|")]
+
+
+def _clean(text: str) -> str:
+    """Strip markdown emphasis from a short value."""
+    return text.replace("**", "").strip()
+
+
+@dataclass
+class ProcessAnalysis:
+    """
+    Parsed transcript analysis.
+
+    Behaves like the markdown it was parsed from where the pipeline expects
+    text: ``str(analysis)`` returns the original markdown and
+    ``"## Process Steps" in analysis`` performs a substring check on it.
+    """
+
+    title: str = ""
+    steps: List[ProcessStep] = field(default_factory=list)
+    actors: List[Actor] = field(default_factory=list)
+    decision_points: List[DecisionPoint] = field(default_factory=list)
+    systems: List[SystemTool] = field(default_factory=list)
+    pain_points: List[PainPoint] = field(default_factory=list)
+    metrics: List[Metric] = field(default_factory=list)
+    preamble: str = ""  # Text before the first ## heading (title line)
+    blocks: List[Tuple[str, str]] = field(default_factory=list)  # (heading, raw section text)
+    kinds: Dict[str, int] = field(default_factory=dict)  # Canonical section name -> first block index
+
+    @classmethod
+    def parse(cls, text: str) -> "ProcessAnalysis":
+        """
+        Parse analysis markdown in a single pass.
+
+        Args:
+            text: Markdown produced by the transcript-analysis skill
+
+        Returns:
+            ProcessAnalysis holding the typed records and the original text
+        """
+        analysis = cls()
+        preamble: List[str] = []
+        section: List[str] = preamble
+        heading = ""
+        kind: Optional[str] = None
+        subheading = ""  # Current ### heading (pain point category)
+        table_rows = 0  # Rows seen in the current section's table (first is the header)
+        in_fence = False
+        current: Any = None  # Step, decision point or pain point receiving fields
+        in_outcomes = False
+
+        def close_section():
+            if section is not preamble:
+                analysis.blocks.append((heading, "".join(section)))
+
+        for raw in text.splitlines(keepends=True):
+            line = raw.rstrip("\r\n")
+            stripped = line.strip()
+
+            if stripped.startswith("```"):
+                in_fence = not in_fence
+            elif not in_fence and line.startswith("## "):
+                close_section()
+                section = []
+                heading = line[3:].strip()
+                kind = section_kind(heading)
+                if kind is not None and kind not in analysis.kinds:
+                    analysis.kinds[kind] = len(analysis.blocks)
+                subheading, table_rows, current, in_outcomes = "", 0, None, False
+            elif not in_fence and line.startswith("# ") and not analysis.title and section is preamble:
+                analysis.title = line[2:].strip()
+            section.append(raw)
+
+            if in_fence or kind is None or not stripped or line.startswith("## "):
+                continue
+
+            if line.startswith("### "):
+                subheading = line[4:].strip()
+                match = _NUMBERED_HEADING.match(line)
+                current, in_outcomes = None, False
+                if match and kind == PROCESS_STEPS:
+                    current = ProcessStep(number=match.group(1), name=match.group(2).strip())
+                    analysis.steps.append(current)
+                elif match and kind == DECISION_POINTS:
+                    current = DecisionPoint(number=match.group(1), name=match.group(2).strip())
+                    analysis.decision_points.append(current)
+                continue
+
+            if stripped.startswith("|"):
+                if _TABLE_SEPARATOR.match(stripped):
+                    continue
+                table_rows += 1
+                if table_rows == 1:
+                    continue  # Header row
+                cells = _table_cells(stripped) + ["", ""]
+                if kind == ACTORS:
+                    analysis.actors.append(Actor(_clean(cells[0]), cells[1], cells[2]))
+                elif kind == SYSTEMS:
+                    analysis.systems.append(SystemTool(_clean(cells[0]), cells[1], cells[2]))
+                continue
+
+            if kind == PAIN_POINTS:
+                match = _NUMBERED_ITEM.match(stripped) if not line[0].isspace() else None
+                if match:
+                    current = PainPoint(category=subheading, title=match.group(2).strip(),
+                                        summary=match.group(3).strip())
+                    analysis.pain_points.append(current)
+                    continue
+
+            match = _FIELD.match(line)
+            if match is None:
+                continue
+            label, value = match.group(1).strip().rstrip(":"), match.group(2).strip()
+
+            if kind == METRICS and not line[0].isspace():
+                analysis.metrics.append(Metric(label, value))
+            elif isinstance(current, ProcessStep):
+                attribute = _STEP_FIELDS.get(label.lower())
+                if attribute is not None:
+                    setattr(current, attribute, value)
+                else:
+                    current.extra[label] = value
+            elif isinstance(current, DecisionPoint):
+                if in_outcomes and line[0].isspace():
+                    current.outcomes.append(f"{label}: {value}")
+                    continue
+                lowered = label.lower()
+                in_outcomes = lowered == "outcomes"
+                if lowered.startswith("location"):
+                    current.location = value
+                elif lowered == "condition":
+                    current.condition = value
+                elif lowered == "decision maker":
+                    current.decision_maker = value
+            elif isinstance(current, PainPoint):
+                current.details[label] = value
+
+        close_section()
+        analysis.preamble = "".join(preamble)
+        return analysis
+
+    @classmethod
+    def coerce(cls, data: Any) -> "ProcessAnalysis":
+        """
+        Return data as a ProcessAnalysis, parsing markdown text if needed.
+
+        Raises:
+            ValueError: If data is neither a ProcessAnalysis nor a string
+        """
+        if isinstance(data, cls):
+            return data
+        if isinstance(data, str):
+            return cls.parse(data)
+        raise ValueError(f"Input must be string or ProcessAnalysis, got {type(data)}")
+
+    def has_section(self, name: str) -> bool:
+        """Return True if a section (canonical name or heading prefix) is present."""
+        if name in self.kinds:
+            return True
+        lowered = name.lower()
+        return any(heading.lower().startswith(lowered) for heading, _ in self.blocks)
+
+    def section(self, name: str) -> str:
+        """
+        Return the body of a section, without its heading line.
+
+        Args:
+            name: Canonical section name or heading prefix
+
+        Returns:
+            Section text, or "" if the section is missing
+        """
+        for heading, text in self._select([name]):
+            return text.split("\n", 1)[1] if "\n" in text else ""
+        return ""
+
+    @property
+    def summary(self) -> str:
+        """Return the executive summary text."""
+        return self.section(EXECUTIVE_SUMMARY).strip()
+
+    def _select(self, names: Iterable[str]) -> List[Tuple[str, str]]:
+        """Return the blocks matching any of the given section names, in document order."""
+        wanted = [name.lower() for name in names]
+        return [
+            (heading, text) for heading, text in self.blocks
+            if section_kind(heading) in names or any(heading.lower().startswith(w) for w in wanted)
+        ]
+
+    def to_markdown(self, sections: Optional[Iterable[str]] = None) -> str:
+        """
+        Render the analysis as markdown.
+
+        Args:
+            sections: Section names to include (canonical names or heading
+                      prefixes); None renders every section. The title is
+                      always included.
+
+        Returns:
+            The original markdown when rendering every section, otherwise the
+            title followed by the selected sections in document order
+        """
+        if sections is None:
+            blocks = self.blocks
+        else:
+            blocks = self._select(list(sections))
+        return self.preamble + "".join(text for _, text in blocks)
+
+    def stats(self) -> Dict[str, int]:
+        """Return record counts per section."""
+        return {
+            "steps": len(self.steps),
+            "actors": len(self.actors),
+            "decision_points": len(self.decision_points),
+            "systems": len(self.systems),
+            "pain_points": len(self.pain_points),
+            "metrics": len(self.metrics),
+        }
+
+    def __str__(self) -> str:
+        return self.to_markdown()
+
+    def __contains__(self, item: str) -> bool:
+        return item in self.to_markdown()
+
+    def __len__(self) -> int:
+        return len(self.preamble) + sum(len(text) for _, text in self.blocks)
+
+    def __bool__(self) -> bool:
+        # A parsed analysis is a result even when empty; len() alone would make it falsy
+        return True
@@ -2,25 +2,53 @@
 Main entry point for transformation consultant agent.
 
 Provides high-level functions for common workflows and pipeline creation.
+
+Importing this module has no side effects and stays cheap: components (and
+with them the Anthropic SDK) are imported when a pipeline is first built, and
+config/.env is loaded when an API key is first needed.
 """
 
 import os
 from pathlib import Path
 from typing import Optional
-from dotenv import load_dotenv
 
+from .runtime.cassette import Cassette, set_cassette
+from .runtime.checkpoint import CheckpointStore
+from .runtime.client_pool import ClientPool, set_client_pool
+from .runtime.metrics import CompositeMetricsSink, JSONLinesMetricsSink, MetricsSink, PrometheusTextfileSink
+from .runtime.rate_limiter import RateLimits, RequestScheduler, get_request_scheduler, set_request_scheduler
+from .runtime.response_cache import ResponseCache
+
+from . import components
+from .interfaces.cascade import ModelCascade
 from .pipeline import Pipeline, PipelineResult
-from .components.input.transcript_processor import TranscriptProcessor
-from .components.generation.bpmn_generator import BPMNGenerator
-from .components.optimization.recommendation_engine import RecommendationEngine
 
-# Load environment variables
-load_dotenv("config/.env")
+ENV_FILE = "config/.env"
+
+# Model tiers used by create_full_pipeline(cascade=True)
+FAST_MODEL = "claude-haiku-4-5-20251001"
+RECOMMENDATION_MODEL = "claude-opus-4-5-20251101"
+
+_environment_loaded = False
+
+
+def load_environment():
+    """
+    Load environment variables from config/.env once per process.
+
+    Variables already set in the environment take precedence.
+    """
+    global _environment_loaded
+    if not _environment_loaded:
+        from dotenv import load_dotenv
+
+        load_dotenv(ENV_FILE)
+        _environment_loaded = True
 
 
 def get_api_key() -> str:
     """
-    Get Anthropic API key from environment.
+    Get Anthropic API key from environment (loading config/.env first).
 
     Returns:
         API key string
@@ -28,6 +56,7 @@ def get_api_key() -> str:
     Raises:
         ValueError: If ANTHROPIC_API_KEY not found in environment
     """
+    load_environment()
     api_key = os.getenv("ANTHROPIC_API_KEY")
     if not api_key:
         raise ValueError("ANTHROPIC_API_KEY not found in environment")
@@ -35,15 +64,35 @@ def get_api_key() -> str:
 
 
 def create_full_pipeline(api_key: Optional[str] = None,
-                        model: str = "claude-sonnet-4-5-20250929") -> Pipeline:
+                        model: str = "claude-sonnet-4-5-20250929",
+                        response_cache: Optional[ResponseCache] = None,
+                        client_pool: Optional[ClientPool] = None,
+                        metrics_sink: Optional[MetricsSink] = None,
+                        cascade: bool = False,
+                        checkpoint_store: Optional[CheckpointStore] = None,
+                        preprocess: bool = False) -> Pipeline:
     """
     Create the full transformation consultant pipeline.
 
-    Pipeline flow: Transcript → Analysis → BPMN → Recommendations
+    Pipeline flow: Transcript → [Preprocessing] → Analysis → BPMN → Recommendations
+
+    With ``cascade`` each stage first runs on a faster model (Haiku for
+    analysis and BPMN, ``model`` for recommendations) and escalates to the
+    usual model only when the result fails that stage's checks.
 
     Args:
         api_key: Anthropic API key (defaults to env var)
         model: Claude model to use for transcript and BPMN (Opus used for recommendations)
+        response_cache: Optional response cache shared by all components
+        client_pool: API client pool shared by all components (defaults to
+                    the process-wide pool)
+        metrics_sink: Optional sink receiving per-stage metric events
+        cascade: Try a faster model first for every stage (see ModelCascade)
+        checkpoint_store: Optional store for per-stage checkpoints (see
+                         Pipeline.execute's ``resume``)
+        preprocess: Compact the transcript locally before analysis (see
+                   TranscriptPreprocessor). Off by default: the rewrite is
+                   lossy and drops repeated sentences and small talk
 
     Returns:
         Configured pipeline ready for execution
@@ -51,23 +100,33 @@ def create_full_pipeline(api_key: Optional[str] = None,
     if api_key is None:
         api_key = get_api_key()
 
+    def tiered(component, fast_model: str):
+        return ModelCascade(component, [fast_model, component.model]) if cascade else component
+
     # Create pipeline
-    pipeline = Pipeline(name="Full Transformation Consultant Pipeline")
+    pipeline = Pipeline(name="Full Transformation Consultant Pipeline", metrics_sink=metrics_sink,
+                        checkpoint_store=checkpoint_store)
 
     # Add components
+    if preprocess:
+        pipeline.add_component(components.TranscriptPreprocessor(), config={})
+
     pipeline.add_component(
-        TranscriptProcessor(api_key=api_key, model=model),
+        tiered(components.TranscriptProcessor(api_key=api_key, model=model, response_cache=response_cache,
+                                              client_pool=client_pool), FAST_MODEL),
         config={}
     )
 
     pipeline.add_component(
-        BPMNGenerator(api_key=api_key, model=model),
+        tiered(components.BPMNGenerator(api_key=api_key, model=model, response_cache=response_cache,
+                                        client_pool=client_pool), FAST_MODEL),
         config={"include_apqc": True}
     )
 
-    # Recommendation engine receives the analysis (from component 1), not the BPMN
+    # Recommendation engine receives the analysis, not the BPMN
     pipeline.add_component(
-        RecommendationEngine(api_key=api_key, model="claude-opus-4-5-20251101"),
+        tiered(components.RecommendationEngine(api_key=api_key, model=RECOMMENDATION_MODEL,
+                                               response_cache=response_cache, client_pool=client_pool), model),
         config={"input_from": "Transcript Analysis"}
     )
 
@@ -75,15 +134,26 @@ def create_full_pipeline(api_key: Optional[str] = None,
 
 
 def create_analysis_pipeline(api_key: Optional[str] = None,
-                             model: str = "claude-sonnet-4-5-20250929") -> Pipeline:
+                             model: str = "claude-sonnet-4-5-20250929",
+                             response_cache: Optional[ResponseCache] = None,
+                             client_pool: Optional[ClientPool] = None,
+                             metrics_sink: Optional[MetricsSink] = None,
+                             preprocess: bool = False) -> Pipeline:
     """
     Create analysis-only pipeline.
 
-    Pipeline flow: Transcript → Analysis
+    Pipeline flow: Transcript → [Preprocessing] → Analysis
 
     Args:
         api_key: Anthropic API key (defaults to env var)
         model: Claude model to use
+        response_cache: Optional response cache shared by all components
+        client_pool: API client pool shared by all components (defaults to
+                    the process-wide pool)
+        metrics_sink: Optional sink receiving per-stage metric events
+        preprocess: Compact the transcript locally before analysis (see
+                   TranscriptPreprocessor). Off by default: the rewrite is
+                   lossy and drops repeated sentences and small talk
 
     Returns:
         Configured pipeline ready for execution
@@ -91,9 +161,12 @@ def create_analysis_pipeline(api_key: Optional[str] = None,
     if api_key is None:
         api_key = get_api_key()
 
-    pipeline = Pipeline(name="Transcript Analysis Pipeline")
+    pipeline = Pipeline(name="Transcript Analysis Pipeline", metrics_sink=metrics_sink)
+    if preprocess:
+        pipeline.add_component(components.TranscriptPreprocessor(), config={})
     pipeline.add_component(
-        TranscriptProcessor(api_key=api_key, model=model),
+        components.TranscriptProcessor(api_key=api_key, model=model, response_cache=response_cache,
+                                       client_pool=client_pool),
         config={}
     )
 
@@ -101,7 +174,10 @@ def create_analysis_pipeline(api_key: Optional[str] = None,
 
 
 def create_bpmn_pipeline(api_key: Optional[str] = None,
-                        model: str = "claude-sonnet-4-5-20250929") -> Pipeline:
+                        model: str = "claude-sonnet-4-5-20250929",
+                        response_cache: Optional[ResponseCache] = None,
+                        client_pool: Optional[ClientPool] = None,
+                        metrics_sink: Optional[MetricsSink] = None) -> Pipeline:
     """
     Create BPMN generation pipeline.
 
@@ -110,6 +186,10 @@ def create_bpmn_pipeline(api_key: Optional[str] = None,
     Args:
         api_key: Anthropic API key (defaults to env var)
         model: Claude model to use
+        response_cache: Optional response cache shared by all components
+        client_pool: API client pool shared by all components (defaults to
+                    the process-wide pool)
+        metrics_sink: Optional sink receiving per-stage metric events
 
     Returns:
         Configured pipeline ready for execution
@@ -117,9 +197,10 @@ def create_bpmn_pipeline(api_key: Optional[str] = None,
     if api_key is None:
         api_key = get_api_key()
 
-    pipeline = Pipeline(name="BPMN Generation Pipeline")
+    pipeline = Pipeline(name="BPMN Generation Pipeline", metrics_sink=metrics_sink)
     pipeline.add_component(
-        BPMNGenerator(api_key=api_key, model=model),
+        components.BPMNGenerator(api_key=api_key, model=model, response_cache=response_cache,
+                                 client_pool=client_pool),
         config={"include_apqc": True}
     )
 
@@ -129,7 +210,11 @@ def create_bpmn_pipeline(api_key: Optional[str] = None,
 def run_full_transformation(transcript_path: Path,
                            output_dir: Path,
                            api_key: Optional[str] = None,
-                           business_context: Optional[str] = None) -> PipelineResult:
+                           business_context: Optional[str] = None,
+                           response_cache: Optional[ResponseCache] = None,
+                           stream: bool = False,
+                           metrics_sink: Optional[MetricsSink] = None,
+                           checkpoint_store: Optional[CheckpointStore] = None) -> PipelineResult:
     """
     High-level function to run full transformation from transcript to recommendations.
 
@@ -138,6 +223,11 @@ def run_full_transformation(transcript_path: Path,
         output_dir: Directory to save outputs
         api_key: Anthropic API key (defaults to env var)
         business_context: Optional context for optimization (industry, budget, etc.)
+        response_cache: Optional response cache so repeat runs skip API calls
+        stream: If True, stream responses into output_dir as tokens arrive
+        metrics_sink: Optional sink receiving per-stage metric events
+        checkpoint_store: Optional store checkpointing each stage; stages
+                         checkpointed by an earlier run are restored, not rerun
 
     Returns:
         PipelineResult with all outputs
@@ -146,19 +236,21 @@ def run_full_transformation(transcript_path: Path,
     transcript = Path(transcript_path).read_text(encoding='utf-8')
 
     # Create pipeline
-    pipeline = create_full_pipeline(api_key=api_key)
+    pipeline = create_full_pipeline(api_key=api_key, response_cache=response_cache, metrics_sink=metrics_sink,
+                                    checkpoint_store=checkpoint_store)
 
     # Add business context if provided
     if business_context:
         # Update recommendation engine config
-        pipeline.component_configs[2]['business_context'] = business_context
+        pipeline.component_config("Process Optimization")['business_context'] = business_context
 
     # Execute
     print(f"[Main] Starting full transformation pipeline")
     print(f"[Main] Input: {transcript_path}")
     print(f"[Main] Output: {output_dir}")
 
-    result = pipeline.execute(transcript)
+    result = pipeline.execute(transcript, stream_dir=output_dir if stream else None,
+                              resume=checkpoint_store is not None)
 
     # Save outputs
     if result.success:
@@ -170,14 +262,131 @@ def run_full_transformation(transcript_path: Path,
     return result
 
 
+def run_batch_cli(argv: list) -> int:
+    """
+    Run the ``batch`` subcommand.
+
+    Args:
+        argv: Arguments following ``batch`` on the command line
+
+    Returns:
+        Process exit code (0 if every transcript succeeded)
+    """
+    import argparse
+    from .batch import load_batch_jobs, run_batch, format_summary, save_summary
+
+    parser = argparse.ArgumentParser(
+        prog="python -m src.main batch",
+        description="Run the full pipeline over a directory or manifest of transcripts."
+    )
+    parser.add_argument("source", help="Directory of *.txt transcripts, or a .txt/.json manifest")
+    parser.add_argument("--concurrency", type=int, default=4,
+                        help="Maximum number of pipelines in flight (default: 4)")
+    parser.add_argument("--output-dir", default="outputs/batch",
+                        help="Root directory for per-transcript outputs (default: outputs/batch)")
+    parser.add_argument("--business-context", default=None,
+                        help="Business context applied to jobs that do not set their own")
+    parser.add_argument("--cache-dir", default=None,
+                        help="Directory for the on-disk response cache (disabled if omitted)")
+    parser.add_argument("--checkpoint-dir", default=None,
+                        help="Checkpoint every stage here; a rerun resumes after the last completed stage")
+    parser.add_argument("--max-connections", type=int, default=None,
+                        help="Maximum HTTP connections shared by all jobs (default: 100)")
+    parser.add_argument("--rpm", type=float, default=None,
+                        help="Requests per minute allowed per model (default: unlimited)")
+    parser.add_argument("--input-tpm", type=float, default=None,
+                        help="Input tokens per minute allowed per model (default: unlimited)")
+    parser.add_argument("--output-tpm", type=float, default=None,
+                        help="Output tokens per minute allowed per model (default: unlimited)")
+    parser.add_argument("--metrics-jsonl", default=None,
+                        help="Append per-stage metric events to this JSON-lines file")
+    parser.add_argument("--metrics-textfile", default=None,
+                        help="Write Prometheus textfile-collector metrics to this .prom file")
+    cassette_group = parser.add_mutually_exclusive_group()
+    cassette_group.add_argument("--record", metavar="CASSETTE", default=None,
+                                help="Record every API response into this .jsonl.gz cassette")
+    cassette_group.add_argument("--replay", metavar="CASSETTE", default=None,
+                                help="Serve API responses from this cassette instead of the API")
+    parser.add_argument("--replay-timing", choices=["fast", "recorded"], default="fast",
+                        help="Replay as fast as possible or at the recorded pace (default: fast)")
+    args = parser.parse_args(argv)
+    if args.replay and not Path(args.replay).exists():
+        parser.error(f"cassette not found: {args.replay}")
+
+    sinks = []
+    if args.metrics_jsonl:
+        sinks.append(JSONLinesMetricsSink(Path(args.metrics_jsonl)))
+    if args.metrics_textfile:
+        sinks.append(PrometheusTextfileSink(Path(args.metrics_textfile)))
+    metrics_sink = sinks[0] if len(sinks) == 1 else CompositeMetricsSink(sinks) if sinks else None
+
+    cassette = None
+    if args.record or args.replay:
+        # Every component records into / replays from the process-wide cassette
+        cassette = Cassette(Path(args.record or args.replay),
+                            mode="record" if args.record else "replay",
+                            timing=args.replay_timing)
+        set_cassette(cassette)
+
+    if args.rpm or args.input_tpm or args.output_tpm:
+        # Every component paces its API calls through the process-wide scheduler
+        set_request_scheduler(RequestScheduler(default_limits=RateLimits(
+            requests_per_minute=args.rpm,
+            input_tokens_per_minute=args.input_tpm,
+            output_tokens_per_minute=args.output_tpm
+        )))
+
+    if args.max_connections:
+        # Every component takes its client from the process-wide pool
+        set_client_pool(ClientPool(max_connections=args.max_connections,
+                                   max_keepalive_connections=args.max_connections))
+
+    jobs = load_batch_jobs(Path(args.source), Path(args.output_dir))
+    if args.business_context:
+        for job in jobs:
+            job.business_context = job.business_context or args.business_context
+
+    response_cache = ResponseCache(Path(args.cache_dir)) if args.cache_dir else None
+    checkpoint_store = CheckpointStore(Path(args.checkpoint_dir)) if args.checkpoint_dir else None
+    # Replays need no API key; recorded responses are served locally
+    load_environment()
+    api_key = os.getenv("ANTHROPIC_API_KEY") or ("replay" if args.replay else None)
+    try:
+        results = run_batch(jobs, concurrency=args.concurrency, api_key=api_key,
+                            response_cache=response_cache, metrics_sink=metrics_sink,
+                            checkpoint_store=checkpoint_store)
+    finally:
+        if cassette is not None:
+            cassette.close()
+            set_cassette(None)
+
+    print()
+    print(format_summary(results))
+    summary_path = save_summary(results, Path(args.output_dir))
+    print(f"[Batch] Summary saved to {summary_path}")
+    if response_cache is not None:
+        print(f"[Batch] Response cache: {response_cache.stats()}")
+    if checkpoint_store is not None:
+        print(f"[Batch] Checkpoints: {checkpoint_store.stats()}")
+    print(f"[Batch] Request scheduler: {get_request_scheduler().stats()}")
+    if cassette is not None:
+        print(f"[Batch] Cassette {cassette.path}: {cassette.stats()}")
+
+    return 0 if all(r.success for r in results) else 1
+
+
 def main():
     """Command-line interface for running the transformation pipeline."""
     import sys
 
     if len(sys.argv) < 2:
         print("Usage: python -m src.main <transcript_path> [output_dir]")
+        print("       python -m src.main batch <dir|manifest> [--concurrency N] [--output-dir DIR]")
         sys.exit(1)
 
+    if sys.argv[1] == "batch":
+        sys.exit(run_batch_cli(sys.argv[2:]))
+
     transcript_path = sys.argv[1]
     output_dir = sys.argv[2] if len(sys.argv) > 2 else "outputs/generated"
 
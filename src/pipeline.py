@@ -2,16 +2,114 @@
 Pipeline orchestration for transformation consultant agent.
 
 This module provides classes for building and executing pipelines that
-chain together multiple components in sequence.
+chain together multiple components, running independent components concurrently.
 """
 
-from typing import List, Dict, Any, Optional
+from typing import TYPE_CHECKING, List, Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
 import json
+import os
+import time
 
 from .interfaces.component import BaseComponent, ComponentResult
+from .interfaces.process_analysis import ProcessAnalysis
+from .runtime.checkpoint import CheckpointStore, make_checkpoint_key
+from .runtime.metrics import MetricsSink, build_component_span, emit_safely, make_event
+
+if TYPE_CHECKING:
+    import asyncio
+
+
+def output_filename(component_name: str) -> str:
+    """
+    Return the output filename for a component.
+
+    Args:
+        component_name: Human-readable component name
+
+    Returns:
+        Filename with an extension matching the component's output type
+    """
+    # Determine file extension
+    if "BPMN" in component_name:
+        ext = ".bpmn"
+    elif "Analysis" in component_name:
+        ext = "-analysis.md"
+    elif "Optimization" in component_name:
+        ext = "-recommendations.md"
+    else:
+        ext = ".txt"
+
+    return f"{component_name.lower().replace(' ', '-')}{ext}"
+
+
+def summarize_prompt_cache(metadata_list: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Aggregate prompt-cache token counts across API calls.
+
+    Responses served from the local response cache are skipped because they
+    made no API call.
+
+    Args:
+        metadata_list: Component result metadata dicts
+
+    Returns:
+        Dict with summed input, cache creation and cache read tokens, plus
+        ``hit_ratio``: the share of prompt tokens read from the cache
+    """
+    totals = {"input_tokens": 0, "cache_creation_input_tokens": 0, "cache_read_input_tokens": 0}
+    for metadata in metadata_list:
+        if not isinstance(metadata, dict) or metadata.get("response_cache") == "hit":
+            continue
+        for key in totals:
+            totals[key] += metadata.get(key, 0) or 0
+
+    prompt_tokens = sum(totals.values())
+    totals["hit_ratio"] = round(totals["cache_read_input_tokens"] / prompt_tokens, 4) if prompt_tokens else 0.0
+    return totals
+
+
+class StreamingOutputWriter:
+    """
+    Appends a component's streamed text to its output file as it arrives.
+
+    The file is the same one PipelineResult.save_outputs writes, so analysts
+    can watch it grow during a run; save_outputs later replaces it with the
+    component's final (post-processed) output.
+    """
+
+    def __init__(self, output_dir: Path, component_name: str):
+        """
+        Open the output file for a component.
+
+        Args:
+            output_dir: Directory to write to (created if missing)
+            component_name: Component whose output is streamed
+        """
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        self.path = output_dir / output_filename(component_name)
+        self._file = open(self.path, "w", encoding='utf-8')
+        self.write_seconds = 0.0
+
+    def write(self, text: str):
+        """Append a text delta and flush it to disk."""
+        start = time.perf_counter()
+        self._file.write(text)
+        self._file.flush()
+        self.write_seconds += time.perf_counter() - start
+
+    def restart(self):
+        """Discard the text written so far (the component is retrying on another model)."""
+        self._file.seek(0)
+        self._file.truncate()
+
+    def close(self):
+        """Close the output file."""
+        self._file.close()
 
 
 @dataclass
@@ -23,6 +121,7 @@ class PipelineResult:
     metadata: Dict[str, Any]
     errors: List[str] = field(default_factory=list)
     timestamp: Optional[datetime] = None
+    metrics_sink: Optional[MetricsSink] = field(default=None, repr=False, compare=False)
 
     def __post_init__(self):
         """Set timestamp if not provided."""
@@ -33,9 +132,13 @@ class PipelineResult:
         """
         Save pipeline outputs to files.
 
+        The time spent writing outputs is recorded as ``file_write_seconds``
+        in the saved metadata and emitted as a ``file_write`` metric event.
+
         Args:
             output_dir: Directory to save outputs to
         """
+        start = time.perf_counter()
         output_dir = Path(output_dir)
         output_dir.mkdir(parents=True, exist_ok=True)
 
@@ -44,20 +147,11 @@ class PipelineResult:
             if output_data is None:
                 continue
 
-            # Determine file extension
-            if "BPMN" in component_name:
-                ext = ".bpmn"
-            elif "Analysis" in component_name:
-                ext = "-analysis.md"
-            elif "Optimization" in component_name:
-                ext = "-recommendations.md"
-            else:
-                ext = ".txt"
+            # Save output (replaces any partial file written while streaming)
+            output_path = output_dir / output_filename(component_name)
+            output_path.write_text(str(output_data), encoding='utf-8')
 
-            # Save output
-            filename = f"{component_name.lower().replace(' ', '-')}{ext}"
-            output_path = output_dir / filename
-            output_path.write_text(output_data, encoding='utf-8')
+        self.metadata["file_write_seconds"] = round(time.perf_counter() - start, 6)
 
         # Save metadata
         metadata_path = output_dir / "pipeline-metadata.json"
@@ -66,23 +160,49 @@ class PipelineResult:
             encoding='utf-8'
         )
 
+        emit_safely(self.metrics_sink, make_event(
+            "file_write",
+            pipeline=self.metadata.get("pipeline_name"),
+            run_id=self.metadata.get("run_id"),
+            seconds=self.metadata["file_write_seconds"]
+        ))
+
 
 class Pipeline:
     """
-    Orchestrates execution of components in sequence.
+    Orchestrates execution of components as a dependency graph.
 
-    A pipeline is a directed sequence of components where
-    the output of one component becomes the input to the next.
+    Each component takes its input either from the component added before it
+    (the default, which gives a simple sequential chain) or from the component
+    named in its ``input_from`` config. Components whose inputs are ready run
+    concurrently, so independent branches (e.g. BPMN generation and process
+    optimization, which both consume the transcript analysis) overlap.
+
+    Every run records a span per component (queue wait, validation, API
+    time, time to first token, output tokens/sec, post-processing, file
+    writes) under ``metadata["stages"]`` and emits it to the metrics sink.
     """
 
-    def __init__(self, name: str):
+    def __init__(self,
+                 name: str,
+                 max_workers: Optional[int] = None,
+                 metrics_sink: Optional[MetricsSink] = None,
+                 checkpoint_store: Optional[CheckpointStore] = None):
         """
         Initialize pipeline.
 
         Args:
             name: Human-readable pipeline name
+            max_workers: Maximum number of components to run concurrently
+                        (defaults to the number of components)
+            metrics_sink: Optional sink receiving component and run metric events
+            checkpoint_store: Optional store every successful stage result is
+                             saved to; ``execute(resume=True)`` restores from it
         """
         self.name = name
+        self.max_workers = max_workers
+        self.metrics_sink = metrics_sink
+        self.checkpoint_store = checkpoint_store
         self.components: List[BaseComponent] = []
         self.component_configs: List[Dict[str, Any]] = []
 
@@ -94,102 +214,504 @@ class Pipeline:
 
         Args:
             component: Component instance to add
-            config: Component-specific configuration for execution
+            config: Component-specific configuration for execution. The
+                   optional ``input_from`` key names the component whose
+                   output this component consumes.
         """
         self.components.append(component)
         self.component_configs.append(config or {})
 
+    def component_config(self, component_name: str) -> Dict[str, Any]:
+        """
+        Return the execution configuration of a component, for updating in place.
+
+        Args:
+            component_name: Name of a component in this pipeline
+
+        Returns:
+            The component's config dict
+
+        Raises:
+            ValueError: If no component has that name
+        """
+        for component, config in zip(self.components, self.component_configs):
+            if component.component_name == component_name:
+                return config
+        raise ValueError(f"Component '{component_name}' not found")
+
+    def _resolve_dependencies(self) -> List[Optional[int]]:
+        """
+        Resolve the input source of every component.
+
+        Returns:
+            List with, for each component, the index of the component it takes
+            its input from (None for the pipeline's initial input)
+
+        Raises:
+            ValueError: If an ``input_from`` reference is unknown or the
+                        dependencies form a cycle
+        """
+        names = {c.component_name: i for i, c in enumerate(self.components)}
+        dependencies: List[Optional[int]] = []
+
+        for i, config in enumerate(self.component_configs):
+            if 'input_from' in config:
+                input_component = config['input_from']
+                if input_component not in names:
+                    raise ValueError(f"Component '{input_component}' output not found")
+                dependencies.append(names[input_component])
+            else:
+                dependencies.append(i - 1 if i > 0 else None)
+
+        # Reject cycles (a component can only be reached from the initial input)
+        for i in range(len(dependencies)):
+            seen = set()
+            current = i
+            while current is not None:
+                if current in seen:
+                    name = self.components[i].component_name
+                    raise ValueError(f"Pipeline dependency cycle involving '{name}'")
+                seen.add(current)
+                current = dependencies[current]
+
+        return dependencies
+
+    def _checkpoint_key(self, index: int, component_input: Any) -> Optional[str]:
+        """Return the checkpoint key for a stage, or None without a checkpoint store."""
+        if self.checkpoint_store is None:
+            return None
+        component = self.components[index]
+        # A cascade's output depends on every model it may use
+        model = getattr(component, "models", None) or component.model
+        return make_checkpoint_key(component.component_name, str(component_input),
+                                   self.component_configs[index], model, component.skill_hash)
+
+    def _restore_checkpoint(self, key: Optional[str], writer: Optional["StreamingOutputWriter"]) -> Optional[ComponentResult]:
+        """Return the checkpointed result for a stage, if there is one."""
+        if key is None:
+            return None
+        entry = self.checkpoint_store.get(key)
+        if entry is None:
+            return None
+        data = entry["data"]
+        if entry["data_type"] == "analysis":
+            data = ProcessAnalysis.parse(data)
+        if writer is not None:
+            writer.write(str(data))
+        # Restoring costs no tokens; usage totals should only count this run's calls
+        metadata = {**entry["metadata"], "checkpoint": "restored"}
+        for usage in ("input_tokens", "output_tokens", "cache_creation_input_tokens", "cache_read_input_tokens"):
+            if usage in metadata:
+                metadata[usage] = 0
+        return ComponentResult(success=True, data=data, metadata=metadata)
+
+    def _save_checkpoint(self, key: Optional[str], result: Optional[ComponentResult]):
+        """Store a successful stage result under its checkpoint key."""
+        if key is None or result is None or not result.success:
+            return
+        data_type = "analysis" if isinstance(result.data, ProcessAnalysis) else "text"
+        metadata = {k: v for k, v in result.metadata.items() if k != "span"}
+        self.checkpoint_store.put(key, str(result.data), data_type, metadata)
+
+    def _run_component(self,
+                       index: int,
+                       component_input: Any,
+                       stream_dir: Optional[Path] = None,
+                       ready_at: Optional[float] = None,
+                       run_id: Optional[str] = None,
+                       resume: bool = False) -> ComponentResult:
+        """Execute a single component with its configuration."""
+        start = time.perf_counter()
+        component = self.components[index]
+        config = dict(self.component_configs[index])
+        writer = None
+        if stream_dir is not None:
+            writer = StreamingOutputWriter(stream_dir, component.component_name)
+            config["on_text"] = writer.write
+            config["on_escalate"] = writer.restart
+
+        result = None
+        try:
+            key = self._checkpoint_key(index, component_input)
+            if resume:
+                result = self._restore_checkpoint(key, writer)
+                if result is not None:
+                    return result
+            result = component.process(component_input, **config)
+            self._save_checkpoint(key, result)
+            return result
+        finally:
+            if writer is not None:
+                writer.close()
+            self._record_span(index, result, ready_at, start, writer, run_id)
+
+    async def _arun_component(self,
+                              index: int,
+                              component_input: Any,
+                              semaphore: Optional["asyncio.Semaphore"],
+                              stream_dir: Optional[Path] = None,
+                              ready_at: Optional[float] = None,
+                              run_id: Optional[str] = None,
+                              resume: bool = False) -> ComponentResult:
+        """Await a single component with its configuration."""
+        component = self.components[index]
+        config = dict(self.component_configs[index])
+
+        if semaphore is not None:
+            await semaphore.acquire()
+        start = time.perf_counter()
+        writer = None
+        result = None
+        try:
+            if stream_dir is not None:
+                writer = StreamingOutputWriter(stream_dir, component.component_name)
+                config["on_text"] = writer.write
+                config["on_escalate"] = writer.restart
+            key = self._checkpoint_key(index, component_input)
+            if resume:
+                result = self._restore_checkpoint(key, writer)
+                if result is not None:
+                    return result
+            result = await component.aprocess(component_input, **config)
+            self._save_checkpoint(key, result)
+            return result
+        finally:
+            if semaphore is not None:
+                semaphore.release()
+            if writer is not None:
+                writer.close()
+            self._record_span(index, result, ready_at, start, writer, run_id)
+
+    def _record_span(self,
+                     index: int,
+                     result: Optional[ComponentResult],
+                     ready_at: Optional[float],
+                     start: float,
+                     writer: Optional[StreamingOutputWriter],
+                     run_id: Optional[str]):
+        """Attach a component's timing span to its result and emit it."""
+        end = time.perf_counter()
+        metadata = result.metadata if result is not None else {}
+        span = build_component_span(
+            self.components[index].component_name,
+            metadata,
+            queue_wait=start - ready_at if ready_at is not None else 0.0,
+            total=end - start,
+            file_write=writer.write_seconds if writer is not None else 0.0,
+            success=result is not None and result.success
+        )
+        if result is not None:
+            result.metadata["span"] = span
+        emit_safely(self.metrics_sink, make_event("component_span", pipeline=self.name, run_id=run_id, **span))
+
     def execute(self,
                 initial_input: Any,
-                stop_on_error: bool = True) -> PipelineResult:
+                stop_on_error: bool = True,
+                stream_dir: Optional[Path] = None,
+                resume: bool = False) -> PipelineResult:
         """
         Execute pipeline from start to finish.
 
         Args:
             initial_input: Input to first component
-            stop_on_error: If True, stop pipeline on first error
+            stop_on_error: If True, stop scheduling components after the first
+                          error (components already running are allowed to finish)
+            stream_dir: If set, stream each component's response and append it
+                       to its output file in this directory as tokens arrive
+            resume: If True, restore stages whose checkpoint is still valid
+                   instead of running them (needs a checkpoint_store)
 
         Returns:
             PipelineResult with all outputs and metadata
         """
-        outputs = {}
+        metadata, errors, dependencies = self._start_run()
+
+        results = {}
+        if dependencies is not None:
+            results = self._execute_graph(initial_input, dependencies, stop_on_error, errors, stream_dir,
+                                          run_id=metadata["run_id"], resume=resume)
+
+        return self._finish_run(results, metadata, errors)
+
+    async def aexecute(self,
+                       initial_input: Any,
+                       stop_on_error: bool = True,
+                       stream_dir: Optional[Path] = None,
+                       resume: bool = False) -> PipelineResult:
+        """
+        Execute pipeline from start to finish on the running event loop.
+
+        Components are awaited through ``aprocess``, so many pipelines can be
+        in flight on a single event loop without a thread per API call.
+
+        Args:
+            initial_input: Input to first component
+            stop_on_error: If True, stop scheduling components after the first
+                          error (components already running are allowed to finish)
+            stream_dir: If set, stream each component's response and append it
+                       to its output file in this directory as tokens arrive
+            resume: If True, restore stages whose checkpoint is still valid
+                   instead of running them (needs a checkpoint_store)
+
+        Returns:
+            PipelineResult with all outputs and metadata
+        """
+        metadata, errors, dependencies = self._start_run()
+
+        results = {}
+        if dependencies is not None:
+            results = await self._aexecute_graph(initial_input, dependencies, stop_on_error, errors, stream_dir,
+                                                 run_id=metadata["run_id"], resume=resume)
+
+        return self._finish_run(results, metadata, errors)
+
+    def _start_run(self) -> tuple[Dict[str, Any], List[str], Optional[List[Optional[int]]]]:
+        """Create run metadata and resolve the dependency graph."""
         errors = []
         metadata = {
             "pipeline_name": self.name,
+            "run_id": os.urandom(6).hex(),
             "components": [c.component_name for c in self.components],
             "start_time": datetime.now().isoformat()
         }
 
-        # Track current input (output of previous component)
-        current_input = initial_input
-
-        # Store intermediate outputs for non-sequential access
-        intermediate_outputs = {}
+        try:
+            dependencies = self._resolve_dependencies()
+        except ValueError as e:
+            errors.append(str(e))
+            print(f"[Pipeline] ERROR: {e}")
+            return metadata, errors, None
 
-        # Execute each component in sequence
-        for i, (component, config) in enumerate(zip(self.components, self.component_configs)):
-            component_name = component.component_name
-            print(f"[Pipeline] Executing: {component_name} ({i+1}/{len(self.components)})")
-
-            try:
-                # Check if config specifies a specific input to use
-                if 'input_from' in config:
-                    input_component = config['input_from']
-                    if input_component in intermediate_outputs:
-                        current_input = intermediate_outputs[input_component]
-                        print(f"[Pipeline] Using output from '{input_component}' as input")
-                    else:
-                        raise ValueError(f"Component '{input_component}' output not found")
-
-                # Execute component
-                result = component.process(current_input, **config)
-
-                # Store result
-                outputs[component_name] = result.data
-                intermediate_outputs[component_name] = result.data
-
-                # Track metadata
-                if component_name not in metadata:
-                    metadata[component_name] = {}
-                metadata[component_name] = result.metadata
-
-                # Check for errors
-                if not result.success:
-                    error_msg = f"{component_name} failed: {result.error}"
-                    errors.append(error_msg)
-                    print(f"[Pipeline] ERROR: {error_msg}")
-
-                    if stop_on_error:
-                        print(f"[Pipeline] Stopping pipeline due to error")
-                        break
-                    else:
-                        # Continue with None input
-                        current_input = None
-                else:
-                    # Success - pass output to next component
-                    current_input = result.data
-                    print(f"[Pipeline] SUCCESS: {component_name} completed")
-
-            except Exception as e:
-                error_msg = f"{component_name} raised exception: {str(e)}"
-                errors.append(error_msg)
-                print(f"[Pipeline] EXCEPTION: {error_msg}")
-
-                if stop_on_error:
-                    break
-                else:
-                    current_input = None
+        metadata["dependencies"] = {
+            c.component_name: (self.components[d].component_name if d is not None else None)
+            for c, d in zip(self.components, dependencies)
+        }
+        return metadata, errors, dependencies
+
+    def _finish_run(self,
+                    results: Dict[int, Optional[ComponentResult]],
+                    metadata: Dict[str, Any],
+                    errors: List[str]) -> PipelineResult:
+        """Collect component results into a PipelineResult."""
+        # Collect outputs in declaration order
+        outputs = {}
+        stages = {}
+        for i, component in enumerate(self.components):
+            if results.get(i) is not None:
+                if "span" in results[i].metadata:
+                    stages[component.component_name] = results[i].metadata.pop("span")
+                outputs[component.component_name] = results[i].data
+                metadata[component.component_name] = results[i].metadata
+        metadata["stages"] = stages
+
+        metadata["prompt_cache"] = summarize_prompt_cache(
+            [result.metadata for result in results.values() if result is not None]
+        )
 
         # Pipeline completion
-        metadata["end_time"] = datetime.now().isoformat()
+        end_time = datetime.now()
+        metadata["end_time"] = end_time.isoformat()
+        metadata["duration_seconds"] = round(
+            (end_time - datetime.fromisoformat(metadata["start_time"])).total_seconds(), 6)
         metadata["total_components"] = len(self.components)
         metadata["completed_components"] = len(outputs)
 
         success = len(errors) == 0
 
+        emit_safely(self.metrics_sink, make_event(
+            "pipeline_run",
+            pipeline=self.name,
+            run_id=metadata["run_id"],
+            success=success,
+            duration=metadata["duration_seconds"],
+            completed_components=len(outputs),
+            total_components=len(self.components)
+        ))
+
         return PipelineResult(
             success=success,
             outputs=outputs,
             metadata=metadata,
-            errors=errors
+            errors=errors,
+            metrics_sink=self.metrics_sink
         )
+
+    def _ready_components(self,
+                          pending: List[int],
+                          dependencies: List[Optional[int]],
+                          initial_input: Any,
+                          results: Dict[int, Optional[ComponentResult]],
+                          failed: set) -> List[tuple[int, Any, float]]:
+        """
+        Remove and return every pending component whose input is available.
+
+        Returns:
+            List of (component index, component input, ready time) tuples
+        """
+        ready = []
+        for i in list(pending):
+            source = dependencies[i]
+            if source is not None and source not in results:
+                continue
+            pending.remove(i)
+
+            if source is None:
+                component_input = initial_input
+            elif source in failed:
+                component_input = None
+            else:
+                component_input = results[source].data
+
+            if 'input_from' in self.component_configs[i]:
+                print(f"[Pipeline] Using output from '{self.component_configs[i]['input_from']}' as input")
+
+            component_name = self.components[i].component_name
+            print(f"[Pipeline] Executing: {component_name} ({i+1}/{len(self.components)})")
+            ready.append((i, component_input, time.perf_counter()))
+        return ready
+
+    def _record_completion(self,
+                           index: int,
+                           result: Optional[ComponentResult],
+                           exception: Optional[BaseException],
+                           results: Dict[int, Optional[ComponentResult]],
+                           failed: set,
+                           errors: List[str]) -> bool:
+        """
+        Record a finished component.
+
+        Returns:
+            True if the component failed or raised
+        """
+        component_name = self.components[index].component_name
+
+        if exception is not None:
+            results[index] = None
+            failed.add(index)
+            error_msg = f"{component_name} raised exception: {str(exception)}"
+            errors.append(error_msg)
+            print(f"[Pipeline] EXCEPTION: {error_msg}")
+            return True
+
+        results[index] = result
+        if not result.success:
+            failed.add(index)
+            error_msg = f"{component_name} failed: {result.error}"
+            errors.append(error_msg)
+            print(f"[Pipeline] ERROR: {error_msg}")
+            return True
+
+        print(f"[Pipeline] SUCCESS: {component_name} completed")
+        return False
+
+    def _execute_graph(self,
+                       initial_input: Any,
+                       dependencies: List[Optional[int]],
+                       stop_on_error: bool,
+                       errors: List[str],
+                       stream_dir: Optional[Path] = None,
+                       run_id: Optional[str] = None,
+                       resume: bool = False) -> Dict[int, Optional[ComponentResult]]:
+        """
+        Run components on a thread pool as soon as their input is available.
+
+        Args:
+            initial_input: Input for components without an upstream component
+            dependencies: Input source per component (see _resolve_dependencies)
+            stop_on_error: If True, stop scheduling after the first error
+            errors: List to append error messages to
+            stream_dir: Optional directory to stream outputs into
+            run_id: Run identifier attached to metric events
+            resume: Restore checkpointed stages instead of running them
+
+        Returns:
+            Mapping of component index to its result (None if it raised)
+        """
+        results: Dict[int, Optional[ComponentResult]] = {}
+        failed = set()
+        pending = list(range(len(self.components)))
+        running = {}
+        halted = False
+
+        max_workers = self.max_workers or max(len(self.components), 1)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            while pending or running:
+                # Schedule every component whose input is ready
+                if not halted:
+                    for i, component_input, ready_at in self._ready_components(
+                            pending, dependencies, initial_input, results, failed):
+                        future = executor.submit(self._run_component, i, component_input, stream_dir,
+                                                 ready_at, run_id, resume)
+                        running[future] = i
+
+                if not running:
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    i = running.pop(future)
+                    exception = future.exception()
+                    result = future.result() if exception is None else None
+                    if self._record_completion(i, result, exception, results, failed, errors):
+                        if stop_on_error and not halted:
+                            print(f"[Pipeline] Stopping pipeline due to error")
+                            halted = True
+
+        return results
+
+    async def _aexecute_graph(self,
+                              initial_input: Any,
+                              dependencies: List[Optional[int]],
+                              stop_on_error: bool,
+                              errors: List[str],
+                              stream_dir: Optional[Path] = None,
+                              run_id: Optional[str] = None,
+                              resume: bool = False) -> Dict[int, Optional[ComponentResult]]:
+        """
+        Run components as asyncio tasks as soon as their input is available.
+
+        Args:
+            initial_input: Input for components without an upstream component
+            dependencies: Input source per component (see _resolve_dependencies)
+            stop_on_error: If True, stop scheduling after the first error
+            errors: List to append error messages to
+            stream_dir: Optional directory to stream outputs into
+            run_id: Run identifier attached to metric events
+            resume: Restore checkpointed stages instead of running them
+
+        Returns:
+            Mapping of component index to its result (None if it raised)
+        """
+        import asyncio  # Deferred: synchronous pipelines never pay for importing asyncio
+
+        results: Dict[int, Optional[ComponentResult]] = {}
+        failed = set()
+        pending = list(range(len(self.components)))
+        running = {}
+        halted = False
+
+        semaphore = asyncio.Semaphore(self.max_workers) if self.max_workers else None
+
+        while pending or running:
+            # Schedule every component whose input is ready
+            if not halted:
+                for i, component_input, ready_at in self._ready_components(
+                        pending, dependencies, initial_input, results, failed):
+                    task = asyncio.create_task(
+                        self._arun_component(i, component_input, semaphore, stream_dir, ready_at, run_id, resume))
+                    running[task] = i
+
+            if not running:
+                break
+
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                i = running.pop(task)
+                exception = task.exception()
+                result = task.result() if exception is None else None
+                if self._record_completion(i, result, exception, results, failed, errors):
+                    if stop_on_error and not halted:
+                        print(f"[Pipeline] Stopping pipeline due to error")
+                        halted = True
+
+        return results
@@ -0,0 +1,55 @@
+"""
+Runtime infrastructure for transformation consultant agent.
+
+This package contains services shared by components and pipelines at
+execution time, such as the on-disk response cache, stage checkpoints,
+record/replay cassettes, the shared API client pool, the rate-limit-aware
+request scheduler and metrics sinks.
+"""
+
+from .cassette import Cassette, CassetteMiss, get_cassette, set_cassette
+from .checkpoint import CheckpointStore, make_checkpoint_key
+from .client_pool import ClientPool, ClientSettings, create_anthropic_client, get_client_pool, set_client_pool
+from .metrics import (
+    CompositeMetricsSink,
+    JSONLinesMetricsSink,
+    MetricsSink,
+    PrometheusTextfileSink,
+    StageTimings,
+)
+from .rate_limiter import (
+    RateLimits,
+    RequestScheduler,
+    TokenBucket,
+    estimate_input_tokens,
+    get_request_scheduler,
+    set_request_scheduler,
+)
+from .response_cache import ResponseCache, make_request_key
+
+__all__ = [
+    "Cassette",
+    "CassetteMiss",
+    "get_cassette",
+    "set_cassette",
+    "CheckpointStore",
+    "make_checkpoint_key",
+    "ClientPool",
+    "ClientSettings",
+    "create_anthropic_client",
+    "get_client_pool",
+    "set_client_pool",
+    "CompositeMetricsSink",
+    "JSONLinesMetricsSink",
+    "MetricsSink",
+    "PrometheusTextfileSink",
+    "StageTimings",
+    "RateLimits",
+    "RequestScheduler",
+    "TokenBucket",
+    "estimate_input_tokens",
+    "get_request_scheduler",
+    "set_request_scheduler",
+    "ResponseCache",
+    "make_request_key",
+]
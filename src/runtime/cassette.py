@@ -0,0 +1,200 @@
+"""
+Record/replay cassettes for Claude API calls.
+
+A cassette is a gzip-compressed JSON-lines archive of API responses keyed by
+request hash (see make_request_key). Recording a real run captures every
+response with its usage metadata and timing; replaying serves the same
+responses with no network access, either as fast as possible or at the
+recorded pace. Only hashes of requests are stored, not their content.
+"""
+
+import gzip
+import json
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+REPLAY_CHUNK_CHARS = 64
+
+
+class CassetteMiss(LookupError):
+    """Raised when a replayed request was never recorded."""
+
+
+class Cassette:
+    """
+    Records or replays Claude API responses.
+
+    In record mode entries are appended (and flushed) as calls complete, so
+    a crashed run still leaves a usable cassette. In replay mode requests
+    recorded several times are served in recorded order. Thread-safe.
+    """
+
+    def __init__(self, path: Path, mode: str = "replay", timing: str = "fast"):
+        """
+        Open a cassette.
+
+        Args:
+            path: Cassette file (``.jsonl.gz``)
+            mode: "record" to append responses, "replay" to serve them
+            timing: Replay pace: "fast" (no delays) or "recorded"
+
+        Raises:
+            ValueError: If mode or timing is unknown
+            FileNotFoundError: If replaying a cassette that does not exist
+        """
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        if timing not in ("fast", "recorded"):
+            raise ValueError(f"Unknown cassette timing: {timing}")
+
+        self.path = Path(path)
+        self.mode = mode
+        self.timing = timing
+        self.recorded = 0
+        self.replayed = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self._file = None
+
+        if mode == "record":
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = gzip.open(self.path, "at", encoding='utf-8')
+        else:
+            with gzip.open(self.path, "rt", encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self._entries[entry["key"]].append(entry)
+
+    @property
+    def replaying(self) -> bool:
+        """Return True if this cassette serves responses instead of recording them."""
+        return self.mode == "replay"
+
+    def __len__(self) -> int:
+        """Return the number of recorded entries available for replay."""
+        return sum(len(entries) for entries in self._entries.values())
+
+    def record(self, key: str, model: str, text: str, metadata: Dict[str, Any], duration: float):
+        """
+        Append a response to the cassette.
+
+        Args:
+            key: Request key from make_request_key
+            model: Model that produced the response
+            text: Response text
+            metadata: Usage metadata returned with the response
+            duration: Seconds the API call took
+        """
+        line = json.dumps(
+            {"key": key, "model": model, "text": text, "metadata": metadata, "duration": round(duration, 4)},
+            ensure_ascii=False,
+            default=str
+        )
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+            self.recorded += 1
+
+    def _next_entry(self, key: str) -> Dict[str, Any]:
+        """Return the next recorded entry for a key."""
+        with self._lock:
+            entries = self._entries.get(key)
+            if not entries:
+                self.misses += 1
+                raise CassetteMiss(f"No recorded response for request {key[:16]} in {self.path}")
+            self.replayed += 1
+            # Keep the last entry so extra identical requests still replay
+            return entries.pop(0) if len(entries) > 1 else entries[0]
+
+    def _replay_plan(self, entry: Dict[str, Any], streamed: bool) -> tuple[float, List[str], float]:
+        """Return (delay before first chunk, chunks, delay between chunks)."""
+        text = entry["text"]
+        chunks = [text[i:i + REPLAY_CHUNK_CHARS] for i in range(0, len(text), REPLAY_CHUNK_CHARS)] \
+            if streamed else [text]
+        if self.timing == "fast":
+            return 0.0, chunks, 0.0
+        duration = entry.get("duration", 0.0)
+        first = min(entry["metadata"].get("time_to_first_token", duration), duration) if streamed else duration
+        gap = (duration - first) / len(chunks) if chunks and streamed else 0.0
+        return first, chunks, gap
+
+    def replay(self, key: str, on_text: Optional[Callable[[str], None]] = None) -> tuple[str, dict]:
+        """
+        Serve a recorded response.
+
+        Args:
+            key: Request key from make_request_key
+            on_text: Optional callback receiving the response in chunks
+
+        Returns:
+            Tuple of (response_text, usage_metadata)
+
+        Raises:
+            CassetteMiss: If the request was never recorded
+        """
+        entry = self._next_entry(key)
+        first, chunks, gap = self._replay_plan(entry, on_text is not None)
+        if first:
+            time.sleep(first)
+        if on_text is not None:
+            for chunk in chunks:
+                on_text(chunk)
+                if gap:
+                    time.sleep(gap)
+        return entry["text"], {**entry["metadata"], "cassette": "replay"}
+
+    async def areplay(self, key: str, on_text: Optional[Callable[[str], None]] = None) -> tuple[str, dict]:
+        """Async version of replay (see replay for parameters)."""
+        import asyncio  # Deferred: only async callers need it
+
+        entry = self._next_entry(key)
+        first, chunks, gap = self._replay_plan(entry, on_text is not None)
+        if first:
+            await asyncio.sleep(first)
+        if on_text is not None:
+            for chunk in chunks:
+                on_text(chunk)
+                if gap:
+                    await asyncio.sleep(gap)
+        return entry["text"], {**entry["metadata"], "cassette": "replay"}
+
+    def close(self):
+        """Finish writing a recording."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def stats(self) -> Dict[str, int]:
+        """Return recorded/replayed/miss counters."""
+        with self._lock:
+            return {"recorded": self.recorded, "replayed": self.replayed, "misses": self.misses}
+
+
+_active_cassette: Optional[Cassette] = None
+
+
+def get_cassette() -> Optional[Cassette]:
+    """Return the process-wide cassette, if one is active."""
+    return _active_cassette
+
+
+def set_cassette(cassette: Optional[Cassette]) -> Optional[Cassette]:
+    """
+    Activate a cassette for every component without an injected one.
+
+    Args:
+        cassette: Cassette to record into or replay from (None deactivates)
+
+    Returns:
+        The previously active cassette, if any
+    """
+    global _active_cassette
+    previous = _active_cassette
+    _active_cassette = cassette
+    return previous
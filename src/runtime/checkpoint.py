@@ -0,0 +1,152 @@
+"""
+Stage checkpoints for pipeline runs.
+
+A checkpoint is the successful output of one pipeline stage, stored on disk
+under a SHA-256 key derived from everything that determines that output: the
+stage's input, its configuration, its model and the content of its skill
+prompt. A rerun with ``resume=True`` restores every stage whose key is still
+present instead of calling the API again, so a pipeline that failed in its
+last stage only repeats that stage.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+
+def make_checkpoint_key(component_name: str,
+                        stage_input: str,
+                        config: Dict[str, Any],
+                        model: Any,
+                        skill_hash: str) -> str:
+    """
+    Compute the content hash identifying a stage execution.
+
+    Args:
+        component_name: Name of the stage's component
+        stage_input: Text of the stage's input
+        config: Execution configuration passed to the component
+        model: Model name (or list of cascade models)
+        skill_hash: Content hash of the component's SKILL.md
+
+    Returns:
+        Hex-encoded SHA-256 digest
+    """
+    payload = json.dumps(
+        {
+            "component": component_name,
+            "input": stage_input,
+            "config": config,
+            "model": model,
+            "skill": skill_hash
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+        separators=(",", ":"),
+        default=str
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class CheckpointStore:
+    """
+    Directory of stage checkpoints keyed by make_checkpoint_key.
+
+    Each checkpoint is a small JSON file written atomically, so several
+    pipelines (threads or processes) may share a directory. Checkpoints are
+    content addressed and never go stale; ``clear`` removes them.
+    """
+
+    def __init__(self, checkpoint_dir: Path):
+        """
+        Initialize checkpoint store.
+
+        Args:
+            checkpoint_dir: Directory to store checkpoints in (created if missing)
+        """
+        self.checkpoint_dir = Path(checkpoint_dir)
+        self.checkpoint_dir.mkdir(parents=True, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self._lock = threading.Lock()
+
+    def _path_for(self, key: str) -> Path:
+        """Return the checkpoint file path for a key."""
+        return self.checkpoint_dir / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a checkpoint.
+
+        Args:
+            key: Stage key from make_checkpoint_key
+
+        Returns:
+            The stored entry (``data``, ``data_type`` and ``metadata`` keys),
+            or None if there is no checkpoint
+        """
+        try:
+            entry = json.loads(self._path_for(key).read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+        return entry
+
+    def put(self, key: str, data: str, data_type: str, metadata: Dict[str, Any]):
+        """
+        Store a stage output.
+
+        Args:
+            key: Stage key from make_checkpoint_key
+            data: Serialized stage output
+            data_type: How to restore ``data`` (e.g. "text" or "analysis")
+            metadata: Result metadata (values that are not JSON are stored as strings)
+        """
+        path = self._path_for(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        payload = json.dumps(
+            {"key": key, "created_at": time.time(), "data": data, "data_type": data_type, "metadata": metadata},
+            ensure_ascii=False,
+            default=str
+        ).encode('utf-8')
+
+        # Write atomically so a crashed run never leaves a partial checkpoint
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(payload)
+            os.replace(tmp_name, path)
+        except BaseException:
+            if os.path.exists(tmp_name):
+                os.unlink(tmp_name)
+            raise
+
+        with self._lock:
+            self.writes += 1
+
+    def clear(self):
+        """Remove every checkpoint and reset counters."""
+        for path in list(self.checkpoint_dir.glob("*/*.json")):
+            try:
+                path.unlink()
+            except OSError:
+                pass
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+            self.writes = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss/write counters."""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "writes": self.writes}
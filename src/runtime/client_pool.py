@@ -0,0 +1,230 @@
+"""
+Process-wide pool of Anthropic API clients.
+
+Each Anthropic client owns an HTTP connection pool, so creating one client per
+component means every pipeline pays for its own TLS handshakes. The pool here
+hands out one shared client per distinct set of client settings instead.
+Synchronous clients are shared by every thread; asynchronous clients are bound
+to an event loop, so they are shared per running loop.
+"""
+
+import threading
+import weakref
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+
+
+@dataclass(frozen=True)
+class ClientSettings:
+    """Everything that distinguishes one pooled client from another."""
+
+    api_key: str
+    base_url: Optional[str] = None
+    max_retries: int = 2
+    timeout: float = 600.0
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 30.0
+
+
+def create_anthropic_client(settings: ClientSettings, asynchronous: bool = False):
+    """
+    Create an Anthropic client with its own connection limits.
+
+    Args:
+        settings: Client settings
+        asynchronous: Create an AsyncAnthropic client instead of Anthropic
+
+    Returns:
+        Anthropic or AsyncAnthropic client
+    """
+    import anthropic
+    import httpx  # Always installed: the anthropic SDK depends on it
+
+    limits = httpx.Limits(
+        max_connections=settings.max_connections,
+        max_keepalive_connections=settings.max_keepalive_connections,
+        keepalive_expiry=settings.keepalive_expiry
+    )
+    if asynchronous:
+        client_class = anthropic.AsyncAnthropic
+        http_client = anthropic.DefaultAsyncHttpxClient(limits=limits, timeout=settings.timeout)
+    else:
+        client_class = anthropic.Anthropic
+        http_client = anthropic.DefaultHttpxClient(limits=limits, timeout=settings.timeout)
+
+    return client_class(
+        api_key=settings.api_key,
+        base_url=settings.base_url,
+        max_retries=settings.max_retries,
+        timeout=settings.timeout,
+        http_client=http_client
+    )
+
+
+class ClientPool:
+    """
+    Thread-safe cache of Anthropic clients keyed by ClientSettings.
+
+    Connection limits are configured once per pool and apply to every client
+    it creates; components only supply their API key and per-call settings.
+    """
+
+    def __init__(self,
+                 max_connections: int = 100,
+                 max_keepalive_connections: int = 20,
+                 keepalive_expiry: float = 30.0,
+                 timeout: float = 600.0,
+                 base_url: Optional[str] = None,
+                 client_factory: Optional[Callable[[ClientSettings, bool], Any]] = None):
+        """
+        Initialize client pool.
+
+        Args:
+            max_connections: Maximum concurrent connections per client
+            max_keepalive_connections: Maximum idle connections kept open per client
+            keepalive_expiry: Seconds an idle connection is kept open
+            timeout: Request timeout in seconds
+            base_url: API base URL (defaults to the SDK default)
+            client_factory: Callable creating a client from (settings,
+                           asynchronous); defaults to create_anthropic_client
+        """
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.keepalive_expiry = keepalive_expiry
+        self.timeout = timeout
+        self.base_url = base_url
+        self._client_factory = client_factory or create_anthropic_client
+        self._clients: Dict[ClientSettings, Any] = {}
+        self._async_clients: "weakref.WeakKeyDictionary[Any, Dict[ClientSettings, Any]]" = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+        self.created = 0
+        self.reused = 0
+
+    def settings_for(self, api_key: str, max_retries: int = 2) -> ClientSettings:
+        """
+        Return the client settings for an API key under this pool's limits.
+
+        Args:
+            api_key: Anthropic API key
+            max_retries: Number of retries the SDK performs itself
+
+        Returns:
+            ClientSettings used as the pool key
+        """
+        return ClientSettings(
+            api_key=api_key,
+            base_url=self.base_url,
+            max_retries=max_retries,
+            timeout=self.timeout,
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry
+        )
+
+    def get_client(self, api_key: str, max_retries: int = 2):
+        """
+        Return the shared synchronous client for an API key.
+
+        Args:
+            api_key: Anthropic API key
+            max_retries: Number of retries the SDK performs itself
+
+        Returns:
+            Anthropic client
+        """
+        settings = self.settings_for(api_key, max_retries)
+        with self._lock:
+            client = self._clients.get(settings)
+            if client is not None:
+                self.reused += 1
+                return client
+            # Create under the lock so racing threads never build duplicates
+            client = self._client_factory(settings, False)
+            self._clients[settings] = client
+            self.created += 1
+            return client
+
+    def get_async_client(self, api_key: str, max_retries: int = 2):
+        """
+        Return the shared asynchronous client for an API key on the running loop.
+
+        Async HTTP connections cannot be shared between event loops, so each
+        loop gets its own clients. They are dropped with the loop.
+
+        Args:
+            api_key: Anthropic API key
+            max_retries: Number of retries the SDK performs itself
+
+        Returns:
+            AsyncAnthropic client
+
+        Raises:
+            RuntimeError: If called outside a running event loop
+        """
+        import asyncio  # Deferred: only async callers need it
+
+        loop = asyncio.get_running_loop()
+        settings = self.settings_for(api_key, max_retries)
+        with self._lock:
+            clients = self._async_clients.setdefault(loop, {})
+            client = clients.get(settings)
+            if client is not None:
+                self.reused += 1
+                return client
+            client = self._client_factory(settings, True)
+            clients[settings] = client
+            self.created += 1
+            return client
+
+    def close(self):
+        """Close every synchronous client and forget all pooled clients."""
+        with self._lock:
+            clients = list(self._clients.values())
+            self._clients.clear()
+            self._async_clients = weakref.WeakKeyDictionary()
+        for client in clients:
+            close = getattr(client, "close", None)
+            if close is not None:
+                close()
+
+    def stats(self) -> Dict[str, int]:
+        """Return client counts and created/reused counters."""
+        with self._lock:
+            return {
+                "sync_clients": len(self._clients),
+                "async_clients": sum(len(clients) for clients in self._async_clients.values()),
+                "created": self.created,
+                "reused": self.reused
+            }
+
+
+_default_pool: Optional[ClientPool] = None
+_default_pool_lock = threading.Lock()
+
+
+def get_client_pool() -> ClientPool:
+    """Return the process-wide client pool."""
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = ClientPool()
+        return _default_pool
+
+
+def set_client_pool(pool: Optional[ClientPool]) -> Optional[ClientPool]:
+    """
+    Replace the process-wide client pool.
+
+    Args:
+        pool: Pool to use for components without an injected pool (None
+              recreates a default pool on next use)
+
+    Returns:
+        The previous process-wide pool, if any
+    """
+    global _default_pool
+    with _default_pool_lock:
+        previous = _default_pool
+        _default_pool = pool
+        return previous
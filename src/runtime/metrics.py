@@ -0,0 +1,269 @@
+"""
+Per-stage instrumentation for pipelines and components.
+
+Components record how long each stage of their work takes (input validation,
+request building, the API call, post-processing) in StageTimings. The
+pipeline adds queue wait and file write time, and emits one structured
+``component_span`` event per component plus a ``pipeline_run`` event per run
+to a metrics sink. Sinks write JSON lines or a Prometheus textfile.
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+# Span fields measured in seconds, exported as per-stage latency in Prometheus
+STAGE_FIELDS = [
+    "queue_wait", "validation", "request_build", "api", "time_to_first_token",
+    "postprocess", "file_write", "total",
+]
+
+
+class StageTimings:
+    """Accumulates wall-clock durations per named stage."""
+
+    def __init__(self):
+        """Initialize with no recorded stages."""
+        self.durations: Dict[str, float] = {}
+
+    @contextmanager
+    def measure(self, stage: str) -> Iterator[None]:
+        """Time the enclosed block and add it to the stage's duration."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(stage, time.perf_counter() - start)
+
+    def add(self, stage: str, seconds: float):
+        """Add a duration to a stage."""
+        self.durations[stage] = self.durations.get(stage, 0.0) + seconds
+
+    def as_dict(self) -> Dict[str, float]:
+        """Return stage durations in seconds."""
+        return {stage: round(seconds, 6) for stage, seconds in self.durations.items()}
+
+
+def build_component_span(component_name: str,
+                         metadata: Dict[str, Any],
+                         queue_wait: float,
+                         total: float,
+                         file_write: float,
+                         success: bool) -> Dict[str, Any]:
+    """
+    Combine pipeline-side and component-side timings into one span.
+
+    Args:
+        component_name: Component the span belongs to
+        metadata: Component result metadata (with ``timings`` and token usage)
+        queue_wait: Seconds between the input becoming ready and execution start
+        total: Seconds the component ran for
+        file_write: Seconds spent writing streamed output to disk
+        success: Whether the component succeeded
+
+    Returns:
+        Span dict with per-stage seconds, token counts and output tokens/sec
+    """
+    timings = metadata.get("timings", {})
+    span: Dict[str, Any] = {
+        "component": component_name,
+        "success": success,
+        "queue_wait": round(queue_wait, 6),
+        "total": round(total, 6),
+        "file_write": round(file_write, 6),
+    }
+    for stage in ("validation", "request_build", "api", "postprocess"):
+        if stage in timings:
+            span[stage] = timings[stage]
+    if "time_to_first_token" in metadata:
+        span["time_to_first_token"] = metadata["time_to_first_token"]
+
+    output_tokens = metadata.get("output_tokens")
+    if output_tokens is not None:
+        span["input_tokens"] = metadata.get("input_tokens", 0)
+        span["output_tokens"] = output_tokens
+        # Generation time excludes time to first token when streaming
+        generation = timings.get("api", 0.0) - metadata.get("time_to_first_token", 0.0)
+        if metadata.get("response_cache") != "hit" and generation > 0:
+            span["output_tokens_per_second"] = round(output_tokens / generation, 2)
+    return span
+
+
+class MetricsSink:
+    """Receives structured metric events. Subclasses must be thread-safe."""
+
+    def emit(self, event: Dict[str, Any]):
+        """
+        Record one event.
+
+        Args:
+            event: Event dict with at least ``event`` and ``timestamp`` keys
+        """
+        raise NotImplementedError
+
+    def close(self):
+        """Flush and release resources."""
+
+
+class JSONLinesMetricsSink(MetricsSink):
+    """Appends every event as one JSON line to a file."""
+
+    def __init__(self, path: Path):
+        """
+        Initialize sink.
+
+        Args:
+            path: File to append to (parent directories are created)
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def emit(self, event: Dict[str, Any]):
+        """Append an event to the file."""
+        line = json.dumps(event, default=str) + "\n"
+        with self._lock:
+            with open(self.path, "a", encoding='utf-8') as f:
+                f.write(line)
+
+
+class PrometheusTextfileSink(MetricsSink):
+    """
+    Aggregates events into a Prometheus textfile-collector file.
+
+    The file is rewritten atomically after every event, so node_exporter's
+    textfile collector never reads a partial file.
+    """
+
+    def __init__(self, path: Path, prefix: str = "transformation_agent"):
+        """
+        Initialize sink.
+
+        Args:
+            path: ``.prom`` file to write (parent directories are created)
+            prefix: Metric name prefix
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        # (metric name, sorted label items) -> value
+        self._counters: Dict[tuple, float] = {}
+
+    def _inc(self, name: str, labels: Dict[str, str], value: float = 1.0):
+        """Increment a counter (caller holds the lock)."""
+        key = (name, tuple(sorted(labels.items())))
+        self._counters[key] = self._counters.get(key, 0.0) + value
+
+    def emit(self, event: Dict[str, Any]):
+        """Aggregate an event and rewrite the textfile."""
+        with self._lock:
+            if event.get("event") == "component_span":
+                labels = {"pipeline": event.get("pipeline", ""), "component": event.get("component", "")}
+                status = "success" if event.get("success") else "failure"
+                self._inc("component_runs_total", {**labels, "status": status})
+                for stage in STAGE_FIELDS:
+                    if stage in event:
+                        stage_labels = {**labels, "stage": stage}
+                        self._inc("stage_seconds_sum", stage_labels, event[stage])
+                        self._inc("stage_seconds_count", stage_labels)
+                for direction in ("input", "output"):
+                    tokens = event.get(f"{direction}_tokens")
+                    if tokens:
+                        self._inc("tokens_total", {**labels, "direction": direction}, tokens)
+            elif event.get("event") == "pipeline_run":
+                labels = {"pipeline": event.get("pipeline", "")}
+                status = "success" if event.get("success") else "failure"
+                self._inc("pipeline_runs_total", {**labels, "status": status})
+                self._inc("pipeline_seconds_sum", labels, event.get("duration", 0.0))
+                self._inc("pipeline_seconds_count", labels)
+            elif event.get("event") == "file_write":
+                labels = {"pipeline": event.get("pipeline", ""), "component": "", "stage": "file_write"}
+                self._inc("stage_seconds_sum", labels, event.get("seconds", 0.0))
+                self._inc("stage_seconds_count", labels)
+            self._write()
+
+    def render(self) -> str:
+        """Return the current metrics in Prometheus text exposition format."""
+        lines: List[str] = []
+        typed = set()
+        for (name, labels), value in sorted(self._counters.items()):
+            full_name = f"{self.prefix}_{name}"
+            family = full_name.rsplit("_sum", 1)[0].rsplit("_count", 1)[0]
+            if family not in typed:
+                typed.add(family)
+                metric_type = "summary" if family != full_name else "counter"
+                lines.append(f"# TYPE {family} {metric_type}")
+            label_text = ",".join(f'{k}="{_escape_label(v)}"' for k, v in labels)
+            lines.append(f"{full_name}{{{label_text}}} {value:g}")
+        return "\n".join(lines) + "\n"
+
+    def _write(self):
+        """Atomically replace the textfile (caller holds the lock)."""
+        fd, tmp_name = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding='utf-8') as f:
+                f.write(self.render())
+            os.replace(tmp_name, self.path)
+        except BaseException:
+            if os.path.exists(tmp_name):
+                os.unlink(tmp_name)
+            raise
+
+
+def _escape_label(value: Any) -> str:
+    """Escape a Prometheus label value."""
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class CompositeMetricsSink(MetricsSink):
+    """Forwards every event to several sinks."""
+
+    def __init__(self, sinks: List[MetricsSink]):
+        """
+        Initialize sink.
+
+        Args:
+            sinks: Sinks to forward events to
+        """
+        self.sinks = list(sinks)
+
+    def emit(self, event: Dict[str, Any]):
+        """Forward an event to every sink."""
+        for sink in self.sinks:
+            sink.emit(event)
+
+    def close(self):
+        """Close every sink."""
+        for sink in self.sinks:
+            sink.close()
+
+
+def make_event(event: str, **fields) -> Dict[str, Any]:
+    """
+    Build a structured metric event.
+
+    Args:
+        event: Event type (``component_span``, ``pipeline_run``, ``file_write``)
+        **fields: Event fields
+
+    Returns:
+        Event dict with type and timestamp
+    """
+    return {"event": event, "timestamp": datetime.now().isoformat(), **fields}
+
+
+def emit_safely(sink: Optional[MetricsSink], event: Dict[str, Any]):
+    """Emit an event, never letting a failing sink break a pipeline run."""
+    if sink is None:
+        return
+    try:
+        sink.emit(event)
+    except Exception as e:
+        print(f"[Metrics] WARNING: failed to emit {event.get('event')} event: {e}")
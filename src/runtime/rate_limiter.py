@@ -0,0 +1,415 @@
+"""
+Rate-limit-aware scheduling of Claude API requests.
+
+Every API call made by a component goes through a RequestScheduler. Per model
+it keeps token buckets for requests per minute, input tokens per minute and
+output tokens per minute, so bursts of parallel pipelines are paced to the
+account's limits up front instead of being rejected with 429s. Requests that
+still fail with a retryable error are retried with jittered exponential
+backoff, honoring the server's ``retry-after`` header.
+"""
+
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+
+# HTTP statuses worth retrying: timeouts, conflicts, rate limits, server errors, overload
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504, 529}
+
+
+def estimate_input_tokens(system_messages: list, user_message: str) -> int:
+    """
+    Estimate the input tokens of a request from its text (about 4 chars/token).
+
+    Args:
+        system_messages: List of system message dicts
+        user_message: User message content
+
+    Returns:
+        Estimated number of input tokens
+    """
+    chars = len(user_message)
+    for block in system_messages:
+        chars += len(block.get("text", ""))
+    return max(1, chars // 4)
+
+
+@dataclass
+class RateLimits:
+    """Per-minute limits for one model (None means unlimited)."""
+
+    requests_per_minute: Optional[float] = None
+    input_tokens_per_minute: Optional[float] = None
+    output_tokens_per_minute: Optional[float] = None
+
+
+class TokenBucket:
+    """
+    Token bucket refilled continuously at a per-minute rate.
+
+    Reservations may drive the balance negative; the debt is the time the
+    caller has to wait. Later callers queue behind it, so a saturated bucket
+    admits requests at a steady rate instead of in bursts.
+    """
+
+    def __init__(self, per_minute: float, now: float):
+        """
+        Initialize a full bucket.
+
+        Args:
+            per_minute: Refill rate and capacity
+            now: Current clock reading
+        """
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.updated = now
+
+    def _refill(self, now: float):
+        """Add tokens for the time elapsed since the last update."""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, amount: float, now: float) -> float:
+        """
+        Take tokens from the bucket.
+
+        Args:
+            amount: Tokens to take (capped at capacity so any request can run)
+            now: Current clock reading
+
+        Returns:
+            Seconds to wait before the reservation is covered
+        """
+        self._refill(now)
+        self.tokens -= min(amount, self.capacity)
+        return max(0.0, -self.tokens / self.rate)
+
+    def adjust(self, amount: float, now: float):
+        """Return (positive) or take (negative) tokens after the fact."""
+        self._refill(now)
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+
+class _ModelState:
+    """Buckets and usage statistics for one model."""
+
+    def __init__(self, limits: RateLimits, now: float, default_output_tokens: int):
+        self.requests = TokenBucket(limits.requests_per_minute, now) if limits.requests_per_minute else None
+        self.input_tokens = TokenBucket(limits.input_tokens_per_minute, now) \
+            if limits.input_tokens_per_minute else None
+        self.output_tokens = TokenBucket(limits.output_tokens_per_minute, now) \
+            if limits.output_tokens_per_minute else None
+        self.blocked_until = 0.0
+        self.average_output_tokens = float(default_output_tokens)
+
+
+def _header_retry_after(error: Exception) -> Optional[float]:
+    """Return the delay requested by a ``retry-after`` header, if any."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    retry_after_ms = headers.get("retry-after-ms")
+    if retry_after_ms is not None:
+        try:
+            return float(retry_after_ms) / 1000.0
+        except ValueError:
+            pass
+    retry_after = headers.get("retry-after")
+    if retry_after is not None:
+        try:
+            return float(retry_after)
+        except ValueError:
+            return None  # HTTP-date form; fall back to backoff
+    return None
+
+
+def is_retryable(error: Exception) -> bool:
+    """
+    Return True if an API error is transient and the request may be retried.
+
+    Args:
+        error: Exception raised by the API client
+
+    Returns:
+        True for rate limits, overload, server errors and connection failures
+    """
+    status_code = getattr(error, "status_code", None)
+    if status_code is not None:
+        return status_code in RETRYABLE_STATUS_CODES
+    if isinstance(error, (ConnectionError, TimeoutError)):
+        return True
+    try:
+        from anthropic import APIConnectionError
+    except ImportError:
+        return False
+    return isinstance(error, APIConnectionError)
+
+
+class RequestScheduler:
+    """
+    Paces and retries Claude API requests for all components in a process.
+
+    Limits are configured per model, with an optional default for models
+    that have none. Models without limits are not paced but still get
+    retries. Safe to use from threads and from asyncio.
+    """
+
+    def __init__(self,
+                 limits: Optional[Dict[str, RateLimits]] = None,
+                 default_limits: Optional[RateLimits] = None,
+                 max_retries: int = 6,
+                 base_delay: float = 1.0,
+                 max_delay: float = 60.0,
+                 default_output_tokens: int = 2000,
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep,
+                 async_sleep: Optional[Callable[[float], Any]] = None):
+        """
+        Initialize request scheduler.
+
+        Args:
+            limits: Rate limits keyed by model name
+            default_limits: Limits for models not listed in limits
+            max_retries: Maximum retries per request after the first attempt
+            base_delay: Backoff delay before the first retry in seconds
+            max_delay: Upper bound for a single backoff delay in seconds
+            default_output_tokens: Output tokens reserved per request until
+                                  actual usage has been observed
+            clock: Monotonic clock (injectable for tests)
+            sleep: Blocking sleep function (injectable for tests)
+            async_sleep: Async sleep coroutine function (defaults to
+                        asyncio.sleep; injectable for tests)
+        """
+        self.limits = dict(limits or {})
+        self.default_limits = default_limits or RateLimits()
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.default_output_tokens = default_output_tokens
+        self._clock = clock
+        self._sleep = sleep
+        self._async_sleep = async_sleep
+        self._models: Dict[str, _ModelState] = {}
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.retries = 0
+        self.rate_limited = 0
+        self.wait_seconds = 0.0
+
+    def set_limits(self, model: str, limits: RateLimits):
+        """Set the rate limits for a model, resetting its buckets."""
+        with self._lock:
+            self.limits[model] = limits
+            self._models.pop(model, None)
+
+    def _state(self, model: str) -> _ModelState:
+        """Return the bucket state for a model (caller holds the lock)."""
+        state = self._models.get(model)
+        if state is None:
+            limits = self.limits.get(model, self.default_limits)
+            state = _ModelState(limits, self._clock(), self.default_output_tokens)
+            self._models[model] = state
+        return state
+
+    def _reserve(self, model: str, input_tokens: int, max_tokens: int) -> tuple[float, float]:
+        """
+        Reserve capacity for one request.
+
+        Returns:
+            Tuple of (seconds to wait, output tokens reserved)
+        """
+        with self._lock:
+            now = self._clock()
+            state = self._state(model)
+            output_tokens = min(float(max_tokens), state.average_output_tokens)
+            wait = max(0.0, state.blocked_until - now)
+            if state.requests is not None:
+                wait = max(wait, state.requests.reserve(1, now))
+            if state.input_tokens is not None:
+                wait = max(wait, state.input_tokens.reserve(input_tokens, now))
+            if state.output_tokens is not None:
+                wait = max(wait, state.output_tokens.reserve(output_tokens, now))
+            self.requests += 1
+            self.wait_seconds += wait
+            return wait, output_tokens
+
+    def _settle(self, model: str, input_tokens: int, output_tokens: float, metadata: dict):
+        """Correct reservations with the usage the API actually reported."""
+        actual_input = (metadata.get("input_tokens", 0) or 0) + \
+            (metadata.get("cache_creation_input_tokens", 0) or 0)
+        actual_output = metadata.get("output_tokens", 0) or 0
+        with self._lock:
+            now = self._clock()
+            state = self._state(model)
+            if state.input_tokens is not None:
+                state.input_tokens.adjust(input_tokens - actual_input, now)
+            if state.output_tokens is not None:
+                state.output_tokens.adjust(output_tokens - actual_output, now)
+            # Exponential moving average steers future output reservations
+            state.average_output_tokens = 0.8 * state.average_output_tokens + 0.2 * actual_output
+
+    def _release(self, model: str, input_tokens: int, output_tokens: float):
+        """Return the token reservation of a request that produced no usage."""
+        with self._lock:
+            now = self._clock()
+            state = self._state(model)
+            if state.input_tokens is not None:
+                state.input_tokens.adjust(input_tokens, now)
+            if state.output_tokens is not None:
+                state.output_tokens.adjust(output_tokens, now)
+
+    def _retry_delay(self, model: str, error: Exception, attempt: int) -> float:
+        """
+        Compute the delay before retrying a failed request.
+
+        A ``retry-after`` header wins over exponential backoff. Rate limit
+        errors also pause the model for every other caller, so concurrent
+        requests back off together instead of hammering the API.
+        """
+        retry_after = _header_retry_after(error)
+        if retry_after is not None:
+            delay = retry_after + random.uniform(0, self.base_delay)
+        else:
+            backoff = min(self.max_delay, self.base_delay * (2 ** attempt))
+            delay = backoff / 2 + random.uniform(0, backoff / 2)
+
+        if getattr(error, "status_code", None) == 429:
+            with self._lock:
+                state = self._state(model)
+                state.blocked_until = max(state.blocked_until, self._clock() + delay)
+                self.rate_limited += 1
+        with self._lock:
+            self.retries += 1
+        return delay
+
+    def run(self,
+            model: str,
+            send: Callable[[], tuple[str, dict]],
+            input_tokens: int,
+            max_tokens: int) -> tuple[str, dict]:
+        """
+        Run a request under the model's rate limits, retrying transient errors.
+
+        Args:
+            model: Claude model name
+            send: Callable performing the request and returning
+                  (response_text, usage_metadata)
+            input_tokens: Estimated input tokens of the request
+            max_tokens: Maximum output tokens of the request
+
+        Returns:
+            Tuple of (response_text, usage_metadata) with scheduling metadata
+
+        Raises:
+            Exception: The last error if it is not retryable or retries ran out
+        """
+        waited = 0.0
+        attempt = 0
+        while True:
+            wait, output_tokens = self._reserve(model, input_tokens, max_tokens)
+            if wait > 0:
+                self._sleep(wait)
+                waited += wait
+            try:
+                text, metadata = send()
+            except Exception as e:
+                self._release(model, input_tokens, output_tokens)
+                if attempt >= self.max_retries or not is_retryable(e):
+                    raise
+                delay = self._retry_delay(model, e, attempt)
+                self._sleep(delay)
+                waited += delay
+                attempt += 1
+                continue
+            self._settle(model, input_tokens, output_tokens, metadata)
+            return text, {**metadata, "rate_limit_wait": round(waited, 3), "retries": attempt}
+
+    async def arun(self,
+                   model: str,
+                   send: Callable[[], Any],
+                   input_tokens: int,
+                   max_tokens: int) -> tuple[str, dict]:
+        """
+        Async version of run; ``send`` is a coroutine function.
+
+        Args:
+            model: Claude model name
+            send: Coroutine function performing the request and returning
+                  (response_text, usage_metadata)
+            input_tokens: Estimated input tokens of the request
+            max_tokens: Maximum output tokens of the request
+
+        Returns:
+            Tuple of (response_text, usage_metadata) with scheduling metadata
+
+        Raises:
+            Exception: The last error if it is not retryable or retries ran out
+        """
+        import asyncio  # Deferred: synchronous callers never pay for importing asyncio
+
+        async_sleep = self._async_sleep or asyncio.sleep
+        waited = 0.0
+        attempt = 0
+        while True:
+            wait, output_tokens = self._reserve(model, input_tokens, max_tokens)
+            if wait > 0:
+                await async_sleep(wait)
+                waited += wait
+            try:
+                text, metadata = await send()
+            except Exception as e:
+                self._release(model, input_tokens, output_tokens)
+                if attempt >= self.max_retries or not is_retryable(e):
+                    raise
+                delay = self._retry_delay(model, e, attempt)
+                await async_sleep(delay)
+                waited += delay
+                attempt += 1
+                continue
+            self._settle(model, input_tokens, output_tokens, metadata)
+            return text, {**metadata, "rate_limit_wait": round(waited, 3), "retries": attempt}
+
+    def stats(self) -> Dict[str, float]:
+        """Return request, retry, rate limit and total wait counters."""
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "retries": self.retries,
+                "rate_limited": self.rate_limited,
+                "wait_seconds": round(self.wait_seconds, 3)
+            }
+
+
+_default_scheduler: Optional[RequestScheduler] = None
+_default_scheduler_lock = threading.Lock()
+
+
+def get_request_scheduler() -> RequestScheduler:
+    """Return the process-wide request scheduler (retries only, no limits by default)."""
+    global _default_scheduler
+    with _default_scheduler_lock:
+        if _default_scheduler is None:
+            _default_scheduler = RequestScheduler()
+        return _default_scheduler
+
+
+def set_request_scheduler(scheduler: Optional[RequestScheduler]) -> Optional[RequestScheduler]:
+    """
+    Replace the process-wide request scheduler.
+
+    Args:
+        scheduler: Scheduler for components without an injected one (None
+                   recreates a default scheduler on next use)
+
+    Returns:
+        The previous process-wide scheduler, if any
+    """
+    global _default_scheduler
+    with _default_scheduler_lock:
+        previous = _default_scheduler
+        _default_scheduler = scheduler
+        return previous
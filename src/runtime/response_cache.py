@@ -0,0 +1,226 @@
+"""
+Content-addressed response cache for Claude API calls.
+
+Responses are stored on disk under a SHA-256 key derived from everything that
+determines the model output (model, system messages, user message, temperature
+and max_tokens). Entries expire after a TTL and the cache is kept under a size
+cap by evicting least recently used entries.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+
+def make_request_key(model: str,
+                     system_messages: list,
+                     user_message: str,
+                     temperature: float,
+                     max_tokens: int) -> str:
+    """
+    Compute the content hash identifying a Messages API request.
+
+    Args:
+        model: Claude model name
+        system_messages: List of system message dicts
+        user_message: User message content
+        temperature: Sampling temperature
+        max_tokens: Maximum tokens in response
+
+    Returns:
+        Hex-encoded SHA-256 digest
+    """
+    payload = json.dumps(
+        {
+            "model": model,
+            "system": system_messages,
+            "user": user_message,
+            "temperature": temperature,
+            "max_tokens": max_tokens
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+        separators=(",", ":")
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class ResponseCache:
+    """
+    On-disk LRU cache of Claude responses keyed by request hash.
+
+    Each entry is a small JSON file in a two-level directory layout. The file
+    modification time doubles as the last-access time: it is refreshed on every
+    hit, and eviction removes the oldest entries first. Safe to share between
+    threads; multiple processes may share a directory (writes are atomic).
+    """
+
+    def __init__(self,
+                 cache_dir: Path,
+                 max_bytes: int = 512 * 1024 * 1024,
+                 ttl_seconds: Optional[float] = 7 * 24 * 3600):
+        """
+        Initialize response cache.
+
+        Args:
+            cache_dir: Directory to store entries in (created if missing)
+            max_bytes: Maximum total size of cached entries
+            ttl_seconds: Maximum age of an entry, or None to never expire
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._size = sum(p.stat().st_size for p in self._entry_paths())
+
+    def _entry_paths(self):
+        """Iterate over all entry files."""
+        return self.cache_dir.glob("*/*.json")
+
+    def _path_for(self, key: str) -> Path:
+        """Return the entry file path for a key."""
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached response.
+
+        Args:
+            key: Request key from make_request_key
+
+        Returns:
+            Dict with ``text`` and ``metadata`` keys, or None on a miss
+        """
+        path = self._path_for(key)
+        try:
+            entry = json.loads(path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        if self.ttl_seconds is not None and time.time() - entry.get("created_at", 0) > self.ttl_seconds:
+            self._remove(path)
+            with self._lock:
+                self.misses += 1
+            return None
+
+        # Refresh access time for LRU ordering
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+        with self._lock:
+            self.hits += 1
+        return entry
+
+    def put(self, key: str, text: str, metadata: Dict[str, Any]):
+        """
+        Store a response.
+
+        Args:
+            key: Request key from make_request_key
+            text: Response text
+            metadata: Usage metadata returned with the response
+        """
+        path = self._path_for(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        payload = json.dumps(
+            {"key": key, "created_at": time.time(), "text": text, "metadata": metadata},
+            ensure_ascii=False
+        ).encode('utf-8')
+
+        # Write atomically so concurrent readers never see partial entries
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(payload)
+            previous = path.stat().st_size if path.exists() else 0
+            os.replace(tmp_name, path)
+        except BaseException:
+            if os.path.exists(tmp_name):
+                os.unlink(tmp_name)
+            raise
+
+        with self._lock:
+            self._size += len(payload) - previous
+            over_limit = self._size > self.max_bytes
+        if over_limit:
+            self._evict()
+
+    def delete(self, key: str):
+        """
+        Remove a stored response, if present.
+
+        Args:
+            key: Request key from make_request_key
+        """
+        self._remove(self._path_for(key))
+
+    def _remove(self, path: Path):
+        """Delete an entry and update the size estimate."""
+        try:
+            size = path.stat().st_size
+            path.unlink()
+        except OSError:
+            return
+        with self._lock:
+            self._size -= size
+
+    def _evict(self):
+        """Evict least recently used entries until under 90% of the size cap."""
+        with self._lock:
+            entries = []
+            for path in self._entry_paths():
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+            # Re-measure from disk: other processes may share the directory
+            self._size = sum(size for _, size, _ in entries)
+            target = int(self.max_bytes * 0.9)
+            for _, size, path in sorted(entries):
+                if self._size <= target:
+                    break
+                try:
+                    path.unlink()
+                except OSError:
+                    continue
+                self._size -= size
+                self.evictions += 1
+
+    def clear(self):
+        """Remove every entry and reset counters."""
+        for path in list(self._entry_paths()):
+            self._remove(path)
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    @property
+    def size_bytes(self) -> int:
+        """Return the current total size of cached entries."""
+        return self._size
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss/eviction counters and current size."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size_bytes": self._size
+            }
@@ -5,6 +5,16 @@ This module provides utilities for loading and managing SKILL.md files
 and their associated domain knowledge.
 """
 
-from .skill_manager import SkillManager
+from .knowledge_index import KnowledgeChunk, KnowledgeIndex
+from .skill_manager import SkillManager, get_skill_manager
+from .skill_registry import SkillDocument, SkillRegistry, get_skill_registry
 
-__all__ = ["SkillManager"]
+__all__ = [
+    "KnowledgeChunk",
+    "KnowledgeIndex",
+    "SkillManager",
+    "get_skill_manager",
+    "SkillDocument",
+    "SkillRegistry",
+    "get_skill_registry"
+]
@@ -0,0 +1,207 @@
+"""
+Lexical retrieval over domain knowledge files.
+
+Domain knowledge files are split into chunks (markdown sections, or groups
+of paragraphs for plain text) and indexed with Okapi BM25. Components query
+the index with their input to attach only the most relevant chunks, within a
+token budget, instead of whole files.
+"""
+
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Roughly 4 characters per token, as in rate_limiter.estimate_input_tokens
+CHARS_PER_TOKEN = 4
+# Chunks longer than this are split at paragraph boundaries
+MAX_CHUNK_CHARS = 2400
+
+_WORD = re.compile(r"[a-z0-9]+")
+_HEADING = re.compile(r"^(#{1,3})\s+(.*)$")
+
+STOPWORDS = frozenset("""
+a about after all also an and any are as at be been but by can could did do does for from had has have
+how i if in into is it its just like me my no not of on or our so some than that the their them then
+there these they this to up us was we were what when where which who will with would yeah you your
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    """Return the lowercase index terms of a text, without stopwords."""
+    return [word for word in _WORD.findall(text.lower()) if word not in STOPWORDS and len(word) > 1]
+
+
+@dataclass
+class KnowledgeChunk:
+    """A retrievable piece of a domain knowledge file."""
+
+    source: str  # Filename within domain-knowledge/
+    heading: str  # Heading path, e.g. "Finance - Accounts Payable > 3.2.1 Receive Vendor Invoice"
+    text: str
+    position: int  # Order within the source file
+
+    @property
+    def tokens(self) -> int:
+        """Return the estimated token count of the chunk."""
+        return max(1, len(self.text) // CHARS_PER_TOKEN)
+
+
+def _split_paragraphs(text: str, max_chars: int) -> List[str]:
+    """Group blank-line separated paragraphs into pieces of at most ``max_chars``."""
+    pieces: List[str] = []
+    current: List[str] = []
+    size = 0
+    for paragraph in re.split(r"\n\s*\n", text.strip()):
+        if current and size + len(paragraph) > max_chars:
+            pieces.append("\n\n".join(current))
+            current, size = [], 0
+        current.append(paragraph)
+        size += len(paragraph) + 2
+    if current:
+        pieces.append("\n\n".join(current))
+    return pieces
+
+
+def chunk_document(text: str, source: str, max_chars: int = MAX_CHUNK_CHARS) -> List[KnowledgeChunk]:
+    """
+    Split a domain knowledge file into chunks.
+
+    Markdown files are split at ``#``, ``##`` and ``###`` headings; each chunk
+    remembers the headings above it. Other files (transcripts, XML) are split
+    into groups of paragraphs. Sections longer than ``max_chars`` are split
+    further at paragraph boundaries.
+
+    Args:
+        text: File content
+        source: Filename recorded on each chunk
+        max_chars: Maximum chunk size before paragraph splitting
+
+    Returns:
+        Chunks in file order (empty sections are dropped)
+    """
+    sections: List[Tuple[str, str]] = []
+    if source.endswith(".md"):
+        path: List[str] = []
+        lines: List[str] = []
+
+        def flush():
+            body = "\n".join(lines).strip()
+            if body and not all(_HEADING.match(line) for line in body.splitlines()):
+                sections.append((" > ".join(path), body))
+
+        for line in text.splitlines():
+            match = _HEADING.match(line)
+            if match:
+                flush()
+                lines = []
+                level = len(match.group(1))
+                path = path[:level - 1] + [match.group(2).strip()]
+            lines.append(line)
+        flush()
+    else:
+        sections.append(("", text))
+
+    chunks = []
+    for heading, body in sections:
+        for piece in _split_paragraphs(body, max_chars) if len(body) > max_chars else [body]:
+            chunks.append(KnowledgeChunk(source=source, heading=heading, text=piece, position=len(chunks)))
+    return chunks
+
+
+class KnowledgeIndex:
+    """
+    Okapi BM25 index over knowledge chunks.
+
+    Postings map each term to the chunks containing it with their term
+    frequency, so a query only scores chunks sharing a term with it.
+    """
+
+    def __init__(self, chunks: Iterable[KnowledgeChunk], k1: float = 1.5, b: float = 0.75):
+        """
+        Build the index.
+
+        Args:
+            chunks: Chunks to index
+            k1: BM25 term frequency saturation
+            b: BM25 length normalization
+        """
+        self.chunks = list(chunks)
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, List[Tuple[int, int]]] = {}
+        self.lengths: List[int] = []
+
+        for index, chunk in enumerate(self.chunks):
+            terms = Counter(tokenize(f"{chunk.heading}\n{chunk.text}"))
+            self.lengths.append(sum(terms.values()))
+            for term, count in terms.items():
+                self.postings.setdefault(term, []).append((index, count))
+
+        self.average_length = sum(self.lengths) / len(self.lengths) if self.lengths else 0.0
+        total = len(self.chunks)
+        self.idf = {
+            term: math.log(1 + (total - len(posting) + 0.5) / (len(posting) + 0.5))
+            for term, posting in self.postings.items()
+        }
+
+    def search(self, query: str, top_k: Optional[int] = None) -> List[Tuple[float, KnowledgeChunk]]:
+        """
+        Rank chunks by BM25 score against a query.
+
+        Args:
+            query: Query text (e.g. a transcript or analysis)
+            top_k: Maximum number of results (all matching chunks if None)
+
+        Returns:
+            List of (score, chunk), best first; chunks without a shared term are omitted
+        """
+        scores: Dict[int, float] = {}
+        for term, query_count in Counter(tokenize(query)).items():
+            posting = self.postings.get(term)
+            if posting is None:
+                continue
+            idf = self.idf[term]
+            for index, count in posting:
+                norm = self.k1 * (1 - self.b + self.b * self.lengths[index] / self.average_length)
+                # Query term frequency is damped so long queries do not swamp rare terms
+                scores[index] = scores.get(index, 0.0) + idf * count * (self.k1 + 1) / (count + norm) \
+                    * (1 + math.log(query_count))
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        if top_k is not None:
+            ranked = ranked[:top_k]
+        return [(score, self.chunks[index]) for index, score in ranked]
+
+    def select(self, query: str, token_budget: int, top_k: Optional[int] = None) -> List[KnowledgeChunk]:
+        """
+        Choose the most relevant chunks that fit a token budget.
+
+        Chunks are taken in score order, skipping any that would exceed the
+        budget, and returned in source order so excerpts read naturally.
+
+        Args:
+            query: Query text
+            token_budget: Maximum total estimated tokens of the selected chunks
+            top_k: Maximum number of chunks (unbounded if None)
+
+        Returns:
+            Selected chunks ordered by source file and position
+        """
+        selected = []
+        used = 0
+        for _, chunk in self.search(query):
+            if top_k is not None and len(selected) >= top_k:
+                break
+            if used + chunk.tokens > token_budget:
+                continue
+            selected.append(chunk)
+            used += chunk.tokens
+        order = {chunk.source: i for i, chunk in reversed(list(enumerate(self.chunks)))}
+        return sorted(selected, key=lambda chunk: (order[chunk.source], chunk.position))
+
+
+def format_chunks(chunks: List[KnowledgeChunk]) -> str:
+    """Render selected chunks as one reference block, labelled with their source file."""
+    return "\n\n---\n\n".join(f"[{chunk.source}]\n\n{chunk.text}" for chunk in chunks)
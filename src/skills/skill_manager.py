@@ -5,26 +5,48 @@ This module provides utilities for working with SKILL.md files and their
 associated domain knowledge files.
 """
 
+import threading
 from pathlib import Path
-from typing import List, Dict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .knowledge_index import KnowledgeChunk, KnowledgeIndex, chunk_document
+from .skill_registry import SkillRegistry, get_skill_registry
 
 
 class SkillManager:
-    """Manages loading and caching of skill prompts and domain knowledge."""
+    """
+    Manages loading of skill prompts and domain knowledge.
+
+    File contents are cached in a SkillRegistry (the process-wide one by
+    default), so every SkillManager instance shares the same cache and picks
+    up edits to skill files automatically.
+    """
 
-    def __init__(self, skills_root: Path = None):
+    def __init__(self, skills_root: Path = None, registry: Optional[SkillRegistry] = None):
         """
         Initialize skill manager.
 
         Args:
             skills_root: Root directory containing skills/ folder.
                         Defaults to project root/skills
+            registry: Skill registry to cache files in (defaults to the
+                     process-wide registry)
         """
         if skills_root is None:
             # Default to project root/skills
             skills_root = Path(__file__).parent.parent.parent / "skills"
         self.skills_root = Path(skills_root)
-        self._cache: Dict[str, str] = {}
+        self.registry = registry or get_skill_registry()
+        self._indexes: Dict[Tuple, KnowledgeIndex] = {}
+        self._index_lock = threading.Lock()
+
+    def skill_prompt_path(self, skill_name: str) -> Path:
+        """Return the path of a skill's SKILL.md file."""
+        return self.skills_root / skill_name / "SKILL.md"
+
+    def domain_knowledge_path(self, skill_name: str, filename: str) -> Path:
+        """Return the path of a skill's domain knowledge file."""
+        return self.skills_root / skill_name / "domain-knowledge" / filename
 
     def load_skill_prompt(self, skill_name: str) -> str:
         """
@@ -39,13 +61,11 @@ class SkillManager:
         Raises:
             FileNotFoundError: If SKILL.md not found
         """
-        cache_key = f"{skill_name}_prompt"
-        if cache_key not in self._cache:
-            skill_path = self.skills_root / skill_name / "SKILL.md"
-            if not skill_path.exists():
-                raise FileNotFoundError(f"SKILL.md not found at {skill_path}")
-            self._cache[cache_key] = skill_path.read_text(encoding='utf-8')
-        return self._cache[cache_key]
+        skill_path = self.skill_prompt_path(skill_name)
+        try:
+            return self.registry.read_text(skill_path)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"SKILL.md not found at {skill_path}")
 
     def load_domain_knowledge(self, skill_name: str, filename: str) -> str:
         """
@@ -61,13 +81,36 @@ class SkillManager:
         Raises:
             FileNotFoundError: If domain knowledge file not found
         """
-        cache_key = f"{skill_name}_dk_{filename}"
-        if cache_key not in self._cache:
-            dk_path = self.skills_root / skill_name / "domain-knowledge" / filename
-            if not dk_path.exists():
-                raise FileNotFoundError(f"Domain knowledge file not found at {dk_path}")
-            self._cache[cache_key] = dk_path.read_text(encoding='utf-8')
-        return self._cache[cache_key]
+        dk_path = self.domain_knowledge_path(skill_name, filename)
+        try:
+            return self.registry.read_text(dk_path)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Domain knowledge file not found at {dk_path}")
+
+    def skill_hash(self, skill_name: str) -> str:
+        """
+        Return the content hash of a skill's SKILL.md.
+
+        Args:
+            skill_name: Name of skill directory
+
+        Returns:
+            SHA-256 hex digest of the current SKILL.md content
+        """
+        return self.registry.content_hash(self.skill_prompt_path(skill_name))
+
+    def domain_knowledge_hash(self, skill_name: str, filename: str) -> str:
+        """
+        Return the content hash of a domain knowledge file.
+
+        Args:
+            skill_name: Name of skill directory
+            filename: Name of file in domain-knowledge/ folder
+
+        Returns:
+            SHA-256 hex digest of the current file content
+        """
+        return self.registry.content_hash(self.domain_knowledge_path(skill_name, filename))
 
     def list_domain_knowledge_files(self, skill_name: str) -> List[str]:
         """
@@ -84,6 +127,74 @@ class SkillManager:
             return []
         return [f.name for f in dk_dir.glob("*.md") if f.is_file()]
 
+    def knowledge_index(self, skill_name: str, filenames: Optional[Sequence[str]] = None) -> KnowledgeIndex:
+        """
+        Return a BM25 index over chunks of a skill's domain knowledge files.
+
+        Indexes are cached per set of files and rebuilt when any file's
+        content hash changes.
+
+        Args:
+            skill_name: Name of skill directory
+            filenames: Files in domain-knowledge/ to index (defaults to the
+                      markdown files other than README.md)
+
+        Returns:
+            KnowledgeIndex over the files' chunks
+        """
+        if filenames is None:
+            filenames = sorted(name for name in self.list_domain_knowledge_files(skill_name) if name != "README.md")
+        documents = [self.registry.get(self.domain_knowledge_path(skill_name, name)) for name in filenames]
+        key = (skill_name,) + tuple((name, document.sha256) for name, document in zip(filenames, documents))
+
+        with self._index_lock:
+            index = self._indexes.get(key)
+        if index is None:
+            chunks: List[KnowledgeChunk] = []
+            for name, document in zip(filenames, documents):
+                chunks.extend(chunk_document(document.content, name))
+            index = KnowledgeIndex(chunks)
+            with self._index_lock:
+                self._indexes[key] = index
+        return index
+
+    def retrieve_domain_knowledge(self,
+                                  skill_name: str,
+                                  query: str,
+                                  token_budget: int,
+                                  top_k: Optional[int] = None,
+                                  filenames: Optional[Sequence[str]] = None) -> List[KnowledgeChunk]:
+        """
+        Select the domain knowledge chunks most relevant to a query.
+
+        Args:
+            skill_name: Name of skill directory
+            query: Text to rank chunks against (e.g. the transcript or analysis)
+            token_budget: Maximum estimated tokens of the selected chunks
+            top_k: Maximum number of chunks (unbounded if None)
+            filenames: Files to search (see knowledge_index)
+
+        Returns:
+            Selected chunks in source order
+
+        Raises:
+            FileNotFoundError: If a domain knowledge file is not found
+        """
+        return self.knowledge_index(skill_name, filenames).select(query, token_budget, top_k)
+
     def clear_cache(self):
-        """Clear the prompt cache."""
-        self._cache.clear()
+        """Drop cached files and knowledge indexes under this manager's skills root."""
+        self.registry.invalidate(self.skills_root)
+        with self._index_lock:
+            self._indexes.clear()
+
+
+_default_manager: Optional[SkillManager] = None
+
+
+def get_skill_manager() -> SkillManager:
+    """Return the process-wide skill manager for the project's skills/ folder."""
+    global _default_manager
+    if _default_manager is None:
+        _default_manager = SkillManager()
+    return _default_manager
@@ -0,0 +1,114 @@
+"""
+Process-wide registry of skill files.
+
+This module keeps SKILL.md and domain knowledge file contents in memory for
+the whole process, revalidating them with a cheap ``stat`` on every access so
+edits on disk are picked up (hot reload) without re-reading unchanged files.
+"""
+
+import hashlib
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional
+
+
+@dataclass(frozen=True)
+class SkillDocument:
+    """Cached content of a skill file plus the metadata used to revalidate it."""
+
+    path: Path
+    content: str
+    sha256: str
+    mtime_ns: int
+    size: int
+
+
+class SkillRegistry:
+    """
+    Thread-safe cache of skill files keyed by resolved path.
+
+    Entries are revalidated against the file's mtime and size on every access
+    and reloaded when either changes. Content hashes are stable for unchanged
+    files, so other layers can use them as cache keys.
+    """
+
+    def __init__(self):
+        """Initialize an empty registry."""
+        self._documents: Dict[Path, SkillDocument] = {}
+        self._lock = threading.Lock()
+        self.loads = 0
+        self.hits = 0
+
+    def get(self, path: Path) -> SkillDocument:
+        """
+        Return the current document for a file, loading it if needed.
+
+        Args:
+            path: Path to a SKILL.md or domain knowledge file
+
+        Returns:
+            SkillDocument with content and content hash
+
+        Raises:
+            FileNotFoundError: If the file does not exist
+        """
+        path = Path(path).resolve()
+        stat = path.stat()  # Raises FileNotFoundError for missing files
+
+        with self._lock:
+            document = self._documents.get(path)
+            if document is not None and document.mtime_ns == stat.st_mtime_ns and document.size == stat.st_size:
+                self.hits += 1
+                return document
+
+        content = path.read_text(encoding='utf-8')
+        document = SkillDocument(
+            path=path,
+            content=content,
+            sha256=hashlib.sha256(content.encode('utf-8')).hexdigest(),
+            mtime_ns=stat.st_mtime_ns,
+            size=stat.st_size
+        )
+
+        with self._lock:
+            self._documents[path] = document
+            self.loads += 1
+        return document
+
+    def read_text(self, path: Path) -> str:
+        """Return the current content of a file."""
+        return self.get(path).content
+
+    def content_hash(self, path: Path) -> str:
+        """Return the SHA-256 hex digest of a file's current content."""
+        return self.get(path).sha256
+
+    def invalidate(self, path: Optional[Path] = None):
+        """
+        Drop cached documents.
+
+        Args:
+            path: File or directory to invalidate (everything if None)
+        """
+        with self._lock:
+            if path is None:
+                self._documents.clear()
+                return
+            path = Path(path).resolve()
+            for cached_path in list(self._documents):
+                if cached_path == path or path in cached_path.parents:
+                    del self._documents[cached_path]
+
+    def stats(self) -> Dict[str, int]:
+        """Return load/hit counters and the number of cached documents."""
+        with self._lock:
+            return {"documents": len(self._documents), "loads": self.loads, "hits": self.hits}
+
+
+_default_registry = SkillRegistry()
+
+
+def get_skill_registry() -> SkillRegistry:
+    """Return the process-wide skill registry."""
+    return _default_registry
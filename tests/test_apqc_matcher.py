@@ -0,0 +1,112 @@
+"""
+Unit tests for local APQC activity matching.
+"""
+
+from pathlib import Path
+
+import pytest
+
+from src.components.generation.apqc_matcher import APQCMatcher, get_apqc_matcher, parse_apqc_reference
+from src.components.generation.bpmn_generator import BPMNGenerator
+from tests.test_components import fake_client
+
+APQC = Path("skills/bpmn-generation/domain-knowledge/apqc-activities.md")
+ANALYSIS = Path("outputs/analysis/example-01-ap-analysis-test.md")
+BPMN_FILES = sorted(Path("outputs/bpmn-diagrams").glob("*.bpmn"))
+
+
+@pytest.fixture(scope="module")
+def matcher():
+    return APQCMatcher.from_reference(APQC.read_text(encoding='utf-8'))
+
+
+class TestParsing:
+    """Test parsing the APQC reference."""
+
+    def test_parses_every_activity(self):
+        activities = parse_apqc_reference(APQC.read_text(encoding='utf-8'))
+
+        assert len(activities) == 24
+        first = activities[0]
+        assert (first.code, first.name, first.domain) == ("3.2.1", "Receive Vendor Invoice",
+                                                           "Finance - Accounts Payable")
+        assert first.description.startswith("Obtain invoice from vendor")
+        assert "portal" in first.context_terms
+
+
+class TestMatching:
+    """Test mapping task names to activities."""
+
+    @pytest.mark.parametrize("name, code", [
+        ("Receive Invoice", "3.2.1"),
+        ("Manual Data Entry", "3.2.2"),
+        ("Link Invoice to PO and Perform Three-Way Match", "3.2.3"),
+        ("Send PO to supplier", "5.1.6"),
+        ("Enroll employee in health insurance", "4.1.7"),
+        ("Legal contract review", "5.1.4"),
+    ])
+    def test_task_names(self, matcher, name, code):
+        match = matcher.match([name])[0]
+
+        assert match.code == code
+        assert 0 < match.confidence <= 1
+
+    def test_explicit_code_wins(self, matcher):
+        match = matcher.match(["3.2.8 Vendor Notification"])[0]
+
+        assert (match.code, match.activity, match.confidence) == ("3.2.8", "Close Invoice", 1.0)
+
+    def test_unrelated_task_is_unmatched(self, matcher):
+        match = matcher.match(["Lunch break"])[0]
+
+        assert match.code is None and match.activity is None
+
+    @pytest.mark.parametrize("path", BPMN_FILES, ids=lambda p: p.name)
+    def test_sample_diagrams(self, matcher, path):
+        matches = matcher.match_bpmn(path.read_text(encoding='utf-8'))
+
+        assert matches and all(match["task_id"] for match in matches)
+        assert all(0 <= match["confidence"] <= 1 for match in matches)
+        assert sum(1 for match in matches if match["code"]) >= len(matches) / 2
+
+    def test_matcher_is_cached(self):
+        assert get_apqc_matcher() is get_apqc_matcher()
+
+
+class TestGenerator:
+    """Test BPMNGenerator serving include_apqc locally."""
+
+    def test_local_matching_sends_no_reference(self):
+        component = BPMNGenerator(api_key="test-key")
+        component._client = fake_client(BPMN_FILES[0].read_text(encoding='utf-8'))
+
+        result = component.process(ANALYSIS.read_text(encoding='utf-8'), local_layout=False)
+
+        system = component._client.messages.calls[0]["system"]
+        assert len(system) == 1
+        assert "APQC Level 4 Activities Reference" not in system[0]["text"]
+        assert result.success, result.error
+        matches = result.metadata["apqc_activities"]
+        assert matches and {"task_id", "task_name", "code", "activity", "confidence"} <= set(matches[0])
+        assert result.metadata["apqc_unmatched"] == sum(1 for match in matches if match["code"] is None)
+
+    def test_include_apqc_off(self):
+        component = BPMNGenerator(api_key="test-key")
+        component._client = fake_client(BPMN_FILES[0].read_text(encoding='utf-8'))
+
+        result = component.process(ANALYSIS.read_text(encoding='utf-8'), include_apqc=False, local_layout=False)
+
+        assert result.success, result.error
+        assert "apqc_activities" not in result.metadata
+
+    def test_unknown_reference_mode(self):
+        component = BPMNGenerator(api_key="test-key")
+
+        result = component.process(ANALYSIS.read_text(encoding='utf-8'), apqc_reference="remote")
+
+        assert not result.success
+        assert "apqc_reference" in result.error
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
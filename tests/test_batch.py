@@ -0,0 +1,132 @@
+"""
+Unit tests for batch execution.
+
+The pipeline runner is replaced with a stub so no API calls are made.
+"""
+
+import json
+import threading
+import time
+
+import pytest
+
+from src.batch import BatchJob, load_batch_jobs, run_batch, format_summary, save_summary
+from src.pipeline import PipelineResult
+
+
+def _write_transcripts(directory, names):
+    directory.mkdir(parents=True, exist_ok=True)
+    for name in names:
+        (directory / f"{name}.txt").write_text("transcript " * 20, encoding='utf-8')
+
+
+class TestLoadBatchJobs:
+    """Test job discovery from directories and manifests."""
+
+    def test_directory(self, tmp_path):
+        _write_transcripts(tmp_path / "in", ["b", "a"])
+
+        jobs = load_batch_jobs(tmp_path / "in", tmp_path / "out")
+
+        assert [job.name for job in jobs] == ["a", "b"]
+        assert jobs[0].output_dir == tmp_path / "out" / "a"
+
+    def test_text_manifest_resolves_relative_paths(self, tmp_path):
+        _write_transcripts(tmp_path / "in", ["a"])
+        manifest = tmp_path / "manifest.txt"
+        manifest.write_text("# quarterly intake\nin/a.txt\nin/a.txt\n", encoding='utf-8')
+
+        jobs = load_batch_jobs(manifest, tmp_path / "out")
+
+        assert jobs[0].transcript_path == tmp_path / "in" / "a.txt"
+        assert [job.name for job in jobs] == ["a", "a-2"]
+
+    def test_json_manifest(self, tmp_path):
+        manifest = tmp_path / "manifest.json"
+        manifest.write_text(json.dumps([
+            "x.txt",
+            {"transcript": "y.txt", "name": "vendor-y", "business_context": "Budget: $50K"}
+        ]), encoding='utf-8')
+
+        jobs = load_batch_jobs(manifest, tmp_path / "out")
+
+        assert [job.name for job in jobs] == ["x", "vendor-y"]
+        assert jobs[1].business_context == "Budget: $50K"
+
+    def test_empty_directory(self, tmp_path):
+        (tmp_path / "empty").mkdir()
+        with pytest.raises(ValueError):
+            load_batch_jobs(tmp_path / "empty", tmp_path / "out")
+
+
+class TestRunBatch:
+    """Test bounded fan-out and result aggregation."""
+
+    def test_concurrency_is_bounded(self, tmp_path):
+        jobs = [BatchJob(tmp_path / f"{i}.txt", tmp_path / str(i)) for i in range(6)]
+        lock = threading.Lock()
+        in_flight = [0]
+        peak = [0]
+
+        def runner(job):
+            with lock:
+                in_flight[0] += 1
+                peak[0] = max(peak[0], in_flight[0])
+            time.sleep(0.02)
+            with lock:
+                in_flight[0] -= 1
+            return PipelineResult(
+                success=job.name != "3",
+                outputs={},
+                metadata={
+                    "components": ["Transcript Analysis"],
+                    "Transcript Analysis": {"input_tokens": 10, "output_tokens": 5},
+                    "prompt_cache": {"input_tokens": 10, "cache_creation_input_tokens": 0,
+                                     "cache_read_input_tokens": 30, "hit_ratio": 0.75}
+                },
+                errors=[] if job.name != "3" else ["Transcript Analysis failed: boom"]
+            )
+
+        results = run_batch(jobs, concurrency=2, runner=runner)
+
+        assert peak[0] <= 2
+        assert [r.job.name for r in results] == [str(i) for i in range(6)]
+        assert sum(r.success for r in results) == 5
+        assert results[0].input_tokens == 10 and results[0].output_tokens == 5
+        assert results[0].cache_hit_ratio == pytest.approx(0.75)
+
+        table = format_summary(results)
+        assert "5/6 OK" in table
+        assert "boom" in table
+
+        summary = json.loads(save_summary(results, tmp_path).read_text(encoding='utf-8'))
+        assert len(summary) == 6
+
+    def test_runner_exception_is_reported(self, tmp_path):
+        def runner(job):
+            raise FileNotFoundError("missing transcript")
+
+        results = run_batch([BatchJob(tmp_path / "a.txt", tmp_path / "a")], runner=runner)
+
+        assert not results[0].success
+        assert "missing transcript" in results[0].errors[0]
+
+    def test_cache_hits_spend_no_tokens(self, tmp_path):
+        def runner(job):
+            return PipelineResult(
+                success=True,
+                outputs={},
+                metadata={
+                    "components": ["Transcript Analysis", "BPMN Generation"],
+                    "Transcript Analysis": {"input_tokens": 10, "output_tokens": 5, "response_cache": "hit"},
+                    "BPMN Generation": {"input_tokens": 7, "output_tokens": 3, "response_cache": "miss"}
+                }
+            )
+
+        results = run_batch([BatchJob(tmp_path / "a.txt", tmp_path / "a")], runner=runner)
+
+        assert (results[0].input_tokens, results[0].output_tokens) == (7, 3)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,181 @@
+"""
+Unit tests for the local BPMN diagram layout.
+"""
+
+import re
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+import pytest
+
+from benchmarks.bpmn_validation import synthetic_bpmn
+from src.components.generation.bpmn_generator import BPMNGenerator
+from src.components.generation.bpmn_layout import (
+    LOCAL_LAYOUT_INSTRUCTION, layout_bpmn, layout_process, strip_diagram
+)
+from src.components.generation.bpmn_validation import BPMN_NS, validate_bpmn_graph
+from tests.test_components import fake_client
+
+BPMN_FILES = sorted(Path("outputs/bpmn-diagrams").glob("*.bpmn"))
+
+HEADER = ('<bpmn:definitions xmlns:bpmn="http://www.omg.org/spec/BPMN/20100524/MODEL" id="Definitions_1">'
+          '<bpmn:process id="P">')
+
+
+def process_of(text: str) -> ET.Element:
+    return ET.fromstring(text).find(f"{{{BPMN_NS}}}process")
+
+
+def flow(flow_id: str, source: str, target: str) -> str:
+    return f'<bpmn:sequenceFlow id="{flow_id}" sourceRef="{source}" targetRef="{target}" />'
+
+
+def overlapping(shapes):
+    return [
+        (a.element_id, b.element_id)
+        for i, a in enumerate(shapes) for b in shapes[i + 1:]
+        if a.x < b.right and b.x < a.right and a.y < b.bottom and b.y < a.bottom
+    ]
+
+
+class TestLayout:
+    """Test shapes and edges computed from the process graph."""
+
+    @pytest.mark.parametrize("path", BPMN_FILES, ids=lambda p: p.name)
+    def test_sample_diagrams(self, path):
+        semantic = strip_diagram(path.read_text(encoding='utf-8'))
+
+        laid_out = layout_bpmn(semantic)
+        layout = layout_process(process_of(semantic))
+
+        assert "BPMNDiagram" not in semantic
+        assert laid_out.startswith(semantic[:semantic.rindex("</bpmn:definitions>")].rstrip())
+        assert validate_bpmn_graph(laid_out).message == validate_bpmn_graph(path).message
+        nodes = [shape for shape in layout.shapes if shape.kind != "lane"]
+        lanes = [shape for shape in layout.shapes if shape.kind == "lane"]
+        assert overlapping(nodes) == []
+        assert all(any(lane.y <= n.y and n.bottom <= lane.bottom for lane in lanes) for n in nodes)
+        assert len(layout.edges) == laid_out.count("<bpmn:sequenceFlow")
+        for edge in layout.edges:  # Orthogonal segments only
+            for (x1, y1), (x2, y2) in zip(edge.waypoints, edge.waypoints[1:]):
+                assert x1 == x2 or y1 == y2
+
+    def test_replaces_existing_diagram(self):
+        text = BPMN_FILES[0].read_text(encoding='utf-8')
+
+        laid_out = layout_bpmn(text)
+
+        assert laid_out.count("<bpmndi:BPMNDiagram") == 1
+        assert layout_bpmn(laid_out) == laid_out
+
+    def test_adds_namespace_declarations(self):
+        text = HEADER + '<bpmn:startEvent id="S" />' + flow("F", "S", "E") + '<bpmn:endEvent id="E" /></bpmn:process></bpmn:definitions>'
+
+        laid_out = layout_bpmn(text)
+
+        root_tag = re.match(r"<bpmn:definitions[^>]*>", laid_out).group(0)
+        assert 'xmlns:bpmndi="http://www.omg.org/spec/BPMN/20100524/DI"' in root_tag
+        assert 'xmlns:dc=' in root_tag and 'xmlns:di=' in root_tag
+        assert ET.fromstring(laid_out) is not None
+
+    def test_columns_follow_flow_and_loops_route_below(self):
+        text = (HEADER + '<bpmn:startEvent id="S" /><bpmn:task id="A" /><bpmn:exclusiveGateway id="G" />'
+                '<bpmn:task id="B" /><bpmn:endEvent id="E" />'
+                + flow("F1", "S", "A") + flow("F2", "A", "G") + flow("F3", "G", "A") + flow("F4", "G", "B")
+                + flow("F5", "B", "E") + '</bpmn:process></bpmn:definitions>')
+
+        layout = layout_process(process_of(text))
+
+        shapes = layout.index
+        assert shapes["S"].cx < shapes["A"].cx < shapes["G"].cx < shapes["B"].cx < shapes["E"].cx
+        loop = next(edge for edge in layout.edges if edge.element_id == "F3")
+        assert loop.waypoints[0] == (shapes["G"].cx, shapes["G"].bottom)
+        assert loop.waypoints[1][1] > shapes["A"].bottom
+
+    def test_gateway_branches_get_separate_rows(self):
+        text = synthetic_bpmn(3).replace(
+            "</bpmn:process>",
+            '<bpmn:exclusiveGateway id="Split" /><bpmn:task id="Alt" />'
+            + flow("X1", "Start", "Split") + flow("X2", "Split", "Alt") + flow("X3", "Alt", "End")
+            + "</bpmn:process>")
+
+        layout = layout_process(process_of(text))
+
+        assert overlapping([s for s in layout.shapes if s.kind != "lane"]) == []
+
+    def test_nested_lanes_and_boundary_events(self):
+        text = (HEADER + '<bpmn:laneSet id="LS"><bpmn:lane id="Parent"><bpmn:childLaneSet id="CLS">'
+                '<bpmn:lane id="Child1"><bpmn:flowNodeRef>S</bpmn:flowNodeRef><bpmn:flowNodeRef>T</bpmn:flowNodeRef></bpmn:lane>'
+                '<bpmn:lane id="Child2"><bpmn:flowNodeRef>E</bpmn:flowNodeRef></bpmn:lane>'
+                '</bpmn:childLaneSet></bpmn:lane></bpmn:laneSet>'
+                '<bpmn:startEvent id="S" /><bpmn:task id="T" /><bpmn:endEvent id="E" />'
+                '<bpmn:boundaryEvent id="Timer" attachedToRef="T" />'
+                + flow("F1", "S", "T") + flow("F2", "T", "E") + flow("F3", "Timer", "E")
+                + '</bpmn:process></bpmn:definitions>')
+
+        layout = layout_process(process_of(text))
+
+        lanes = {s.element_id: s for s in layout.shapes if s.kind == "lane"}
+        assert lanes["Parent"].y == lanes["Child1"].y and lanes["Parent"].bottom == lanes["Child2"].bottom
+        assert lanes["Child1"].x == lanes["Parent"].x + 30
+        timer, task = layout.index["Timer"], layout.index["T"]
+        assert timer.cy == task.bottom and task.x <= timer.x < task.right
+        assert layout.index["E"].y >= lanes["Child2"].y
+
+    def test_collaboration_pools(self):
+        text = ('<bpmn:definitions xmlns:bpmn="http://www.omg.org/spec/BPMN/20100524/MODEL" id="D">'
+                '<bpmn:collaboration id="C"><bpmn:participant id="Pool1" processRef="P1" />'
+                '<bpmn:participant id="Vendor" /><bpmn:messageFlow id="M" sourceRef="T" targetRef="Vendor" />'
+                '</bpmn:collaboration><bpmn:process id="P1"><bpmn:startEvent id="S" /><bpmn:task id="T" />'
+                '<bpmn:endEvent id="E" />' + flow("F1", "S", "T") + flow("F2", "T", "E")
+                + '</bpmn:process></bpmn:definitions>')
+
+        laid_out = layout_bpmn(text)
+
+        assert 'bpmnElement="C"' in laid_out
+        assert 'bpmnElement="Pool1" isHorizontal="true"' in laid_out
+        assert 'bpmnElement="Vendor" isHorizontal="true"' in laid_out
+        assert '<bpmndi:BPMNEdge id="M_di" bpmnElement="M">' in laid_out
+
+    def test_invalid_xml_raises(self):
+        with pytest.raises(ValueError, match="XML parsing error"):
+            layout_bpmn("<bpmn:definitions")
+
+    def test_missing_close_tag_raises(self):
+        with pytest.raises(ValueError, match="Closing </bpmn:definitions> tag not found"):
+            layout_bpmn('<bpmn:definitions xmlns:bpmn="http://www.omg.org/spec/BPMN/20100524/MODEL" id="D" />')
+
+
+class TestGeneratorLayout:
+    """Test BPMNGenerator with local layout."""
+
+    def test_model_asked_for_semantics_only(self):
+        analysis = Path("outputs/analysis/example-01-ap-analysis-test.md").read_text(encoding='utf-8')
+        semantic = strip_diagram(BPMN_FILES[0].read_text(encoding='utf-8'))
+        component = BPMNGenerator(api_key="test-key")
+        component._client = fake_client(semantic)
+
+        result = component.process(analysis, include_apqc=False)
+
+        user_message = component._client.messages.calls[0]["messages"][0]["content"]
+        assert user_message.endswith(LOCAL_LAYOUT_INSTRUCTION)
+        assert result.success, result.error
+        assert result.metadata["layout"] == "local"
+        assert "<bpmndi:BPMNDiagram" in result.data
+
+    def test_local_layout_can_be_disabled(self):
+        analysis = Path("outputs/analysis/example-01-ap-analysis-test.md").read_text(encoding='utf-8')
+        generated = BPMN_FILES[0].read_text(encoding='utf-8')
+        component = BPMNGenerator(api_key="test-key")
+        component._client = fake_client(generated)
+
+        result = component.process(analysis, include_apqc=False, local_layout=False)
+
+        user_message = component._client.messages.calls[0]["messages"][0]["content"]
+        assert LOCAL_LAYOUT_INSTRUCTION not in user_message
+        assert "layout" not in result.metadata
+        assert result.data == generated.strip()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
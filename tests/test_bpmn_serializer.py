@@ -0,0 +1,149 @@
+"""
+Unit tests for JSON process graphs and the local BPMN serializer.
+"""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from benchmarks.mock_api import MockConfig, MockMessagesAPI
+from src.components.generation.bpmn_generator import BPMNGenerator
+from src.components.generation.bpmn_serializer import (
+    PROCESS_GRAPH_INSTRUCTION, ProcessGraphError, parse_process_graph, process_graph_from_bpmn, serialize_bpmn
+)
+from src.components.generation.bpmn_validation import validate_bpmn_graph
+from src.runtime.client_pool import ClientPool
+from tests.test_components import fake_client
+
+BPMN_FILES = sorted(Path("outputs/bpmn-diagrams").glob("*.bpmn"))
+ANALYSIS = Path("outputs/analysis/example-01-ap-analysis-test.md")
+
+
+def small_graph(**changes):
+    graph = {
+        "name": "Approve Invoice",
+        "lanes": [{"id": "Lane_Clerk", "name": "Clerk"}, {"id": "Lane_Manager", "name": "Manager"}],
+        "nodes": [
+            {"id": "Start", "type": "startEvent", "name": "Invoice <received>", "lane": "Lane_Clerk"},
+            {"id": "Review", "type": "userTask", "name": "3.2.4 Review & Approve", "lane": "Lane_Manager"},
+            {"id": "Approved", "type": "exclusiveGateway", "name": "Approved?", "lane": "Lane_Manager"},
+            {"id": "Timeout", "type": "boundaryEvent", "event": "timer", "attachedTo": "Review"},
+            {"id": "End", "type": "endEvent", "lane": "Lane_Clerk"},
+        ],
+        "flows": [
+            {"source": "Start", "target": "Review"},
+            {"source": "Review", "target": "Approved"},
+            {"source": "Approved", "target": "End", "name": "Yes", "condition": "amount < 10000"},
+            {"source": "Approved", "target": "Review", "name": "No", "default": True},
+            {"source": "Timeout", "target": "End"},
+        ],
+    }
+    graph.update(changes)
+    return graph
+
+
+class TestSerializer:
+    """Test graph validation and XML serialization."""
+
+    def test_serializes_cross_references(self):
+        graph = parse_process_graph(json.dumps(small_graph()))
+
+        xml = serialize_bpmn(graph)
+
+        report = validate_bpmn_graph(xml)
+        assert report.valid and report.warnings == []
+        assert report.message == "Valid BPMN XML - 1 tasks, 1 gateways, 2 lanes, 5 flows"
+        assert [flow["id"] for flow in graph["flows"]] == ["Flow_1", "Flow_2", "Flow_3", "Flow_4", "Flow_5"]
+        assert '<bpmn:exclusiveGateway id="Approved" name="Approved?" default="Flow_4">' in xml
+        assert 'name="Invoice &lt;received&gt;"' in xml and "3.2.4 Review &amp; Approve" in xml
+        assert "<bpmn:timerEventDefinition />" in xml
+        assert '<bpmn:conditionExpression xsi:type="bpmn:tFormalExpression">amount &lt; 10000' in xml
+        assert "<bpmndi:BPMNDiagram" in xml
+        parsed = process_graph_from_bpmn(xml)
+        assert parsed["nodes"][3] == {**graph["nodes"][3], "lane": "Lane_Manager"}
+        assert parsed["flows"] == graph["flows"]
+
+    def test_response_prose_and_fences_are_ignored(self):
+        text = "Here is the graph:\n```json\n" + json.dumps(small_graph()) + "\n```\nDone."
+
+        assert len(parse_process_graph(text)["nodes"]) == 5
+
+    @pytest.mark.parametrize("graph, message", [
+        (small_graph(nodes=[{"id": "Start", "type": "startEvent"}, {"id": "X", "type": "widget"}]),
+         "is not one of"),
+        (small_graph(flows=[{"source": "Start", "target": "Missing"}]), "unknown node 'Missing'"),
+        (small_graph(extra=1), "unexpected property 'extra'"),
+        (small_graph(lanes=[]), "unknown lane 'Lane_Clerk'"),
+        (small_graph(nodes=[{"id": "A", "type": "task"}, {"id": "A", "type": "endEvent"}]), "Duplicate id: A"),
+        (small_graph(nodes=[{"id": "A", "type": "task"}, {"id": "B", "type": "task"}]), "No startEvent node"),
+    ])
+    def test_invalid_graphs(self, graph, message):
+        with pytest.raises(ProcessGraphError, match=message):
+            parse_process_graph(json.dumps(graph))
+
+    def test_invalid_json(self):
+        with pytest.raises(ProcessGraphError, match="JSON parsing error"):
+            parse_process_graph('{"nodes": [')
+        with pytest.raises(ProcessGraphError, match="no JSON object"):
+            parse_process_graph("<bpmn:definitions/>")
+
+    @pytest.mark.parametrize("path", BPMN_FILES, ids=lambda p: p.name)
+    def test_sample_diagrams_round_trip(self, path):
+        text = path.read_text(encoding='utf-8')
+        graph = process_graph_from_bpmn(text)
+
+        compact = json.dumps(graph, separators=(",", ":"))
+        xml = serialize_bpmn(parse_process_graph(compact))
+
+        assert validate_bpmn_graph(xml).message == validate_bpmn_graph(text).message
+        assert len(compact) * 3 < len(text)
+
+
+class TestGeneratorJSONMode:
+    """Test BPMNGenerator with output_format="json"."""
+
+    def test_graph_response_is_serialized(self):
+        component = BPMNGenerator(api_key="test-key")
+        component._client = fake_client(json.dumps(small_graph()))
+
+        result = component.process(ANALYSIS.read_text(encoding='utf-8'), include_apqc=False, output_format="json")
+
+        call = component._client.messages.calls[0]
+        assert call["messages"][0]["content"].endswith(PROCESS_GRAPH_INSTRUCTION)
+        assert "Process Graph JSON Schema" in call["system"][-1]["text"]
+        assert result.success, result.error
+        assert result.data.startswith('<?xml version="1.0"')
+        assert result.metadata["output_format"] == "json"
+        assert "aborted_early" not in result.metadata
+
+    def test_invalid_graph_fails(self):
+        component = BPMNGenerator(api_key="test-key")
+        component._client = fake_client(json.dumps(small_graph(flows=[{"source": "Start", "target": "Nowhere"}])))
+
+        result = component.process(ANALYSIS.read_text(encoding='utf-8'), include_apqc=False, output_format="json")
+
+        assert not result.success
+        assert result.error.startswith("Process graph validation failed")
+
+    def test_unknown_output_format(self):
+        component = BPMNGenerator(api_key="test-key")
+
+        result = component.process(ANALYSIS.read_text(encoding='utf-8'), output_format="yaml")
+
+        assert not result.success
+        assert "output_format" in result.error
+
+    def test_mock_api_round_trip(self):
+        with MockMessagesAPI(MockConfig(time_scale=0.0)) as api:
+            component = BPMNGenerator(api_key="test-key", client_pool=ClientPool(base_url=api.url))
+            analysis = ANALYSIS.read_text(encoding='utf-8')
+
+            as_json = component.process(analysis, include_apqc=False, output_format="json")
+
+        assert as_json.success, as_json.error
+        assert as_json.metadata["response_length"] * 3 < as_json.metadata["xml_length"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
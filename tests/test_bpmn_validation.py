@@ -0,0 +1,215 @@
+"""
+Unit tests for incremental BPMN XML validation.
+"""
+
+from pathlib import Path
+
+import pytest
+
+from src.components.generation.bpmn_generator import BPMNGenerator
+from benchmarks.bpmn_validation import legacy_validate, synthetic_bpmn
+from src.components.generation.bpmn_validation import IncrementalBPMNValidator, validate_bpmn_graph
+from tests.test_components import fake_client
+
+
+BPMN_FILES = sorted(Path("outputs/bpmn-diagrams").glob("*.bpmn"))
+
+
+def feed_all(text: str, chunk_size: int):
+    """Feed text in fixed-size chunks; return (validator, offset of first error)."""
+    validator = IncrementalBPMNValidator()
+    for offset in range(0, len(text), chunk_size):
+        if validator.feed(text[offset:offset + chunk_size]) is not None:
+            return validator, offset
+    return validator, None
+
+
+@pytest.fixture
+def sample_bpmn():
+    return Path("outputs/bpmn-diagrams/example-01-ap.bpmn").read_text(encoding='utf-8')
+
+
+class TestIncrementalValidator:
+    """Test streamed validation of BPMN text."""
+
+    @pytest.mark.parametrize("path", BPMN_FILES, ids=lambda p: p.name)
+    @pytest.mark.parametrize("chunk_size", [1, 13, 4096])
+    def test_valid_diagrams_with_prose_and_fences(self, path, chunk_size):
+        text = f"Here is the diagram:\n```xml\n{path.read_text(encoding='utf-8')}\n```\nNotes follow."
+
+        validator, error_offset = feed_all(text, chunk_size)
+
+        assert error_offset is None, validator.error
+        assert validator.process_count == 1
+
+    @pytest.mark.parametrize("fence", ["```xml\n", "```\n", ""])
+    @pytest.mark.parametrize("chunk_size", [1, 7, 4096])
+    def test_prose_with_angle_brackets_is_skipped(self, sample_bpmn, fence, chunk_size):
+        closing = "\n```" if fence else ""
+        text = (f"The diagram has <10 tasks for the <Accounts Payable> process.\n{fence}"
+                f"{sample_bpmn}{closing}\nDone.")
+
+        validator, error_offset = feed_all(text, chunk_size)
+
+        assert error_offset is None, validator.error
+        assert validator.process_count == 1
+        assert validator.text.startswith("<?xml")
+
+    def test_wrong_namespace_detected_at_root(self, sample_bpmn):
+        text = sample_bpmn.replace("http://www.omg.org/spec/BPMN/20100524/MODEL", "http://example.com/x", 1)
+
+        validator, error_offset = feed_all(text, 50)
+
+        assert "Invalid BPMN namespace" in validator.error
+        assert error_offset < 1000
+
+    def test_malformed_xml(self, sample_bpmn):
+        text = sample_bpmn.replace('<bpmn:task id="Activity_2', '<bpmn:task id="Activity_2" <')
+
+        validator, error_offset = feed_all(text, 50)
+
+        assert validator.error.startswith("XML parsing error")
+        assert error_offset < len(text) // 2
+
+    def test_dangling_sequence_flow_reference(self, sample_bpmn):
+        text = sample_bpmn.replace('targetRef="Activity_1_ReceiveInvoice"', 'targetRef="Missing"')
+
+        validator, error_offset = feed_all(text, 50)
+
+        assert "references unknown element 'Missing'" in validator.error
+        # Detected when the process closes, before the diagram section streams
+        assert error_offset < sample_bpmn.index("bpmndi:BPMNDiagram")
+
+    def test_unknown_incoming_flow(self, sample_bpmn):
+        text = sample_bpmn.replace("<bpmn:outgoing>Flow_1</bpmn:outgoing>", "<bpmn:outgoing>Flow_X</bpmn:outgoing>")
+
+        validator, _ = feed_all(text, 50)
+
+        assert "unknown sequence flow 'Flow_X'" in validator.error
+
+    def test_diagram_before_process(self):
+        text = ('<bpmn:definitions xmlns:bpmn="http://www.omg.org/spec/BPMN/20100524/MODEL" '
+                'xmlns:bpmndi="http://www.omg.org/spec/BPMN/20100524/DI">'
+                '<bpmndi:BPMNDiagram id="d">' + ' ' * 40)
+
+        validator, _ = feed_all(text, 10)
+
+        assert "before any process" in validator.error
+
+
+class TestEarlyAbort:
+    """Test that BPMNGenerator cancels the stream on invalid output."""
+
+    def test_generation_aborted_early(self, sample_bpmn):
+        analysis = Path("outputs/analysis/example-01-ap-analysis-test.md").read_text(encoding='utf-8')
+        invalid = sample_bpmn.replace("http://www.omg.org/spec/BPMN/20100524/MODEL", "http://example.com/x", 1)
+        component = BPMNGenerator(api_key="test-key")
+        component._client = fake_client(invalid)
+        deltas = []
+
+        result = component.process(analysis, on_text=deltas.append)
+
+        assert not result.success
+        assert result.metadata["aborted_early"] is True
+        assert "Invalid BPMN namespace" in result.error
+        assert result.metadata["aborted_after_chars"] < len(invalid)
+        assert len("".join(deltas)) < len(invalid)
+
+    def test_prose_preamble_is_not_aborted(self, sample_bpmn):
+        analysis = Path("outputs/analysis/example-01-ap-analysis-test.md").read_text(encoding='utf-8')
+        component = BPMNGenerator(api_key="test-key")
+        component._client = fake_client(f"The diagram has <10 tasks:\n```xml\n{sample_bpmn}\n```")
+
+        result = component.process(analysis, on_text=lambda _: None)
+
+        assert result.success, result.error
+        assert not result.metadata.get("aborted_early")
+
+    def test_early_abort_can_be_disabled(self, sample_bpmn):
+        analysis = Path("outputs/analysis/example-01-ap-analysis-test.md").read_text(encoding='utf-8')
+        component = BPMNGenerator(api_key="test-key")
+        component._client = fake_client(sample_bpmn)
+
+        result = component.process(analysis, early_abort=False)
+
+        assert result.success
+        assert "streamed" not in result.metadata
+
+
+class TestGraphValidator:
+    """Test the single-pass process graph validator."""
+
+    @pytest.mark.parametrize("path", BPMN_FILES, ids=lambda p: p.name)
+    def test_sample_diagrams_match_legacy_message(self, path):
+        text = path.read_text(encoding='utf-8')
+
+        report = validate_bpmn_graph(text)
+
+        assert report.valid, report.errors
+        assert report.message == legacy_validate(text)[1]
+        assert validate_bpmn_graph(path) == report
+
+    def test_synthetic_diagram_is_clean(self):
+        report = validate_bpmn_graph(synthetic_bpmn(1000), chunk_size=4096)
+
+        assert report.valid and report.warnings == []
+        assert report.counts["tasks"] == 1000
+
+    def test_dangling_reference_is_error(self, sample_bpmn):
+        text = sample_bpmn.replace('targetRef="Activity_1_ReceiveInvoice"', 'targetRef="Missing"')
+
+        report = validate_bpmn_graph(text)
+
+        assert not report.valid
+        assert "references unknown element 'Missing'" in report.message
+
+    def test_unreachable_node_warns(self):
+        text = synthetic_bpmn(3).replace("</bpmn:process>", '<bpmn:task id="Orphan" /></bpmn:process>')
+
+        report = validate_bpmn_graph(text)
+
+        assert report.valid
+        assert any("unreachable" in w and "Orphan" in w for w in report.warnings)
+        assert any("not assigned to any lane: Orphan" in w for w in report.warnings)
+
+    def test_unconditioned_gateway_branch_warns(self):
+        text = synthetic_bpmn(10).replace(
+            '<bpmn:conditionExpression xsi:type="bpmn:tFormalExpression">ok</bpmn:conditionExpression>', "")
+
+        report = validate_bpmn_graph(text)
+
+        assert any("Gateway_9 has outgoing flows without conditions" in w for w in report.warnings)
+
+    def test_lane_and_flow_list_mismatches_warn(self):
+        text = synthetic_bpmn(3)
+        text = text.replace("<bpmn:flowNodeRef>Task_1</bpmn:flowNodeRef>", "<bpmn:flowNodeRef>Ghost</bpmn:flowNodeRef>")
+        text = text.replace("<bpmn:incoming>Flow_1</bpmn:incoming>", "")
+
+        report = validate_bpmn_graph(text)
+
+        assert report.valid
+        assert "Lane Lane_1 references unknown element 'Ghost'" in report.warnings
+        assert "Sequence flow Flow_1 is missing from Task_1's incoming list" in report.warnings
+
+    def test_legacy_error_messages(self, sample_bpmn):
+        wrong_ns = sample_bpmn.replace(
+            "http://www.omg.org/spec/BPMN/20100524/MODEL", "http://example.com/x", 1)
+
+        assert validate_bpmn_graph(wrong_ns).message == legacy_validate(wrong_ns)[1]
+        assert validate_bpmn_graph(sample_bpmn[:-40]).message.startswith("XML parsing error:")
+        assert validate_bpmn_graph(sample_bpmn.replace("bpmn:endEvent", "bpmn:task")).message == "No end event found"
+
+    def test_generator_reports_warnings(self, sample_bpmn):
+        analysis = Path("outputs/analysis/example-01-ap-analysis-test.md").read_text(encoding='utf-8')
+        component = BPMNGenerator(api_key="test-key")
+        component._client = fake_client(sample_bpmn)
+
+        result = component.process(analysis, include_apqc=False)
+
+        assert result.success
+        assert result.metadata["validation"].startswith("Valid BPMN XML")
+        assert result.metadata["validation_warnings"] == validate_bpmn_graph(sample_bpmn).warnings
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
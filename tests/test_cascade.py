@@ -0,0 +1,172 @@
+"""
+Unit tests for model cascades.
+"""
+
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from benchmarks.mock_api import MockConfig, MockMessagesAPI
+from src.batch import _token_usage
+from src.components.generation.bpmn_generator import BPMNGenerator
+from src.components.input.transcript_processor import TranscriptProcessor
+from src.components.optimization.recommendation_engine import RecommendationEngine
+from src.interfaces import ComponentResult, ModelCascade
+from src.main import FAST_MODEL, create_full_pipeline
+from src.pipeline import Pipeline, StreamingOutputWriter
+from src.runtime.client_pool import ClientPool
+from tests.test_components import AsyncRoutingMessages, RoutingMessages
+
+ANALYSIS = Path("outputs/analysis/example-01-ap-analysis-test.md")
+BPMN = Path("outputs/bpmn-diagrams/example-01-ap.bpmn")
+TRANSCRIPT = Path("data/sample-transcripts/ap-process.txt")
+
+FAST, LARGE = "fast-model", "large-model"
+
+
+def cascade_of(component_class, texts, asynchronous=False):
+    component = component_class(api_key="test-key", model=LARGE)
+    messages = (AsyncRoutingMessages if asynchronous else RoutingMessages)(lambda request: texts[request["model"]])
+    if asynchronous:
+        component._async_client = SimpleNamespace(messages=messages)
+    else:
+        component._client = SimpleNamespace(messages=messages)
+    return ModelCascade(component, [FAST, LARGE]), messages
+
+
+class TestModelCascade:
+    """Test tier selection and escalation."""
+
+    def test_first_tier_serves_routine_input(self):
+        analysis = ANALYSIS.read_text(encoding='utf-8')
+        cascade, messages = cascade_of(TranscriptProcessor, {FAST: analysis, LARGE: analysis})
+
+        result = cascade.process(TRANSCRIPT.read_text(encoding='utf-8'))
+
+        assert result.success, result.error
+        assert messages.models == [FAST]
+        assert result.metadata["cascade"] == {
+            "tier": 0, "model": FAST, "models": [FAST, LARGE], "escalations": [],
+            "usage": {"input_tokens": 100, "output_tokens": 50, "cache_creation_input_tokens": 0,
+                      "cache_read_input_tokens": 300}
+        }
+        assert cascade.component_name == "Transcript Analysis"
+        assert cascade.model == LARGE
+
+    def test_invalid_output_escalates(self):
+        cascade, messages = cascade_of(BPMNGenerator, {FAST: "<bpmn:definitions", LARGE: BPMN.read_text(encoding='utf-8')})
+
+        result = cascade.process(ANALYSIS.read_text(encoding='utf-8'), include_apqc=False, local_layout=False)
+
+        assert result.success, result.error
+        assert messages.models == [FAST, LARGE]
+        assert result.metadata["cascade"]["tier"] == 1
+        escalation, = result.metadata["cascade"]["escalations"]
+        assert escalation["model"] == FAST
+        assert escalation["reason"].startswith("BPMN validation failed")
+
+    def test_rejected_tiers_count_toward_usage(self):
+        analysis = ANALYSIS.read_text(encoding='utf-8')
+        cascade, messages = cascade_of(TranscriptProcessor, {FAST: "# Analysis\n\n## Executive Summary\nDone.",
+                                                             LARGE: analysis})
+        pipeline = Pipeline(name="Cascade")
+        pipeline.add_component(cascade, config={})
+
+        result = pipeline.execute(TRANSCRIPT.read_text(encoding='utf-8'))
+
+        assert result.success, result.errors
+        assert messages.models == [FAST, LARGE]
+        metadata = result.metadata["Transcript Analysis"]
+        assert (metadata["input_tokens"], metadata["output_tokens"]) == (200, 100)
+        assert metadata["cascade"]["usage"]["input_tokens"] == 100
+        assert result.metadata["prompt_cache"]["cache_read_input_tokens"] == 600
+        assert _token_usage(result) == (200, 100)
+
+    def test_quality_warning_escalates_until_last_tier(self):
+        incomplete = "## Executive Summary\nShort."
+        cascade, messages = cascade_of(RecommendationEngine, {FAST: incomplete, LARGE: incomplete})
+        restarts = []
+
+        result = cascade.process(ANALYSIS.read_text(encoding='utf-8'), on_escalate=lambda: restarts.append(1))
+
+        assert result.success
+        assert messages.models == [FAST, LARGE]
+        assert result.metadata["warning"].startswith("Recommendations missing sections")
+        assert result.metadata["cascade"]["tier"] == 1
+        assert restarts == [1]
+
+    def test_incomplete_analysis_escalates(self):
+        analysis = ANALYSIS.read_text(encoding='utf-8')
+        cascade, messages = cascade_of(TranscriptProcessor, {FAST: "# Analysis\n\n## Executive Summary\nDone.",
+                                                             LARGE: analysis})
+
+        result = cascade.process(TRANSCRIPT.read_text(encoding='utf-8'))
+
+        assert messages.models == [FAST, LARGE]
+        assert result.metadata["cascade"]["escalations"][0]["reason"].startswith("Analysis missing sections")
+
+    def test_invalid_input_is_not_escalated(self):
+        cascade, messages = cascade_of(TranscriptProcessor, {})
+
+        result = cascade.process("too short")
+
+        assert not result.success
+        assert result.error.startswith("Validation error")
+        assert messages.calls == []
+        assert "cascade" not in result.metadata
+
+    @pytest.mark.asyncio
+    async def test_async_escalation(self):
+        cascade, messages = cascade_of(BPMNGenerator, {FAST: "<bpmn:definitions", LARGE: BPMN.read_text(encoding='utf-8')},
+                                       asynchronous=True)
+
+        result = await cascade.aprocess(ANALYSIS.read_text(encoding='utf-8'), include_apqc=False, local_layout=False)
+
+        assert result.success, result.error
+        assert messages.models == [FAST, LARGE]
+        assert result.metadata["cascade"]["model"] == LARGE
+
+    def test_only_structural_bpmn_warnings_escalate(self):
+        component = BPMNGenerator(api_key="test-key")
+
+        def reason(*warnings):
+            return component.escalation_reason(ComponentResult(True, "", {"validation_warnings": list(warnings)}))
+
+        assert reason("Sequence flow Flow_1 is missing from Task_1's incoming list") is None
+        assert reason("Elements unreachable from a start event: Task_9").startswith("BPMN validation warnings")
+
+    def test_needs_a_model(self):
+        with pytest.raises(ValueError, match="at least one model"):
+            ModelCascade(TranscriptProcessor(api_key="test-key"), [])
+
+
+class TestPipelineCascade:
+    """Test create_full_pipeline(cascade=True)."""
+
+    def test_mock_api_run_stays_on_fast_tiers(self):
+        with MockMessagesAPI(MockConfig(time_scale=0.0)) as api:
+            pipeline = create_full_pipeline(api_key="test-key", client_pool=ClientPool(base_url=api.url), cascade=True)
+
+            result = pipeline.execute(TRANSCRIPT.read_text(encoding='utf-8'))
+
+        assert result.success, result.errors
+        tiers = {name: result.metadata[name]["cascade"] for name in result.outputs}
+        assert tiers["Transcript Analysis"]["model"] == FAST_MODEL
+        assert tiers["BPMN Generation"]["model"] == FAST_MODEL
+        assert tiers["Process Optimization"]["model"] == "claude-sonnet-4-5-20250929"
+        assert all(tier["escalations"] == [] for tier in tiers.values())
+
+    def test_stream_restarts_on_escalation(self, tmp_path):
+        writer = StreamingOutputWriter(tmp_path, "BPMN Generation")
+        writer.write("rejected draft")
+
+        writer.restart()
+        writer.write("final")
+        writer.close()
+
+        assert writer.path.read_text(encoding='utf-8') == "final"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,151 @@
+"""
+Unit tests for record/replay cassettes.
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from src.components.generation.bpmn_generator import BPMNGenerator
+from src.components.input.transcript_processor import TranscriptProcessor
+from src.runtime.cassette import Cassette
+from tests.test_components import fake_client, sample_analysis, sample_bpmn, sample_transcript  # noqa: F401 (fixtures)
+
+
+def offline_client():
+    """Client that fails every call, proving replays make no API requests."""
+    def fail(**kwargs):
+        raise AssertionError("API called during replay")
+    return SimpleNamespace(messages=SimpleNamespace(create=fail, stream=fail))
+
+
+class TestCassette:
+    """Test recording and replaying component API calls."""
+
+    def record_analysis(self, path, transcript, analysis, **kwargs):
+        cassette = Cassette(path, mode="record")
+        component = TranscriptProcessor(api_key="test-key", cassette=cassette)
+        component._client = fake_client(analysis)
+        result = component.process(transcript, **kwargs)
+        cassette.close()
+        return result
+
+    def test_replay_serves_recorded_response(self, tmp_path, sample_transcript, sample_analysis):
+        path = tmp_path / "run.jsonl.gz"
+        recorded = self.record_analysis(path, sample_transcript, sample_analysis)
+
+        cassette = Cassette(path)
+        component = TranscriptProcessor(api_key="test-key", cassette=cassette)
+        component._client = offline_client()
+        replayed = component.process(sample_transcript)
+
+        assert replayed.success
+        assert replayed.data == recorded.data
+        assert replayed.metadata["input_tokens"] == recorded.metadata["input_tokens"]
+        assert replayed.metadata["cassette"] == "replay"
+        assert cassette.stats() == {"recorded": 0, "replayed": 1, "misses": 0}
+
+    def test_streamed_replay_calls_on_text_in_chunks(self, tmp_path, sample_transcript, sample_analysis):
+        path = tmp_path / "run.jsonl.gz"
+        self.record_analysis(path, sample_transcript, sample_analysis, on_text=lambda delta: None)
+
+        component = TranscriptProcessor(api_key="test-key", cassette=Cassette(path))
+        component._client = offline_client()
+        deltas = []
+        result = component.process(sample_transcript, on_text=deltas.append)
+
+        assert result.success
+        assert len(deltas) > 1
+        assert "".join(deltas) == sample_analysis
+
+    def test_unrecorded_request_fails(self, tmp_path, sample_transcript, sample_analysis):
+        path = tmp_path / "run.jsonl.gz"
+        self.record_analysis(path, sample_transcript, sample_analysis)
+
+        component = TranscriptProcessor(api_key="test-key", cassette=Cassette(path))
+        component._client = offline_client()
+        result = component.process(sample_transcript + "\nSomething new was said.")
+
+        assert not result.success
+        assert "No recorded response" in result.error
+
+    def test_aborted_stream_replays_the_abort(self, tmp_path, sample_analysis, sample_bpmn):
+        path = tmp_path / "run.jsonl.gz"
+        invalid = sample_bpmn.replace("http://www.omg.org/spec/BPMN/20100524/MODEL", "http://example.com/x", 1)
+
+        cassette = Cassette(path, mode="record")
+        component = BPMNGenerator(api_key="test-key", cassette=cassette)
+        component._client = fake_client(invalid)
+        assert component.process(sample_analysis).metadata["aborted_early"]
+        cassette.close()
+
+        component = BPMNGenerator(api_key="test-key", cassette=Cassette(path))
+        component._client = offline_client()
+        result = component.process(sample_analysis)
+
+        assert not result.success
+        assert result.metadata["aborted_early"]
+        assert "Invalid BPMN namespace" in result.error
+
+    def test_recorded_timing_replays_pace(self, tmp_path, monkeypatch):
+        path = tmp_path / "run.jsonl.gz"
+        cassette = Cassette(path, mode="record")
+        cassette.record("key", "model", "x" * 200, {"time_to_first_token": 0.5}, duration=1.5)
+        cassette.close()
+        sleeps = []
+        monkeypatch.setattr("src.runtime.cassette.time.sleep", sleeps.append)
+
+        deltas = []
+        text, metadata = Cassette(path, timing="recorded").replay("key", on_text=deltas.append)
+
+        assert text == "x" * 200
+        assert len(deltas) == 4
+        assert sleeps[0] == 0.5
+        assert sum(sleeps) == pytest.approx(1.5)
+
+    @pytest.mark.asyncio
+    async def test_async_replay(self, tmp_path, sample_transcript, sample_analysis):
+        path = tmp_path / "run.jsonl.gz"
+        self.record_analysis(path, sample_transcript, sample_analysis)
+
+        component = TranscriptProcessor(api_key="test-key", cassette=Cassette(path))
+        component._async_client = offline_client()
+        result = await component.aprocess(sample_transcript)
+
+        assert result.success
+        assert str(result.data) == sample_analysis
+
+    def test_invalid_mode(self, tmp_path):
+        with pytest.raises(ValueError):
+            Cassette(tmp_path / "x.jsonl.gz", mode="rewind")
+
+
+class TestBatchCassetteCLI:
+    """Test recording a batch run and replaying it offline."""
+
+    def test_record_then_replay_batch(self, tmp_path, monkeypatch):
+        from benchmarks.mock_api import MockConfig, MockMessagesAPI
+        from src.main import run_batch_cli
+        from src.runtime.client_pool import ClientPool, set_client_pool
+
+        transcripts = tmp_path / "transcripts"
+        transcripts.mkdir()
+        (transcripts / "ap.txt").write_text("Clerk: We receive invoices by email and key them in. " * 5, encoding='utf-8')
+        cassette = tmp_path / "run.jsonl.gz"
+        metrics = tmp_path / "metrics.jsonl"
+        monkeypatch.setenv("ANTHROPIC_API_KEY", "test-key")
+
+        with MockMessagesAPI(MockConfig(time_scale=0.0)) as api:
+            previous = set_client_pool(ClientPool(base_url=api.url))
+            try:
+                assert run_batch_cli([str(transcripts), "--output-dir", str(tmp_path / "recorded"),
+                                      "--record", str(cassette), "--metrics-jsonl", str(metrics)]) == 0
+            finally:
+                set_client_pool(previous)
+            requests = api.requests
+
+        monkeypatch.delenv("ANTHROPIC_API_KEY")
+        assert run_batch_cli([str(transcripts), "--output-dir", str(tmp_path / "replayed"),
+                              "--replay", str(cassette)]) == 0
+        assert len(Cassette(cassette)) == requests
+        assert metrics.read_text(encoding='utf-8').strip()
@@ -0,0 +1,90 @@
+"""
+Unit tests for the shared API client pool.
+"""
+
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from src.components.input.transcript_processor import TranscriptProcessor
+from src.components.generation.bpmn_generator import BPMNGenerator
+from src.runtime.client_pool import ClientPool
+
+
+def recording_factory():
+    """Return a client factory that records every client it creates."""
+    created = []
+
+    def factory(settings, asynchronous):
+        client = SimpleNamespace(settings=settings, asynchronous=asynchronous)
+        created.append(client)
+        return client
+
+    return factory, created
+
+
+class TestClientPool:
+    """Test client sharing and keying."""
+
+    def test_components_share_one_client(self):
+        factory, created = recording_factory()
+        pool = ClientPool(client_factory=factory)
+
+        first = TranscriptProcessor(api_key="key-a", client_pool=pool)
+        second = BPMNGenerator(api_key="key-a", client_pool=pool)
+
+        assert first._get_client() is second._get_client()
+        assert len(created) == 1
+        assert pool.stats()["reused"] == 1
+
+    def test_clients_keyed_by_api_key_and_settings(self):
+        factory, created = recording_factory()
+        pool = ClientPool(max_connections=8, base_url="http://localhost:9000", client_factory=factory)
+
+        a = pool.get_client("key-a")
+        b = pool.get_client("key-b")
+        no_retries = pool.get_client("key-a", max_retries=0)
+
+        assert len({id(a), id(b), id(no_retries)}) == 3
+        assert a.settings.max_connections == 8
+        assert a.settings.base_url == "http://localhost:9000"
+        assert no_retries.settings.max_retries == 0
+
+    def test_concurrent_threads_create_one_client(self):
+        factory, created = recording_factory()
+        pool = ClientPool(client_factory=factory)
+        clients = []
+
+        def worker():
+            clients.append(pool.get_client("key-a"))
+
+        threads = [threading.Thread(target=worker) for _ in range(16)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(created) == 1
+        assert all(client is created[0] for client in clients)
+
+    def test_async_clients_are_per_event_loop(self):
+        factory, created = recording_factory()
+        pool = ClientPool(client_factory=factory)
+        component = TranscriptProcessor(api_key="key-a", client_pool=pool)
+
+        async def get_twice():
+            return component._get_async_client(), component._get_async_client()
+
+        first_loop = asyncio.run(get_twice())
+        second_loop = asyncio.run(get_twice())
+
+        assert first_loop[0] is first_loop[1]
+        assert first_loop[0] is not second_loop[0]
+        assert all(client.asynchronous for client in created)
+
+    def test_async_client_requires_running_loop(self):
+        pool = ClientPool(client_factory=recording_factory()[0])
+        with pytest.raises(RuntimeError):
+            pool.get_async_client("key-a")
@@ -0,0 +1,307 @@
+"""
+Unit tests for components with a mocked Anthropic client.
+
+These tests exercise request building and result handling without network
+access by injecting fake sync/async clients.
+"""
+
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from src.components.input.transcript_processor import TranscriptProcessor
+from src.components.generation.bpmn_generator import BPMNGenerator
+from src.components.optimization.recommendation_engine import RecommendationEngine
+
+
+ANALYSIS_PATH = Path("outputs/analysis/example-01-ap-analysis-test.md")
+BPMN_PATH = Path("outputs/bpmn-diagrams/example-01-ap.bpmn")
+TRANSCRIPT_PATH = Path("data/sample-transcripts/ap-process.txt")
+
+
+def _response(text: str, input_tokens: int = 100, output_tokens: int = 50):
+    """Build an object shaped like an Anthropic Messages API response."""
+    return SimpleNamespace(
+        content=[SimpleNamespace(type="text", text=text)],
+        usage=SimpleNamespace(
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            cache_creation_input_tokens=0,
+            cache_read_input_tokens=300
+        )
+    )
+
+
+def _chunks(text: str, size: int = 64):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+class FakeStream:
+    """Context manager shaped like the SDK's MessageStream."""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.text_stream = iter(_chunks(text))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def get_final_message(self):
+        return _response(self.text)
+
+
+class FakeAsyncStream:
+    """Async context manager shaped like the SDK's AsyncMessageStream."""
+
+    def __init__(self, text: str):
+        self.text = text
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    @property
+    def text_stream(self):
+        async def deltas():
+            for chunk in _chunks(self.text):
+                yield chunk
+        return deltas()
+
+    async def get_final_message(self):
+        return _response(self.text)
+
+
+class RoutingMessages:
+    """Records create()/stream() calls and answers each with ``respond(request_kwargs)``."""
+
+    def __init__(self, respond):
+        self.respond = respond
+        self.calls = []
+
+    @property
+    def models(self):
+        return [call["model"] for call in self.calls]
+
+    def create(self, **kwargs):
+        self.calls.append(kwargs)
+        return _response(self.respond(kwargs))
+
+    def stream(self, **kwargs):
+        self.calls.append(kwargs)
+        return FakeStream(self.respond(kwargs))
+
+
+class AsyncRoutingMessages(RoutingMessages):
+    """Async variant of RoutingMessages."""
+
+    async def create(self, **kwargs):
+        self.calls.append(kwargs)
+        return _response(self.respond(kwargs))
+
+    def stream(self, **kwargs):
+        self.calls.append(kwargs)
+        return FakeAsyncStream(self.respond(kwargs))
+
+
+class FakeMessages(RoutingMessages):
+    """Records create()/stream() calls and returns a canned response."""
+
+    def __init__(self, text: str):
+        super().__init__(lambda _: text)
+        self.text = text
+
+
+class FakeAsyncMessages(AsyncRoutingMessages):
+    """Async variant of FakeMessages."""
+
+    def __init__(self, text: str):
+        super().__init__(lambda _: text)
+        self.text = text
+
+
+def fake_client(text: str, asynchronous: bool = False):
+    """Create a fake client whose messages.create returns ``text``."""
+    messages = FakeAsyncMessages(text) if asynchronous else FakeMessages(text)
+    return SimpleNamespace(messages=messages)
+
+
+@pytest.fixture
+def sample_analysis():
+    return ANALYSIS_PATH.read_text(encoding='utf-8')
+
+
+@pytest.fixture
+def sample_bpmn():
+    return BPMN_PATH.read_text(encoding='utf-8')
+
+
+@pytest.fixture
+def sample_transcript():
+    return TRANSCRIPT_PATH.read_text(encoding='utf-8')
+
+
+class TestSyncComponents:
+    """Test process() against a fake client."""
+
+    def test_transcript_processor(self, sample_transcript, sample_analysis):
+        component = TranscriptProcessor(api_key="test-key")
+        component._client = fake_client(sample_analysis)
+
+        result = component.process(sample_transcript)
+
+        assert result.success
+        assert "## Process Steps" in result.data
+        assert result.metadata["input_tokens"] == 100
+        call = component._client.messages.calls[0]
+        assert sample_transcript in call["messages"][0]["content"]
+
+    def test_bpmn_generator_strips_code_fence(self, sample_analysis, sample_bpmn):
+        component = BPMNGenerator(api_key="test-key")
+        component._client = fake_client(f"Here you go:\n```xml\n{sample_bpmn}\n```")
+
+        result = component.process(sample_analysis)
+
+        assert result.success, result.error
+        assert result.data.startswith("<?xml")
+        assert "Valid BPMN XML" in result.metadata["validation"]
+
+    def test_bpmn_generator_invalid_xml(self, sample_analysis):
+        component = BPMNGenerator(api_key="test-key")
+        component._client = fake_client("<not-bpmn/>")
+
+        result = component.process(sample_analysis)
+
+        assert not result.success
+        assert "BPMN validation failed" in result.error
+
+    def test_api_failure_is_processing_error(self, sample_analysis):
+        component = RecommendationEngine(api_key="test-key")
+        component._client = SimpleNamespace(messages=None)
+
+        result = component.process(sample_analysis)
+
+        assert not result.success
+        assert result.error.startswith("Processing error: Claude API call failed")
+
+
+class TestPromptCaching:
+    """Test the system message layout and cache metrics."""
+
+    def test_skill_prompt_and_last_reference_block_are_breakpoints(self, sample_transcript, sample_analysis):
+        component = TranscriptProcessor(api_key="test-key")
+        component._client = fake_client(sample_analysis)
+
+        result = component.process(
+            sample_transcript,
+            domain_knowledge=["example-01-ap-analysis.md", "example-02-onboarding-analysis.md",
+                              "example-03-po-approval-analysis.md", "README.md"]
+        )
+
+        system = component._client.messages.calls[0]["system"]
+        breakpoints = [i for i, block in enumerate(system) if "cache_control" in block]
+        assert breakpoints == [0, len(system) - 1]
+        assert system[0]["text"] == component._load_skill_prompt()
+        assert result.metadata["cache_read_input_tokens"] == 300
+        assert result.metadata["cache_creation_input_tokens"] == 0
+
+    def test_pipeline_hit_ratio(self, sample_transcript, sample_analysis):
+        from src.pipeline import Pipeline
+
+        component = TranscriptProcessor(api_key="test-key")
+        component._client = fake_client(sample_analysis)
+        pipeline = Pipeline(name="cache metrics")
+        pipeline.add_component(component)
+
+        result = pipeline.execute(sample_transcript)
+
+        assert result.metadata["prompt_cache"]["cache_read_input_tokens"] == 300
+        assert result.metadata["prompt_cache"]["hit_ratio"] == 0.75
+
+
+class TestStreaming:
+    """Test streamed responses."""
+
+    def test_stream_deltas_and_time_to_first_token(self, sample_analysis, sample_bpmn):
+        component = BPMNGenerator(api_key="test-key")
+        component._client = fake_client(f"```xml\n{sample_bpmn}\n```")
+        deltas = []
+
+        result = component.process(sample_analysis, on_text=deltas.append)
+
+        assert result.success, result.error
+        assert len(deltas) > 1
+        assert "".join(deltas).startswith("```xml")
+        assert result.metadata["streamed"] is True
+        assert result.metadata["time_to_first_token"] >= 0
+
+    @pytest.mark.asyncio
+    async def test_async_stream(self, sample_transcript, sample_analysis):
+        component = TranscriptProcessor(api_key="test-key")
+        component._async_client = fake_client(sample_analysis, asynchronous=True)
+        deltas = []
+
+        result = await component.aprocess(sample_transcript, on_text=deltas.append)
+
+        assert result.success
+        assert "".join(deltas) == sample_analysis
+        assert result.metadata["streamed"] is True
+
+    def test_pipeline_streams_to_output_file(self, tmp_path, sample_transcript, sample_analysis):
+        from src.pipeline import Pipeline
+
+        component = TranscriptProcessor(api_key="test-key")
+        component._client = fake_client(sample_analysis)
+        pipeline = Pipeline(name="streaming")
+        pipeline.add_component(component)
+
+        result = pipeline.execute(sample_transcript, stream_dir=tmp_path)
+
+        assert result.success
+        streamed = (tmp_path / "transcript-analysis-analysis.md").read_text(encoding='utf-8')
+        assert streamed == sample_analysis
+
+
+class TestAsyncComponents:
+    """Test aprocess() against a fake async client."""
+
+    @pytest.mark.asyncio
+    async def test_transcript_processor(self, sample_transcript, sample_analysis):
+        component = TranscriptProcessor(api_key="test-key")
+        component._async_client = fake_client(sample_analysis, asynchronous=True)
+
+        result = await component.aprocess(sample_transcript)
+
+        assert result.success
+        assert "## Process Steps" in result.data
+
+    @pytest.mark.asyncio
+    async def test_recommendation_engine(self, sample_analysis):
+        component = RecommendationEngine(api_key="test-key")
+        component._async_client = fake_client(
+            "## Executive Summary\n## Quick Wins\n## Implementation Roadmap", asynchronous=True)
+
+        result = await component.aprocess(sample_analysis, business_context="Budget: $200K")
+
+        assert result.success
+        assert result.metadata["warning"] is None
+        user_message = component._async_client.messages.calls[0]["messages"][0]["content"]
+        assert "Budget: $200K" in user_message
+
+    @pytest.mark.asyncio
+    async def test_validation_error(self):
+        component = BPMNGenerator(api_key="test-key")
+
+        result = await component.aprocess("# Some analysis")
+
+        assert not result.success
+        assert "missing required section" in result.error.lower()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,138 @@
+"""
+Unit tests for domain knowledge chunking and BM25 retrieval.
+"""
+
+import os
+from pathlib import Path
+
+import pytest
+
+from src.components.generation.bpmn_generator import BPMNGenerator
+from src.components.input.transcript_processor import TranscriptProcessor
+from src.skills.knowledge_index import KnowledgeIndex, chunk_document, tokenize
+from src.skills.skill_manager import SkillManager, get_skill_manager
+from src.skills.skill_registry import SkillRegistry
+from tests.test_components import fake_client
+
+APQC = Path("skills/bpmn-generation/domain-knowledge/apqc-activities.md")
+ANALYSIS = Path("outputs/analysis/example-03-po-approval-analysis-test.md")
+TRANSCRIPT = Path("data/sample-transcripts/ap-process.txt")
+
+
+class TestChunking:
+    """Test splitting files into chunks."""
+
+    def test_markdown_sections_keep_heading_path(self):
+        chunks = chunk_document(APQC.read_text(encoding='utf-8'), "apqc-activities.md")
+
+        receive = next(c for c in chunks if "3.2.1" in c.heading)
+        assert receive.heading == ("APQC Level 4 Activities Reference > Finance - Accounts Payable"
+                                   " > 3.2.1 Receive Vendor Invoice")
+        assert receive.text.startswith("### 3.2.1 Receive Vendor Invoice")
+        assert "3.2.2" not in receive.text
+        assert not any(c.heading.endswith("Finance - Accounts Payable") for c in chunks)
+        assert [c.position for c in chunks] == list(range(len(chunks)))
+
+    def test_plain_text_is_split_into_paragraph_groups(self):
+        text = TRANSCRIPT.read_text(encoding='utf-8')
+
+        chunks = chunk_document(text, "transcript.txt", max_chars=1500)
+
+        assert len(chunks) > 1
+        assert all(len(c.text) <= 1500 or "\n\n" not in c.text for c in chunks)
+        assert "".join(c.text for c in chunks).replace("\n", "") == "".join(text.split("\n\n")).replace("\n", "")
+
+    def test_tokenize_drops_stopwords(self):
+        assert tokenize("The invoice is routed to the AP Manager") == ["invoice", "routed", "ap", "manager"]
+
+
+class TestRetrieval:
+    """Test BM25 ranking and budgeted selection."""
+
+    @pytest.fixture
+    def index(self):
+        return KnowledgeIndex(chunk_document(APQC.read_text(encoding='utf-8'), "apqc-activities.md"))
+
+    @pytest.mark.parametrize("query, prefix", [
+        ("vendor invoice received by email and mail, scanned", "3.2.1"),
+        ("new hire background check and criminal record verification", "4.1.2"),
+        ("send the formal purchase order to the vendor", "5.1.6"),
+    ])
+    def test_best_match(self, index, query, prefix):
+        (_, best), *_ = index.search(query)
+
+        assert best.heading.rsplit(" > ", 1)[1].startswith(prefix)
+
+    def test_select_respects_budget_and_source_order(self, index):
+        selected = index.select(ANALYSIS.read_text(encoding='utf-8'), token_budget=1000)
+
+        assert sum(c.tokens for c in selected) <= 1000
+        assert [c.position for c in selected] == sorted(c.position for c in selected)
+        assert any("5.1." in c.heading for c in selected)
+        assert index.select("unrelated zebra", token_budget=1000) == []
+
+    def test_top_k(self, index):
+        assert len(index.select("invoice approval", token_budget=100000, top_k=3)) == 3
+
+
+class TestSkillManagerIndex:
+    """Test index caching in SkillManager."""
+
+    def test_index_is_cached_until_a_file_changes(self, tmp_path):
+        knowledge = tmp_path / "demo" / "domain-knowledge"
+        knowledge.mkdir(parents=True)
+        (knowledge / "README.md").write_text("# Readme\n\nAbout invoices", encoding='utf-8')
+        reference = knowledge / "reference.md"
+        reference.write_text("# Reference\n\n## Invoices\n\nPay invoices", encoding='utf-8')
+        manager = SkillManager(skills_root=tmp_path, registry=SkillRegistry())
+
+        first = manager.knowledge_index("demo")
+        assert manager.knowledge_index("demo") is first
+        assert {c.source for c in first.chunks} == {"reference.md"}
+
+        reference.write_text("# Reference\n\n## Payments\n\nPay vendors on time", encoding='utf-8')
+        os.utime(reference, ns=(0, 10**9))
+        second = manager.knowledge_index("demo")
+
+        assert second is not first
+        assert [c.heading for c in second.chunks] == ["Reference > Payments"]
+
+
+class TestComponentRetrieval:
+    """Test components sending retrieved excerpts instead of whole files."""
+
+    def test_transcript_processor_sends_relevant_examples(self):
+        component = TranscriptProcessor(api_key="test-key")
+        component._client = fake_client(Path("outputs/analysis/ap-process-analysis.md").read_text(encoding='utf-8'))
+
+        result = component.process(TRANSCRIPT.read_text(encoding='utf-8'), knowledge_budget=3000)
+
+        assert result.success, result.error
+        excerpts = component._client.messages.calls[0]["system"][-1]["text"]
+        assert excerpts.startswith("# Domain Knowledge Excerpts")
+        assert len(excerpts) < 3000 * 4 + 1000
+        assert "[example-01-ap-analysis.md]" in excerpts
+
+    def test_bpmn_generator_sends_matching_activities(self):
+        component = BPMNGenerator(api_key="test-key")
+        component._client = fake_client("<bpmn:definitions/>")
+
+        component.process(ANALYSIS.read_text(encoding='utf-8'), apqc_reference="prompt", knowledge_budget=1000)
+
+        reference = component._client.messages.calls[0]["system"][1]["text"]
+        assert reference.startswith("# APQC Level 4 Activities Reference")
+        assert len(reference) < len(APQC.read_text(encoding='utf-8')) / 2
+        assert "5.1.3 Route for Approval" in reference
+
+    def test_whole_files_without_budget(self):
+        component = BPMNGenerator(api_key="test-key")
+        component._client = fake_client("<bpmn:definitions/>")
+
+        component.process(ANALYSIS.read_text(encoding='utf-8'), apqc_reference="prompt")
+
+        reference = component._client.messages.calls[0]["system"][1]["text"]
+        assert reference.endswith(get_skill_manager().load_domain_knowledge('bpmn-generation', 'apqc-activities.md'))
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
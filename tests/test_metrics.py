@@ -0,0 +1,134 @@
+"""
+Unit tests for per-stage instrumentation and metrics sinks.
+"""
+
+import json
+
+import pytest
+
+from src.components.input.transcript_processor import TranscriptProcessor
+from src.pipeline import Pipeline
+from src.runtime.metrics import (
+    JSONLinesMetricsSink,
+    MetricsSink,
+    PrometheusTextfileSink,
+    build_component_span,
+)
+from tests.test_components import fake_client, sample_analysis, sample_transcript  # noqa: F401 (fixtures)
+from tests.test_pipeline import StubComponent
+
+
+class ListSink(MetricsSink):
+    """Sink collecting events in memory."""
+
+    def __init__(self):
+        self.events = []
+
+    def emit(self, event):
+        self.events.append(event)
+
+
+class TestComponentSpans:
+    """Test spans recorded by components and the pipeline."""
+
+    def test_component_records_stage_timings(self, sample_transcript, sample_analysis):
+        component = TranscriptProcessor(api_key="test-key")
+        component._client = fake_client(sample_analysis)
+
+        result = component.process(sample_transcript)
+
+        assert set(result.metadata["timings"]) == {"validation", "request_build", "api", "postprocess"}
+
+    def test_pipeline_emits_spans_and_run_event(self, sample_transcript, sample_analysis, tmp_path):
+        component = TranscriptProcessor(api_key="test-key")
+        component._client = fake_client(sample_analysis)
+        sink = ListSink()
+        pipeline = Pipeline(name="metrics", metrics_sink=sink)
+        pipeline.add_component(component)
+
+        result = pipeline.execute(sample_transcript, stream_dir=tmp_path)
+        result.save_outputs(tmp_path)
+
+        span = result.metadata["stages"]["Transcript Analysis"]
+        for stage in ("queue_wait", "validation", "api", "time_to_first_token", "postprocess", "file_write"):
+            assert stage in span
+        assert span["output_tokens"] == 50
+        assert span["output_tokens_per_second"] > 0
+
+        assert [e["event"] for e in sink.events] == ["component_span", "pipeline_run", "file_write"]
+        assert len({e["run_id"] for e in sink.events}) == 1
+        assert sink.events[1]["success"] is True
+
+    def test_failed_component_still_emits_span(self):
+        sink = ListSink()
+        pipeline = Pipeline(name="failing", metrics_sink=sink)
+        pipeline.add_component(StubComponent("A", fail=True))
+
+        pipeline.execute("in")
+
+        assert sink.events[0]["event"] == "component_span"
+        assert sink.events[0]["success"] is False
+
+    def test_broken_sink_does_not_fail_run(self):
+        class BrokenSink(MetricsSink):
+            def emit(self, event):
+                raise OSError("disk full")
+
+        pipeline = Pipeline(name="broken sink", metrics_sink=BrokenSink())
+        pipeline.add_component(StubComponent("A"))
+
+        assert pipeline.execute("in").success
+
+    @pytest.mark.asyncio
+    async def test_async_pipeline_records_queue_wait(self):
+        pipeline = Pipeline(name="async", max_workers=1)
+        pipeline.add_component(StubComponent("A"))
+        pipeline.add_component(StubComponent("B"), config={"input_from": "A"})
+
+        result = await pipeline.aexecute("in")
+
+        assert set(result.metadata["stages"]) == {"A", "B"}
+        assert result.metadata["stages"]["B"]["queue_wait"] >= 0
+
+
+class TestSinks:
+    """Test JSON-lines and Prometheus textfile output."""
+
+    def span_event(self, **overrides):
+        span = build_component_span(
+            "Transcript Analysis",
+            {"timings": {"api": 2.0}, "input_tokens": 100, "output_tokens": 50},
+            queue_wait=0.5, total=2.5, file_write=0.0, success=True
+        )
+        return {"event": "component_span", "pipeline": "p", **span, **overrides}
+
+    def test_output_tokens_per_second_excludes_first_token(self):
+        span = build_component_span(
+            "X", {"timings": {"api": 3.0}, "output_tokens": 200, "time_to_first_token": 1.0},
+            queue_wait=0.0, total=3.0, file_write=0.0, success=True
+        )
+        assert span["output_tokens_per_second"] == 100
+
+    def test_jsonl_sink_appends_events(self, tmp_path):
+        sink = JSONLinesMetricsSink(tmp_path / "metrics" / "events.jsonl")
+        sink.emit(self.span_event())
+        sink.emit(self.span_event())
+
+        lines = (tmp_path / "metrics" / "events.jsonl").read_text().splitlines()
+        assert len(lines) == 2
+        assert json.loads(lines[0])["component"] == "Transcript Analysis"
+
+    def test_prometheus_sink_aggregates(self, tmp_path):
+        path = tmp_path / "agent.prom"
+        sink = PrometheusTextfileSink(path)
+        sink.emit(self.span_event())
+        sink.emit(self.span_event())
+        sink.emit({"event": "pipeline_run", "pipeline": "p", "success": True, "duration": 4.0})
+
+        text = path.read_text()
+        labels = 'component="Transcript Analysis",pipeline="p",stage="api"'
+        assert f"transformation_agent_stage_seconds_sum{{{labels}}} 4" in text
+        assert f"transformation_agent_stage_seconds_count{{{labels}}} 2" in text
+        assert "# TYPE transformation_agent_stage_seconds summary" in text
+        assert 'transformation_agent_pipeline_runs_total{pipeline="p",status="success"} 1' in text
+        assert 'direction="output"' in text
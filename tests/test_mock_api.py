@@ -0,0 +1,54 @@
+"""
+Tests for the offline mock Messages API used by the benchmark suite.
+
+These run the real Anthropic SDK against a local server, so they need no
+API key or network access.
+"""
+
+from pathlib import Path
+
+import pytest
+
+from benchmarks.mock_api import MockConfig, MockMessagesAPI
+from src.main import create_full_pipeline
+from src.runtime.client_pool import ClientPool
+
+TRANSCRIPT = Path("data/sample-transcripts/ap-process.txt")
+
+
+@pytest.fixture
+def mock_api():
+    with MockMessagesAPI(MockConfig(time_scale=0.0)) as api:
+        yield api
+
+
+@pytest.fixture
+def transcript():
+    if not TRANSCRIPT.exists():
+        pytest.skip(f"Sample transcript not found: {TRANSCRIPT}")
+    return TRANSCRIPT.read_text(encoding='utf-8')
+
+
+class TestMockMessagesAPI:
+    """Test replay, streaming and prompt-cache simulation."""
+
+    def test_full_pipeline_replays_recorded_outputs(self, mock_api, transcript, tmp_path):
+        pipeline = create_full_pipeline(api_key="test-key", client_pool=ClientPool(base_url=mock_api.url))
+
+        result = pipeline.execute(transcript, stream_dir=tmp_path)
+
+        assert result.success, result.errors
+        assert "bpmn:definitions" in result.outputs["BPMN Generation"]
+        assert "Quick Wins" in result.outputs["Process Optimization"]
+        assert result.metadata["Transcript Analysis"]["streamed"] is True
+        assert mock_api.requests == 3
+
+    def test_repeat_requests_read_prompt_cache(self, mock_api, transcript):
+        pool = ClientPool(base_url=mock_api.url)
+
+        first = create_full_pipeline(api_key="test-key", client_pool=pool).execute(transcript)
+        second = create_full_pipeline(api_key="test-key", client_pool=pool).execute(transcript)
+
+        assert first.metadata["prompt_cache"]["cache_read_input_tokens"] == 0
+        assert first.metadata["prompt_cache"]["cache_creation_input_tokens"] > 0
+        assert second.metadata["prompt_cache"]["hit_ratio"] > 0
@@ -0,0 +1,256 @@
+"""
+Unit tests for pipeline orchestration.
+
+These tests use stub components so they run without an API key.
+"""
+
+import threading
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from src.interfaces.component import BaseComponent, ComponentResult
+from src.interfaces.process_analysis import ProcessAnalysis
+from src.pipeline import Pipeline
+from src.runtime.checkpoint import CheckpointStore
+from src.skills.skill_registry import get_skill_registry
+
+
+class StubComponent(BaseComponent):
+    """Component that transforms its input locally instead of calling Claude."""
+
+    def __init__(self, name: str, transform=None, fail: bool = False, barrier=None):
+        super().__init__(api_key="test-key")
+        self._name = name
+        self._transform = transform or (lambda text: f"{text}>{name}")
+        self._fail = fail
+        self._barrier = barrier
+        self.received = []
+
+    @property
+    def component_name(self) -> str:
+        return self._name
+
+    @property
+    def skill_path(self) -> Path:
+        return Path("SKILL.md")
+
+    def validate_input(self, input_data: Any) -> bool:
+        if input_data is None:
+            raise ValueError("Input cannot be None")
+        return True
+
+    def process(self, input_data: Any, **kwargs) -> ComponentResult:
+        self.received.append(input_data)
+        if self._barrier is not None:
+            self._barrier.wait(timeout=5)
+        try:
+            self.validate_input(input_data)
+        except ValueError as e:
+            return ComponentResult(success=False, data=None, error=f"Validation error: {e}")
+        if self._fail:
+            return ComponentResult(success=False, data=None, error="stub failure")
+        return ComponentResult(success=True, data=self._transform(input_data),
+                               metadata={"component": self._name})
+
+
+class TestPipelineScheduling:
+    """Test dependency resolution and concurrent execution."""
+
+    def test_sequential_chain_by_default(self):
+        pipeline = Pipeline(name="chain")
+        pipeline.add_component(StubComponent("A"))
+        pipeline.add_component(StubComponent("B"))
+        pipeline.add_component(StubComponent("C"))
+
+        result = pipeline.execute("in")
+
+        assert result.success
+        assert result.outputs["C"] == "in>A>B>C"
+        assert list(result.outputs) == ["A", "B", "C"]
+        assert result.metadata["dependencies"] == {"A": None, "B": "A", "C": "B"}
+
+    def test_independent_branches_run_concurrently(self):
+        # Both branches must be in flight at once for the barrier to release
+        barrier = threading.Barrier(2)
+        pipeline = Pipeline(name="fan-out")
+        pipeline.add_component(StubComponent("Analysis"))
+        pipeline.add_component(StubComponent("BPMN", barrier=barrier))
+        pipeline.add_component(StubComponent("Optimization", barrier=barrier),
+                               config={"input_from": "Analysis"})
+
+        result = pipeline.execute("in")
+
+        assert result.success
+        assert result.outputs["BPMN"] == "in>Analysis>BPMN"
+        assert result.outputs["Optimization"] == "in>Analysis>Optimization"
+
+    def test_stop_on_error_skips_dependents(self):
+        downstream = StubComponent("B")
+        pipeline = Pipeline(name="failing")
+        pipeline.add_component(StubComponent("A", fail=True))
+        pipeline.add_component(downstream)
+
+        result = pipeline.execute("in")
+
+        assert not result.success
+        assert downstream.received == []
+        assert result.metadata["completed_components"] == 1
+        assert "A failed: stub failure" in result.errors
+
+    def test_continue_on_error_passes_none(self):
+        downstream = StubComponent("B")
+        pipeline = Pipeline(name="failing")
+        pipeline.add_component(StubComponent("A", fail=True))
+        pipeline.add_component(downstream)
+
+        result = pipeline.execute("in", stop_on_error=False)
+
+        assert not result.success
+        assert downstream.received == [None]
+        assert len(result.errors) == 2
+
+    def test_unknown_input_from(self):
+        pipeline = Pipeline(name="broken")
+        pipeline.add_component(StubComponent("A"), config={"input_from": "Missing"})
+
+        result = pipeline.execute("in")
+
+        assert not result.success
+        assert "Component 'Missing' output not found" in result.errors[0]
+
+
+class TestAsyncPipeline:
+    """Test aexecute() on the event loop."""
+
+    @pytest.mark.asyncio
+    async def test_aexecute_fan_out(self):
+        pipeline = Pipeline(name="async fan-out")
+        pipeline.add_component(StubComponent("Analysis"))
+        pipeline.add_component(StubComponent("BPMN"))
+        pipeline.add_component(StubComponent("Optimization"), config={"input_from": "Analysis"})
+
+        result = await pipeline.aexecute("in")
+
+        assert result.success
+        assert result.outputs == {
+            "Analysis": "in>Analysis",
+            "BPMN": "in>Analysis>BPMN",
+            "Optimization": "in>Analysis>Optimization",
+        }
+
+    @pytest.mark.asyncio
+    async def test_aexecute_stop_on_error(self):
+        downstream = StubComponent("B")
+        pipeline = Pipeline(name="async failing")
+        pipeline.add_component(StubComponent("A", fail=True))
+        pipeline.add_component(downstream)
+
+        result = await pipeline.aexecute("in")
+
+        assert not result.success
+        assert downstream.received == []
+
+
+class CheckpointedStub(StubComponent):
+    """Stub whose skill prompt is a file the test controls."""
+
+    def __init__(self, name: str, skill: Path, **kwargs):
+        super().__init__(name, **kwargs)
+        self._skill = skill
+
+    @property
+    def skill_path(self) -> Path:
+        return self._skill
+
+
+class TestCheckpoints:
+    """Test stage checkpointing and resume."""
+
+    @pytest.fixture
+    def skill(self, tmp_path):
+        path = tmp_path / "SKILL.md"
+        path.write_text("Skill v1", encoding='utf-8')
+        yield path
+        get_skill_registry().invalidate(path)
+
+    def build(self, store, skill, fail_last=False, last_config=None):
+        stages = [CheckpointedStub("A", skill), CheckpointedStub("B", skill),
+                  CheckpointedStub("C", skill, fail=fail_last)]
+        pipeline = Pipeline(name="checkpointed", checkpoint_store=store)
+        for stage in stages[:2]:
+            pipeline.add_component(stage)
+        pipeline.add_component(stages[2], config=last_config)
+        return pipeline, stages
+
+    def test_resume_reruns_only_the_failed_stage(self, tmp_path, skill):
+        store = CheckpointStore(tmp_path / "checkpoints")
+        failed = self.build(store, skill, fail_last=True)[0].execute("in")
+        pipeline, (a, b, c) = self.build(store, skill)
+
+        result = pipeline.execute("in", resume=True)
+
+        assert not failed.success
+        assert result.success
+        assert result.outputs["C"] == "in>A>B>C"
+        assert a.received == [] and b.received == [] and c.received == ["in>A>B"]
+        assert result.metadata["A"]["checkpoint"] == "restored"
+        assert "checkpoint" not in result.metadata["C"]
+        assert store.stats() == {"hits": 2, "misses": 1, "writes": 3}
+
+    def test_config_and_skill_changes_invalidate(self, tmp_path, skill):
+        store = CheckpointStore(tmp_path / "checkpoints")
+        self.build(store, skill)[0].execute("in")
+
+        pipeline, (a, b, c) = self.build(store, skill, last_config={"business_context": "Budget: $200K"})
+        pipeline.execute("in", resume=True)
+        assert (len(a.received), len(b.received), len(c.received)) == (0, 0, 1)
+
+        skill.write_text("Skill v2", encoding='utf-8')
+        get_skill_registry().invalidate(skill)
+        pipeline, (a, b, c) = self.build(store, skill)
+        pipeline.execute("in", resume=True)
+        assert (len(a.received), len(b.received), len(c.received)) == (1, 1, 1)
+
+    def test_without_resume_checkpoints_are_written_not_read(self, tmp_path, skill):
+        store = CheckpointStore(tmp_path / "checkpoints")
+        self.build(store, skill)[0].execute("in")
+        pipeline, (a, _, _) = self.build(store, skill)
+
+        pipeline.execute("in")
+
+        assert a.received == ["in"]
+        assert store.stats()["hits"] == 0
+
+    def test_analysis_output_is_restored_as_process_analysis(self, tmp_path, skill):
+        analysis_text = Path("outputs/analysis/example-01-ap-analysis-test.md").read_text(encoding='utf-8')
+        store = CheckpointStore(tmp_path / "checkpoints")
+
+        def run():
+            stage = CheckpointedStub("Analysis", skill, transform=lambda _: ProcessAnalysis.parse(analysis_text))
+            pipeline = Pipeline(name="analysis", checkpoint_store=store)
+            pipeline.add_component(stage)
+            return pipeline.execute("in", resume=True), stage
+
+        first, _ = run()
+        second, stage = run()
+
+        assert stage.received == []
+        assert isinstance(second.outputs["Analysis"], ProcessAnalysis)
+        assert str(second.outputs["Analysis"]) == str(first.outputs["Analysis"])
+
+    @pytest.mark.asyncio
+    async def test_aexecute_resume(self, tmp_path, skill):
+        store = CheckpointStore(tmp_path / "checkpoints")
+        await self.build(store, skill, fail_last=True)[0].aexecute("in")
+        pipeline, (a, _, c) = self.build(store, skill)
+
+        result = await pipeline.aexecute("in", resume=True)
+
+        assert result.success
+        assert a.received == [] and c.received == ["in>A>B"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
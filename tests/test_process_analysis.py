@@ -0,0 +1,147 @@
+"""
+Unit tests for the typed ProcessAnalysis model.
+"""
+
+from pathlib import Path
+
+import pytest
+
+from src.components.generation.bpmn_generator import BPMNGenerator
+from src.components.input.transcript_processor import TranscriptProcessor
+from src.components.optimization.recommendation_engine import RecommendationEngine
+from src.interfaces.process_analysis import ProcessAnalysis
+from src.pipeline import Pipeline
+from tests.test_components import fake_client, sample_analysis, sample_bpmn, sample_transcript  # noqa: F401 (fixtures)
+
+ANALYSES = sorted(Path("outputs/analysis").glob("*.md"))
+
+
+class TestParsing:
+    """Test the single-pass markdown parser."""
+
+    @pytest.mark.parametrize("path", ANALYSES, ids=lambda p: p.name)
+    def test_round_trip_is_lossless(self, path):
+        text = path.read_text(encoding='utf-8')
+
+        analysis = ProcessAnalysis.parse(text)
+
+        assert analysis.to_markdown() == text
+        assert str(analysis) == text
+        assert len(analysis) == len(text)
+
+    def test_empty_analysis_is_truthy(self):
+        analysis = ProcessAnalysis.parse("")
+
+        assert len(analysis) == 0
+        assert analysis
+
+    def test_typed_records(self, sample_analysis):
+        analysis = ProcessAnalysis.parse(sample_analysis)
+
+        assert analysis.title == "Process Analysis: Accounts Payable Invoice Processing"
+        step = analysis.steps[0]
+        assert (step.number, step.name) == ("1", "Receive Invoice")
+        assert step.actor == "AP Clerk (Sarah Mitchell)"
+        assert step.duration == "Continuous/as received"
+        assert analysis.steps[5].extra["Frequency"] == "10-15% of invoices"
+
+        decision = analysis.decision_points[0]
+        assert decision.name == "Invoice Channel Routing"
+        assert decision.outcomes[0].startswith("Path A: Email (60%)")
+        assert len(decision.outcomes) == 4
+
+        assert analysis.actors[1].role == "AP Manager (Linda)"
+        assert analysis.systems[0].integration_points == "Steps 1, 2, 6, 9, 15"
+        assert analysis.pain_points[0].category == "Critical Issues"
+        assert "Impact" in analysis.pain_points[0].details
+        assert analysis.metrics[0].name == "Total Steps"
+        assert analysis.summary.startswith("The Accounts Payable Invoice Processing process")
+
+    def test_headings_inside_code_fences_are_ignored(self):
+        text = "# T\n\n## Process Steps\n\n```\n## Not a section\n### Step 9: Fake\n```\n"
+
+        analysis = ProcessAnalysis.parse(text)
+
+        assert [heading for heading, _ in analysis.blocks] == ["Process Steps"]
+        assert analysis.steps == []
+        assert analysis.to_markdown() == text
+
+
+class TestRendering:
+    """Test section selection and string compatibility."""
+
+    def test_render_selected_sections(self, sample_analysis):
+        analysis = ProcessAnalysis.parse(sample_analysis)
+
+        subset = analysis.to_markdown(["Process Steps", "Decision Points"])
+
+        assert subset.startswith("# Process Analysis")
+        assert "## Process Steps" in subset and "## Decision Points" in subset
+        assert "## Pain Points" not in subset
+        assert len(subset) < len(sample_analysis)
+
+    def test_string_compatibility(self, sample_analysis):
+        analysis = ProcessAnalysis.parse(sample_analysis)
+
+        assert "## Process Steps" in analysis
+        assert "not in the analysis" not in analysis
+        assert analysis.has_section("Pain Points")
+        assert not analysis.has_section("Appendix")
+
+    def test_coerce(self, sample_analysis):
+        analysis = ProcessAnalysis.parse(sample_analysis)
+
+        assert ProcessAnalysis.coerce(analysis) is analysis
+        assert ProcessAnalysis.coerce(sample_analysis) == analysis
+        with pytest.raises(ValueError):
+            ProcessAnalysis.coerce(42)
+
+
+class TestComponents:
+    """Test components producing and consuming ProcessAnalysis."""
+
+    def test_transcript_processor_returns_model(self, sample_transcript, sample_analysis):
+        component = TranscriptProcessor(api_key="test-key")
+        component._client = fake_client(sample_analysis)
+
+        result = component.process(sample_transcript)
+
+        assert isinstance(result.data, ProcessAnalysis)
+        assert str(result.data) == sample_analysis
+        assert result.metadata["analysis_stats"]["decision_points"] == 7
+
+    def test_bpmn_generator_sends_only_needed_sections(self, sample_analysis, sample_bpmn):
+        component = BPMNGenerator(api_key="test-key")
+        component._client = fake_client(sample_bpmn)
+
+        result = component.process(ProcessAnalysis.parse(sample_analysis), include_apqc=False)
+
+        user_message = component._client.messages.calls[0]["messages"][0]["content"]
+        assert result.success
+        assert "## Decision Points" in user_message
+        assert "## Process Metrics" not in user_message
+        assert "## Notes and Observations" not in user_message
+
+    def test_recommendation_engine_validates_fields(self):
+        component = RecommendationEngine(api_key="test-key")
+
+        result = component.process(ProcessAnalysis.parse("# Analysis\n\n## Process Steps\n\n### Step 1: A\n"))
+
+        assert not result.success
+        assert "## Pain Points" in result.error
+
+    def test_pipeline_saves_markdown(self, tmp_path, sample_transcript, sample_analysis, sample_bpmn):
+        processor = TranscriptProcessor(api_key="test-key")
+        processor._client = fake_client(sample_analysis)
+        generator = BPMNGenerator(api_key="test-key")
+        generator._client = fake_client(sample_bpmn)
+        pipeline = Pipeline("Test")
+        pipeline.add_component(processor, config={})
+        pipeline.add_component(generator, config={"include_apqc": False})
+
+        result = pipeline.execute(sample_transcript)
+        result.save_outputs(tmp_path)
+
+        assert result.success, result.errors
+        saved = (tmp_path / "transcript-analysis-analysis.md").read_text(encoding='utf-8')
+        assert saved == sample_analysis
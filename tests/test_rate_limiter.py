@@ -0,0 +1,173 @@
+"""
+Unit tests for the rate-limit-aware request scheduler.
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from src.components.input.transcript_processor import TranscriptProcessor
+from src.runtime.rate_limiter import RateLimits, RequestScheduler, TokenBucket, estimate_input_tokens
+from tests.test_components import _response, sample_analysis, sample_transcript  # noqa: F401 (fixtures)
+
+
+class FakeClock:
+    """Manually advanced clock whose sleep just moves time forward."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+    async def async_sleep(self, seconds):
+        self.sleep(seconds)
+
+
+class FakeAPIError(Exception):
+    """Exception shaped like an Anthropic APIStatusError."""
+
+    def __init__(self, status_code, headers=None):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.response = SimpleNamespace(headers=headers or {})
+
+
+def make_scheduler(clock, **kwargs):
+    return RequestScheduler(clock=clock, sleep=clock.sleep, async_sleep=clock.async_sleep, **kwargs)
+
+
+def usage(input_tokens=100, output_tokens=50):
+    return {"input_tokens": input_tokens, "output_tokens": output_tokens}
+
+
+class TestTokenBucket:
+    """Test bucket refill and debt."""
+
+    def test_reserve_waits_for_refill(self):
+        bucket = TokenBucket(60, now=0.0)  # 1 token per second
+
+        assert bucket.reserve(60, now=0.0) == 0.0
+        assert bucket.reserve(3, now=0.0) == pytest.approx(3.0)
+        # Debt carries over: the next caller queues behind the previous one
+        assert bucket.reserve(1, now=1.0) == pytest.approx(3.0)
+
+    def test_oversized_reservation_is_capped(self):
+        bucket = TokenBucket(10, now=0.0)
+        assert bucket.reserve(1000, now=0.0) == 0.0
+
+
+class TestRequestScheduler:
+    """Test pacing and retries."""
+
+    def test_estimate_input_tokens(self):
+        assert estimate_input_tokens([{"type": "text", "text": "x" * 400}], "y" * 400) == 200
+
+    def test_requests_per_minute_paces_steadily(self):
+        clock = FakeClock()
+        scheduler = make_scheduler(clock, limits={"m": RateLimits(requests_per_minute=60)})
+        scheduler._state("m").requests.tokens = 0  # Start from an empty bucket
+
+        for _ in range(3):
+            scheduler.run("m", lambda: ("ok", usage()), input_tokens=10, max_tokens=100)
+
+        assert clock.sleeps == pytest.approx([1.0, 1.0, 1.0])
+
+    def test_output_reservation_is_settled_with_actual_usage(self):
+        clock = FakeClock()
+        scheduler = make_scheduler(
+            clock, limits={"m": RateLimits(output_tokens_per_minute=6000)}, default_output_tokens=2000
+        )
+
+        scheduler.run("m", lambda: ("ok", usage(output_tokens=500)), input_tokens=10, max_tokens=4000)
+
+        # 2000 reserved, 500 used: 1500 refunded
+        assert scheduler._state("m").output_tokens.tokens == pytest.approx(5500)
+
+    def test_rate_limit_retry_honors_retry_after(self):
+        clock = FakeClock()
+        scheduler = make_scheduler(clock)
+        attempts = []
+
+        def send():
+            attempts.append(clock.now)
+            if len(attempts) == 1:
+                raise FakeAPIError(429, {"retry-after": "7"})
+            return "ok", usage()
+
+        text, metadata = scheduler.run("m", send, input_tokens=10, max_tokens=100)
+
+        assert text == "ok"
+        assert metadata["retries"] == 1
+        assert 7.0 <= attempts[1] <= 7.0 + scheduler.base_delay
+        assert scheduler.stats()["rate_limited"] == 1
+
+    def test_backoff_grows_and_gives_up(self):
+        clock = FakeClock()
+        scheduler = make_scheduler(clock, max_retries=3, base_delay=1.0)
+
+        def send():
+            raise FakeAPIError(529)
+
+        with pytest.raises(FakeAPIError):
+            scheduler.run("m", send, input_tokens=10, max_tokens=100)
+
+        assert len(clock.sleeps) == 3
+        for attempt, delay in enumerate(clock.sleeps):
+            assert 2 ** attempt / 2 <= delay <= 2 ** attempt
+
+    def test_non_retryable_error_raises_immediately(self):
+        clock = FakeClock()
+        scheduler = make_scheduler(clock)
+
+        def send():
+            raise FakeAPIError(400)
+
+        with pytest.raises(FakeAPIError):
+            scheduler.run("m", send, input_tokens=10, max_tokens=100)
+        assert clock.sleeps == []
+
+    @pytest.mark.asyncio
+    async def test_async_retry(self):
+        clock = FakeClock()
+        scheduler = make_scheduler(clock)
+        attempts = []
+
+        async def send():
+            attempts.append(clock.now)
+            if len(attempts) == 1:
+                raise ConnectionError("reset")
+            return "ok", usage()
+
+        text, metadata = await scheduler.arun("m", send, input_tokens=10, max_tokens=100)
+
+        assert text == "ok"
+        assert metadata["retries"] == 1
+
+
+class TestComponentScheduling:
+    """Test that component API calls go through the scheduler."""
+
+    def test_component_retries_rate_limited_call(self, sample_transcript, sample_analysis):
+        clock = FakeClock()
+        component = TranscriptProcessor(api_key="test-key", scheduler=make_scheduler(clock))
+        responses = [FakeAPIError(429, {"retry-after": "2"}), _response(sample_analysis)]
+
+        def create(**kwargs):
+            response = responses.pop(0)
+            if isinstance(response, Exception):
+                raise response
+            return response
+
+        component._client = SimpleNamespace(messages=SimpleNamespace(create=create))
+
+        result = component.process(sample_transcript)
+
+        assert result.success
+        assert result.metadata["retries"] == 1
+        assert result.metadata["rate_limit_wait"] >= 2.0
@@ -0,0 +1,156 @@
+"""
+Unit tests for sectioned recommendation generation.
+"""
+
+import re
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from benchmarks.mock_api import MockConfig, MockMessagesAPI
+from src.components.optimization.recommendation_engine import (
+    DEPENDENT_SECTIONS, PLAN_SECTIONS, RECOMMENDATION_SECTIONS, RecommendationEngine, section_text
+)
+from src.runtime.client_pool import ClientPool
+from tests.test_components import AsyncRoutingMessages, RoutingMessages
+
+ANALYSIS = Path("outputs/analysis/example-01-ap-analysis-test.md")
+RECOMMENDATIONS = Path("outputs/recommendations/example-01-ap-recommendations-generated.md")
+
+
+def requested_heading(kwargs) -> str:
+    return re.search(r"Write only the `## (.+?)` section", kwargs["messages"][0]["content"]).group(1)
+
+
+def section_messages(respond, asynchronous=False):
+    """Fake messages API answering each section request with ``respond(heading)``."""
+    messages_class = AsyncRoutingMessages if asynchronous else RoutingMessages
+    return messages_class(lambda request: respond(requested_heading(request)))
+
+
+def recorded_section(heading: str) -> str:
+    return section_text(RECOMMENDATIONS.read_text(encoding='utf-8'), heading)
+
+
+def section_headings(markdown: str) -> list:
+    return [line[3:] for line in markdown.splitlines() if line.startswith("## ")]
+
+
+class TestSectionText:
+    """Test extracting sections from a recommendations document."""
+
+    def test_matches_heading_without_qualifier(self):
+        text = RECOMMENDATIONS.read_text(encoding='utf-8')
+
+        quick_wins = section_text(text, "Quick Wins")
+
+        assert quick_wins.startswith("## Quick Wins (0-3 Months)\n")
+        assert "### Recommendation 4:" in quick_wins and "### Recommendation 5:" not in quick_wins
+        assert not quick_wins.endswith("---")
+        assert section_text(text, "Glossary") == ""
+
+    def test_section_list_follows_skill_output_format(self):
+        skill = Path("skills/process-optimization/SKILL.md").read_text(encoding='utf-8')
+        template = skill.split("## Output Format")[1].split("## Important Guidelines")[0]
+
+        assert section_headings(template) == list(RECOMMENDATION_SECTIONS)
+
+
+class TestSectionedGeneration:
+    """Test RecommendationEngine with sectioned=True."""
+
+    def test_sections_are_assembled_in_order(self):
+        component = RecommendationEngine(api_key="test-key")
+        component._client = SimpleNamespace(messages=section_messages(recorded_section))
+
+        result = component.process(ANALYSIS.read_text(encoding='utf-8'), sectioned=True,
+                                   business_context="Budget: $200K")
+
+        assert result.success, result.error
+        calls = component._client.messages.calls
+        plan_calls, dependent_calls = calls[:len(PLAN_SECTIONS)], calls[len(PLAN_SECTIONS):]
+        assert sorted(requested_heading(call) for call in plan_calls) == sorted(PLAN_SECTIONS)
+        assert sorted(requested_heading(call) for call in dependent_calls) == sorted(DEPENDENT_SECTIONS)
+        assert all(call["system"] == plan_calls[0]["system"] for call in plan_calls)
+        assert all(call["system"] == dependent_calls[0]["system"] for call in dependent_calls)
+        assert "Budget: $200K" in plan_calls[0]["system"][-1]["text"]
+        assert "cache_control" in plan_calls[0]["system"][-1]
+        # Dependent sections extend the cached prefix with the finished recommendations
+        assert dependent_calls[0]["system"][:-1] == plan_calls[0]["system"]
+        assert "### Recommendation 10:" in dependent_calls[0]["system"][-1]["text"]
+        assert result.data.startswith("# Process Optimization Recommendations: Accounts Payable")
+        assert section_headings(result.data) == list(RECOMMENDATION_SECTIONS)
+        numbers = [int(n) for n in re.findall(r"^### Recommendation (\d+):", result.data, re.MULTILINE)]
+        assert numbers == list(range(1, 11))
+        assert result.metadata["sectioned"] is True
+        assert result.metadata["warning"] is None
+        assert result.metadata["output_tokens"] == 50 * len(RECOMMENDATION_SECTIONS)
+        assert "time_to_first_token" in result.metadata
+
+    def test_headings_are_normalized(self):
+        def respond(heading):
+            if heading.startswith("Quick Wins"):
+                return "# Recommendations\n\n### Recommendation 1: Do it\n\n## Medium-Term\nNot requested"
+            if heading.startswith("Risk"):
+                return "Preamble\n\n## risk assessment summary\n\nLow"
+            if heading.startswith("Appendix"):
+                return ""
+            return f"## {heading.split(' (')[0]}\n\nText"
+
+        component = RecommendationEngine(api_key="test-key")
+        component._client = SimpleNamespace(messages=section_messages(respond))
+
+        result = component.process(ANALYSIS.read_text(encoding='utf-8'), sectioned=True, warm_cache=False)
+
+        assert result.success, result.error
+        assert section_headings(result.data) == list(RECOMMENDATION_SECTIONS)
+        assert "Not requested" not in result.data and "Preamble" not in result.data
+        assert "## Risk Assessment Summary\n\nLow" in result.data
+        assert result.metadata["warning"] == "Recommendations missing sections: Appendix: Detailed Assumptions"
+
+    def test_references_follow_renumbering(self):
+        def respond(heading):
+            if heading in PLAN_SECTIONS:
+                return (f"## {heading}\n\n### Recommendation 1: First\n\n"
+                        "### Recommendation 2: Second\n\nRequires Recommendation 1 to be live.")
+            return f"## {heading}\n\nText"
+
+        component = RecommendationEngine(api_key="test-key")
+        component._client = SimpleNamespace(messages=section_messages(respond))
+
+        result = component.process(ANALYSIS.read_text(encoding='utf-8'), sectioned=True)
+
+        assert result.success, result.error
+        long_term = section_text(result.data, "Long-Term Transformations")
+        assert "### Recommendation 5: First" in long_term
+        assert "### Recommendation 6: Second\n\nRequires Recommendation 5 to be live." in long_term
+
+    @pytest.mark.asyncio
+    async def test_async_matches_sync(self):
+        analysis = ANALYSIS.read_text(encoding='utf-8')
+        sync_component = RecommendationEngine(api_key="test-key")
+        sync_component._client = SimpleNamespace(messages=section_messages(recorded_section))
+        async_component = RecommendationEngine(api_key="test-key")
+        async_component._async_client = SimpleNamespace(messages=section_messages(recorded_section, asynchronous=True))
+
+        expected = sync_component.process(analysis, sectioned=True)
+        result = await async_component.aprocess(analysis, sectioned=True)
+
+        assert result.success, result.error
+        assert result.data == expected.data
+
+    def test_mock_api_round_trip(self):
+        with MockMessagesAPI(MockConfig(time_scale=0.0)) as api:
+            component = RecommendationEngine(api_key="test-key", client_pool=ClientPool(base_url=api.url))
+
+            result = component.process(ANALYSIS.read_text(encoding='utf-8'), sectioned=True)
+
+        assert result.success, result.error
+        assert section_headings(result.data) == list(RECOMMENDATION_SECTIONS)
+        assert result.metadata["warning"] is None
+        assert result.metadata["cache_read_input_tokens"] > 0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
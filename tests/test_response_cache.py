@@ -0,0 +1,117 @@
+"""
+Unit tests for the on-disk response cache.
+"""
+
+import os
+import time
+from pathlib import Path
+
+import pytest
+
+from src.components.input.transcript_processor import TranscriptProcessor
+from src.runtime.response_cache import ResponseCache, make_request_key
+from tests.test_components import fake_client
+
+
+SYSTEM = [{"type": "text", "text": "skill"}]
+ANALYSIS = Path("outputs/analysis/example-01-ap-analysis-test.md")
+
+
+class TestResponseCache:
+    """Test key derivation, expiry and eviction."""
+
+    def test_key_depends_on_every_request_field(self):
+        base = make_request_key("model-a", SYSTEM, "hello", 0, 16000)
+
+        assert base == make_request_key("model-a", SYSTEM, "hello", 0, 16000)
+        assert base != make_request_key("model-b", SYSTEM, "hello", 0, 16000)
+        assert base != make_request_key("model-a", [{"type": "text", "text": "x"}], "hello", 0, 16000)
+        assert base != make_request_key("model-a", SYSTEM, "hello!", 0, 16000)
+        assert base != make_request_key("model-a", SYSTEM, "hello", 0, 8000)
+
+    def test_put_and_get(self, tmp_path):
+        cache = ResponseCache(tmp_path)
+        cache.put("ab" * 32, "response", {"input_tokens": 3})
+
+        entry = cache.get("ab" * 32)
+
+        assert entry["text"] == "response"
+        assert entry["metadata"] == {"input_tokens": 3}
+        assert cache.get("cd" * 32) is None
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    def test_ttl_expiry(self, tmp_path):
+        cache = ResponseCache(tmp_path, ttl_seconds=0.01)
+        cache.put("ab" * 32, "response", {})
+        time.sleep(0.05)
+
+        assert cache.get("ab" * 32) is None
+        assert cache.size_bytes == 0
+
+    def test_lru_eviction(self, tmp_path):
+        cache = ResponseCache(tmp_path, max_bytes=1700)
+        keys = [f"{i:02d}" * 32 for i in range(3)]
+        for i, key in enumerate(keys):
+            cache.put(key, "x" * 400, {})
+            # Make access order explicit regardless of filesystem timestamp resolution
+            path = tmp_path / key[:2] / f"{key}.json"
+            os.utime(path, (1000 + i, 1000 + i))
+
+        # Touch the oldest entry so the second one becomes least recently used
+        os.utime(tmp_path / keys[0][:2] / f"{keys[0]}.json", (2000, 2000))
+        cache.put("99" * 32, "x" * 400, {})
+
+        assert cache.get(keys[1]) is None
+        assert cache.get(keys[0]) is not None
+        assert cache.size_bytes <= 1700
+        assert cache.stats()["evictions"] >= 1
+
+    def test_delete(self, tmp_path):
+        cache = ResponseCache(tmp_path)
+        cache.put("ab" * 32, "response", {})
+
+        cache.delete("ab" * 32)
+        cache.delete("cd" * 32)
+
+        assert cache.get("ab" * 32) is None
+        assert cache.size_bytes == 0
+
+
+class TestComponentCaching:
+    """Test the cache layer under BaseComponent._call_claude."""
+
+    def test_repeat_call_served_from_cache(self, tmp_path):
+        transcript = Path("data/sample-transcripts/ap-process.txt").read_text(encoding='utf-8')
+        cache = ResponseCache(tmp_path)
+        component = TranscriptProcessor(api_key="test-key", response_cache=cache)
+        component._client = fake_client(ANALYSIS.read_text(encoding='utf-8'))
+
+        first = component.process(transcript)
+        second = component.process(transcript)
+
+        assert first.metadata["response_cache"] == "miss"
+        assert second.metadata["response_cache"] == "hit"
+        assert second.data == first.data
+        assert second.metadata["response_cache_stats"]["hits"] == 1
+        assert first.metadata["input_tokens"] > 0
+        assert second.metadata["input_tokens"] == second.metadata["output_tokens"] == 0
+        assert len(component._client.messages.calls) == 1
+
+    def test_rejected_response_is_evicted(self, tmp_path):
+        transcript = Path("data/sample-transcripts/ap-process.txt").read_text(encoding='utf-8')
+        cache = ResponseCache(tmp_path)
+        component = TranscriptProcessor(api_key="test-key", response_cache=cache)
+        component._client = fake_client("## Process Steps\nanalysis")
+
+        first = component.process(transcript)
+        second = component.process(transcript)
+
+        assert first.metadata["response_cache_evicted"] == 1
+        assert second.metadata["response_cache"] == "miss"
+        assert len(component._client.messages.calls) == 2
+        assert cache.size_bytes == 0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
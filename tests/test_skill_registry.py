@@ -0,0 +1,100 @@
+"""
+Unit tests for the skill registry and skill manager.
+"""
+
+import os
+import threading
+
+import pytest
+
+from src.skills.skill_manager import SkillManager, get_skill_manager
+from src.skills.skill_registry import SkillRegistry
+
+
+@pytest.fixture
+def skills_root(tmp_path):
+    skill_dir = tmp_path / "demo-skill"
+    (skill_dir / "domain-knowledge").mkdir(parents=True)
+    (skill_dir / "SKILL.md").write_text("# Demo skill v1", encoding='utf-8')
+    (skill_dir / "domain-knowledge" / "reference.md").write_text("reference", encoding='utf-8')
+    return tmp_path
+
+
+class TestSkillRegistry:
+    """Test caching, revalidation and hashing."""
+
+    def test_unchanged_file_is_read_once(self, skills_root):
+        registry = SkillRegistry()
+        path = skills_root / "demo-skill" / "SKILL.md"
+
+        first = registry.get(path)
+        second = registry.get(path)
+
+        assert first is second
+        assert registry.stats() == {"documents": 1, "loads": 1, "hits": 1}
+
+    def test_hot_reload_on_change(self, skills_root):
+        registry = SkillRegistry()
+        path = skills_root / "demo-skill" / "SKILL.md"
+        old_hash = registry.content_hash(path)
+
+        path.write_text("# Demo skill v2 (edited)", encoding='utf-8')
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+        assert registry.read_text(path) == "# Demo skill v2 (edited)"
+        assert registry.content_hash(path) != old_hash
+
+    def test_concurrent_access(self, skills_root):
+        registry = SkillRegistry()
+        path = skills_root / "demo-skill" / "SKILL.md"
+        contents = []
+
+        threads = [threading.Thread(target=lambda: contents.append(registry.read_text(path)))
+                   for _ in range(16)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert contents == ["# Demo skill v1"] * 16
+
+    def test_missing_file(self, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            SkillRegistry().get(tmp_path / "missing.md")
+
+
+class TestSkillManager:
+    """Test SkillManager on top of a registry."""
+
+    def test_managers_share_registry(self, skills_root):
+        registry = SkillRegistry()
+        SkillManager(skills_root, registry).load_skill_prompt("demo-skill")
+        SkillManager(skills_root, registry).load_skill_prompt("demo-skill")
+
+        assert registry.stats()["loads"] == 1
+
+    def test_hashes_and_clear_cache(self, skills_root):
+        registry = SkillRegistry()
+        manager = SkillManager(skills_root, registry)
+
+        assert len(manager.skill_hash("demo-skill")) == 64
+        assert manager.domain_knowledge_hash("demo-skill", "reference.md") != manager.skill_hash("demo-skill")
+
+        manager.clear_cache()
+        assert registry.stats()["documents"] == 0
+
+    def test_missing_files_raise(self, skills_root):
+        manager = SkillManager(skills_root, SkillRegistry())
+        with pytest.raises(FileNotFoundError, match="SKILL.md not found"):
+            manager.load_skill_prompt("unknown-skill")
+        with pytest.raises(FileNotFoundError, match="Domain knowledge file not found"):
+            manager.load_domain_knowledge("demo-skill", "missing.md")
+
+    def test_default_manager_is_shared(self):
+        assert get_skill_manager() is get_skill_manager()
+        assert "transcript" in get_skill_manager().load_skill_prompt("transcript-analysis").lower()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,44 @@
+"""
+Tests for CLI startup cost: importing src.main stays lazy and within budget.
+"""
+
+import sys
+
+import pytest
+
+from benchmarks.startup import DEFERRED_MODULES, IMPORT_BUDGET_SECONDS, bench_startup, parse_importtime
+
+
+class TestStartup:
+    """Test that heavy modules are imported on first use, not at startup."""
+
+    def test_import_defers_sdk_components_and_env(self):
+        report = bench_startup(runs=1)
+
+        # The check covers what the test name promises: SDK, env loading and component modules
+        assert {"anthropic", "dotenv"} <= set(DEFERRED_MODULES)
+        assert any(name.startswith("src.components.") for name in DEFERRED_MODULES)
+        assert report["eagerly_imported"] == []
+
+    def test_import_within_budget(self):
+        report = bench_startup(runs=5)
+
+        assert report["import_seconds_median"] <= IMPORT_BUDGET_SECONDS, report["heaviest_modules"]
+
+    def test_components_load_on_first_access(self):
+        import src.components
+
+        assert src.components.BPMNGenerator.__name__ == "BPMNGenerator"
+        assert "src.components.generation.bpmn_generator" in sys.modules
+        with pytest.raises(AttributeError):
+            src.components.MissingComponent
+
+    def test_parse_importtime(self):
+        report = (
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       120 |        120 |   json.decoder\n"
+            "import time:       300 |       2500 | src.main\n"
+        )
+
+        assert parse_importtime(report) == {"json.decoder": 0.00012, "src.main": 0.0025}
+
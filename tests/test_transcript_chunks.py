@@ -0,0 +1,173 @@
+"""
+Unit tests for chunked (map-reduce) transcript analysis.
+"""
+
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from benchmarks.mock_api import MockConfig, MockMessagesAPI
+from src.components.input.transcript_chunker import split_transcript
+from src.components.input.transcript_processor import TranscriptProcessor
+from src.interfaces import ProcessAnalysis
+from src.interfaces.analysis_merge import merge_analyses, remap_step_references
+from src.runtime.client_pool import ClientPool
+from tests.test_components import FakeMessages, fake_client
+
+TRANSCRIPT = Path("data/sample-transcripts/ap-process.txt")
+AP_ANALYSIS = Path("outputs/analysis/example-01-ap-analysis-test.md")
+ONBOARDING_ANALYSIS = Path("outputs/analysis/example-02-onboarding-analysis-test.md")
+
+
+class TestSplitTranscript:
+    """Test cutting transcripts between speaker turns."""
+
+    def test_short_transcript_is_one_chunk(self):
+        text = TRANSCRIPT.read_text(encoding='utf-8')
+
+        assert split_transcript(text, len(text) * 2) == [text]
+
+    def test_chunks_overlap_on_whole_turns(self):
+        text = TRANSCRIPT.read_text(encoding='utf-8')
+        header = text.split("\n")[0]
+
+        chunks = split_transcript(text, 4000, overlap_turns=2)
+
+        assert len(chunks) > 2
+        for previous, chunk in zip(chunks, chunks[1:]):
+            assert chunk.startswith(header)
+            previous_turns = previous.split("\n\n")
+            turns = chunk.split("\n\n")
+            assert turns[1] in previous_turns
+        assert all(len(chunk) <= 4000 + len(header) + 200 for chunk in chunks)
+
+    def test_cuts_before_topic_change(self):
+        turns = [f"Interviewer: Question {i}?\n\nAnna: {'Answer text. ' * 20}" for i in range(6)]
+        turns.insert(3, "Interviewer: Let's move on to payments. How are they scheduled?\n\nAnna: Weekly.")
+        text = "\n\n".join(turns)
+
+        chunks = split_transcript(text, 1200, overlap_turns=0)
+
+        assert any(chunk.startswith("Interviewer: Let's move on to payments") for chunk in chunks[1:])
+
+
+class TestMergeAnalyses:
+    """Test reducing chunk analyses into one."""
+
+    def test_identical_analyses_collapse(self):
+        analysis = ProcessAnalysis.parse(AP_ANALYSIS.read_text(encoding='utf-8'))
+
+        merged, removed = merge_analyses([analysis, analysis, analysis])
+
+        assert merged.stats() == analysis.stats()
+        assert [step.number for step in merged.steps] == [step.number for step in analysis.steps]
+        assert removed["steps"] == 2 * len(analysis.steps)
+
+    def test_distinct_analyses_are_renumbered(self):
+        first = ProcessAnalysis.parse(AP_ANALYSIS.read_text(encoding='utf-8'))
+        second = ProcessAnalysis.parse(ONBOARDING_ANALYSIS.read_text(encoding='utf-8'))
+
+        merged, _ = merge_analyses([first, second])
+
+        numbers = [step.number for step in merged.steps]
+        assert len(numbers) == len(set(numbers)) == len(first.steps) + len(second.steps)
+        assert merged.summary.startswith(first.summary.split(".")[0])
+        reparsed = ProcessAnalysis.parse(str(merged))
+        assert reparsed.stats() == merged.stats()
+
+    def test_remap_step_references(self):
+        assert remap_step_references("After Step 2 and Steps 3-4", {"2": "7", "3": "8", "4": "9"}) == \
+            "After Step 7 and Steps 8-9"
+
+    def test_nothing_to_merge(self):
+        with pytest.raises(ValueError, match="No analyses"):
+            merge_analyses([])
+
+
+class InFlightMessages(FakeMessages):
+    """FakeMessages that records the most create() calls running at once."""
+
+    def __init__(self, text: str):
+        super().__init__(text)
+        self.lock = threading.Lock()
+        self.running = 0
+        self.peak = 0
+
+    def create(self, **kwargs):
+        with self.lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        time.sleep(0.02)
+        with self.lock:
+            self.running -= 1
+        return super().create(**kwargs)
+
+
+class TestChunkedProcessor:
+    """Test TranscriptProcessor in chunked mode."""
+
+    def test_one_call_per_chunk(self):
+        text = TRANSCRIPT.read_text(encoding='utf-8')
+        analysis = AP_ANALYSIS.read_text(encoding='utf-8')
+        component = TranscriptProcessor(api_key="test-key")
+        component._client = fake_client(analysis)
+        streamed = []
+
+        result = component.process(text, chunked=True, chunk_chars=4000, on_text=streamed.append)
+
+        assert result.success, result.error
+        calls = component._client.messages.calls
+        assert len(calls) == result.metadata["chunks"] == len(split_transcript(text, 4000)) > 1
+        assert len({str(call["system"]) for call in calls}) == 1
+        assert "part 1 of" in calls[0]["messages"][0]["content"]
+        assert result.metadata["analysis_stats"] == ProcessAnalysis.parse(analysis).stats()
+        assert result.metadata["output_tokens"] == sum(result.metadata["chunk_output_tokens"])
+        assert streamed == [str(result.data)]
+
+    def test_parallel_chunks_are_capped(self):
+        text = TRANSCRIPT.read_text(encoding='utf-8')
+        component = TranscriptProcessor(api_key="test-key")
+        component._client = SimpleNamespace(messages=InFlightMessages(AP_ANALYSIS.read_text(encoding='utf-8')))
+
+        result = component.process(text, chunked=True, chunk_chars=2000, max_parallel_chunks=2, warm_cache=False)
+
+        assert result.success, result.error
+        assert result.metadata["chunks"] > 2
+        assert component._client.messages.peak == 2
+
+    def test_short_transcript_stays_single_call(self):
+        component = TranscriptProcessor(api_key="test-key")
+        component._client = fake_client(AP_ANALYSIS.read_text(encoding='utf-8'))
+
+        result = component.process(TRANSCRIPT.read_text(encoding='utf-8'))
+
+        assert result.success, result.error
+        assert len(component._client.messages.calls) == 1
+        assert "chunked" not in result.metadata
+
+    def test_single_call_limit(self):
+        component = TranscriptProcessor(api_key="test-key")
+        component.max_single_call_chars = 100
+
+        result = component.process(TRANSCRIPT.read_text(encoding='utf-8'), chunked=False)
+
+        assert not result.success
+        assert "chunked=True" in result.error
+
+    def test_mock_api_run(self):
+        with MockMessagesAPI(MockConfig(time_scale=0.0)) as api:
+            component = TranscriptProcessor(api_key="test-key", client_pool=ClientPool(base_url=api.url))
+
+            result = component.process(TRANSCRIPT.read_text(encoding='utf-8'), chunked=True, chunk_chars=6000)
+
+        assert result.success, result.error
+        assert result.metadata["chunks"] > 1
+        assert result.metadata["cache_read_input_tokens"] > 0
+        assert result.data.steps
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,125 @@
+"""
+Unit tests for the transcript preprocessor.
+"""
+
+from pathlib import Path
+
+import pytest
+
+from src.components.input.transcript_preprocessor import (
+    TranscriptPreprocessor, normalize_whitespace, parse_turns, strip_disfluencies
+)
+from src.main import create_analysis_pipeline, create_full_pipeline
+
+TRANSCRIPT = Path("data/sample-transcripts/ap-process.txt")
+
+RAW = """Workshop notes
+---
+
+[00:00:05] INTERVIEWER:   Hi Dana, thanks for joining.
+[00:00:07] DANA LEE: Hello!   Nice to meet you.
+[00:00:10] INTERVIEWER: So, um, how do purchase requests start?
+[00:00:15] DANA LEE: Um, so the the requester fills in a form in Coupa, you know, and it goes to their manager.
+[00:00:30] DANA LEE: Uh, anything above $5,000 also needs, um, finance sign-off before the PO is issued.
+[00:00:40] INTERVIEWER: Okay. Got it.
+[00:00:41] INTERVIEWER: What happens when the manager is out?
+[00:00:45] DANA: I- I mean it just sits there. The requester fills in a form in Coupa and it goes to their manager.
+[00:00:55] INTERVIEWER: Great, thank you so much.
+"""
+
+
+class TestHelpers:
+    """Test the individual reductions."""
+
+    def test_normalize_whitespace(self):
+        assert normalize_whitespace("a\r\n\tb   c  \n\n\n\nd ") == "a\nb c\n\nd"
+
+    def test_strip_disfluencies(self):
+        assert strip_disfluencies("Um, so the the form goes, you know, to the manager.") == \
+            ("So the form goes to the manager.", 3)
+        assert strip_disfluencies("We had had two approvers.") == ("We had had two approvers.", 0)
+
+    def test_speaker_labels_are_unified(self):
+        turns = parse_turns(["DANA LEE: First.", "Note: this is not a speaker", "Interviewer: Q?", "Dana: Second.",
+                             "Interviewer: Q2?"])
+
+        assert [speaker for speaker, _ in turns] == ["Dana", "Interviewer", "Dana", "Interviewer"]
+        assert turns[0][1] == ["First. Note: this is not a speaker"]
+
+
+class TestPreprocessor:
+    """Test the component."""
+
+    def test_compacts_transcript(self):
+        result = TranscriptPreprocessor().process(RAW)
+
+        assert result.success, result.error
+        assert result.data == (
+            "Workshop notes\n---\n\n"
+            "Interviewer: So how do purchase requests start?\n\n"
+            "Dana: So the requester fills in a form in Coupa and it goes to their manager.\n"
+            "Anything above $5,000 also needs finance sign-off before the PO is issued.\n\n"
+            "Interviewer: What happens when the manager is out?\n\n"
+            "Dana: It just sits there."
+        )
+        metadata = result.metadata
+        assert metadata["compression_ratio"] == round(len(result.data) / len(RAW), 4) < 0.5
+        assert metadata["duplicate_sentences"] == 1
+        assert metadata["small_talk_sentences"] == 6
+        assert metadata["speakers"] == ["Dana", "Interviewer"]
+        assert "postprocess" in metadata["timings"]
+
+    def test_reductions_can_be_disabled(self):
+        result = TranscriptPreprocessor().process(RAW, strip_disfluencies=False, strip_small_talk=False,
+                                                  dedupe=False)
+
+        assert "Um, so the the requester" in result.data
+        assert "Nice to meet you." in result.data
+        assert result.metadata["disfluencies"] == result.metadata["small_talk_sentences"] == 0
+
+    def test_sample_transcript_keeps_content(self):
+        text = TRANSCRIPT.read_text(encoding='utf-8')
+
+        result = TranscriptPreprocessor().process(text)
+
+        assert result.success, result.error
+        assert 0.9 < result.metadata["compression_ratio"] < 1
+        assert result.metadata["speakers"] == ["Interviewer", "Jennifer"]
+        assert "three-way match" in result.data
+
+    def test_invalid_input(self):
+        result = TranscriptPreprocessor().process("   ")
+
+        assert not result.success
+        assert result.error == "Validation error: Transcript text cannot be empty"
+
+    def test_streams_output(self):
+        chunks = []
+
+        result = TranscriptPreprocessor().process(RAW, on_text=chunks.append)
+
+        assert chunks == [result.data]
+
+
+class TestPipelines:
+    """Test the preprocessing stage in the standard pipelines."""
+
+    def test_preprocessing_is_opt_in(self):
+        full = create_full_pipeline(api_key="test-key", preprocess=True)
+        analysis = create_analysis_pipeline(api_key="test-key")
+
+        assert [c.component_name for c in full.components][:2] == ["Transcript Preprocessing", "Transcript Analysis"]
+        assert [c.component_name for c in analysis.components] == ["Transcript Analysis"]
+
+    def test_component_config_by_name(self):
+        pipeline = create_full_pipeline(api_key="test-key")
+
+        pipeline.component_config("Process Optimization")["business_context"] = "Retail"
+
+        assert pipeline.component_configs[-1]["business_context"] == "Retail"
+        with pytest.raises(ValueError, match="not found"):
+            pipeline.component_config("Missing")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])